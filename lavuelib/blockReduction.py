@@ -0,0 +1,388 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+
+""" block and frame stack reductions computed in row bands
+    by a pool of threads """
+
+import threading
+import numpy as np
+
+try:
+    import concurrent.futures
+    #: (:obj:`bool`) concurrent.futures can be imported
+    FUTURES = True
+except ImportError:
+    FUTURES = False
+
+
+#: (:obj:`list` <:obj:`str`>) reduction functions
+REDUCTIONS = ["max", "min", "mean", "sum", "median",
+              "nanmax", "nanmin", "nanmean", "nansum", "nanmedian"]
+
+#: (:obj:`dict` <:obj:`str`, :class:`numpy.ufunc`>) ufuncs of reductions
+#:    computed by strided in-place operations
+UFUNCS = {
+    "max": np.maximum,
+    "min": np.minimum,
+    "mean": np.add,
+    "sum": np.add,
+    "nanmax": np.fmax,
+    "nanmin": np.fmin,
+    "nanmean": np.add,
+    "nansum": np.add,
+}
+
+#: (:obj:`int`) minimal number of image pixels reduced in parallel
+MINPARALLELSIZE = 1 << 18
+
+
+class BlockReducer(object):
+
+    """ reduces pixel blocks of images or frames of image stacks
+        splitting the work into row bands of the result
+        which are computed in a pool of threads """
+
+    #: (:obj:`int`) number of reduction threads, 0 switches it off
+    nthreads = 0
+    #: (:class:`concurrent.futures.ThreadPoolExecutor`) thread pool
+    __pool = None
+    #: (:class:`threading.Lock`) thread pool lock
+    __lock = threading.Lock()
+
+    @classmethod
+    def setNumberOfThreads(cls, nthreads):
+        """ sets a number of reduction threads
+
+        :param nthreads: number of threads, 0 switches it off
+        :type nthreads: :obj:`int`
+        """
+        nthreads = max(int(nthreads or 0), 0)
+        with cls.__lock:
+            if nthreads != cls.nthreads and cls.__pool is not None:
+                cls.__pool.shutdown(wait=False)
+                cls.__pool = None
+            cls.nthreads = nthreads
+
+    @classmethod
+    def __getPool(cls):
+        """ provides the thread pool
+
+        :returns: thread pool
+        :rtype: :class:`concurrent.futures.ThreadPoolExecutor`
+        """
+        with cls.__lock:
+            if cls.__pool is None and cls.nthreads > 0 and FUTURES:
+                cls.__pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=cls.nthreads)
+            return cls.__pool
+
+    @classmethod
+    def __bands(cls, task, rows, size):
+        """ executes the task for row bands of the result
+
+        :param task: task with the first and the last row of the band
+        :type task: :obj:`callable`
+        :param rows: number of result rows
+        :type rows: :obj:`int`
+        :param size: number of input pixels
+        :type size: :obj:`int`
+        """
+        pool = None
+        if size >= MINPARALLELSIZE and rows > 1:
+            pool = cls.__getPool()
+        if pool is None:
+            task(0, rows)
+            return
+        nbands = min(rows, 2 * cls.nthreads)
+        edges = [rows * i // nbands for i in range(nbands + 1)]
+        futures = [pool.submit(task, edges[i], edges[i + 1])
+                   for i in range(nbands)]
+        for ft in futures:
+            ft.result()
+
+    @classmethod
+    def resultType(cls, reduction, dtype):
+        """ provides the data type of the reduction result
+
+        :param reduction: reduction function
+        :type reduction: :obj:`str`
+        :param dtype: data type of the input
+        :type dtype: :class:`numpy.dtype`
+        :returns: data type of the result
+        :rtype: :class:`numpy.dtype`
+        """
+        return getattr(np, reduction)(
+            np.ones((1, 1), dtype=dtype), axis=0).dtype
+
+    @classmethod
+    def reduce(cls, image, factor, reduction="max", out=None, dtype=None):
+        """ reduces image blocks of factor x factor pixels
+            of the last two dimensions. The last blocks are partial,
+            i.e. the image is padded with pixels ignored by the reduction
+
+        :param image: 2d image or 3d image with channels in the first axis
+        :type image: :class:`numpy.ndarray`
+        :param factor: block size
+        :type factor: :obj:`int`
+        :param reduction: reduction function, i.e. max, min, mean, sum,
+                          median or their nan variants, e.g. nanmax
+        :type reduction: :obj:`str`
+        :param out: preallocated result
+        :type out: :class:`numpy.ndarray`
+        :param dtype: data type of the result if out is None
+        :type dtype: :class:`numpy.dtype`
+        :returns: reduced image
+        :rtype: :class:`numpy.ndarray`
+        """
+        if reduction not in REDUCTIONS:
+            raise ValueError(
+                "BlockReducer: unknown reduction %s" % reduction)
+        factor = int(factor)
+        if factor <= 1 and out is None and dtype is None:
+            return image
+        factor = max(factor, 1)
+        shape = image.shape
+        rshape = shape[:-2] + (-(-shape[-2] // factor),
+                               -(-shape[-1] // factor))
+        if out is None:
+            out = np.empty(
+                rshape, dtype=dtype or cls.resultType(reduction, image.dtype))
+        elif out.shape != rshape:
+            raise ValueError(
+                "BlockReducer: result shape %s instead of %s"
+                % (out.shape, rshape))
+        if not image.size:
+            return out
+        if reduction.startswith("nan") and image.dtype.kind not in "fc":
+            # integer images do not have NaNs
+            reduction = reduction[3:]
+        result = out
+        if abs(image.strides[-2]) < abs(image.strides[-1]):
+            # the blocks are reduced in the memory order,
+            # e.g. of transposed images provided by the sources
+            image = np.swapaxes(image, -1, -2)
+            out = np.swapaxes(out, -1, -2)
+        if reduction in UFUNCS:
+            task = cls.__ufuncTask(image, factor, reduction, out)
+        else:
+            task = cls.__medianTask(image, factor, reduction, out)
+        cls.__bands(task, out.shape[-2], image.size)
+        return result
+
+    @classmethod
+    def __ufuncTask(cls, image, factor, reduction, out):
+        """ provides the task reducing blocks of the result row band
+            with strided in-place ufunc operations, i.e. without copies
+            of the whole image
+
+        :param image: 2d image or 3d image with channels in the first axis
+        :type image: :class:`numpy.ndarray`
+        :param factor: block size
+        :type factor: :obj:`int`
+        :param reduction: reduction function
+        :type reduction: :obj:`str`
+        :param out: result
+        :type out: :class:`numpy.ndarray`
+        :returns: task with the first and the last row of the band
+        :rtype: :obj:`callable`
+        """
+        ufunc = UFUNCS[reduction]
+        counted = reduction in ["mean", "nanmean", "nansum"]
+        if reduction in ["max", "min", "nanmax", "nanmin"]:
+            acctype = image.dtype
+        elif reduction in ["sum", "nansum"] or out.dtype.kind in "fc":
+            acctype = out.dtype
+        else:
+            acctype = np.float64
+
+        def _reduce(src, dst):
+            # reduces rows and then columns of the blocks
+            acc = np.array(src[..., ::factor, :], dtype=acctype)
+            for shift in range(1, factor):
+                part = src[..., shift::factor, :]
+                target = acc[..., :part.shape[-2], :]
+                ufunc(target, part, out=target)
+            dst[...] = acc[..., ::factor]
+            for shift in range(1, factor):
+                part = acc[..., shift::factor]
+                target = dst[..., :part.shape[-1]]
+                ufunc(target, part, out=target, casting="unsafe")
+
+        def _task(first, last):
+            src = image[..., first * factor:last * factor, :]
+            dst = out[..., first:last, :]
+            if not counted:
+                _reduce(src, dst)
+                return
+            if reduction == "mean":
+                _reduce(src, dst)
+                rows = np.minimum(
+                    src.shape[-2] - np.arange(0, src.shape[-2], factor),
+                    factor)
+                cols = np.minimum(
+                    src.shape[-1] - np.arange(0, src.shape[-1], factor),
+                    factor)
+                counts = np.outer(rows, cols)
+            else:
+                valid = ~np.isnan(src)
+                _reduce(np.where(valid, src, 0), dst)
+                if reduction == "nansum":
+                    return
+                counts = np.empty(dst.shape, dtype=np.int64)
+                acc = np.array(valid[..., ::factor, :], dtype=np.int64)
+                for shift in range(1, factor):
+                    part = valid[..., shift::factor, :]
+                    target = acc[..., :part.shape[-2], :]
+                    np.add(target, part, out=target)
+                counts[...] = acc[..., ::factor]
+                for shift in range(1, factor):
+                    part = acc[..., shift::factor]
+                    target = counts[..., :part.shape[-1]]
+                    np.add(target, part, out=target)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                np.true_divide(dst, counts, out=dst, casting="unsafe")
+
+        return _task
+
+    @classmethod
+    def __medianTask(cls, image, factor, reduction, out):
+        """ provides the task computing medians of blocks
+            of the result row band from reshaped band copies
+
+        :param image: 2d image or 3d image with channels in the first axis
+        :type image: :class:`numpy.ndarray`
+        :param factor: block size
+        :type factor: :obj:`int`
+        :param reduction: reduction function, i.e. median or nanmedian
+        :type reduction: :obj:`str`
+        :param out: result
+        :type out: :class:`numpy.ndarray`
+        :returns: task with the first and the last row of the band
+        :rtype: :obj:`callable`
+        """
+        function = getattr(np, reduction)
+        height, width = image.shape[-2:]
+        wfull = width // factor
+
+        def _blocks(src, dst, rfactor, cfactor):
+            if not src.size:
+                return
+            blocks = src.reshape(
+                src.shape[:-2] + (src.shape[-2] // rfactor, rfactor,
+                                  src.shape[-1] // cfactor, cfactor))
+            blocks = np.moveaxis(blocks, -3, -2)
+            dst[...] = function(
+                blocks.reshape(blocks.shape[:-2] + (-1,)), axis=-1)
+
+        def _task(first, last):
+            rfirst = first * factor
+            rlast = min(last * factor, height)
+            hfull = (rlast - rfirst) // factor
+            rmid = rfirst + hfull * factor
+            cmid = wfull * factor
+            for rows, drows, rfactor in [
+                    (slice(rfirst, rmid), slice(first, first + hfull),
+                     factor),
+                    (slice(rmid, rlast), slice(first + hfull, last),
+                     rlast - rmid)]:
+                if rows.stop <= rows.start:
+                    continue
+                for cols, dcols, cfactor in [
+                        (slice(0, cmid), slice(0, wfull), factor),
+                        (slice(cmid, width), slice(wfull, None),
+                         width - cmid)]:
+                    if cols.stop <= cols.start:
+                        continue
+                    _blocks(image[..., rows, cols], out[..., drows, dcols],
+                            rfactor, cfactor)
+
+        return _task
+
+    @classmethod
+    def reduceStack(cls, stack, reduction="nansum", out=None):
+        """ reduces frames of the stack, i.e. its first axis
+
+        :param stack: stack of frames
+        :type stack: :class:`numpy.ndarray`
+        :param reduction: reduction function, i.e. max, min, mean, sum,
+                          median or their nan variants, e.g. nansum
+        :type reduction: :obj:`str`
+        :param out: preallocated result
+        :type out: :class:`numpy.ndarray`
+        :returns: reduced stack
+        :rtype: :class:`numpy.ndarray`
+        """
+        if reduction not in REDUCTIONS:
+            raise ValueError(
+                "BlockReducer: unknown reduction %s" % reduction)
+        function = getattr(np, reduction)
+        if len(stack.shape) < 2:
+            return function(stack, axis=0)
+        if out is None:
+            out = np.empty(
+                stack.shape[1:], dtype=cls.resultType(reduction, stack.dtype))
+
+        def _task(first, last):
+            out[first:last] = function(stack[:, first:last], axis=0)
+
+        cls.__bands(_task, stack.shape[1], stack.size)
+        return out
+
+
+def reduce(image, factor, reduction="max", out=None, dtype=None):
+    """ reduces image blocks of factor x factor pixels,
+        the last blocks can be partial
+
+    :param image: 2d image or 3d image with channels in the first axis
+    :type image: :class:`numpy.ndarray`
+    :param factor: block size
+    :type factor: :obj:`int`
+    :param reduction: reduction function, i.e. max, min, mean, sum,
+                      median or their nan variants, e.g. nanmax
+    :type reduction: :obj:`str`
+    :param out: preallocated result
+    :type out: :class:`numpy.ndarray`
+    :param dtype: data type of the result if out is None
+    :type dtype: :class:`numpy.dtype`
+    :returns: reduced image
+    :rtype: :class:`numpy.ndarray`
+    """
+    return BlockReducer.reduce(image, factor, reduction, out, dtype)
+
+
+def reduceStack(stack, reduction="nansum", out=None):
+    """ reduces frames of the stack, i.e. its first axis
+
+    :param stack: stack of frames
+    :type stack: :class:`numpy.ndarray`
+    :param reduction: reduction function, i.e. max, min, mean, sum,
+                      median or their nan variants, e.g. nansum
+    :type reduction: :obj:`str`
+    :param out: preallocated result
+    :type out: :class:`numpy.ndarray`
+    :returns: reduced stack
+    :rtype: :class:`numpy.ndarray`
+    """
+    return BlockReducer.reduceStack(stack, reduction, out)
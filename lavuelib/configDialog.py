@@ -244,6 +244,8 @@ class ConfigDialog(QtGui.QDialog):
         self.zeromask = False
         #: (:obj:`bool`) nan mask enabled
         self.nanmask = True
+        #: (:obj:`bool`) integer images masked by a validity mask
+        self.validitymask = False
         #: (:obj:`bool`) adding maximal type value to negative high value mask
         self.negmask = False
 
@@ -265,6 +267,8 @@ class ConfigDialog(QtGui.QDialog):
         self.showlevels = True
         #: (:obj:`bool`) show frame rate widget
         self.showframerate = True
+        #: (:obj:`bool`) show performance overlay with stage times
+        self.showperformance = False
 
         #: (:obj:`int`) number of image sources
         self.nrsources = 1
@@ -276,8 +280,13 @@ class ConfigDialog(QtGui.QDialog):
         self.statswoscaling = True
         #: (:obj:`bool`) auto down sample
         self.autodownsample = False
+        #: (:obj:`str`) level of detail rendering reduction,
+        #:     i.e. none, max or mean
+        self.lodrendering = "none"
         #: (:obj:`bool`) keep original coordinates
         self.keepcoords = False
+        #: (:obj:`bool`) image transformations in the display
+        self.displaytransformation = False
         #: (:obj:`bool`) accelerate buffer sum
         self.accelbuffersum = False
         #: (:obj:`bool`) lazy image slider
@@ -293,6 +302,8 @@ class ConfigDialog(QtGui.QDialog):
         self.asapobeamtime = ""
         #: (:obj:`str`) asapo sourcepath
         self.asaposourcepath = ""
+        #: (:obj:`str`) asapo consumer mode, i.e. poll, last or next
+        self.asapomode = "poll"
         #: (:obj:`list` < :obj:`str` > ) asapo datasources
         self.asapodatasources = []
 
@@ -308,6 +319,8 @@ class ConfigDialog(QtGui.QDialog):
 
         #: (:obj:`bool`) interrupt on error
         self.interruptonerror = True
+        #: (:obj:`bool`) skip frames identical to the last fetched frame
+        self.skipduplicates = False
 
         #: (:obj:`str`) JSON dictionary with directory and filename translation
         #  for Tango file source
@@ -331,12 +344,17 @@ class ConfigDialog(QtGui.QDialog):
         #: (:obj:`str`) JSON dictionary with {label: doocs property}
         #  for DOOCS Property source
         self.doocsprops = '{}'
+        #: (:obj:`str`) JSON dictionary with {label: shared memory ring}
+        #  for Shared Memory source
+        self.shmnames = '{}'
         #: (:obj:`str`) JSON dictionary with {label: epics PV name}
         #  for Epics PV source
         self.epicspvnames = '{}'
         #: (:obj:`str`) JSON dictionary with {label: epics PV shape}
         #  for Epics PV source
         self.epicspvshapes = '{}'
+        #: (:obj:`bool`) Epics PV source subscribes to CA monitors
+        self.epicsmonitor = False
         #: (:obj:`str`) JSON dictionary with {label: url}
         #  for HTTP responce source
         self.httpurls = '{}'
@@ -348,6 +366,13 @@ class ConfigDialog(QtGui.QDialog):
         self.nxsopen = False
         #: (:obj:`bool`) nexus file source starts from the last image
         self.nxslast = False
+        #: (:obj:`int`) number of nexus chunk decompression threads
+        self.nxsthreads = 0
+        #: (:obj:`int`) number of block reduction threads
+        self.reductionthreads = 0
+        #: (:obj:`str`) JSON dictionary with the raw stack file format,
+        #  i.e. dtype, shape, header and frameheader
+        self.rawformat = '{}'
         #: (:obj:`bool`) store detector geometry
         self.storegeometry = False
         #: (:obj:`bool`) fetch geometry from source
@@ -436,6 +461,8 @@ class ConfigDialog(QtGui.QDialog):
         self.__ui.aspectlockedCheckBox.setChecked(self.aspectlocked)
         self.__ui.downsampleCheckBox.setChecked(self.autodownsample)
         self.__ui.keepCoordsCheckBox.setChecked(self.keepcoords)
+        self.__ui.displayTrafoCheckBox.setChecked(
+            self.displaytransformation)
         self.__ui.buffersumCheckBox.setChecked(self.accelbuffersum)
         self.__ui.lazyimageCheckBox.setChecked(self.lazyimageslider)
         self.__ui.statsscaleCheckBox.setChecked(not self.statswoscaling)
@@ -447,6 +474,7 @@ class ConfigDialog(QtGui.QDialog):
         self.__ui.secstreamCheckBox.setChecked(self.secstream)
         self.__ui.zeromaskCheckBox.setChecked(self.zeromask)
         self.__ui.nanmaskCheckBox.setChecked(self.nanmask)
+        self.__ui.validitymaskCheckBox.setChecked(self.validitymask)
         self.__ui.negmaskCheckBox.setChecked(self.negmask)
         self.__ui.secautoportCheckBox.setChecked(self.secautoport)
         self.__ui.secportLineEdit.setText(self.secport)
@@ -468,6 +496,7 @@ class ConfigDialog(QtGui.QDialog):
         self.__ui.showscaleCheckBox.setChecked(self.showscale)
         self.__ui.showlevelsCheckBox.setChecked(self.showlevels)
         self.__ui.showframerateCheckBox.setChecked(self.showframerate)
+        self.__ui.showperformanceCheckBox.setChecked(self.showperformance)
         self.__ui.timeoutLineEdit.setText(str(self.timeout))
         self.__ui.zmqtopicsLineEdit.setText(" ".join(self.zmqtopics))
         self.__ui.asapodatasourcesLineEdit.setText(
@@ -478,15 +507,22 @@ class ConfigDialog(QtGui.QDialog):
         self.__ui.asapotokenLineEdit.setText(self.asapotoken)
         self.__ui.asapobeamtimeLineEdit.setText(self.asapobeamtime)
         self.__ui.asaposourcepathLineEdit.setText(self.asaposourcepath)
+        fid = self.__ui.asapomodeComboBox.findText(self.asapomode)
+        if fid < 0:
+            fid = 0
+        self.__ui.asapomodeComboBox.setCurrentIndex(fid)
         self.__ui.defdetserversCheckBox.setChecked(self.defdetservers)
         self.__ui.autozmqtopicsCheckBox.setChecked(self.autozmqtopics)
         self.__ui.interruptCheckBox.setChecked(self.interruptonerror)
+        self.__ui.skipduplicatesCheckBox.setChecked(self.skipduplicates)
         self.__ui.dirtransLineEdit.setText(self.dirtrans)
         self.__ui.attrLineEdit.setText(self.tangoattrs)
         self.__ui.tinepropLineEdit.setText(self.tineprops)
         self.__ui.doocspropLineEdit.setText(self.doocsprops)
+        self.__ui.shmnameLineEdit.setText(self.shmnames)
         self.__ui.pvnameLineEdit.setText(self.epicspvnames)
         self.__ui.pvshapeLineEdit.setText(self.epicspvshapes)
+        self.__ui.epicsmonitorCheckBox.setChecked(self.epicsmonitor)
         self.__ui.evattrLineEdit.setText(self.tangoevattrs)
         self.__ui.fileattrLineEdit.setText(self.tangofileattrs)
         self.__ui.dirattrLineEdit.setText(self.tangodirattrs)
@@ -494,6 +530,9 @@ class ConfigDialog(QtGui.QDialog):
         self.__ui.urlsLineEdit.setText(self.httpurls)
         self.__ui.nxsopenCheckBox.setChecked(self.nxsopen)
         self.__ui.nxslastCheckBox.setChecked(self.nxslast)
+        self.__ui.nxsthreadsSpinBox.setValue(self.nxsthreads)
+        self.__ui.reductionthreadsSpinBox.setValue(self.reductionthreads)
+        self.__ui.rawformatLineEdit.setText(self.rawformat)
         self.__ui.storegeometryCheckBox.setChecked(self.storegeometry)
         self.__ui.fetchgeometryCheckBox.setChecked(self.geometryfromsource)
         self.__ui.sendroisCheckBox.setChecked(self.sendrois)
@@ -510,6 +549,12 @@ class ConfigDialog(QtGui.QDialog):
         if fid < 0:
             fid = 0
         self.__ui.floatComboBox.setCurrentIndex(fid)
+        if self.lodrendering not in ["none", "max", "mean"]:
+            self.lodrendering = "none"
+        lid = self.__ui.lodComboBox.findText(self.lodrendering)
+        if lid < 0:
+            lid = 0
+        self.__ui.lodComboBox.setCurrentIndex(lid)
 
         self.__ui.urlsLineEdit.installEventFilter(self)
         self.__objtitles[repr(self.__ui.urlsLineEdit)] = \
@@ -535,6 +580,9 @@ class ConfigDialog(QtGui.QDialog):
         self.__ui.doocspropLineEdit.installEventFilter(self)
         self.__objtitles[repr(self.__ui.doocspropLineEdit)] = \
             "DOOCS facility/device/location/property name"
+        self.__ui.shmnameLineEdit.installEventFilter(self)
+        self.__objtitles[repr(self.__ui.shmnameLineEdit)] = \
+            "shared memory ring name"
 
         self._updateSecPortLineEdit(self.secautoport)
         self.__ui.secautoportCheckBox.stateChanged.connect(
@@ -764,6 +812,7 @@ class ConfigDialog(QtGui.QDialog):
         self.secstream = self.__ui.secstreamCheckBox.isChecked()
         self.zeromask = self.__ui.zeromaskCheckBox.isChecked()
         self.nanmask = self.__ui.nanmaskCheckBox.isChecked()
+        self.validitymask = self.__ui.validitymaskCheckBox.isChecked()
         self.negmask = self.__ui.negmaskCheckBox.isChecked()
         self.secautoport = self.__ui.secautoportCheckBox.isChecked()
         self.refreshrate = float(self.__ui.rateDoubleSpinBox.value())
@@ -785,6 +834,8 @@ class ConfigDialog(QtGui.QDialog):
         self.showscale = self.__ui.showscaleCheckBox.isChecked()
         self.showlevels = self.__ui.showlevelsCheckBox.isChecked()
         self.showframerate = self.__ui.showframerateCheckBox.isChecked()
+        self.showperformance = \
+            self.__ui.showperformanceCheckBox.isChecked()
         self.showhisto = self.__ui.showhistoCheckBox.isChecked()
         self.showaddhisto = self.__ui.showaddhistoCheckBox.isChecked()
         self.showmask = self.__ui.showmaskCheckBox.isChecked()
@@ -794,12 +845,19 @@ class ConfigDialog(QtGui.QDialog):
         self.calcvariance = self.__ui.calcvarianceCheckBox.isChecked()
         self.aspectlocked = self.__ui.aspectlockedCheckBox.isChecked()
         self.autodownsample = self.__ui.downsampleCheckBox.isChecked()
+        self.lodrendering = str(self.__ui.lodComboBox.currentText())
         self.keepcoords = self.__ui.keepCoordsCheckBox.isChecked()
+        self.displaytransformation = \
+            self.__ui.displayTrafoCheckBox.isChecked()
         self.accelbuffersum = self.__ui.buffersumCheckBox.isChecked()
         self.lazyimageslider = self.__ui.lazyimageCheckBox.isChecked()
         self.statswoscaling = not self.__ui.statsscaleCheckBox.isChecked()
         self.nxsopen = self.__ui.nxsopenCheckBox.isChecked()
         self.nxslast = self.__ui.nxslastCheckBox.isChecked()
+        self.nxsthreads = int(self.__ui.nxsthreadsSpinBox.value())
+        self.reductionthreads = int(
+            self.__ui.reductionthreadsSpinBox.value())
+        self.epicsmonitor = self.__ui.epicsmonitorCheckBox.isChecked()
         self.storegeometry = self.__ui.storegeometryCheckBox.isChecked()
         self.geometryfromsource = self.__ui.fetchgeometryCheckBox.isChecked()
         self.sendrois = self.__ui.sendroisCheckBox.isChecked()
@@ -857,6 +915,17 @@ class ConfigDialog(QtGui.QDialog):
             self.__ui.tabWidget.setCurrentIndex(3)
             self.__ui.doocspropLineEdit.setFocus(True)
             return
+        try:
+            prop = str(self.__ui.shmnameLineEdit.text()).strip()
+            mytr = json.loads(prop)
+            if isinstance(mytr, dict):
+                self.shmnames = prop
+        except Exception as e:
+            logger.warning(str(e))
+            # print(str(e))
+            self.__ui.tabWidget.setCurrentIndex(3)
+            self.__ui.shmnameLineEdit.setFocus(True)
+            return
         try:
             attr = str(self.__ui.evattrLineEdit.text()).strip()
             mytr = json.loads(attr)
@@ -934,9 +1003,21 @@ class ConfigDialog(QtGui.QDialog):
             self.__ui.tabWidget.setCurrentIndex(2)
             self.__ui.urlsLineEdit.setFocus(True)
             return
+        try:
+            rawformat = str(self.__ui.rawformatLineEdit.text()).strip()
+            mytr = json.loads(rawformat or '{}')
+            if isinstance(mytr, dict):
+                self.rawformat = rawformat or '{}'
+        except Exception as e:
+            logger.warning(str(e))
+            # print(str(e))
+            self.__ui.tabWidget.setCurrentIndex(2)
+            self.__ui.rawformatLineEdit.setFocus(True)
+            return
         zmqtopics = str(self.__ui.zmqtopicsLineEdit.text()).strip().split(" ")
         self.zmqtopics = [tp for tp in zmqtopics if tp]
         self.interruptonerror = self.__ui.interruptCheckBox.isChecked()
+        self.skipduplicates = self.__ui.skipduplicatesCheckBox.isChecked()
         self.autozmqtopics = self.__ui.autozmqtopicsCheckBox.isChecked()
         datasources = str(
             self.__ui.asapodatasourcesLineEdit.text()).strip().split(" ")
@@ -949,6 +1030,7 @@ class ConfigDialog(QtGui.QDialog):
             self.__ui.asapobeamtimeLineEdit.text()).strip()
         self.asaposourcepath = str(
             self.__ui.asaposourcepathLineEdit.text()).strip()
+        self.asapomode = str(self.__ui.asapomodeComboBox.currentText())
         detservers = str(
             self.__ui.detserversLineEdit.text()).strip().split(" ")
         self.detservers = json.dumps([ds for ds in detservers if ds])
@@ -30,11 +30,21 @@ from __future__ import unicode_literals
 
 from pyqtgraph import QtCore
 import time
+import json
+import numpy as np
+import logging
 from .omniQThread import OmniQThread
+from . import stageTimers
+from . import filters
 
 #: (:obj:`float`) refresh rate in seconds
 GLOBALREFRESHRATE = .1
 
+#: (:obj:`bool`) skip frames identical to the last fetched frame
+SKIPDUPLICATES = False
+
+logger = logging.getLogger("lavue")
+
 
 class ExchangeList(object):
 
@@ -81,13 +91,15 @@ class DataFetchThread(OmniQThread):
     #: (:class:`pyqtgraph.QtCore.pyqtSignal`) new data name signal
     newDataNameFetched = QtCore.pyqtSignal(str, str)
 
-    def __init__(self, datasource, alist):
+    def __init__(self, datasource, alist, timers=None):
         """ constructor
 
         :param datasource: image source
         :type datasource: :class:`lavuelib.imageSource.BaseSource`
         :param alist: exchange object
         :type alist: :class:`ExchangeList`
+        :param timers: stage timers
+        :type timers: :class:`lavuelib.stageTimers.StageTimers`
         """
         OmniQThread.__init__(self)
         #: (:class:`lavuelib.imageSource.BaseSource`) image source
@@ -102,6 +114,147 @@ class DataFetchThread(OmniQThread):
         self.__ready = True
         #: (:class:`pyqtgraph.QtCore.QMutex`) thread mutex
         self.__mutex = QtCore.QMutex()
+        #: (:obj:`tuple`) key of the last fetched frame
+        self.__lastkey = None
+        #: (:class:`lavuelib.stageTimers.StageTimers`) stage timers
+        self.__timers = timers
+        #: (:obj:`int`) source frame counter of the last fetched frame
+        self.__lastframeid = None
+        #: (:obj:`tuple`) region of interest to be set in the image source,
+        #:    i.e. x1, y1, x2, y2, down-sampling factor and reduction function
+        self.__region = None
+        #: (:obj:`str`) JSON list with filter configuration
+        #:    of the viewer or None
+        self.__filterconfig = None
+        #: (:class:`lavuelib.filters.FilterChain`) filter chain
+        #:    of the fetch thread whose leading thread-safe filters
+        #:    are applied to fetched images
+        self.__filters = None
+        #: (:obj:`str`) filter configuration of the filter chain
+        self.__chainconfig = None
+        #: (:obj:`tuple`) configuration and number of the applied filters
+        self.__filterkey = None
+        #: (:class:`lavuelib.nexusRecorder.NexusRecorder`) recorder
+        #:    of fetched images before the source region and filters
+        self.__recorder = None
+
+    def __isDuplicate(self, img, name):
+        """ checks if the fetched frame is identical to the last one
+
+        :param img: image data
+        :type img: :class:`numpy.ndarray`
+        :param name: image name
+        :type name: :obj:`str`
+        :returns: if the frame is a duplicate
+        :rtype: :obj:`bool`
+        """
+        if not SKIPDUPLICATES or name is None or name == "__ERROR__":
+            return False
+        try:
+            with QtCore.QMutexLocker(self.__mutex):
+                key = self.__datasource.frameKey(img, name)
+        except Exception:
+            key = None
+        if key is None:
+            return False
+        duplicate = (key == self.__lastkey)
+        self.__lastkey = key
+        return duplicate
+
+    def __updateTimers(self, start, stop):
+        """ updates fetch and decode times and the dropped frame counter
+
+        :param start: time before reading the source
+        :type start: :obj:`float`
+        :param stop: time after reading the source
+        :type stop: :obj:`float`
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            fetched = self.__datasource.fetchedTime()
+            frameid = self.__datasource.frameNumber()
+        if fetched is None or fetched < start or fetched > stop:
+            fetched = stop
+        self.__timers.add("fetch", fetched - start)
+        self.__timers.add("decode", stop - fetched)
+        if isinstance(frameid, int):
+            if isinstance(self.__lastframeid, int) and \
+               frameid > self.__lastframeid + 1:
+                self.__timers.count(
+                    "dropped", frameid - self.__lastframeid - 1)
+            self.__lastframeid = frameid
+
+    def __updateFilters(self):
+        """ builds the own filter chain of the fetch thread
+            when the filter configuration is changed
+
+        :returns: filter chain or None
+        :rtype: :class:`lavuelib.filters.FilterChain`
+        """
+        config = self.__filterconfig
+        if config != self.__chainconfig:
+            self.__chainconfig = config
+            self.__filters = None
+            if config:
+                try:
+                    self.__filters = filters.FilterChain(json.loads(config))
+                except Exception as e:
+                    # the filters are reported in the GUI thread
+                    logger.debug(str(e))
+        return self.__filters
+
+    def __applyFilters(self, chain, nfilters, img, name, metadata):
+        """ applies the leading thread-safe filters to the fetched image.
+            The number of applied filters is added to the metadata
+            as prefilters
+
+        :param chain: filter chain
+        :type chain: :class:`lavuelib.filters.FilterChain`
+        :param nfilters: number of filters to apply
+        :type nfilters: :obj:`int`
+        :param img: image data
+        :type img: :class:`numpy.ndarray`
+        :param name: image name
+        :type name: :obj:`str`
+        :param metadata: json dictionary with image metadata
+        :type metadata: :obj:`str`
+        :returns: image data and json dictionary with image metadata
+        :rtype: (:class:`numpy.ndarray`, :obj:`str`)
+        """
+        start = stageTimers.clock()
+        try:
+            mdata = json.loads(str(metadata)) if metadata else {}
+            if not isinstance(mdata, dict):
+                return img, metadata
+            img, fltmdata = chain.apply(
+                img, name, metadata, None, stop=nfilters)
+        except Exception as e:
+            # the filters are applied and reported in the GUI thread
+            logger.debug(str(e))
+            return img, metadata
+        mdata.update(fltmdata)
+        mdata["prefilters"] = nfilters
+        if self.__timers is not None:
+            self.__timers.add("filters", stageTimers.clock() - start)
+        return img, json.dumps(mdata)
+
+    def __record(self, recorder, img, name, metadata):
+        """ passes the fetched image to the recorder
+
+        :param recorder: NeXus recorder
+        :type recorder: :class:`lavuelib.nexusRecorder.NexusRecorder`
+        :param img: image data
+        :type img: :class:`numpy.ndarray`
+        :param name: image name
+        :type name: :obj:`str`
+        :param metadata: json dictionary with image metadata
+        :type metadata: :obj:`str`
+        """
+        if not isinstance(img, np.ndarray) or not img.size:
+            return
+        start = stageTimers.clock()
+        recorder.record(np.transpose(img), name, metadata)
+        if self.__timers is not None:
+            self.__timers.add("record", stageTimers.clock() - start)
 
     def _run(self):
         """ run function of the fetching thread
@@ -118,13 +271,48 @@ class DataFetchThread(OmniQThread):
                 self.msleep(max(int(1000*GLOBALREFRESHRATE - dt), 0))
             t1 = time.time()
             if self.__isConnected and self.__ready:
+                start = stageTimers.clock()
+                chain = self.__updateFilters()
+                nfilters = chain.threadSafeCount() if chain is not None else 0
+                filterkey = (self.__chainconfig, nfilters) \
+                    if nfilters else None
+                recorder = self.__recorder
+                fetched = None
                 try:
                     with QtCore.QMutexLocker(self.__mutex):
-                        img, name, metadata = self.__datasource.getData()
+                        if recorder is not None:
+                            # sources can read only the region window
+                            self.__datasource.setRegion()
+                        elif self.__region is not None:
+                            self.__datasource.setRegion(*self.__region)
+                        if filterkey != self.__filterkey:
+                            self.__filterkey = filterkey
+                            self.__datasource.refresh()
+                        fetched = self.__datasource.getData()
+                        img, name, metadata = self.__datasource.applyRegion(
+                            *fetched)
+                        refreshed = self.__datasource.refreshed()
                 except Exception as e:
                     name = "__ERROR__"
                     img = str(e)
                     metadata = ""
+                    refreshed = False
+                stop = stageTimers.clock()
+                # a refreshed frame is provided for the changed region
+                if self.__isDuplicate(img, name) and not refreshed:
+                    name = None
+                    if self.__timers is not None:
+                        self.__timers.count("duplicates")
+                elif self.__timers is not None and name is not None \
+                        and name != "__ERROR__":
+                    self.__updateTimers(start, stop)
+                if recorder is not None and fetched is not None and \
+                   name is not None and name != "__ERROR__" and \
+                   name == fetched[1]:
+                    self.__record(recorder, *fetched)
+                if nfilters and name is not None and name != "__ERROR__":
+                    img, metadata = self.__applyFilters(
+                        chain, nfilters, img, name, metadata)
                 if name is not None:
                     self.__list.addData(name, img, metadata)
                     self.__ready = False
@@ -145,6 +333,8 @@ class DataFetchThread(OmniQThread):
         """
         self.__isConnected = status
         self.__ready = True
+        self.__lastkey = None
+        self.__lastframeid = None
 
     def setDataSource(self, datasource):
         """ sets datasource
@@ -153,6 +343,47 @@ class DataFetchThread(OmniQThread):
         """
         with QtCore.QMutexLocker(self.__mutex):
             self.__datasource = datasource
+            self.__lastkey = None
+        self.__lastframeid = None
+
+    def setRegion(self, x1=None, y1=None, x2=None, y2=None, binning=1,
+                  reduction="max"):
+        """ sets the region of interest of the image source
+            before the next fetch, i.e. without waiting for the running one
+
+        :param x1: x1 position
+        :type x1: :obj:`int`
+        :param y1: y1 position
+        :type y1: :obj:`int`
+        :param x2: x2 position
+        :type x2: :obj:`int`
+        :param y2: y2 position
+        :type y2: :obj:`int`
+        :param binning: down-sampling factor
+        :type binning: :obj:`int`
+        :param reduction: reduction function, i.e. max, min, mean or sum
+        :type reduction: :obj:`str`
+        """
+        self.__region = (x1, y1, x2, y2, binning, reduction)
+
+    def setFilters(self, configlist):
+        """ sets the filter configuration whose leading thread-safe
+            filters are applied to fetched images by the own filter chain
+            of the fetch thread
+
+        :param configlist: JSON list with filter configuration or None
+        :type configlist: :obj:`str`
+        """
+        self.__filterconfig = configlist
+
+    def setRecorder(self, recorder):
+        """ sets the recorder of fetched images, i.e. the images are
+            fetched without the source region and recorded before filters
+
+        :param recorder: NeXus recorder or None
+        :type recorder: :class:`lavuelib.nexusRecorder.NexusRecorder`
+        """
+        self.__recorder = recorder
 
     def ready(self):
         """ continue acquisition
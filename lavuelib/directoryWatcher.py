@@ -0,0 +1,274 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+
+""" watcher of newly written files in a detector directory """
+
+import os
+import stat
+import errno
+import fnmatch
+import struct
+import logging
+
+try:
+    import ctypes
+    import ctypes.util
+    _LIBC = ctypes.CDLL(
+        ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    _LIBC.inotify_init1.argtypes = [ctypes.c_int]
+    _LIBC.inotify_add_watch.argtypes = [
+        ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    #: (:obj:`bool`) inotify can be used
+    INOTIFY = True
+except Exception:
+    #: (:obj:`bool`) inotify can be used
+    INOTIFY = False
+
+
+logger = logging.getLogger("lavue")
+
+#: (:obj:`int`) inotify event of a file closed after writing
+IN_CLOSE_WRITE = 0x00000008
+#: (:obj:`int`) inotify event of a file moved into the directory
+IN_MOVED_TO = 0x00000080
+#: (:obj:`int`) inotify event of the removed directory
+IN_DELETE_SELF = 0x00000400
+#: (:obj:`int`) inotify event of the moved directory
+IN_MOVE_SELF = 0x00000800
+#: (:obj:`int`) inotify event of the event queue overflow
+IN_Q_OVERFLOW = 0x00004000
+#: (:obj:`int`) inotify event of the removed watch
+IN_IGNORED = 0x00008000
+#: (:obj:`int`) inotify watch flag for directories only
+IN_ONLYDIR = 0x01000000
+#: (:obj:`int`) inotify non-blocking flag
+IN_NONBLOCK = 0o4000
+#: (:obj:`int`) inotify close-on-exec flag
+IN_CLOEXEC = 0o2000000
+
+#: (:obj:`str`) inotify event header format, i.e.
+#:    watch descriptor, event mask, cookie and name length
+EVENTFORMAT = "iIII"
+#: (:obj:`int`) inotify event header size in bytes
+EVENTSIZE = struct.calcsize(EVENTFORMAT)
+
+
+class DirectoryWatcher(object):
+
+    """ provides files of a directory which were completely written
+
+        With inotify a file is complete when it is closed after writing
+        or moved into the directory. Polling, e.g. for network file
+        systems which do not deliver inotify events of remote writers,
+        takes a file as complete when its size and modification time
+        have not changed between two scans.
+    """
+
+    def __init__(self, directory, pattern="*", polling=False):
+        """ constructor
+
+        :param directory: directory to watch
+        :type directory: :obj:`str`
+        :param pattern: glob pattern of file names, e.g. *.cbf
+        :type pattern: :obj:`str`
+        :param polling: use polling instead of inotify
+        :type polling: :obj:`bool`
+        """
+        if not os.path.isdir(directory):
+            raise ValueError(
+                "DirectoryWatcher: %s is not a directory" % directory)
+        #: (:obj:`str`) watched directory
+        self.directory = os.path.abspath(directory)
+        #: (:obj:`str`) glob pattern of file names
+        self.pattern = pattern or "*"
+        #: (:obj:`int`) inotify file descriptor
+        self.__fd = None
+        #: (:obj:`dict` <:obj:`str`, :obj:`tuple`>) file stats
+        #:     of the previous scan
+        self.__stats = {}
+        #: (:obj:`dict` <:obj:`str`, :obj:`tuple`>) file stats
+        #:     of the reported files
+        self.__reported = {}
+        if not polling and INOTIFY:
+            try:
+                self.__addWatch()
+            except OSError as e:
+                logger.warning(
+                    "DirectoryWatcher: inotify not available, "
+                    "polling %s: %s" % (self.directory, str(e)))
+        if self.__fd is None:
+            self.__scan()
+            self.__reported = dict(self.__stats)
+
+    @property
+    def mode(self):
+        """ provides the watching mode
+
+        :returns: inotify or polling
+        :rtype: :obj:`str`
+        """
+        return "inotify" if self.__fd is not None else "polling"
+
+    def __addWatch(self):
+        """ creates an inotify instance watching the directory
+        """
+        fd = _LIBC.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        wd = _LIBC.inotify_add_watch(
+            fd, self.directory.encode(),
+            IN_CLOSE_WRITE | IN_MOVED_TO | IN_DELETE_SELF | IN_MOVE_SELF
+            | IN_ONLYDIR)
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, os.strerror(err))
+        self.__fd = fd
+
+    def __matches(self, name):
+        """ checks if the file name matches the pattern
+
+        :param name: file name
+        :type name: :obj:`str`
+        :returns: if the file name matches the pattern
+        :rtype: :obj:`bool`
+        """
+        return not name.startswith(".") and \
+            fnmatch.fnmatch(name, self.pattern)
+
+    def __files(self):
+        """ provides stats of the matching files
+
+        :returns: file paths with their size, modification time and inode
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`tuple`>
+        """
+        stats = {}
+        for name in os.listdir(self.directory):
+            if self.__matches(name):
+                path = os.path.join(self.directory, name)
+                try:
+                    st = os.stat(path)
+                    if stat.S_ISREG(st.st_mode):
+                        stats[path] = (st.st_size, st.st_mtime, st.st_ino)
+                except OSError:
+                    pass
+        return stats
+
+    def __scan(self):
+        """ updates stats of the matching files
+        """
+        self.__stats = self.__files()
+
+    def __readEvents(self):
+        """ reads pending inotify events
+
+        :returns: completed files and a flag if the watch is lost
+        :rtype: (:obj:`list` <:obj:`str`>, :obj:`bool`)
+        """
+        files = []
+        lost = False
+        while True:
+            try:
+                buf = os.read(self.__fd, 65536)
+            except OSError as e:
+                if e.errno in [errno.EAGAIN, errno.EWOULDBLOCK]:
+                    break
+                raise
+            if not buf:
+                break
+            offset = 0
+            while offset + EVENTSIZE <= len(buf):
+                _, mask, _, length = struct.unpack_from(
+                    EVENTFORMAT, buf, offset)
+                name = buf[offset + EVENTSIZE:offset + EVENTSIZE + length]
+                offset += EVENTSIZE + length
+                name = name.rstrip(b"\0").decode(errors="replace")
+                if mask & (IN_DELETE_SELF | IN_MOVE_SELF | IN_IGNORED
+                           | IN_Q_OVERFLOW):
+                    lost = True
+                elif name and self.__matches(name):
+                    path = os.path.join(self.directory, name)
+                    if path in files:
+                        files.remove(path)
+                    files.append(path)
+        return files, lost
+
+    def newFiles(self):
+        """ provides files completed since the previous call
+
+        :returns: file paths ordered by completion
+        :rtype: :obj:`list` <:obj:`str`>
+        """
+        if self.__fd is not None:
+            files, lost = self.__readEvents()
+            if not lost:
+                return files
+            # the watch or some events are lost, e.g. the directory was
+            # recreated or the event queue overflowed
+            self.close()
+            try:
+                self.__addWatch()
+            except OSError as e:
+                logger.warning(
+                    "DirectoryWatcher: inotify watch of %s lost, "
+                    "polling: %s" % (self.directory, str(e)))
+            latest = self.latestFile()
+            if latest and latest not in files:
+                files.append(latest)
+            return files
+        if not os.path.isdir(self.directory):
+            return []
+        previous = self.__stats
+        self.__scan()
+        files = []
+        for path, st in self.__stats.items():
+            if previous.get(path) == st and self.__reported.get(path) != st:
+                self.__reported[path] = st
+                files.append(path)
+        for path in list(self.__reported.keys()):
+            if path not in self.__stats:
+                self.__reported.pop(path)
+        return sorted(files, key=lambda path: (self.__stats[path][1], path))
+
+    def latestFile(self):
+        """ provides the last modified file which matches the pattern
+
+        :returns: file path or None
+        :rtype: :obj:`str`
+        """
+        stats = self.__files()
+        if stats:
+            return max(stats.keys(), key=lambda path: (stats[path][1], path))
+
+    def close(self):
+        """ closes the inotify instance
+        """
+        if self.__fd is not None:
+            try:
+                os.close(self.__fd)
+            except OSError:
+                pass
+            self.__fd = None
@@ -35,6 +35,9 @@ import logging
 from pyqtgraph.graphicsItems.ROI import ROI, LineROI, Handle
 from pyqtgraph.graphicsItems.IsocurveItem import IsocurveItem
 
+from . import imageRemap
+from . import imageStages
+
 _VMAJOR, _VMINOR, _VPATCH = _pg.__version__.split(".")[:3] \
     if _pg.__version__ else ("0", "9", "0")
 
@@ -458,20 +461,7 @@ class ROIExtension(DisplayExtension):
                                     ty2, tx2 = self._mainwidget.descaledxy(
                                         rcrds[3], rcrds[2], useraxes=False)
                                     rcrds = [tx, ty, tx2, ty2]
-                        for i in [0, 2]:
-                            if rcrds[i] > image.shape[0]:
-                                rcrds[i] = image.shape[0]
-                            elif rcrds[i] < -i // 2:
-                                rcrds[i] = -i // 2
-                        for i in [1, 3]:
-                            if rcrds[i] > image.shape[1]:
-                                rcrds[i] = image.shape[1]
-                            elif rcrds[i] < - (i - 1) // 2:
-                                rcrds[i] = - (i - 1) // 2
-                        roival = np.nansum(image[
-                            int(rcrds[0]):(int(rcrds[2]) + 1),
-                            int(rcrds[1]):(int(rcrds[3]) + 1)
-                        ])
+                        roival = imageStages.roiSum(image, rcrds)
                     else:
                         roival = 0.
                 else:
@@ -681,6 +671,8 @@ class CutExtension(DisplayExtension):
         #: (:obj:`list` <:class:`pyqtgraph.graphicsItems.ROI`>)
         #:        list of cut widgets
         self.__cut = []
+        #: (:class:`lavuelib.imageRemap.LineCutSampler`) cut sampler
+        self.__sampler = None
         self.__cut.append(SimpleLineROI([10, 10], [60, 10], pen='r'))
         self._mainwidget.viewbox().addItem(self.__cut[0])
         self.__cut[0].hide()
@@ -801,16 +793,42 @@ class CutExtension(DisplayExtension):
         if cid is None:
             cid = self.__current
         if cid > -1 and len(self.__cut) > cid:
-            cut = self._getCut(cid)
-            if self._mainwidget.rawData() is not None:
-                dt = cut.getArrayRegion(
-                    self._mainwidget.rawData(),
-                    self._mainwidget.image(),
-                    axes=(0, 1))
+            return self.cutsData([cid])[0]
+        return None
+
+    def cutsData(self, cids=None):
+        """ provides data of the given cuts sampled at once
+
+        :param cids: cut ids, all cuts if None
+        :type cids: :obj:`list` <:obj:`int`>
+        :returns: cut data
+        :rtype: :obj:`list` <:class:`numpy.ndarray`>
+        """
+        if cids is None:
+            cids = list(range(len(self.__cut)))
+        rawdata = self._mainwidget.rawData()
+        if rawdata is None:
+            return [None] * len(cids)
+        image = self._mainwidget.image()
+        if rawdata.ndim != 2:
+            dts = []
+            for cid in cids:
+                dt = self._getCut(cid).getArrayRegion(
+                    rawdata, image, axes=(0, 1))
                 while dt.ndim > 1:
                     dt = dt.mean(axis=1)
-                return dt
-        return None
+                dts.append(dt)
+            return dts
+        order = "F" if rawdata.flags.f_contiguous \
+            and not rawdata.flags.c_contiguous else "C"
+        params = [self._getCut(cid).getAffineSliceParams(
+            rawdata, image, axes=(0, 1)) for cid in cids]
+        keys = [imageRemap.LineCutSampler.key(prm, rawdata.shape, order)
+                for prm in params]
+        if self.__sampler is None or self.__sampler.keys != keys:
+            self.__sampler = imageRemap.LineCutSampler(
+                params, rawdata.shape, order)
+        return self.__sampler(rawdata)
 
     def cutCoords(self):
         """ provides cuts coordinates
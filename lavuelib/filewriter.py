@@ -860,6 +860,33 @@ class FTField(FTObject):
         :rtype: :obj:`int`
         """
 
+    @property
+    def chunks(self):
+        """ field chunk shape
+
+        :returns: field chunk shape or `None` if the field is not chunked
+        :rtype: :obj:`list` < :obj:`int` >
+        """
+
+    @property
+    def filters(self):
+        """ field filter pipeline
+
+        :returns: a list of (filter id, filter parameters)
+        :rtype: :obj:`list` < (:obj:`int`, :obj:`list` < :obj:`int` >) >
+        """
+        return []
+
+    def read_chunk(self, offset):
+        """ reads the raw chunk data without applying the filter pipeline
+
+        :param offset: logical position of the chunk first element
+        :type offset: :obj:`tuple` < :obj:`int` >
+        :returns: filter mask and raw chunk data
+        :rtype: (:obj:`int`, :obj:`bytes`)
+        """
+        raise NotImplementedError("Raw chunk reading is not supported")
+
     def reopen(self):
         """ reopen attribute
         """
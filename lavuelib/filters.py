@@ -25,6 +25,8 @@
 """ set of image sources """
 
 import sys
+import itertools
+import numpy as np
 
 
 def _tostr(text):
@@ -43,9 +45,91 @@ def _tostr(text):
         return str(text)
 
 
+def _runs(positions):
+    """ splits sorted positions into runs of consecutive positions
+
+    :param positions: sorted positions
+    :type positions: :class:`numpy.ndarray`
+    :returns: list of (first, last + 1) positions and (first, last + 1)
+              indexes of the runs
+    :rtype: :obj:`list` <((:obj:`int`, :obj:`int`), (:obj:`int`, :obj:`int`))>
+    """
+    breaks = list(np.nonzero(np.diff(positions) != 1)[0] + 1)
+    return [((int(positions[first]), int(positions[last - 1]) + 1),
+             (first, last))
+            for first, last in zip([0] + breaks, breaks + [len(positions)])
+            if last > first]
+
+
+def _gapMap(shape, gaps):
+    """ fuses gap insertions into copies of image blocks
+
+    :param shape: input image shape
+    :type shape: :obj:`tuple` <:obj:`int`>
+    :param gaps: axes and indexes of inserted zero pixels
+                 as in :func:`numpy.insert`
+    :type gaps: :obj:`list` < (:obj:`int`, :obj:`list` <:obj:`int`>) >
+    :returns: output shape, output and input selections of copied blocks,
+              output selections of gaps
+    :rtype: (:obj:`tuple` <:obj:`int`>,
+             :obj:`list` < (:obj:`tuple`, :obj:`tuple`) >,
+             :obj:`list` <:obj:`tuple`>)
+    """
+    sizes = list(shape)
+    positions = {}
+    for axis, indexes in gaps:
+        if axis < 0 or axis >= len(shape):
+            raise ValueError(
+                "gap axis %s is out of bounds for the %sD image"
+                % (axis, len(shape)))
+        size = sizes[axis]
+        indexes = np.array(indexes, dtype=int).reshape(-1)
+        indexes[indexes < 0] += size
+        if indexes.size and (indexes.min() < 0 or indexes.max() > size):
+            raise IndexError(
+                "gap index is out of bounds for the axis %s with size %s"
+                % (axis, size))
+        # the pixel j is moved by the number of gaps inserted before it
+        moved = np.arange(size) + np.searchsorted(
+            np.sort(indexes), np.arange(size), side="right")
+        positions[axis] = moved[positions.get(axis, np.arange(size))]
+        sizes[axis] = size + indexes.size
+    blocks = []
+    zeros = []
+    for axis in range(len(shape)):
+        if axis not in positions:
+            blocks.append([(slice(None), slice(None))])
+            continue
+        blocks.append(
+            [(slice(*out), slice(*inp))
+             for out, inp in _runs(positions[axis])])
+        mask = np.ones(sizes[axis], dtype=bool)
+        mask[positions[axis]] = False
+        zeros.extend(
+            (slice(None),) * axis + (slice(*out),)
+            for out, _ in _runs(np.nonzero(mask)[0]))
+    copies = [(tuple(out for out, _ in block), tuple(inp for _, inp in block))
+              for block in itertools.product(*blocks)]
+    return tuple(sizes), copies, zeros
+
+
 class BaseFilter(object):
 
-    """ filter base class"""
+    """ filter base class
+
+        A filter can describe its capabilities to the filter chain:
+        an in-place filter may overwrite the input image, a thread-safe
+        filter does not use the image widget and can be applied outside
+        of the GUI thread and a filter with a known output shape writes
+        the result into the preallocated ``out`` image of the input dtype.
+        Plain filter functions can set the same attributes.
+    """
+
+    #: (:obj:`bool`) filter may overwrite the input image
+    inplace = False
+
+    #: (:obj:`bool`) filter does not use the image widget
+    threadsafe = False
 
     def __init__(self, configuration=None):
         """ constructor
@@ -72,6 +156,28 @@ class BaseFilter(object):
         """
         return None
 
+    def outputShape(self, shape):
+        """ provides the shape of the filtered image. If it is not None
+            the filter is called with the preallocated ``out`` keyword
+            argument, which for in-place filters may be the input image
+
+        :param shape: input image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :returns: output image shape or None if it is not known in advance
+        :rtype: :obj:`tuple` <:obj:`int`>
+        """
+        return None
+
+    def gaps(self):
+        """ provides gap pixels inserted by the filter, so that
+            consecutive gap filters are fused into one copy
+
+        :returns: axis and indexes of the inserted zero pixels
+                  or None if the filter does not insert gaps
+        :rtype: (:obj:`int`, :obj:`list` <:obj:`int`>)
+        """
+        return None
+
     def initialize(self):
         """ initialize the filter
         """
@@ -97,7 +203,7 @@ class FilterList(list):
         """
         list.__init__(self)
         if configlist:
-            self.appendFilter(configlist)
+            self.appendFilters(configlist)
 
     def reset(self, configlist):
         """ reset filters
@@ -145,3 +251,262 @@ class FilterList(list):
         if not hasattr(instance, '__call__'):
             return
         self.append(instance)
+
+
+class FilterChain(FilterList):
+
+    """ Filter list applied with preallocated outputs
+
+        Consecutive gap filters are fused into one copy of the image.
+        Intermediate outputs of stages are allocated once per image shape
+        and used alternately while the output of the last stage
+        is allocated for every image, i.e. it can be kept by the caller.
+    """
+
+    def __init__(self, configlist=None):
+        """ constructor
+
+        :param configlist: list with filter configuration
+        :type configlist: \
+        :    :obj:`list` < [:obj:`str` , :obj:`str`] >
+        """
+        #: (:obj:`int`) filter configuration version
+        self.__version = 0
+        #: (:obj:`dict` <(:obj:`int`, :obj:`str`), :obj:`list`>)
+        #:    output images of stages
+        self.__buffers = {}
+        #: (:obj:`dict` <:obj:`int`, :obj:`tuple`>) fused gap maps of stages
+        self.__gapmaps = {}
+        FilterList.__init__(self, configlist)
+
+    def appendFilters(self, configlist):
+        """ appends filters
+
+        :param configlist: list with filter configuration
+        :type configlist: \
+        :    :obj:`list` < [:obj:`str` , :obj:`str`] >
+        """
+        try:
+            FilterList.appendFilters(self, configlist)
+        finally:
+            self.__buffers = {}
+            self.__gapmaps = {}
+            self.__version += 1
+
+    def version(self):
+        """ provides filter configuration version
+
+        :returns: version incremented when filters are changed
+        :rtype: :obj:`int`
+        """
+        return self.__version
+
+    def threadSafeCount(self):
+        """ provides the number of leading thread-safe filters
+
+        :returns: number of filters which can be applied
+                  outside of the GUI thread
+        :rtype: :obj:`int`
+        """
+        count = 0
+        for flt in self:
+            if not getattr(flt, "threadsafe", False):
+                break
+            count += 1
+        return count
+
+    def apply(self, image, imagename, metadata, imagewg,
+              start=0, stop=None, onerror=None):
+        """ applies filters
+
+        :param image: numpy array with an image
+        :type image: :class:`numpy.ndarray`
+        :param imagename: image name
+        :type imagename: :obj:`str`
+        :param metadata: JSON dictionary with metadata
+        :type metadata: :obj:`str`
+        :param imagewg: image wigdet
+        :type imagewg: :class:`lavuelib.imageWidget.ImageWidget`
+        :param start: index of the first filter
+        :type start: :obj:`int`
+        :param stop: index after the last filter, None for all filters
+        :type stop: :obj:`int`
+        :param onerror: function called with the filter exception,
+                        if None the exception is raised
+        :type onerror: :obj:`callable`
+        :returns: filtered image and metadata dictionary of filters
+        :rtype: (:class:`numpy.ndarray`,
+                 :obj:`dict` <:obj:`str`, :obj:`any`>)
+        """
+        flts = list(self)
+        stop = len(flts) if stop is None else min(stop, len(flts))
+        mdata = {}
+        owned = False
+        index = start
+        while index < stop:
+            last = index + 1
+            gapstage = self.__gaps(flts[index]) is not None
+            if gapstage:
+                while last < stop and self.__gaps(flts[last]) is not None:
+                    last += 1
+            final = last == stop
+            try:
+                if image is not None:
+                    if gapstage:
+                        image = self.__insertGaps(
+                            index, flts[index:last], np.asarray(image),
+                            final)
+                        owned = True
+                    else:
+                        image, owned = self.__applyFilter(
+                            index, flts[index], image, owned,
+                            imagename, metadata, imagewg, mdata, final)
+            except Exception as e:
+                if onerror is None:
+                    raise
+                onerror(e)
+            index = last
+        if owned and self.__isBuffer(image):
+            # e.g. the last filter passed a recycled output through
+            image = np.array(image)
+        return image, mdata
+
+    @classmethod
+    def __gaps(cls, flt):
+        """ provides gap pixels inserted by the filter
+
+        :param flt: image filter
+        :type flt: :class:`BaseFilter`
+        :returns: axis and indexes of gap pixels or None
+        :rtype: (:obj:`int`, :obj:`list` <:obj:`int`>)
+        """
+        gaps = getattr(flt, "gaps", None)
+        return gaps() if callable(gaps) else None
+
+    def __buffer(self, index, role, shape, dtype, final=False):
+        """ provides the next preallocated output of the stage
+
+        :param index: stage index
+        :type index: :obj:`int`
+        :param role: buffer role, i.e. input or output
+        :type role: :obj:`str`
+        :param shape: image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :param dtype: image data type
+        :type dtype: :class:`numpy.dtype`
+        :param final: if the stage is the last one, i.e.
+                      its output is allocated and handed out
+        :type final: :obj:`bool`
+        :returns: image buffer
+        :rtype: :class:`numpy.ndarray`
+        """
+        if final:
+            return np.empty(shape, dtype=dtype)
+        key = (index, role)
+        buffers = self.__buffers.get(key)
+        if buffers is None or buffers[0].shape != tuple(shape) or \
+           buffers[0].dtype != dtype:
+            buffers = [np.empty(shape, dtype=dtype),
+                       np.empty(shape, dtype=dtype)]
+            self.__buffers[key] = buffers
+        buffers.reverse()
+        return buffers[0]
+
+    def __isBuffer(self, image):
+        """ checks if the image is a recycled output of a stage
+
+        :param image: numpy array with an image
+        :type image: :class:`numpy.ndarray`
+        :returns: if the image is a preallocated buffer
+        :rtype: :obj:`bool`
+        """
+        return any(image is buf
+                   for buffers in self.__buffers.values()
+                   for buf in buffers)
+
+    def __insertGaps(self, index, flts, image, final=False):
+        """ inserts gaps of consecutive gap filters by one copy
+
+        :param index: stage index
+        :type index: :obj:`int`
+        :param flts: gap filters
+        :type flts: :obj:`list` <:class:`BaseFilter`>
+        :param image: numpy array with an image
+        :type image: :class:`numpy.ndarray`
+        :param final: if the stage is the last one
+        :type final: :obj:`bool`
+        :returns: image with gaps
+        :rtype: :class:`numpy.ndarray`
+        """
+        gaps = tuple((axis, tuple(indexes))
+                     for axis, indexes in
+                     [self.__gaps(flt) for flt in flts])
+        gapmap = self.__gapmaps.get(index)
+        if gapmap is None or gapmap[0] != (image.shape, gaps):
+            gapmap = ((image.shape, gaps), _gapMap(image.shape, gaps))
+            self.__gapmaps[index] = gapmap
+        shape, copies, zeros = gapmap[1]
+        out = self.__buffer(index, "output", shape, image.dtype, final)
+        for sel in zeros:
+            out[sel] = 0
+        for outsel, insel in copies:
+            out[outsel] = image[insel]
+        return out
+
+    def __applyFilter(self, index, flt, image, owned,
+                      imagename, metadata, imagewg, mdata, final=False):
+        """ applies the filter
+
+        :param index: stage index
+        :type index: :obj:`int`
+        :param flt: image filter
+        :type flt: :class:`BaseFilter`
+        :param image: numpy array with an image
+        :type image: :class:`numpy.ndarray`
+        :param owned: if the image is a chain output
+        :type owned: :obj:`bool`
+        :param imagename: image name
+        :type imagename: :obj:`str`
+        :param metadata: JSON dictionary with metadata
+        :type metadata: :obj:`str`
+        :param imagewg: image wigdet
+        :type imagewg: :class:`lavuelib.imageWidget.ImageWidget`
+        :param mdata: metadata dictionary to update
+        :type mdata: :obj:`dict` <:obj:`str`, :obj:`any`>
+        :param final: if the stage is the last one
+        :type final: :obj:`bool`
+        :returns: filtered image and if it is a chain output
+        :rtype: (:class:`numpy.ndarray`, :obj:`bool`)
+        """
+        isarray = isinstance(image, np.ndarray)
+        if isarray and not owned and getattr(flt, "inplace", False):
+            inp = self.__buffer(
+                index, "input", image.shape, image.dtype, final)
+            np.copyto(inp, image)
+            image, owned = inp, True
+        outputShape = getattr(flt, "outputShape", None)
+        shape = outputShape(image.shape) \
+            if isarray and callable(outputShape) else None
+        out = None
+        if shape is not None:
+            # a recycled input is not handed out by the last stage
+            if owned and getattr(flt, "inplace", False) and \
+               tuple(shape) == image.shape and \
+               not (final and self.__isBuffer(image)):
+                out = image
+            else:
+                out = self.__buffer(
+                    index, "output", shape, image.dtype, final)
+            result = flt(image, imagename, metadata, imagewg, out=out)
+        else:
+            result = flt(image, imagename, metadata, imagewg)
+        fltmdata = None
+        if isinstance(result, tuple) and len(result) >= 2:
+            result, fltmdata = result[:2]
+        if isinstance(fltmdata, dict):
+            mdata.update(fltmdata)
+        if result is not None and (
+                hasattr(result, "size") and result.size > 1):
+            return result, \
+                (result is out) or (owned and result is image)
+        return image, owned
@@ -0,0 +1,288 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+
+""" coordinate maps of the detector geometry shared by geometry tools """
+
+import math
+import threading
+import numpy as np
+
+#: (:obj:`float`) photon energy times wavelength in eV * A
+HC = 12398.4193
+
+#: (:obj:`list` <:obj:`str`>) settings parameters of the geometry
+GEOMETRY = ["centerx", "centery", "detdistance", "energy",
+            "pixelsizex", "pixelsizey", "detponi1", "detponi2",
+            "detrot1", "detrot2", "detrot3"]
+
+#: (:obj:`list` <:obj:`str`>) azimuthal integrator parameters
+#:    which define the coordinate maps
+AIGEOMETRY = ["dist", "poni1", "poni2", "rot1", "rot2", "rot3",
+              "pixel1", "pixel2", "wavelength"]
+
+#: (:obj:`list` <:obj:`str`>) names of coordinate maps, i.e.
+#:    total 2theta in rad, polar angle chi in rad within [-pi, pi]
+#:    as of pyFAI, |q| in 1/A and distance from the beam center in mm
+MAPS = ["theta", "chi", "q", "radius"]
+
+
+def integratorKey(ai):
+    """ provides the geometry key of the azimuthal integrator
+
+    :param ai: azimuthal integrator
+    :type ai: :class:`pyFAI.azimuthalIntegrator.AzimuthalIntegrator`
+    :returns: geometry key
+    :rtype: :obj:`tuple`
+    """
+    detector = getattr(ai, "detector", None)
+    return tuple(float(getattr(ai, name, 0.) or 0.)
+                 for name in AIGEOMETRY) \
+        + (str(getattr(detector, "splineFile", None)),)
+
+
+class GeometryMaps(object):
+
+    """ pixel to angle and q-space conversions and lazily built
+        full-frame coordinate maps of the detector geometry
+
+        The maps are given at pixel centers of images in the lavue order,
+        i.e. map[x, y]. They are calculated by the azimuthal integrator
+        of the settings if it is set, i.e. with PONI and rotations,
+        and for a flat detector perpendicular to the beam otherwise.
+        Callers using the azimuthal integrator hold `settings.aimutex`.
+    """
+
+    def __init__(self, settings):
+        """ constructor
+
+        :param settings: lavue configuration settings
+        :type settings: :class:`lavuelib.settings.Settings`
+        """
+        #: (:class:`lavuelib.settings.Settings`) settings
+        self.__settings = settings
+        #: (:class:`threading.Lock`) map lock
+        self.__lock = threading.Lock()
+        #: (:obj:`tuple`) geometry key of the cached maps
+        self.__key = None
+        #: (:obj:`tuple` <:obj:`int`>) shape of the cached maps
+        self.__shape = None
+        #: (:obj:`dict` <:obj:`str`, :class:`numpy.ndarray`>) cached maps
+        self.__maps = {}
+
+    def key(self):
+        """ provides the geometry key, i.e. center, distance, energy,
+            pixel sizes, PONI and rotations of the settings
+            and of the azimuthal integrator
+
+        :returns: geometry key
+        :rtype: :obj:`tuple`
+        """
+        ai = getattr(self.__settings, "ai", None)
+        return tuple(
+            float(getattr(self.__settings, name) or 0.) for name in GEOMETRY) \
+            + (integratorKey(ai) if ai is not None else ())
+
+    def isValid(self):
+        """ checks if energy and detector distance are set
+
+        :returns: valid geometry flag
+        :rtype: :obj:`bool`
+        """
+        return self.__settings.energy > 0 and \
+            self.__settings.detdistance > 0
+
+    def __offsets(self, xdata, ydata):
+        """ provides pixel offsets from the beam center in mm
+
+        :param xdata: x pixel position
+        :type xdata: :obj:`float` or :class:`numpy.ndarray`
+        :param ydata: y-pixel position
+        :type ydata: :obj:`float` or :class:`numpy.ndarray`
+        :returns: x and y offsets in mm
+        :rtype: (:obj:`float`, :obj:`float`)
+        """
+        st = self.__settings
+        return ((xdata - st.centerx) * st.pixelsizex / 1000.,
+                (ydata - st.centery) * st.pixelsizey / 1000.)
+
+    def pixel2theta(self, xdata, ydata, xy=True):
+        """ converts coordinates from pixel positions to theta angles
+
+        :param xdata: x pixel position
+        :type xdata: :obj:`float` or :class:`numpy.ndarray`
+        :param ydata: y-pixel position
+        :type ydata: :obj:`float` or :class:`numpy.ndarray`
+        :param xy: flag
+        :type xy: :obj:`bool`
+        :returns: x-theta, y-theta, total-theta
+        :rtype: (:obj:`float`, :obj:`float`, :obj:`float`)
+        """
+        thetax = None
+        thetay = None
+        thetatotal = None
+        if self.isValid():
+            distance = self.__settings.detdistance
+            xoff, yoff = self.__offsets(xdata, ydata)
+            if xy:
+                thetax = np.arctan(xoff / distance)
+                thetay = np.arctan(yoff / distance)
+            thetatotal = np.arctan(np.hypot(xoff, yoff) / distance)
+            if np.ndim(thetatotal) == 0:
+                thetatotal = float(thetatotal)
+                if xy:
+                    thetax = float(thetax)
+                    thetay = float(thetay)
+        return thetax, thetay, thetatotal
+
+    def pixel2q(self, xdata, ydata, xy=True):
+        """ converts coordinates from pixel positions to q-space coordinates
+
+        :param xdata: x pixel position
+        :type xdata: :obj:`float` or :class:`numpy.ndarray`
+        :param ydata: y-pixel position
+        :type ydata: :obj:`float` or :class:`numpy.ndarray`
+        :param xy: flag
+        :type xy: :obj:`bool`
+        :returns: q_x, q_y, q_total
+        :rtype: (:obj:`float`, :obj:`float`, :obj:`float`)
+        """
+        qx = None
+        qy = None
+        q = None
+        if self.isValid():
+            thetax, thetay, thetatotal = self.pixel2theta(xdata, ydata, xy)
+            fac = 4 * math.pi * self.__settings.energy / HC
+            if xy:
+                qx = fac * np.sin(thetax / 2.)
+                qy = fac * np.sin(thetay / 2.)
+            q = fac * np.sin(thetatotal / 2.)
+            if np.ndim(q) == 0:
+                q = float(q)
+                if xy:
+                    qx = float(qx)
+                    qy = float(qy)
+        return qx, qy, q
+
+    def isCached(self, name, shape):
+        """ checks if the map of the current geometry and shape is cached
+
+        :param name: map name, i.e. theta, chi, q or radius
+        :type name: :obj:`str`
+        :param shape: image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :returns: cached flag
+        :rtype: :obj:`bool`
+        """
+        with self.__lock:
+            return name in self.__maps and \
+                self.__key == self.key() and \
+                self.__shape == tuple(shape[:2])
+
+    def map(self, name, shape):
+        """ provides the full-frame coordinate map of the pixel centers
+
+        :param name: map name, i.e. theta, chi, q or radius
+        :type name: :obj:`str`
+        :param shape: image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :returns: float32 map or None if the geometry is not set
+        :rtype: :class:`numpy.ndarray`
+        """
+        if name not in MAPS:
+            raise ValueError("GeometryMaps: unknown map %s" % name)
+        if getattr(self.__settings, "ai", None) is None and \
+           not self.isValid():
+            return None
+        key = self.key()
+        shape = tuple(shape[:2])
+        with self.__lock:
+            if key != self.__key or shape != self.__shape:
+                # the maps are invalidated only by a geometry change
+                self.__maps = {}
+                self.__key = key
+                self.__shape = shape
+            if name not in self.__maps:
+                self.__maps[name] = self.__calculate(name, shape)
+            return self.__maps[name]
+
+    def __calculate(self, name, shape):
+        """ calculates the full-frame coordinate map
+
+        :param name: map name, i.e. theta, chi, q or radius
+        :type name: :obj:`str`
+        :param shape: image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :returns: float32 map
+        :rtype: :class:`numpy.ndarray`
+        """
+        ai = getattr(self.__settings, "ai", None)
+        if ai is not None:
+            # pyFAI maps are given in the (y, x) order
+            aishape = (shape[1], shape[0])
+            if name == "theta":
+                values = ai.twoThetaArray(aishape)
+            elif name == "chi":
+                values = ai.chiArray(aishape)
+            elif name == "q":
+                values = np.asarray(ai.qArray(aishape)) / 10.
+            else:
+                values = np.asarray(ai.rArray(aishape)) * 1000.
+            return np.asarray(values).T.astype("float32")
+        xoff, yoff = self.__offsets(
+            np.arange(shape[0], dtype="float64").reshape(shape[0], 1) + 0.5,
+            np.arange(shape[1], dtype="float64").reshape(1, shape[1]) + 0.5)
+        if name == "chi":
+            values = np.arctan2(yoff, xoff)
+        elif name == "radius":
+            values = np.hypot(xoff, yoff)
+        else:
+            values = np.arctan(
+                np.hypot(xoff, yoff) / self.__settings.detdistance)
+            if name == "q":
+                values = 4 * math.pi * self.__settings.energy / HC \
+                    * np.sin(values / 2.)
+        return values.astype("float32")
+
+    def lookup(self, name, xdata, ydata, shape):
+        """ provides the map value of the pixel center
+
+        :param name: map name, i.e. theta, chi, q or radius
+        :type name: :obj:`str`
+        :param xdata: x pixel position
+        :type xdata: :obj:`int`
+        :param ydata: y-pixel position
+        :type ydata: :obj:`int`
+        :param shape: image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :returns: map value or None outside the image
+        :rtype: :obj:`float`
+        """
+        values = self.map(name, shape)
+        xdata = int(math.floor(xdata))
+        ydata = int(math.floor(ydata))
+        if values is None or not 0 <= xdata < values.shape[0] \
+           or not 0 <= ydata < values.shape[1]:
+            return None
+        return float(values[xdata, ydata])
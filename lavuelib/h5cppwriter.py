@@ -1227,6 +1227,18 @@ class H5CppField(filewriter.FTField):
         """
         return self._h5object.dataspace.size
 
+    @property
+    def chunks(self):
+        """ field chunk shape
+
+        :returns: field chunk shape or `None` if the field is not chunked
+        :rtype: :obj:`list` < :obj:`int` >
+        """
+        dcpl = self._h5object.creation_list
+        if dcpl.layout != h5cpp.property.DatasetLayout.CHUNKED:
+            return None
+        return tuple(dcpl.chunk)
+
 
 class H5CppLink(filewriter.FTLink):
 
@@ -1012,6 +1012,38 @@ class H5PYField(filewriter.FTField):
         """
         return self._h5object.size
 
+    @property
+    def chunks(self):
+        """ field chunk shape
+
+        :returns: field chunk shape or `None` if the field is not chunked
+        :rtype: :obj:`list` < :obj:`int` >
+        """
+        return self._h5object.chunks
+
+    @property
+    def filters(self):
+        """ field filter pipeline
+
+        :returns: a list of (filter id, filter parameters)
+        :rtype: :obj:`list` < (:obj:`int`, :obj:`list` < :obj:`int` >) >
+        """
+        dcpl = self._h5object.id.get_create_plist()
+        return [tuple(dcpl.get_filter(i)[:3:2])
+                for i in range(dcpl.get_nfilters())]
+
+    def read_chunk(self, offset):
+        """ reads the raw chunk data without applying the filter pipeline
+
+        :param offset: logical position of the chunk first element
+        :type offset: :obj:`tuple` < :obj:`int` >
+        :returns: filter mask and raw chunk data
+        :rtype: (:obj:`int`, :obj:`bytes`)
+        """
+        if not hasattr(self._h5object.id, "read_direct_chunk"):
+            return filewriter.FTField.read_chunk(self, offset)
+        return self._h5object.id.read_direct_chunk(tuple(offset))
+
 
 class H5PYLink(filewriter.FTLink):
 
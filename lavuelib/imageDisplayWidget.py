@@ -34,14 +34,23 @@ import logging
 
 from . import axesDialog
 from . import memoExportDialog
+from . import imagePyramid
+from . import lookupTable
+from . import validityMask
 
 
 _VMAJOR, _VMINOR, _VPATCH = _pg.__version__.split(".")[:3] \
     if _pg.__version__ else ("0", "9", "0")
 
+#: (:obj:`bool`) pyqtgraph creates QImages from numpy arrays
+_QIMAGEFROMARRAY = hasattr(_pg.functions, "ndarray_to_qimage")
+
 
 logger = logging.getLogger("lavue")
 
+#: (:obj:`int`) minimal number of image pixels rendered with level of detail
+LODMINPIXELS = 1 << 20
+
 
 class SafeImageItem(_pg.ImageItem):
 
@@ -55,8 +64,92 @@ class SafeImageItem(_pg.ImageItem):
         :param kargs:  ImageItem parameter dictionary
         :type kargs: :obj:`dict` < :obj:`str`, :obj:`any`>
         """
+        #: (:class:`lavuelib.imageDisplayWidget.SafeImageItem`)
+        #:      child item which renders the level of detail instead
+        self.lodimage = None
+        #: (:class:`numpy.ndarray`) integer image of the displayed scaled image
+        self.integerimage = None
+        #: (:obj:`str`) intensity scaling of the integer image
+        self.scaling = "linear"
+        #: (:class:`numpy.ndarray`) validity mask of the integer image
+        self.invalidmask = None
+        #: (:obj:`tuple`) scaling, data type and levels of the color table
+        self.__colorkey = None
+        #: (:class:`numpy.ndarray`) lookup table of the color table
+        self.__colorlut = None
+        #: (:class:`numpy.ndarray`) ARGB32 colors of the integer image values
+        self.__colortable = None
         _pg.ImageItem.__init__(self, *args, **kargs)
 
+    def setLookupTable(self, *args, **kargs):
+        """ sets lookup table also for the level of detail item
+
+        :param args: ImageItem.setLookupTable parameters list
+        :type args: :obj:`list` < :obj:`any`>
+        :param kargs:  ImageItem.setLookupTable parameter dictionary
+        :type kargs: :obj:`dict` < :obj:`str`, :obj:`any`>
+        """
+        _pg.ImageItem.setLookupTable(self, *args, **kargs)
+        if self.lodimage is not None:
+            self.lodimage.setLookupTable(*args, **kargs)
+
+    def setLevels(self, *args, **kargs):
+        """ sets levels also for the level of detail item
+
+        :param args: ImageItem.setLevels parameters list
+        :type args: :obj:`list` < :obj:`any`>
+        :param kargs:  ImageItem.setLevels parameter dictionary
+        :type kargs: :obj:`dict` < :obj:`str`, :obj:`any`>
+        """
+        _pg.ImageItem.setLevels(self, *args, **kargs)
+        if self.lodimage is not None:
+            self.lodimage.setLevels(*args, **kargs)
+
+    def render(self):
+        """ renders the integer image by its color table
+            or the displayed image
+        """
+        if not self.__renderIntegerImage():
+            _pg.ImageItem.render(self)
+
+    def __renderIntegerImage(self):
+        """ maps the integer image straight to ARGB32 colors
+            by a table of scaling, levels and lookup table
+
+        :returns: if the image was rendered
+        :rtype: :obj:`bool`
+        """
+        image = self.integerimage
+        if not _QIMAGEFROMARRAY or image is None or self.image is None or \
+           image.shape != self.image.shape or len(image.shape) != 2 or \
+           self.levels is None or self.autoDownsample:
+            return False
+        levels = np.asarray(self.levels)
+        lut = self.lut(self.image) if callable(self.lut) else self.lut
+        if levels.shape != (2,) or \
+           (lut is not None and np.asarray(lut).dtype != np.uint8):
+            return False
+        key = (self.scaling, image.dtype.str,
+               float(levels[0]), float(levels[1]))
+        if key != self.__colorkey or lut is not self.__colorlut:
+            self.__colortable = lookupTable.colorTable(
+                self.scaling, image.dtype, levels, lut)
+            self.__colorkey = key
+            self.__colorlut = lut
+        if getattr(self, "axisOrder", "col-major") == "col-major":
+            image = image.T
+        argb = lookupTable.take(self.__colortable, image, order="C")
+        mask = self.invalidmask
+        if mask is not None and mask.shape == self.image.shape:
+            if getattr(self, "axisOrder", "col-major") == "col-major":
+                mask = mask.T
+            argb[mask] = validityMask.MASKCOLOR
+        self.qimage = _pg.functions.ndarray_to_qimage(
+            argb, QtGui.QImage.Format.Format_ARGB32)
+        self._renderRequired = False
+        self._unrenderable = False
+        return True
+
     def paint(self, p, *args):
         """ safe paint method
 
@@ -65,6 +158,8 @@ class SafeImageItem(_pg.ImageItem):
         :param args: ImageItem parameters list
         :type args: :obj:`list` < :obj:`any`>
         """
+        if self.lodimage is not None:
+            return
         try:
             _pg.ImageItem.paint(self, p, *args)
         except ValueError as e:
@@ -144,6 +239,8 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
     mouseImageDoubleClicked = QtCore.pyqtSignal(float, float)
     #: (:class:`pyqtgraph.QtCore.pyqtSignal`) mouse single clicked
     mouseImageSingleClicked = QtCore.pyqtSignal(float, float)
+    #: (:class:`pyqtgraph.QtCore.pyqtSignal`) image pyramid level built
+    _lodLevelBuilt = QtCore.pyqtSignal()
 
     def __init__(self, parent=None):
         """ constructor
@@ -176,14 +273,42 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
         self.__data = None
         #: (:class:`numpy.ndarray`) raw data to cut plots
         self.__rawdata = None
+        #: ((:class:`numpy.ndarray`, :class:`numpy.ndarray`, :obj:`str`))
+        #:      integer image, its scaled image and the intensity scaling
+        self.__integerimage = (None, None, "linear", None)
+        #: ((:class:`numpy.ndarray`, :class:`numpy.ndarray`, :obj:`tuple`))
+        #:      image in the original pixel order, its transformed view
+        #:      and the transpose, first and second axis flip flags
+        self.__orientedimage = (None, None, None)
+        #: (:class:`pyqtgraph.QtGui.QTransform`) image item transformation
+        #:      to the displayed orientation
+        self.__orientation = QtGui.QTransform()
 
         #: (:class:`pyqtgraph.ImageItem`) image item
         self.__image = SafeImageItem()
+        #: (:class:`pyqtgraph.ImageItem`) level of detail image item
+        #:     with the visible image crop reduced to the screen resolution
+        self.__lodimage = SafeImageItem()
+        self.__lodimage.setParentItem(self.__image)
+        self.__lodimage.hide()
+        #: (:class:`lavuelib.imagePyramid.ImagePyramid`) image pyramid
+        #:     whose levels are built on its worker thread
+        self.__pyramid = imagePyramid.ImagePyramid(
+            callback=self._lodLevelBuilt.emit)
+        #: (:obj:`str`) level of detail reduction, i.e. max or mean,
+        #:     None switches the level of detail rendering off
+        self.__lodreduction = None
+        #: (:obj:`tuple`) image id, reduction factor and image crop
+        #:     of the level of detail item
+        self.__lodcrop = None
 
         #: (:class:`pyqtgraph.ViewBox`) viewbox item
         self.__viewbox = self.__layout.addViewBox(row=0, col=1)
 
         self.__viewbox.addItem(self.__image)
+        self.__viewbox.sigRangeChanged.connect(self._updateLOD)
+        self.__viewbox.sigResized.connect(self._updateLOD)
+        self._lodLevelBuilt.connect(self._updateLOD)
         #: (:obj:`float`) current floar x-position
         self.__xfdata = 0
         #: (:obj:`float`) current floar y-position
@@ -245,6 +370,13 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
         self.sceneObj.rawdata = None
         self.setCursor(QtGui.QCursor(QtCore.Qt.CrossCursor))
 
+        #: (:class:`pyqtgraph.TextItem`) overlay text in view coordinates
+        self.__overlay = _pg.TextItem(
+            color=(255, 255, 0), fill=_pg.mkBrush(0, 0, 0, 160))
+        self.__overlay.setParentItem(self.__viewbox)
+        self.__overlay.setZValue(100)
+        self.__overlay.hide()
+
     def viewbox(self):
         """provides viewbox
         :rtype: :class:`pyqtgraph.ViewBox`
@@ -278,6 +410,18 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
         """
         return self.__extensions.keys()
 
+    def setOverlayText(self, text=None):
+        """ sets text of the overlay in the top left corner of the view
+
+        :param text: overlay text or None to hide the overlay
+        :type text: :obj:`str`
+        """
+        if text:
+            self.__overlay.setText(text)
+            self.__overlay.show()
+        else:
+            self.__overlay.hide()
+
     def setAspectLocked(self, flag):
         """sets aspectLocked
 
@@ -401,6 +545,7 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
                     axes.scale[1], axes.scale[0])
         else:
             self.__image.scale(1, 1)
+        self.__image.setTransform(self.__orientation, True)
         if axes.position is not None and anyupdate:
             if self.__transformations.orgtranspose and wrenabled:
                 self.__image.setPos(
@@ -473,6 +618,7 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
 
         if axes.scale is not None or axes.position is not None:
             self.__image.resetTransform()
+            self.__image.setTransform(self.__orientation)
         if axes.scale is not None:
             self.__image.scale(1, 1)
         if axes.position is not None:
@@ -490,31 +636,44 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
         :param rawimg: 2d raw image array
         :type rawimg: :class:`numpy.ndarray`
         """
+        itemimg = img
+        base, oriented, flags = self.__orientedimage
+        if img is not None and img is oriented and base is not None:
+            # the pixels are flipped and transposed by the item transform
+            itemimg = base
+            self.__setOrientation(img.shape, *flags)
+        else:
+            self.__setOrientation()
+        integer, scaled, scaling, mask = self.__integerimage
+        self.__image.integerimage = integer \
+            if itemimg is not None and itemimg is scaled else None
+        self.__image.scaling = scaling
+        self.__image.invalidmask = mask
         try:
             if img is not None and len(img.shape) == 3:
                 self.__image.setLookupTable(None)
-                if img.dtype.kind == 'f' and np.isnan(img.min()):
-                    img = np.nan_to_num(img)
+                if itemimg.dtype.kind == 'f' and np.isnan(itemimg.min()):
+                    itemimg = np.nan_to_num(itemimg)
                 self.__image.setImage(
-                    img, lut=None,
+                    itemimg, lut=None,
                     # levels=[[0,255], [0, 255], [0, 255]],
                     autoLevels=False)
             elif (self.__autodisplaylevels
                   and self.__displaylevels[0] is not None
                   and self.__displaylevels[1] is not None):
                 self.__image.setImage(
-                    img, autoLevels=False,
+                    itemimg, autoLevels=False,
                     levels=self.__displaylevels,
                     autoDownsample=self.__autodownsample)
             elif (self.__autodisplaylevels
                   or self.__displaylevels[0] is None
                   or self.__displaylevels[1] is None):
                 self.__image.setImage(
-                    img, autoLevels=False,
+                    itemimg, autoLevels=False,
                     autoDownsample=self.__autodownsample)
             else:
                 self.__image.setImage(
-                    img, autoLevels=False,
+                    itemimg, autoLevels=False,
                     levels=self.__displaylevels,
                     autoDownsample=self.__autodownsample)
         except Exception as e:
@@ -522,8 +681,171 @@ class ImageDisplayWidget(_pg.GraphicsLayoutWidget):
             # print(str(e))
         self.__data = img
         self.sceneObj.rawdata = rawimg
+        self._updateLOD(newimage=True)
         self.mouse_position()
 
+    def setIntegerImage(self, image=None, scaledimage=None,
+                        scaling="linear", mask=None):
+        """ sets the integer image of the next scaled image which is
+            rendered by a color table of all integer values
+
+        :param image: uint8 or uint16 image
+        :type image: :class:`numpy.ndarray`
+        :param scaledimage: scaled image to display
+        :type scaledimage: :class:`numpy.ndarray`
+        :param scaling: intensity scaling, i.e. linear, sqrt or log
+        :type scaling: :obj:`str`
+        :param mask: validity mask of the image, i.e. True for invalid pixels
+        :type mask: :class:`numpy.ndarray`
+        """
+        self.__integerimage = (image, scaledimage, scaling, mask)
+
+    def setImageOrientation(self, image=None, orientedimage=None,
+                            transpose=False, xflip=False, yflip=False):
+        """ sets the image of the next transformed image view
+            which is displayed by the image item transformation
+
+        :param image: image in the original pixel order
+        :type image: :class:`numpy.ndarray`
+        :param orientedimage: transformed image view to display
+        :type orientedimage: :class:`numpy.ndarray`
+        :param transpose: transpose flag
+        :type transpose: :obj:`bool`
+        :param xflip: flip of the first axis after transposition
+        :type xflip: :obj:`bool`
+        :param yflip: flip of the second axis after transposition
+        :type yflip: :obj:`bool`
+        """
+        self.__orientedimage = (
+            image, orientedimage, (transpose, xflip, yflip))
+
+    def __setOrientation(self, shape=None, transpose=False, xflip=False,
+                         yflip=False):
+        """ sets the image item transformation from the original pixel
+            order to the displayed orientation
+
+        :param shape: shape of the transformed image
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :param transpose: transpose flag
+        :type transpose: :obj:`bool`
+        :param xflip: flip of the first axis after transposition
+        :type xflip: :obj:`bool`
+        :param yflip: flip of the second axis after transposition
+        :type yflip: :obj:`bool`
+        """
+        orientation = QtGui.QTransform()
+        if transpose:
+            orientation = orientation * QtGui.QTransform(0, 1, 1, 0, 0, 0)
+        if xflip:
+            orientation = orientation * QtGui.QTransform(
+                -1, 0, 0, 1, shape[0], 0)
+        if yflip:
+            orientation = orientation * QtGui.QTransform(
+                1, 0, 0, -1, 0, shape[1])
+        if orientation != self.__orientation:
+            inverse = self.__orientation.inverted()[0]
+            self.__image.setTransform(
+                orientation * inverse * self.__image.transform())
+            self.__orientation = orientation
+            self.__lodcrop = None
+
+    def setLODRendering(self, reduction=None):
+        """ sets level of detail rendering
+
+        :param reduction: reduction function, i.e. max or mean,
+                          None or none switches it off
+        :type reduction: :obj:`str`
+        """
+        if reduction in [None, "", "none"]:
+            reduction = None
+        if reduction != self.__lodreduction:
+            self.__lodreduction = reduction
+            if reduction is not None:
+                self.__pyramid.setReduction(reduction)
+            self._updateLOD(newimage=True)
+
+    def _updateLOD(self, *args, **kargs):
+        """ updates the level of detail item with the visible image crop
+            reduced to the screen resolution, i.e. unless a validity mask
+            is displayed
+
+        :param args: signal parameters list
+        :type args: :obj:`list` < :obj:`any`>
+        :param kargs:  parameter dictionary, i.e. newimage flag
+        :type kargs: :obj:`dict` < :obj:`str`, :obj:`any`>
+        """
+        img = self.__image.image
+        # invalid pixels of the validity mask are rendered
+        # only by the full resolution item
+        if self.__lodreduction is None or img is None or \
+           len(img.shape) != 2 or img.size < LODMINPIXELS or \
+           self.__image.invalidmask is not None:
+            if self.__image.lodimage is not None:
+                self.__image.lodimage = None
+                self.__lodimage.hide()
+                self.__lodimage.setImage(np.zeros((1, 1)))
+                self.__pyramid.setImage(None)
+                self.__lodcrop = None
+                self.__image.update()
+            return
+        try:
+            if kargs.get("newimage"):
+                self.__pyramid.setImage(img)
+                self.__lodcrop = None
+            rect = self.__image.mapRectFromView(self.__viewbox.viewRect())
+            if rect.width() <= 0 or rect.height() <= 0:
+                return
+            x1 = max(int(math.floor(rect.left())), 0)
+            y1 = max(int(math.floor(rect.top())), 0)
+            x2 = min(int(math.ceil(rect.right())), img.shape[0])
+            y2 = min(int(math.ceil(rect.bottom())), img.shape[1])
+            # screen size of one image pixel from the current view range,
+            # i.e. the device transform of the item can be outdated
+            vrect = self.__viewbox.viewRect()
+            sx = vrect.width() / max(self.__viewbox.width(), 1)
+            sy = vrect.height() / max(self.__viewbox.height(), 1)
+            p0 = self.__image.mapToView(QtCore.QPointF(0, 0))
+            px = self.__image.mapToView(QtCore.QPointF(1, 0)) - p0
+            py = self.__image.mapToView(QtCore.QPointF(0, 1)) - p0
+            ratio = 1. / max(
+                math.hypot(px.x() / sx, px.y() / sy),
+                math.hypot(py.x() / sx, py.y() / sy), 1e-12)
+            factor = 1
+            while factor * 2 <= ratio:
+                factor *= 2
+            # a margin avoids new crops for small panning
+            mx = (x2 - x1) // 4 + factor
+            my = (y2 - y1) // 4 + factor
+            if self.__lodcrop is not None:
+                cfactor, cx1, cy1, cx2, cy2 = self.__lodcrop
+                if cfactor == factor and cx1 <= x1 and cy1 <= y1 \
+                   and cx2 >= x2 and cy2 >= y2 \
+                   and cx2 - cx1 <= x2 - x1 + 4 * mx \
+                   and cy2 - cy1 <= y2 - y1 + 4 * my:
+                    return
+            x1 = max(x1 - mx, 0)
+            y1 = max(y1 - my, 0)
+            x2 = min(x2 + mx, img.shape[0])
+            y2 = min(y2 + my, img.shape[1])
+            if x2 <= x1 or y2 <= y1:
+                return
+            crop, x0, y0 = self.__pyramid.crop(x1, y1, x2, y2, factor)
+            if crop is None or crop.size == 0:
+                return
+            if self.__image.lodimage is None:
+                self.__lodimage.setLookupTable(self.__image.lut)
+                self.__lodimage.setLevels(self.__image.levels)
+                self.__image.lodimage = self.__lodimage
+                self.__lodimage.show()
+            self.__lodimage.setImage(
+                crop, autoLevels=self.__image.levels is None)
+            self.__lodimage.setTransform(
+                QtGui.QTransform(factor, 0, 0, factor, x0, y0))
+            self.__lodcrop = (factor, x1, y1, x2, y2)
+            self.__image.update()
+        except Exception as e:
+            logger.warning(str(e))
+
     def currentIntensity(self):
         """ provides intensity for current mouse position
 
@@ -28,10 +28,14 @@
     and delivers just the actual array """
 
 import struct
+import os
 import numpy as np
 import sys
 import json
 import logging
+import zlib
+import itertools
+import threading
 
 from . import filewriter
 
@@ -53,6 +57,27 @@ try:
 except ImportError:
     PILLOW = False
 
+try:
+    import concurrent.futures
+    #: (:obj:`bool`) concurrent.futures can be imported
+    FUTURES = True
+except ImportError:
+    FUTURES = False
+
+try:
+    import bitshuffle
+    #: (:obj:`bool`) bitshuffle can be imported
+    BITSHUFFLE = True
+except ImportError:
+    BITSHUFFLE = False
+
+try:
+    import lz4.block
+    #: (:obj:`bool`) lz4 can be imported
+    LZ4 = True
+except ImportError:
+    LZ4 = False
+
 
 #: (:obj:`dict` <:obj:`str`, :obj:`module`> ) nexus writer modules
 WRITERS = {}
@@ -71,6 +96,252 @@ except Exception:
 logger = logging.getLogger("lavue")
 
 
+class ChunkDecompressor(object):
+
+    """ Reads raw chunks of nexus fields and decompresses them
+        in a pool of threads """
+
+    #: (:obj:`int`) HDF5 deflate filter id
+    DEFLATE = 1
+    #: (:obj:`int`) HDF5 shuffle filter id
+    SHUFFLE = 2
+    #: (:obj:`int`) HDF5 LZ4 filter id
+    LZ4 = 32004
+    #: (:obj:`int`) HDF5 bitshuffle filter id
+    BITSHUFFLE = 32008
+
+    #: (:obj:`int`) number of decompression threads, 0 switches it off
+    nthreads = 0
+    #: (:class:`concurrent.futures.ThreadPoolExecutor`) thread pool
+    __pool = None
+    #: (:class:`threading.Lock`) thread pool lock
+    __lock = threading.Lock()
+
+    @classmethod
+    def setNumberOfThreads(cls, nthreads):
+        """ sets a number of decompression threads
+
+        :param nthreads: number of threads, 0 switches it off
+        :type nthreads: :obj:`int`
+        """
+        nthreads = max(int(nthreads or 0), 0)
+        with cls.__lock:
+            if nthreads != cls.nthreads and cls.__pool is not None:
+                cls.__pool.shutdown(wait=False)
+                cls.__pool = None
+            cls.nthreads = nthreads
+
+    @classmethod
+    def __getPool(cls):
+        """ provides the thread pool
+
+        :returns: thread pool
+        :rtype: :class:`concurrent.futures.ThreadPoolExecutor`
+        """
+        with cls.__lock:
+            if cls.__pool is None and cls.nthreads > 0 and FUTURES:
+                cls.__pool = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=cls.nthreads)
+            return cls.__pool
+
+    @classmethod
+    def supported(cls, filters):
+        """ checks if the filter pipeline can be decoded
+
+        :param filters: a list of (filter id, filter parameters)
+        :type filters: :obj:`list` < (:obj:`int`, :obj:`list` <:obj:`int`>) >
+        :returns: if the filter pipeline can be decoded
+        :rtype: :obj:`bool`
+        """
+        for fid, cdvalues in filters:
+            if fid in [cls.DEFLATE, cls.SHUFFLE]:
+                continue
+            elif fid == cls.LZ4 and LZ4:
+                continue
+            elif fid == cls.BITSHUFFLE and BITSHUFFLE \
+                    and (len(cdvalues) < 5 or cdvalues[4] in [0, 2]):
+                continue
+            return False
+        return True
+
+    @classmethod
+    def _unshuffle(cls, buf, esize):
+        """ reverts the HDF5 byte shuffle filter
+
+        :param buf: shuffled buffer
+        :type buf: :obj:`bytes`
+        :param esize: element size
+        :type esize: :obj:`int`
+        :returns: unshuffled buffer
+        :rtype: :obj:`bytes`
+        """
+        nel = len(buf) // esize
+        if esize <= 1 or nel <= 1:
+            return buf
+        body = np.frombuffer(buf, dtype=np.uint8, count=nel * esize)
+        return body.reshape(esize, nel).T.tobytes() + buf[nel * esize:]
+
+    @classmethod
+    def _lz4(cls, buf):
+        """ decodes the HDF5 LZ4 filter
+
+        :param buf: compressed buffer
+        :type buf: :obj:`bytes`
+        :returns: decompressed buffer
+        :rtype: :obj:`bytes`
+        """
+        total, bsize = struct.unpack(">QI", buf[:12])
+        bsize = bsize or total
+        out = []
+        pos = 12
+        left = total
+        while left > 0:
+            size = min(bsize, left)
+            csize = struct.unpack(">I", buf[pos:pos + 4])[0]
+            pos += 4
+            block = buf[pos:pos + csize]
+            pos += csize
+            if csize == size:
+                out.append(bytes(block))
+            else:
+                out.append(lz4.block.decompress(
+                    block, uncompressed_size=size))
+            left -= size
+        return b"".join(out)
+
+    @classmethod
+    def _bitshuffle(cls, buf, cdvalues, dtype):
+        """ decodes the HDF5 bitshuffle filter
+
+        :param buf: compressed buffer
+        :type buf: :obj:`bytes`
+        :param cdvalues: filter parameters
+        :type cdvalues: :obj:`list` < :obj:`int` >
+        :param dtype: element type
+        :type dtype: :class:`numpy.dtype`
+        :returns: decompressed buffer
+        :rtype: :obj:`bytes`
+        """
+        if len(cdvalues) > 4 and cdvalues[4] == 2:
+            total, bsize = struct.unpack(">QI", buf[:12])
+            data = np.frombuffer(buf, dtype=np.uint8, offset=12)
+            arr = bitshuffle.decompress_lz4(
+                data, (total // dtype.itemsize,), dtype,
+                bsize // dtype.itemsize)
+        else:
+            bsize = cdvalues[3] if len(cdvalues) > 3 else 0
+            arr = bitshuffle.bitunshuffle(
+                np.frombuffer(buf, dtype=dtype), bsize)
+        return arr.tobytes()
+
+    @classmethod
+    def decode(cls, buf, mask, filters, dtype):
+        """ decodes the raw chunk
+
+        :param buf: raw chunk buffer
+        :type buf: :obj:`bytes`
+        :param mask: filter mask of skipped filters
+        :type mask: :obj:`int`
+        :param filters: a list of (filter id, filter parameters)
+        :type filters: :obj:`list` < (:obj:`int`, :obj:`list` <:obj:`int`>) >
+        :param dtype: element type
+        :type dtype: :class:`numpy.dtype`
+        :returns: decompressed buffer
+        :rtype: :obj:`bytes`
+        """
+        for ifl in reversed(range(len(filters))):
+            if mask & (1 << ifl):
+                continue
+            fid, cdvalues = filters[ifl]
+            if fid == cls.DEFLATE:
+                buf = zlib.decompress(buf)
+            elif fid == cls.SHUFFLE:
+                buf = cls._unshuffle(
+                    buf, cdvalues[0] if cdvalues else dtype.itemsize)
+            elif fid == cls.LZ4:
+                buf = cls._lz4(buf)
+            elif fid == cls.BITSHUFFLE:
+                buf = cls._bitshuffle(buf, cdvalues, dtype)
+        return buf
+
+    @classmethod
+    def read(cls, node, selection):
+        """ reads the field selection decompressing its chunks in parallel
+
+        :param node: nexus field node
+        :type node: :class:`lavuelib.filewriter.FTField`
+        :param selection: an index or a contiguous slice for every dimension
+        :type selection: :obj:`tuple` < :obj:`int` or :obj:`slice` >
+        :returns: selected data or None if the field cannot be read
+        :rtype: :class:`numpy.ndarray`
+        """
+        pool = cls.__getPool()
+        if pool is None:
+            return None
+        try:
+            chunks = node.chunks
+            filters = list(node.filters or [])
+            if not chunks or not filters or not cls.supported(filters):
+                return None
+            dtype = np.dtype(node.dtype)
+            shape = tuple(node.shape)
+        except Exception:
+            return None
+        if dtype.hasobject or len(chunks) != len(shape):
+            return None
+
+        starts = []
+        stops = []
+        for dm, sel in enumerate(selection):
+            if isinstance(sel, slice):
+                start, stop, step = sel.indices(shape[dm])
+                if step != 1:
+                    return None
+                starts.append(start)
+                stops.append(max(stop, start))
+            else:
+                idx = sel + shape[dm] if sel < 0 else sel
+                if idx < 0 or idx >= shape[dm]:
+                    return None
+                starts.append(idx)
+                stops.append(idx + 1)
+        image = np.empty([e - b for b, e in zip(starts, stops)], dtype=dtype)
+        if not image.size:
+            return image
+
+        def _process(offset, buf, mask):
+            data = np.frombuffer(
+                cls.decode(buf, mask, filters, dtype), dtype=dtype)
+            data = data.reshape(chunks)
+            src = []
+            dst = []
+            for dm, off in enumerate(offset):
+                beg = max(off, starts[dm])
+                end = min(off + chunks[dm], stops[dm])
+                src.append(slice(beg - off, end - off))
+                dst.append(slice(beg - starts[dm], end - starts[dm]))
+            image[tuple(dst)] = data[tuple(src)]
+
+        grid = [range((b // c) * c, e, c)
+                for b, e, c in zip(starts, stops, chunks)]
+        futures = []
+        try:
+            for offset in itertools.product(*grid):
+                # h5py does not allow concurrent reads
+                mask, buf = node.read_chunk(offset)
+                futures.append(pool.submit(_process, offset, buf, mask))
+            for ft in futures:
+                ft.result()
+        except Exception as e:
+            logger.debug(str(e))
+            for ft in futures:
+                ft.cancel()
+            return None
+        squeeze = tuple(dm for dm, sel in enumerate(selection)
+                        if not isinstance(sel, slice))
+        return np.squeeze(image, axis=squeeze) if squeeze else image
+
+
 class NexusFieldHandler(object):
 
     """Nexus file handler class.
@@ -370,6 +641,26 @@ class NexusFieldHandler(object):
                 value = value[0]
         return value
 
+    @classmethod
+    def __selection(cls, shape, frame, growing):
+        """ provides the image selection of the field
+
+        :param shape: field shape
+        :type shape: :obj:`list` < :obj:`int` >
+        :param frame: frame to take, the last one is -1
+        :type frame: :obj:`int`
+        :param growing: growing dimension
+        :type growing: :obj:`int`
+        :returns: an index or a full slice for every dimension
+        :rtype: :obj:`tuple` < :obj:`int` or :obj:`slice` >
+        """
+        selection = [slice(None)] * len(shape)
+        if frame is not None and len(shape) in [3, 4]:
+            if growing not in range(len(shape)):
+                growing = len(shape) - 1
+            selection[growing] = frame
+        return tuple(selection)
+
     @classmethod
     def getImage(cls, node, frame=-1, growing=0, refresh=True):
         """parses the field and add it into the description list
@@ -390,6 +681,11 @@ class NexusFieldHandler(object):
         if node:
             shape = node.shape
         if shape:
+            if ChunkDecompressor.nthreads > 0:
+                image = ChunkDecompressor.read(
+                    node, cls.__selection(shape, frame, growing))
+                if image is not None:
+                    return image
             if frame is None:
                 return node.read()
             if len(shape) == 2:
@@ -418,6 +714,54 @@ class NexusFieldHandler(object):
                     if frame < 0 or shape[3] > frame:
                         return node[:, :, :, frame]
 
+    @classmethod
+    def getImageRegion(cls, node, frame=-1, growing=0, region=None,
+                       refresh=True):
+        """ reads only the region of the image frame, i.e. a hyperslab
+
+        :param node: nexus field node
+        :type node: :class:`lavuelib.filewriter.FTField`
+        :param frame: frame to take, the last one is -1
+        :type frame: :obj:`int`
+        :param growing: growing dimension
+        :type growing: :obj:`int`
+        :param region: x1, y1, x2, y2 window of the transposed image
+        :type region: :obj:`list` < :obj:`int` >
+        :param refresh: refresh image node
+        :type refresh: :obj:`bool`
+        :returns: image region or None if it cannot be read as a hyperslab
+        :rtype: :class:`numpy.ndarray`
+        """
+        if not region or frame is None:
+            return None
+        if refresh:
+            node.refresh()
+        shape = list(node.shape or [])
+        if len(shape) not in [2, 3]:
+            return None
+        selection = list(cls.__selection(shape, frame, growing))
+        dims = [dm for dm, sel in enumerate(selection)
+                if isinstance(sel, slice)]
+        if len(dims) != 2:
+            return None
+        for dm, sel in enumerate(selection):
+            if not isinstance(sel, slice) and \
+               not -shape[dm] <= sel < shape[dm]:
+                return None
+        x1, y1, x2, y2 = region
+        # the sources transpose the image, i.e. x selects the columns
+        for dm, start, stop in [(dims[0], y1, y2), (dims[1], x1, x2)]:
+            start, stop, _ = slice(start, stop).indices(shape[dm])
+            if stop <= start:
+                return None
+            selection[dm] = slice(start, stop)
+        selection = tuple(selection)
+        if ChunkDecompressor.nthreads > 0:
+            image = ChunkDecompressor.read(node, selection)
+            if image is not None:
+                return image
+        return node[selection]
+
 
 class ImageFileHandler(object):
 
@@ -484,6 +828,139 @@ class ImageFileHandler(object):
         return self.__metadata
 
 
+class RawStackHandler(object):
+
+    """Raw stack file handler class.
+       Maps a file of raw frames with optional file and frame headers
+       and returns frames as read-only views of the mapped file.
+       The file may grow but it should not be truncated
+       while its frames are in use."""
+
+    def __init__(self, fname, dtype="uint16", shape=None, header=0,
+                 frameheader=0, framesize=None):
+        """ constructor
+
+        :param fname: file name
+        :type fname: :obj:`str`
+        :param dtype: pixel data type, little-endian if not given
+        :type dtype: :obj:`str`
+        :param shape: frame shape, i.e. height and width
+        :type shape: :obj:`list` <:obj:`int`>
+        :param header: file header size in bytes
+        :type header: :obj:`int`
+        :param frameheader: frame header size in bytes
+        :type frameheader: :obj:`int`
+        :param framesize: distance between frames in bytes,
+                          if None it is computed from the frame shape
+        :type framesize: :obj:`int`
+        """
+        if not shape:
+            raise ValueError("RawStackHandler: frame shape is not defined")
+        dtype = np.dtype(dtype)
+        if dtype.byteorder == "=":
+            dtype = dtype.newbyteorder("<")
+        #: (:obj:`str`) file name
+        self.fname = str(fname)
+        #: (:class:`numpy.dtype`) pixel data type
+        self.dtype = dtype
+        #: (:obj:`tuple` <:obj:`int`>) frame shape
+        self.shape = tuple(int(sh) for sh in shape)
+        #: (:obj:`int`) file header size in bytes
+        self.header = int(header or 0)
+        #: (:obj:`int`) frame header size in bytes
+        self.frameheader = int(frameheader or 0)
+        datasize = int(np.prod(self.shape)) * dtype.itemsize
+        #: (:obj:`int`) distance between frames in bytes
+        self.framesize = int(framesize or 0) or \
+            self.frameheader + datasize
+        if self.framesize < self.frameheader + datasize:
+            raise ValueError(
+                "RawStackHandler: frame size %s is smaller than %s"
+                % (self.framesize, self.frameheader + datasize))
+        #: (:class:`numpy.ndarray`) view of all mapped frames
+        self.__frames = None
+        #: (:obj:`int`) mapped file size in bytes
+        self.__size = 0
+
+    @classmethod
+    def fromFormat(cls, fname, rawformat):
+        """ creates the handler from the raw format dictionary
+
+        :param fname: file name
+        :type fname: :obj:`str`
+        :param rawformat: (JSON) dictionary with dtype, shape, header,
+                          frameheader and framesize items
+        :type rawformat: :obj:`str` or :obj:`dict` <:obj:`str`, :obj:`any`>
+        :returns: raw stack handler
+        :rtype: :class:`RawStackHandler`
+        """
+        if not isinstance(rawformat, dict):
+            rawformat = json.loads(rawformat or "{}")
+        return cls(fname, **rawformat)
+
+    def __map(self, size):
+        """ maps the file of the given size
+
+        :param size: file size
+        :type size: :obj:`int`
+        """
+        nframes = (size - self.header) // self.framesize
+        if nframes < 1:
+            self.__frames = None
+            self.__size = 0
+            return
+        mm = np.memmap(self.fname, dtype="uint8", mode="r", shape=(size,))
+        strides = [self.dtype.itemsize]
+        for sh in reversed(self.shape[1:]):
+            strides.insert(0, strides[0] * sh)
+        self.__frames = np.ndarray(
+            (nframes,) + self.shape, dtype=self.dtype, buffer=mm,
+            offset=self.header + self.frameheader,
+            strides=[self.framesize] + strides)
+        self.__size = size
+
+    def getFrameCount(self, refresh=True):
+        """ provides the number of complete frames
+
+        :param refresh: remap the file if it has grown
+        :type refresh: :obj:`bool`
+        :returns: a number of frames
+        :rtype: :obj:`int`
+        """
+        if refresh or self.__frames is None:
+            try:
+                size = os.path.getsize(self.fname)
+            except OSError:
+                size = 0
+            if size != self.__size:
+                self.__map(size)
+        return self.__frames.shape[0] if self.__frames is not None else 0
+
+    def getImage(self, frame=-1, refresh=True):
+        """ provides the frame as a read-only view of the mapped file
+
+        :param frame: frame number, negative numbers count from the end
+        :type frame: :obj:`int`
+        :param refresh: remap the file if it has grown
+        :type refresh: :obj:`bool`
+        :returns: image frame or None
+        :rtype: :class:`numpy.ndarray`
+        """
+        nframes = self.getFrameCount(refresh)
+        if frame is None:
+            frame = -1
+        if -nframes <= frame < nframes:
+            return self.__frames[frame]
+
+    def getMetaData(self):
+        """  provides the image metadata
+
+        :returns: JSON dictionary with image metadata
+        :rtype: :obj:`str`
+        """
+        return ""
+
+
 class CBFLoader(object):
 
     """ CBF loader """
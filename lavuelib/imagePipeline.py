@@ -0,0 +1,806 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+
+""" headless image processing pipeline """
+
+import json
+import logging
+import time
+
+import numpy as np
+
+from . import filters
+from . import imageFileHandler
+from . import imageSource as isr
+from . import imageStages
+from . import validityMask
+from . import sharedMemoryRing
+
+try:
+    import pyFAI
+    #: (:obj:`bool`) pyFAI imported
+    PYFAI = True
+except ImportError:
+    #: (:obj:`bool`) pyFAI imported
+    PYFAI = False
+
+try:
+    import zmq
+    #: (:obj:`bool`) zmq imported
+    ZMQ = True
+except ImportError:
+    #: (:obj:`bool`) zmq imported
+    ZMQ = False
+
+
+logger = logging.getLogger("lavue")
+
+#: (:obj:`dict` <:obj:`str`, :obj:`str`>) image source classes of aliases
+SOURCES = {
+    "test": "BaseSource",
+    "fixtest": "FixTestSource",
+    "http": "HTTPSource",
+    "hidra": "HiDRASource",
+    "asapo": "ASAPOSource",
+    "tangoattr": "TangoAttrSource",
+    "tangoevents": "TangoEventsSource",
+    "tangofile": "TangoFileSource",
+    "tineprop": "TinePropSource",
+    "epicspv": "EpicsPVSource",
+    "doocsprop": "DOOCSPropSource",
+    "nxsfile": "NXSFileSource",
+    "rawfile": "RawStackSource",
+    "dirwatch": "DirectoryWatchSource",
+    "zmq": "ZMQSource",
+    "shm": "SharedMemorySource",
+}
+
+
+def createSource(alias, configuration=None, timeout=None):
+    """ creates an image source
+
+    :param alias: image source alias, e.g. zmq, tangoattr or nxsfile
+    :type alias: :obj:`str`
+    :param configuration: configuration string of the image source
+    :type configuration: :obj:`str`
+    :param timeout: timeout for setting connection in ms
+    :type timeout: :obj:`int`
+    :returns: image source
+    :rtype: :class:`lavuelib.imageSource.BaseSource`
+    """
+    if alias not in SOURCES:
+        raise Exception("Unknown image source: %s" % alias)
+    source = getattr(isr, SOURCES[alias])(timeout)
+    if configuration is not None:
+        source.setConfiguration(configuration)
+    return source
+
+
+def loadImage(filename):
+    """ loads an image from a file, i.e. the first frame of the first
+        image field for nexus files
+
+    :param filename: image file name
+    :type filename: :obj:`str`
+    :returns: image in lavue coordinates
+    :rtype: :class:`numpy.ndarray`
+    """
+    filename = str(filename)
+    if filename.endswith(".nxs") or filename.endswith(".h5") \
+       or filename.endswith(".nx") or filename.endswith(".ndf"):
+        handler = imageFileHandler.NexusFieldHandler(filename)
+        fields = handler.findImageFields()
+        if not fields:
+            raise Exception("No image field found in %s" % filename)
+        field = fields[sorted(fields.keys())[0]]
+        return np.transpose(
+            handler.getImage(field["node"], 0, 0, refresh=False))
+    return np.transpose(
+        imageFileHandler.ImageFileHandler(filename).getImage())
+
+
+class ImagePipeline(object):
+
+    """ image processing pipeline of lavue without GUI, i.e. range window,
+        down-sampling, filters, memory buffer, channels, background and
+        bright field corrections, masks, transformations, intensity scaling,
+        statistics, ROI sums and diffractograms
+    """
+
+    def __init__(self, source=None, state=None):
+        """ constructor
+
+        :param source: image source
+        :type source: :class:`lavuelib.imageSource.BaseSource`
+        :param state: settings snapshot with lavue state keys, e.g.
+                      rangewindow, dsfactor, dsreduction, filters, mbuffer,
+                      channel, bkgfile, bkgscale, brightfieldfile,
+                      brightfieldscale, maskfile, maskhighvalue,
+                      transformation, scaling, rois, calibration
+        :type state: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        #: (:class:`lavuelib.imageSource.BaseSource`) image source
+        self.source = source
+        #: (:obj:`bool`) loop flag
+        self.__running = False
+
+        #: (:obj:`list` <:obj:`int`>) range window, i.e. x1, y1, x2, y2
+        self.__rangewindow = [None, None, None, None]
+        #: (:obj:`int`) down-sampling factor
+        self.__dsfactor = 1
+        #: (:obj:`str`) down-sampling reduction function
+        self.__dsreduction = "max"
+        #: (:class:`lavuelib.filters.FilterChain`) user filters
+        self.__filters = filters.FilterChain()
+        #: (:class:`lavuelib.imageStages.ImageBuffer`) memory buffer
+        self.__buffer = None
+        #: (:obj:`str`) channel label, i.e. sum, mean or channel number
+        self.__channel = "sum"
+        #: (:class:`numpy.ndarray`) background image
+        self.__bkgimage = None
+        #: (:obj:`float`) background scaling factor
+        self.__bkgscale = None
+        #: (:class:`numpy.ndarray`) bright field image
+        self.__bfimage = None
+        #: (:obj:`float`) bright field scaling factor
+        self.__bfscale = None
+        #: (:class:`numpy.ndarray`) scaled background image
+        self.__scbkgimage = None
+        #: (:class:`numpy.ndarray`) inverted bright-dark field image
+        self.__bfmdfimage = None
+        #: (:class:`numpy.ndarray`) mask indices
+        self.__maskindices = None
+        #: (:obj:`float`) high value mask
+        self.__maskhighvalue = None
+        #: (:obj:`str`) transformation name
+        self.__transformation = "none"
+        #: (:obj:`str`) intensity scaling, i.e. linear, sqrt or log
+        self.__scaling = "linear"
+        #: (:obj:`dict` <:obj:`str`, :obj:`list` <:obj:`list` <:obj:`int`>>>)
+        #:    roi coordinates [x1, y1, x2, y2] of roi labels
+        self.__rois = {}
+        #: (:class:`pyFAI.azimuthalIntegrator.AzimuthalIntegrator`)
+        #:    azimuthal integrator
+        self.__ai = None
+        #: (:obj:`str`) calibration file name
+        self.__calibration = None
+        #: (:obj:`list` <[:obj:`list` <:obj:`float`>,
+        #:    :obj:`list` <:obj:`float`>]>) radial and azimuth ranges
+        self.__diffranges = [[None, None]]
+        #: (:obj:`int`) number of diffractogram points
+        self.__diffnpt = 1000
+        #: (:obj:`bool`) correct solid angle of diffractograms
+        self.__correctsolidangle = True
+        #: (:obj:`str`) diffractogram unit
+        self.__diffunit = "q_nm^-1"
+        #: (:obj:`bool`) mask with NaN values
+        self.__nanmask = True
+        #: (:obj:`bool`) mask integer images by a validity mask
+        self.__validitymask = False
+        #: (:obj:`bool`) mask zero values of mask file
+        self.__zeromask = False
+        #: (:obj:`str`) floating point type
+        self.__floattype = "float"
+        #: (:obj:`bool`) statistics without intensity scaling
+        self.__statswoscaling = True
+        #: (:obj:`str`) last image name
+        self.__imagename = None
+        if state:
+            self.setState(state)
+
+    def setState(self, state):
+        """ sets pipeline settings from a settings snapshot
+
+        :param state: settings snapshot with lavue state keys
+        :type state: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        if "nanmask" in state:
+            self.__nanmask = bool(state["nanmask"])
+        if "validitymask" in state:
+            self.__validitymask = bool(state["validitymask"])
+        if "zeromask" in state:
+            self.__zeromask = bool(state["zeromask"])
+        if "floattype" in state:
+            self.__floattype = str(state["floattype"])
+        if "statswoscaling" in state:
+            self.__statswoscaling = bool(state["statswoscaling"])
+        if "rangewindow" in state:
+            rw = state["rangewindow"] or [None, None, None, None]
+            if not isinstance(rw, (list, tuple)):
+                rw = self.__parseRangeWindow(str(rw))
+            self.__rangewindow = [
+                (int(r) if r not in [None, ""] else None) for r in rw]
+        if "dsfactor" in state:
+            self.__dsfactor = max(int(state["dsfactor"] or 1), 1)
+        if "dsreduction" in state:
+            self.__dsreduction = str(state["dsreduction"] or "max")
+        if "filters" in state:
+            flts = state["filters"] or []
+            if not isinstance(flts, list):
+                flts = json.loads(flts)
+            self.__filters.reset(flts)
+        if "mbuffer" in state:
+            mbuffer = int(state["mbuffer"] or 0)
+            self.__buffer = imageStages.ImageBuffer(mbuffer) \
+                if mbuffer > 0 else None
+        if "channel" in state:
+            self.__channel = str(state["channel"] or "sum")
+        if "bkgscale" in state:
+            self.__bkgscale = float(state["bkgscale"]) \
+                if state["bkgscale"] not in [None, ""] else None
+        if "bkgfile" in state:
+            self.__bkgimage = loadImage(state["bkgfile"]) \
+                if state["bkgfile"] else None
+        if "brightfieldscale" in state:
+            self.__bfscale = float(state["brightfieldscale"]) \
+                if state["brightfieldscale"] not in [None, ""] else None
+        if "brightfieldfile" in state:
+            self.__bfimage = loadImage(state["brightfieldfile"]) \
+                if state["brightfieldfile"] else None
+        self.__updateCorrections()
+        if "maskfile" in state:
+            mask = loadImage(state["maskfile"]) \
+                if state["maskfile"] else None
+            if mask is None:
+                self.__maskindices = None
+            elif self.__zeromask:
+                self.__maskindices = (mask == 0)
+            else:
+                self.__maskindices = (mask != 0)
+        if "maskhighvalue" in state:
+            self.__maskhighvalue = float(state["maskhighvalue"]) \
+                if state["maskhighvalue"] not in [None, ""] else None
+        if "transformation" in state:
+            trafo = str(state["transformation"] or "none")
+            self.__transformation = imageStages.TRANSFORMATIONS.get(
+                trafo, trafo)
+        if "scaling" in state:
+            self.__scaling = str(state["scaling"] or "linear")
+        if "rois" in state:
+            rois = state["rois"] or {}
+            if not isinstance(rois, dict):
+                rois = json.loads(rois)
+            self.__rois = rois
+        if "diffnpt" in state:
+            self.__diffnpt = int(state["diffnpt"])
+        if "correctsolidangle" in state:
+            self.__correctsolidangle = bool(state["correctsolidangle"])
+        if "diffunit" in state:
+            self.__diffunit = str(state["diffunit"])
+        if "diffranges" in state:
+            self.__diffranges = list(state["diffranges"]) or [[None, None]]
+        if "calibration" in state:
+            self.__calibration = state["calibration"] or None
+            self.__ai = None
+            if self.__calibration:
+                if not PYFAI:
+                    raise Exception(
+                        "Diffractograms require the pyFAI package")
+                self.__ai = pyFAI.load(self.__calibration)
+
+    @classmethod
+    def __parseRangeWindow(cls, text):
+        """ parses the range window string, i.e. x1:x2,y1:y2
+
+        :param text: range window string
+        :type text: :obj:`str`
+        :returns: x1, y1, x2, y2
+        :rtype: :obj:`list` <:obj:`int`>
+        """
+        rw = [None, None, None, None]
+        for i, sl in enumerate(text.replace("m", "-").split(",")[:2]):
+            limits = sl.split(":")
+            if limits[0].strip():
+                rw[i] = int(limits[0])
+            if len(limits) > 1 and limits[1].strip():
+                rw[i + 2] = int(limits[1])
+        return rw
+
+    def __updateCorrections(self):
+        """ updates scaled background and bright field images
+        """
+        self.__scbkgimage = imageStages.correctionImage(
+            self.__bkgimage, self.__bkgscale)
+        self.__bfmdfimage = imageStages.invertedBrightField(
+            imageStages.correctionImage(self.__bfimage, self.__bfscale),
+            self.__scbkgimage, self.__floattype)
+
+    def process(self, image, imagename="", metadata=""):
+        """ processes the image
+
+        :param image: raw image
+        :type image: :class:`numpy.ndarray`
+        :param imagename: image name
+        :type imagename: :obj:`str`
+        :param metadata: json dictionary with image metadata
+        :type metadata: :obj:`str`
+        :returns: processed frame with imagename, timestamp, rawimage,
+                  image, scaledimage, validitymask, stats, rois
+                  and diffractograms or None if the image source has
+                  prepared the image for another range
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        mdata = {}
+        if metadata:
+            try:
+                mdata = json.loads(str(metadata))
+            except Exception as e:
+                logger.warning(str(e))
+        if not isinstance(mdata, dict):
+            mdata = {}
+        result = self.__applyRange(image, mdata.get("sourceregion"))
+        if result is None:
+            return None
+        image, position, scale = result
+        image = self.__applyFilters(image, imagename, metadata, mdata)
+        image = self.__applyBuffer(image, imagename, mdata)
+        rawimage = imageStages.greyImage(
+            image, self.__channel, bool(mdata.get("skipfirst")),
+            bool(mdata.get("suminthelast")))
+        image = self.__correct(rawimage)
+        image, invalid = self.__mask(image)
+        image = imageStages.transformImage(image, self.__transformation)
+        if invalid is not None:
+            invalid = imageStages.transformImage(
+                invalid, self.__transformation)
+        if self.__transformation in imageStages.TRANSPOSITIONS:
+            position = [position[1], position[0]]
+            scale = [scale[1], scale[0]]
+        scaled = imageStages.scaleImage(image, self.__scaling)
+        return {
+            "imagename": imagename,
+            "timestamp": time.time(),
+            "rawimage": rawimage,
+            "image": image,
+            "scaledimage": scaled,
+            "validitymask": invalid,
+            "stats": self.__stats(rawimage, image, scaled, invalid),
+            "rois": self.__roiSums(image, position, scale),
+            "diffractograms": self.__diffractograms(image, invalid),
+        }
+
+    def __applyRange(self, image, region=None):
+        """ applies range window and down-sampling
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :param region: range window and down-sampling applied by the source
+        :type region: :obj:`dict` <:obj:`str`, :obj:`any`>
+        :returns: image, image position, down-sampling scale
+                  or None if the image is prepared for another range
+        :rtype: (:class:`numpy.ndarray`, :obj:`list` <:obj:`int`>,
+                 :obj:`list` <:obj:`int`>)
+        """
+        factor = self.__dsfactor
+        applied = imageStages.appliedRegion(
+            region, self.__rangewindow, factor, self.__dsreduction)
+        if applied is None:
+            return None
+        cropped, binned = applied
+        x1, y1, x2, y2 = self.__rangewindow
+        position = [0, 0]
+        if cropped:
+            position = [x1 or 0, y1 or 0]
+        else:
+            image, position = imageStages.cropImage(image, x1, y1, x2, y2)
+        if factor > 1 and binned:
+            return image, position, [factor, factor]
+        image, scale = imageStages.downsampleImage(
+            image, factor, self.__dsreduction)
+        return image, position, scale
+
+    def __applyFilters(self, image, imagename, metadata, mdata):
+        """ applies user filters
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :param imagename: image name
+        :type imagename: :obj:`str`
+        :param metadata: json dictionary with image metadata
+        :type metadata: :obj:`str`
+        :param mdata: metadata dictionary to update
+        :type mdata: :obj:`dict` <:obj:`str`, :obj:`any`>
+        :returns: filtered image
+        :rtype: :class:`numpy.ndarray`
+        """
+        image, fltmdata = self.__filters.apply(
+            image, imagename, metadata, None,
+            onerror=lambda e: logger.warning("ImagePipeline: %s" % str(e)))
+        mdata.update(fltmdata)
+        return image
+
+    def __applyBuffer(self, image, imagename, mdata):
+        """ stacks the image with the last images of the memory buffer
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :param imagename: image name
+        :type imagename: :obj:`str`
+        :param mdata: metadata dictionary to update
+        :type mdata: :obj:`dict` <:obj:`str`, :obj:`any`>
+        :returns: image stack or image
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self.__buffer is None:
+            return image
+        result = self.__buffer.append(image, imagename)
+        if result is None:
+            return image
+        image, bmdata = result
+        mdata.update(bmdata)
+        return image
+
+    def __correct(self, image):
+        """ applies background and bright field corrections
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :returns: corrected image
+        :rtype: :class:`numpy.ndarray`
+        """
+        if self.__scbkgimage is not None:
+            image = imageStages.subtractBackground(image, self.__scbkgimage)
+        if self.__bfmdfimage is not None:
+            image = image * self.__bfmdfimage
+        return image
+
+    def __mask(self, image):
+        """ applies mask and high value mask
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :returns: masked image and validity mask of integer images
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+        """
+        invalid = None
+        validity = self.__validitymask and \
+            validityMask.isIntegerImage(image)
+        if self.__maskindices is not None:
+            image, invalid = imageStages.maskPixels(
+                image, self.__maskindices, invalid, validity,
+                self.__nanmask, self.__floattype)
+        if self.__maskhighvalue is not None:
+            image, invalid, _ = imageStages.maskHighValues(
+                image, self.__maskhighvalue, invalid, validity,
+                self.__nanmask, self.__floattype)
+        return image, invalid
+
+    def __stats(self, rawimage, image, scaled, invalid=None):
+        """ calculates image statistics
+
+        :param rawimage: grey image before corrections
+        :type rawimage: :class:`numpy.ndarray`
+        :param image: display image
+        :type image: :class:`numpy.ndarray`
+        :param scaled: scaled image
+        :type scaled: :class:`numpy.ndarray`
+        :param invalid: validity mask, i.e. True for invalid pixels
+        :type invalid: :class:`numpy.ndarray`
+        :returns: maxval, meanval, varval, minval, maxrawval and scaling
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        stats = imageStages.imageStats(
+            image, scaled, rawimage, invalid, self.__statswoscaling,
+            [True, True, True, True, True, False])
+        if stats is None:
+            return {}
+        maxval, meanval, varval, minval, maxrawval, _ = stats
+        return {
+            "maxval": float(maxval),
+            "meanval": float(meanval),
+            "varval": float(varval),
+            "minval": float(minval),
+            "maxrawval": float(maxrawval),
+            "scaling": ("linear" if self.__statswoscaling
+                        else self.__scaling),
+        }
+
+    def __roiSums(self, image, position, scale):
+        """ calculates ROI sums
+
+        :param image: display image
+        :type image: :class:`numpy.ndarray`
+        :param position: image position in detector pixels
+        :type position: :obj:`list` <:obj:`int`>
+        :param scale: down-sampling scale
+        :type scale: :obj:`list` <:obj:`int`>
+        :returns: roi sums of roi labels
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`list` <:obj:`float`>>
+        """
+        sums = {}
+        for label, coords in self.__rois.items():
+            sums[label] = [
+                float(imageStages.roiSum(image, [
+                    (crd[0] - position[0]) // scale[0],
+                    (crd[1] - position[1]) // scale[1],
+                    (crd[2] - position[0]) // scale[0],
+                    (crd[3] - position[1]) // scale[1]]))
+                for crd in coords]
+        return sums
+
+    def __diffractograms(self, image, invalid=None):
+        """ calculates diffractograms with pyFAI
+
+        :param image: display image
+        :type image: :class:`numpy.ndarray`
+        :param invalid: validity mask, i.e. True for invalid pixels
+        :type invalid: :class:`numpy.ndarray`
+        :returns: list of [x, y] diffractograms
+        :rtype: :obj:`list` <[:obj:`list` <:obj:`float`>,
+                                :obj:`list` <:obj:`float`>]>
+        """
+        if self.__ai is None or len(image.shape) != 2:
+            return []
+        dts, mask = imageStages.integrationData(
+            image.T,
+            [invalid.T] if validityMask.matches(image, invalid) else None)
+        diffs = []
+        for radrange, azrange in self.__diffranges:
+            res = self.__ai.integrate1d(
+                dts, self.__diffnpt,
+                correctSolidAngle=self.__correctsolidangle,
+                radial_range=radrange, azimuth_range=azrange,
+                unit=self.__diffunit, mask=mask)
+            diffs.append(
+                [np.asarray(res[0], dtype=float).tolist(),
+                 np.asarray(res[1], dtype=float).tolist()])
+        return diffs
+
+    def calibration(self):
+        """ provides the calibration file name
+
+        :returns: calibration file name
+        :rtype: :obj:`str`
+        """
+        return self.__calibration
+
+    def diffractogramRanges(self):
+        """ provides radial and azimuth ranges of diffractograms
+
+        :returns: radial and azimuth ranges
+        :rtype: :obj:`list` <[:obj:`list` <:obj:`float`>,
+                                :obj:`list` <:obj:`float`>]>
+        """
+        return list(self.__diffranges)
+
+    def frames(self, refreshtime=0.1, maxframes=None, sourceregion=True):
+        """ fetches images from the source and yields processed frames
+            with the decoded image and its metadata
+
+        :param refreshtime: polling time of the source in seconds
+        :type refreshtime: :obj:`float`
+        :param maxframes: maximal number of frames or None
+        :type maxframes: :obj:`int`
+        :param sourceregion: let the source read only the range window,
+                             otherwise the decoded images are full frames
+        :type sourceregion: :obj:`bool`
+        :returns: processed frames
+        :rtype: :obj:`generator` <:obj:`dict` <:obj:`str`, :obj:`any`>>
+        """
+        if self.source is None:
+            raise Exception("No image source defined")
+        if not self.source.connect():
+            raise Exception(
+                "Cannot connect the image source: %s"
+                % self.source.errormessage)
+        self.__running = True
+        self.__imagename = None
+        counter = 0
+        try:
+            while self.__running:
+                if maxframes is not None and counter >= maxframes:
+                    break
+                if sourceregion:
+                    self.source.setRegion(
+                        *self.__rangewindow, binning=self.__dsfactor,
+                        reduction=self.__dsreduction)
+                image, name, metadata = self.source.applyRegion(
+                    *self.source.getData())
+                if name == "__ERROR__":
+                    logger.warning("ImagePipeline: %s" % str(image))
+                elif name is not None and str(name).strip() and \
+                        str(name).strip() != str(self.__imagename).strip() \
+                        and isinstance(image, np.ndarray) and image.size:
+                    self.__imagename = name
+                    frame = self.process(image, name, metadata)
+                    if frame is not None:
+                        frame["decodedimage"] = image
+                        frame["metadata"] = metadata
+                        counter += 1
+                        yield frame
+                    continue
+                time.sleep(refreshtime)
+        finally:
+            self.__running = False
+            self.source.disconnect()
+
+    def stop(self):
+        """ stops fetching frames
+        """
+        self.__running = False
+
+
+def resultMessage(frame):
+    """ provides a JSON serializable message with results of the frame
+
+    :param frame: processed frame
+    :type frame: :obj:`dict` <:obj:`str`, :obj:`any`>
+    :returns: result message
+    :rtype: :obj:`dict` <:obj:`str`, :obj:`any`>
+    """
+    message = {"command": "results",
+               "imagename": str(frame["imagename"]),
+               "calctime": frame["timestamp"]}
+    message.update(frame["stats"])
+    if frame["rois"]:
+        message["rois"] = frame["rois"]
+    if frame["diffractograms"]:
+        message["diffractograms"] = frame["diffractograms"]
+    return message
+
+
+class ZMQResultPublisher(object):
+
+    """ publishes results on a ZMQ PUB socket """
+
+    def __init__(self, address, topic="10002"):
+        """ constructor
+
+        :param address: socket address to bind, e.g. tcp://*:5560
+        :type address: :obj:`str`
+        :param topic: message topic
+        :type topic: :obj:`str`
+        """
+        if not ZMQ:
+            raise Exception("ZMQ results require the pyzmq package")
+        #: (:obj:`str`) message topic
+        self.__topic = topic
+        #: (:class:`zmq.Context`) zmq context
+        self.__context = zmq.Context()
+        #: (:class:`zmq.Socket`) zmq socket
+        self.__socket = self.__context.socket(zmq.PUB)
+        self.__socket.bind(address)
+
+    def publish(self, frame):
+        """ publishes the frame results
+
+        :param frame: processed frame
+        :type frame: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        self.__socket.send_string(
+            "%s %s" % (self.__topic, json.dumps(resultMessage(frame))))
+
+    def close(self):
+        """ closes the socket
+        """
+        self.__socket.close(linger=0)
+        self.__context.term()
+
+
+class SharedMemoryPublisher(object):
+
+    """ republishes decoded frames with their metadata into a shared
+        memory ring, so other lavue instances on the host read them
+        by the shm source without connecting and decoding the detector
+        stream again. The frames should be fetched without the source region
+        to be processed by the readers with their own settings
+    """
+
+    def __init__(self, name, nslots=8):
+        """ constructor
+
+        :param name: shared memory name or file path
+        :type name: :obj:`str`
+        :param nslots: number of ring slots
+        :type nslots: :obj:`int`
+        """
+        #: (:obj:`str`) shared memory name or file path
+        self.__name = name
+        #: (:obj:`int`) number of ring slots
+        self.__nslots = nslots
+        #: (:class:`lavuelib.sharedMemoryRing.SharedMemoryRingWriter`)
+        #:    shared memory ring writer
+        self.__writer = None
+
+    def publish(self, frame):
+        """ writes the decoded image of the frame with its metadata
+            into the ring
+
+        :param frame: processed frame
+        :type frame: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        image = frame.get("decodedimage")
+        if not isinstance(image, np.ndarray) or not image.size:
+            return
+        metadata = frame.get("metadata") or ""
+        # the shm source transposes frames to the lavue orientation
+        image = np.transpose(image)
+        size = image.nbytes + len(sharedMemoryRing.metadataBytes(metadata))
+        if self.__writer is None or size > self.__writer.slotsize:
+            if self.__writer is not None:
+                self.__writer.close()
+            self.__writer = sharedMemoryRing.SharedMemoryRingWriter(
+                self.__name, nslots=self.__nslots, slotsize=size)
+        self.__writer.write(
+            image, timestamp=frame["timestamp"], metadata=metadata)
+
+    def close(self):
+        """ removes the ring
+        """
+        if self.__writer is not None:
+            self.__writer.close(unlink=True)
+            self.__writer = None
+
+
+class ControllerResultPublisher(object):
+
+    """ writes results into LavueController attributes """
+
+    def __init__(self, device, pipeline=None):
+        """ constructor
+
+        :param device: LavueController device name
+        :type device: :obj:`str`
+        :param pipeline: image pipeline
+        :type pipeline: :class:`ImagePipeline`
+        """
+        from . import controllerClient
+        if not controllerClient.TANGO:
+            raise Exception(
+                "LavueController results require the tango package")
+        #: (:class:`lavuelib.controllerClient.ControllerClient`) client
+        self.__client = controllerClient.ControllerClient(device)
+        #: (:class:`ImagePipeline`) image pipeline
+        self.__pipeline = pipeline
+
+    def publish(self, frame):
+        """ writes the frame results
+
+        :param frame: processed frame
+        :type frame: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        if frame["rois"]:
+            self.__client.writeAttribute(
+                "DetectorROIsValues", json.dumps(frame["rois"]))
+        diffs = frame["diffractograms"]
+        if diffs:
+            results = {"tool": "diffractogram"}
+            results["imagename"] = str(frame["imagename"])
+            results["timestamp"] = frame["timestamp"]
+            results["nrdiffs"] = len(diffs)
+            ranges = []
+            if self.__pipeline is not None:
+                results["calibration"] = self.__pipeline.calibration()
+                ranges = self.__pipeline.diffractogramRanges()
+            for i, diff in enumerate(diffs):
+                if i < len(ranges):
+                    results["radial_range_%s" % (i + 1)] = ranges[i][0]
+                    results["azimuth_range_%s" % (i + 1)] = ranges[i][1]
+                results["diff_%s" % (i + 1)] = diff
+            self.__client.writeAttribute("ToolResults", json.dumps(results))
+
+    def close(self):
+        """ closes the publisher
+        """
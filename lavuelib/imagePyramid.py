@@ -0,0 +1,199 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+
+""" multi-resolution image pyramid for level-of-detail rendering """
+
+import threading
+import numpy as np
+
+from . import blockReduction
+
+
+#: (:obj:`dict` <:obj:`str`, :class:`numpy.dtype`>) data types
+#:    of the reduced levels
+LEVELTYPES = {
+    "mean": np.float32,
+    "sum": np.float64,
+}
+
+
+def blockreduce(image, factor, reduction="max"):
+    """ reduces image blocks of factor x factor pixels,
+        the last blocks can be partial
+
+    :param image: 2d image
+    :type image: :class:`numpy.ndarray`
+    :param factor: block size
+    :type factor: :obj:`int`
+    :param reduction: reduction function, i.e. max, min, mean or sum
+    :type reduction: :obj:`str`
+    :returns: reduced image
+    :rtype: :class:`numpy.ndarray`
+    """
+    if factor <= 1:
+        return image
+    return blockReduction.reduce(
+        image, factor, reduction, dtype=LEVELTYPES.get(reduction))
+
+
+class ImagePyramid(object):
+
+    """ provides crops of an image reduced by powers of two.
+        The pyramid levels are built on a worker thread,
+        i.e. crops of levels which are not ready yet are reduced
+        from the next finer level.
+    """
+
+    def __init__(self, reduction="max", minsize=256, callback=None):
+        """ constructor
+
+        :param reduction: reduction function, i.e. max, min, mean or sum
+        :type reduction: :obj:`str`
+        :param minsize: size of the coarsest pyramid level
+        :type minsize: :obj:`int`
+        :param callback: function called by the worker thread
+                         when a pyramid level is built
+        :type callback: :obj:`callable`
+        """
+        #: (:obj:`str`) reduction function
+        self.reduction = reduction
+        #: (:obj:`int`) size of the coarsest pyramid level
+        self.minsize = minsize
+        #: (:obj:`callable`) function called when a level is built
+        self.callback = callback
+        #: (:class:`threading.Lock`) pyramid lock
+        self.__lock = threading.Lock()
+        #: (:obj:`dict` <:obj:`int`, :class:`numpy.ndarray`>)
+        #:    pyramid levels with reduction factor keys
+        self.__levels = {}
+        #: (:obj:`int`) image generation
+        self.__generation = 0
+        #: (:obj:`int`) generation of the complete pyramid
+        self.__built = 0
+        #: (:class:`threading.Thread`) worker thread
+        self.__thread = None
+
+    def setImage(self, image):
+        """ sets a new image and starts building its pyramid
+
+        :param image: 2d image
+        :type image: :class:`numpy.ndarray`
+        """
+        with self.__lock:
+            self.__generation += 1
+            self.__levels = {1: image} if image is not None else {}
+            if image is None:
+                self.__built = self.__generation
+            elif self.__thread is None:
+                self.__thread = threading.Thread(target=self.__build)
+                self.__thread.daemon = True
+                self.__thread.start()
+
+    def setReduction(self, reduction):
+        """ sets the reduction function and rebuilds the pyramid
+
+        :param reduction: reduction function, i.e. max, min, mean or sum
+        :type reduction: :obj:`str`
+        """
+        if reduction != self.reduction:
+            self.reduction = reduction
+            with self.__lock:
+                image = self.__levels.get(1)
+            self.setImage(image)
+
+    def __build(self):
+        """ builds the pyramid levels of the current image
+        """
+        while True:
+            with self.__lock:
+                if self.__built == self.__generation:
+                    self.__thread = None
+                    return
+                generation = self.__generation
+                reduction = self.reduction
+                factor = max(self.__levels.keys())
+                level = self.__levels[factor]
+            if max(level.shape[:2]) <= self.minsize:
+                with self.__lock:
+                    if generation == self.__generation:
+                        self.__built = generation
+                continue
+            reduced = blockreduce(level, 2, reduction)
+            with self.__lock:
+                if generation != self.__generation:
+                    continue
+                self.__levels[2 * factor] = reduced
+            if self.callback is not None:
+                try:
+                    self.callback()
+                except RuntimeError:
+                    # the receiver has been deleted
+                    self.callback = None
+
+    def ready(self):
+        """ checks if the pyramid of the current image is complete
+
+        :returns: pyramid complete flag
+        :rtype: :obj:`bool`
+        """
+        with self.__lock:
+            return self.__built == self.__generation
+
+    def crop(self, x1, y1, x2, y2, factor):
+        """ provides the image crop reduced by the factor
+
+        :param x1: first pixel of the first axis
+        :type x1: :obj:`int`
+        :param y1: first pixel of the second axis
+        :type y1: :obj:`int`
+        :param x2: pixel after the last one of the first axis
+        :type x2: :obj:`int`
+        :param y2: pixel after the last one of the second axis
+        :type y2: :obj:`int`
+        :param factor: reduction factor, i.e. a power of two
+        :type factor: :obj:`int`
+        :returns: reduced crop and its first pixel in image coordinates
+                  or None if there is no image
+        :rtype: (:class:`numpy.ndarray`, :obj:`int`, :obj:`int`)
+        """
+        with self.__lock:
+            finer = [fc for fc in self.__levels.keys() if fc <= factor]
+            if not finer:
+                return None, 0, 0
+            base = max(finer)
+            level = self.__levels[base]
+            reduction = self.reduction
+        x1 = max(int(x1) // factor, 0)
+        y1 = max(int(y1) // factor, 0)
+        x2 = -(-int(x2) // factor)
+        y2 = -(-int(y2) // factor)
+        if base == factor:
+            return level[x1:x2, y1:y2], x1 * factor, y1 * factor
+        # only the crop of the level which is not ready is reduced
+        scale = factor // base
+        crop = blockreduce(
+            level[x1 * scale:x2 * scale, y1 * scale:y2 * scale],
+            scale, reduction)
+        return crop, x1 * factor, y1 * factor
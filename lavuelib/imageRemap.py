@@ -0,0 +1,400 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" precomputed image remaps """
+
+import threading
+import collections
+import numpy as np
+import scipy.sparse
+
+#: (:obj:`dict` <:obj:`str`, :obj:`int`>) interpolation orders
+INTERPOLATIONS = {
+    "nearest": 0,
+    "bilinear": 1,
+    "spline": 3,
+}
+
+
+class RotationRemap(object):
+
+    """ index/weight remap which rotates 2d images by an arbitrary angle
+        in the same way as :func:`scipy.ndimage.rotate` with reshape=True
+        and the grid-constant mode
+    """
+
+    #: (:obj:`int`) maximal number of cached remaps
+    maxcached = 8
+
+    #: (:class:`collections.OrderedDict` <:obj:`tuple`,
+    #:     :class:`RotationRemap`>) remap cache
+    __cache = collections.OrderedDict()
+    #: (:class:`threading.Lock`) cache lock
+    __cachelock = threading.Lock()
+
+    def __init__(self, angle, shape, order=1):
+        """ constructor
+
+        :param angle: rotation angle in degrees
+        :type angle: :obj:`float`
+        :param shape: input image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :param order: interpolation order: 0 (nearest) or 1 (bilinear)
+        :type order: :obj:`int`
+        """
+        if order not in [0, 1]:
+            raise ValueError(
+                "RotationRemap: interpolation order %s not supported"
+                % order)
+        #: (:obj:`float`) rotation angle in degrees
+        self.angle = float(angle)
+        #: (:obj:`tuple` <:obj:`int`>) input image shape
+        self.shape = tuple(int(sh) for sh in shape)
+        #: (:obj:`int`) interpolation order
+        self.order = order
+        #: (:obj:`tuple` <:obj:`int`>) output image shape
+        self.outshape = None
+        #: (:class:`numpy.ndarray`) flat indices of the padded input image
+        self.__indices = None
+        #: (:class:`numpy.ndarray`) row interpolation fractions
+        self.__frows = None
+        #: (:class:`numpy.ndarray`) column interpolation fractions
+        self.__fcols = None
+        #: (:class:`numpy.ndarray`) padded input buffer
+        self.__padded = None
+        #: (:obj:`list` <:class:`numpy.ndarray`>) gather buffers
+        self.__work = []
+        #: (:class:`threading.Lock`) buffer lock
+        self.__lock = threading.Lock()
+        self.__createMap()
+
+    @classmethod
+    def get(cls, angle, shape, order=1):
+        """ provides a cached remap
+
+        :param angle: rotation angle in degrees
+        :type angle: :obj:`float`
+        :param shape: input image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :param order: interpolation order: 0 (nearest) or 1 (bilinear)
+        :type order: :obj:`int`
+        :returns: rotation remap
+        :rtype: :class:`RotationRemap`
+        """
+        key = (float(angle), tuple(int(sh) for sh in shape), order)
+        with cls.__cachelock:
+            remap = cls.__cache.pop(key, None)
+            if remap is None:
+                remap = RotationRemap(angle, shape, order)
+            cls.__cache[key] = remap
+            while len(cls.__cache) > cls.maxcached:
+                cls.__cache.popitem(last=False)
+        return remap
+
+    @classmethod
+    def clearCache(cls):
+        """ removes all cached remaps
+        """
+        with cls.__cachelock:
+            cls.__cache.clear()
+
+    def __createMap(self):
+        """ computes indices and interpolation fractions of the remap
+        """
+        rad = np.deg2rad(self.angle)
+        cs, sn = np.cos(rad), np.sin(rad)
+        rot = np.array([[cs, sn], [-sn, cs]])
+        inshape = np.array(self.shape[:2], dtype=float)
+        iy, ix = inshape
+        bounds = np.dot(rot, np.array([[0, 0, iy, iy], [0, ix, 0, ix]]))
+        outshape = (np.ptp(bounds, axis=1) + 0.5).astype(int)
+        self.outshape = tuple(int(sh) for sh in outshape)
+        offset = (inshape - 1) / 2. - np.dot(rot, (outshape - 1) / 2.)
+
+        orows = np.arange(self.outshape[0], dtype=float)[:, None]
+        ocols = np.arange(self.outshape[1], dtype=float)[None, :]
+        rows = (rot[0, 0] * orows + rot[0, 1] * ocols + offset[0]).ravel()
+        cols = (rot[1, 0] * orows + rot[1, 1] * ocols + offset[1]).ravel()
+
+        pcols = self.shape[1] + 2
+        npad = (self.shape[0] + 2) * pcols
+        itype = np.int32 if npad + pcols < np.iinfo(np.int32).max \
+            else np.int64
+        if self.order == 0:
+            rows = np.floor(rows + 0.5)
+            cols = np.floor(cols + 0.5)
+            valid = (rows >= 0) & (rows < self.shape[0]) & \
+                (cols >= 0) & (cols < self.shape[1])
+        else:
+            frows = np.floor(rows)
+            fcols = np.floor(cols)
+            valid = (frows >= -1) & (frows < self.shape[0]) & \
+                (fcols >= -1) & (fcols < self.shape[1])
+            self.__frows = np.where(valid, rows - frows, 0).astype(np.float32)
+            self.__fcols = np.where(valid, cols - fcols, 0).astype(np.float32)
+            rows = frows
+            cols = fcols
+        # invalid pixels point to the zero border of the padded image
+        self.__indices = np.where(
+            valid, (rows + 1) * pcols + cols + 1, 0).astype(itype)
+
+    def __pad(self, image, dtype):
+        """ copies the image into the padded input buffer
+
+        :param image: input image
+        :type image: :class:`numpy.ndarray`
+        :param dtype: buffer data type
+        :type dtype: :class:`numpy.dtype`
+        :returns: flat padded image
+        :rtype: :class:`numpy.ndarray`
+        """
+        shape = (self.shape[0] + 2, self.shape[1] + 2)
+        if self.__padded is None or self.__padded.dtype != dtype:
+            self.__padded = np.zeros(shape, dtype=dtype)
+        self.__padded[1:-1, 1:-1] = image
+        return self.__padded.ravel()
+
+    def __call__(self, image, out=None):
+        """ rotates the image
+
+        :param image: 2d input image of the remap shape
+        :type image: :class:`numpy.ndarray`
+        :param out: output buffer of the output shape and image dtype
+        :type out: :class:`numpy.ndarray`
+        :returns: rotated image
+        :rtype: :class:`numpy.ndarray`
+        """
+        image = np.asarray(image)
+        if tuple(image.shape) != self.shape:
+            raise ValueError(
+                "RotationRemap: image shape %s does not match %s"
+                % (image.shape, self.shape))
+        if out is None or out.shape != self.outshape \
+           or out.dtype != image.dtype:
+            out = np.empty(self.outshape, dtype=image.dtype)
+        with self.__lock:
+            if self.order == 0:
+                flat = self.__pad(image, image.dtype)
+                np.take(flat, self.__indices, out=out.reshape(-1))
+                return out
+            if image.dtype.kind in "biu" and image.dtype.itemsize <= 2 \
+               or image.dtype == np.float32:
+                wtype = np.dtype(np.float32)
+            else:
+                wtype = np.dtype(np.float64)
+            flat = self.__pad(image, wtype)
+            size = self.__indices.size
+            if len(self.__work) != 3 or self.__work[0].dtype != wtype:
+                self.__work = [np.empty(size, dtype=wtype) for _ in range(3)]
+            top, bottom, tmp = self.__work
+            pcols = self.shape[1] + 2
+            # top = p[i] + (p[i + 1] - p[i]) * fc
+            np.take(flat, self.__indices, out=top)
+            np.take(flat[1:], self.__indices, out=tmp)
+            np.subtract(tmp, top, out=tmp)
+            np.multiply(tmp, self.__fcols, out=tmp)
+            np.add(top, tmp, out=top)
+            # bottom = p[i + w] + (p[i + w + 1] - p[i + w]) * fc
+            np.take(flat[pcols:], self.__indices, out=bottom)
+            np.take(flat[pcols + 1:], self.__indices, out=tmp)
+            np.subtract(tmp, bottom, out=tmp)
+            np.multiply(tmp, self.__fcols, out=tmp)
+            np.add(bottom, tmp, out=bottom)
+            # result = top + (bottom - top) * fr
+            np.subtract(bottom, top, out=bottom)
+            np.multiply(bottom, self.__frows, out=bottom)
+            np.add(top, bottom, out=top)
+            if out.dtype.kind in "biu":
+                np.rint(top, out=top)
+            np.copyto(out.reshape(-1), top, casting="unsafe")
+        return out
+
+
+class LineCutSampler(object):
+
+    """ precomputed bilinear sampling of line cuts which gives the same
+        profiles as :meth:`pyqtgraph.ROI.getArrayRegion` averaged over
+        the cut width
+
+        All cuts are evaluated with one sparse matrix-vector product
+        of the flattened image.
+    """
+
+    #: (:obj:`int`) maximal number of cached cut matrices
+    maxcached = 64
+
+    #: (:class:`collections.OrderedDict` <:obj:`tuple`,
+    #:     :class:`scipy.sparse.csr_matrix`>) cut matrix cache
+    __cache = collections.OrderedDict()
+    #: (:class:`threading.Lock`) cache lock
+    __cachelock = threading.Lock()
+
+    def __init__(self, params, shape, order="C"):
+        """ constructor
+
+        :param params: (shape, vectors, origin) affine slice parameters
+                       of cuts given by
+                       :meth:`pyqtgraph.ROI.getAffineSliceParams`
+        :type params: :obj:`list` < (:obj:`list` <:obj:`float`>,
+                      :obj:`list` <:obj:`list` <:obj:`float`>>,
+                      :obj:`list` <:obj:`float`>) >
+        :param shape: 2d image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :param order: memory layout of the image, i.e. "C" or "F"
+        :type order: :obj:`str`
+        """
+        #: (:obj:`tuple` <:obj:`int`>) image shape
+        self.shape = tuple(int(sh) for sh in shape)
+        #: (:obj:`str`) memory layout of the image
+        self.order = order
+        keys = [self.key(prm, self.shape, order) for prm in params]
+        matrices = [self.__cutMatrix(key) for key in keys]
+        #: (:obj:`list` <:obj:`int`>) profile offsets
+        self.offsets = list(np.cumsum([0] + [mt.shape[0] for mt in matrices]))
+        #: (:obj:`list` <:obj:`tuple`>) cache keys of the cuts
+        self.keys = keys
+        #: (:class:`scipy.sparse.csr_matrix`) sampling matrix of all cuts
+        self.__sampling = scipy.sparse.vstack(matrices, format="csr") \
+            if matrices else None
+
+    @classmethod
+    def key(cls, params, shape, order="C"):
+        """ provides a cache key of the cut
+
+        :param params: (shape, vectors, origin) affine slice parameters
+        :type params: (:obj:`list` <:obj:`float`>,
+                      :obj:`list` <:obj:`list` <:obj:`float`>>,
+                      :obj:`list` <:obj:`float`>)
+        :param shape: 2d image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :param order: memory layout of the image, i.e. "C" or "F"
+        :type order: :obj:`str`
+        :returns: cache key
+        :rtype: :obj:`tuple`
+        """
+        cshape, vectors, origin = params
+        return (tuple(float(sh) for sh in cshape),
+                tuple(tuple(float(v) for v in vc) for vc in vectors),
+                tuple(float(org) for org in origin),
+                tuple(int(sh) for sh in shape), order)
+
+    def __cutMatrix(self, key):
+        """ provides a cached sampling matrix of the cut
+
+        :param key: cache key
+        :type key: :obj:`tuple`
+        :returns: sampling matrix
+        :rtype: :class:`scipy.sparse.csr_matrix`
+        """
+        cls = LineCutSampler
+        with cls.__cachelock:
+            matrix = cls.__cache.pop(key, None)
+            if matrix is None:
+                matrix = self.__createMatrix(*key[:3])
+            cls.__cache[key] = matrix
+            while len(cls.__cache) > cls.maxcached:
+                cls.__cache.popitem(last=False)
+        return matrix
+
+    def __createMatrix(self, cshape, vectors, origin):
+        """ computes the sampling matrix of the cut
+
+        :param cshape: slice shape
+        :type cshape: :obj:`tuple` <:obj:`float`>
+        :param vectors: slice vectors
+        :type vectors: :obj:`tuple` <:obj:`tuple` <:obj:`float`>>
+        :param origin: slice origin
+        :type origin: :obj:`tuple` <:obj:`float`>
+        :returns: sampling matrix
+        :rtype: :class:`scipy.sparse.csr_matrix`
+        """
+        npts, nwidth = [int(np.ceil(sh)) for sh in cshape]
+        npix = self.shape[0] * self.shape[1]
+        if npts <= 0 or nwidth <= 0:
+            return scipy.sparse.csr_matrix((max(npts, 0), npix))
+        grid0 = np.arange(npts, dtype=float)[:, None]
+        grid1 = np.arange(nwidth, dtype=float)[None, :]
+        coords = [
+            (grid0 * vectors[0][ax] + grid1 * vectors[1][ax]
+             + origin[ax]).ravel()
+            for ax in range(2)]
+        rows = np.repeat(np.arange(npts), nwidth)
+        valid = np.ones(rows.shape, dtype=bool)
+        lower = []
+        fracs = []
+        for ax in range(2):
+            low = np.floor(coords[ax])
+            valid &= (low >= 0) & (coords[ax] <= self.shape[ax] - 1)
+            lower.append(low.astype(np.int64))
+            fracs.append(coords[ax] - low)
+        allrows = []
+        allcols = []
+        allweights = []
+        for c0 in [0, 1]:
+            for c1 in [0, 1]:
+                idx = []
+                weights = np.where(valid, 1.0 / nwidth, 0.0)
+                for ax, corner in enumerate([c0, c1]):
+                    ind = lower[ax] + corner
+                    ind[(ind < 0) | (ind >= self.shape[ax])] = 0
+                    idx.append(ind)
+                    weights = weights * (
+                        fracs[ax] if corner else 1.0 - fracs[ax])
+                if self.order == "F":
+                    cols = idx[0] + idx[1] * self.shape[0]
+                else:
+                    cols = idx[0] * self.shape[1] + idx[1]
+                used = weights != 0
+                allrows.append(rows[used])
+                allcols.append(cols[used])
+                allweights.append(weights[used])
+        return scipy.sparse.csr_matrix(
+            (np.concatenate(allweights),
+             (np.concatenate(allrows), np.concatenate(allcols))),
+            shape=(npts, npix))
+
+    @classmethod
+    def clearCache(cls):
+        """ removes all cached cut matrices
+        """
+        with cls.__cachelock:
+            cls.__cache.clear()
+
+    def __call__(self, image):
+        """ samples cut profiles of the image
+
+        :param image: 2d image of the sampler shape
+        :type image: :class:`numpy.ndarray`
+        :returns: cut profiles
+        :rtype: :obj:`list` <:class:`numpy.ndarray`>
+        """
+        if tuple(image.shape) != self.shape:
+            raise ValueError(
+                "LineCutSampler: image shape %s does not match %s"
+                % (image.shape, self.shape))
+        if self.__sampling is None:
+            return []
+        profiles = self.__sampling.dot(np.ravel(image, order=self.order))
+        return [profiles[self.offsets[i]:self.offsets[i + 1]]
+                for i in range(len(self.offsets) - 1)]
@@ -33,6 +33,7 @@ import logging
 import os
 
 from . import dataFetchThread
+from . import stageTimers
 from .sardanaUtils import debugmethod
 
 try:
@@ -95,6 +96,22 @@ except ImportError:
     #: (:obj:`bool`) PIL imported
     PILLOW = False
 
+try:
+    import concurrent.futures
+    #: (:obj:`bool`) concurrent.futures imported
+    FUTURES = True
+except ImportError:
+    #: (:obj:`bool`) concurrent.futures imported
+    FUTURES = False
+
+try:
+    import xxhash
+    #: (:obj:`bool`) xxhash imported
+    XXHASH = True
+except ImportError:
+    #: (:obj:`bool`) xxhash imported
+    XXHASH = False
+
 try:
     import zmq
     #: (:obj:`str`,:obj:`str`) zmq major version, zmq minor version
@@ -140,7 +157,10 @@ import socket
 import numpy as np
 import random
 import time
+import threading
+import collections
 import datetime
+import zlib
 import pytz
 try:
     import cPickle
@@ -150,6 +170,9 @@ import sys
 
 from io import BytesIO
 from . import imageFileHandler
+from . import blockReduction
+from . import sharedMemoryRing
+from . import directoryWatcher
 
 if sys.version_info > (3,):
     buffer = memoryview
@@ -160,6 +183,9 @@ else:
 
 logger = logging.getLogger("lavue")
 
+#: (:obj:`int`) maximal number of image elements sampled by frame digests
+DIGESTSAMPLES = 1 << 20
+
 #: (:obj:`bool`) PyTango bug #213 flag related to EncodedAttributes in python3
 PYTG_BUG_213 = False
 if sys.version_info > (3,):
@@ -225,6 +251,31 @@ def tostr(x):
         return str(x)
 
 
+def framedigest(image, samples=None):
+    """ provides a fast digest of an image computed from
+        at most `samples` strided image elements
+
+    :param image: image data
+    :type image: :class:`numpy.ndarray`
+    :param samples: maximal number of sampled elements
+    :type samples: :obj:`int`
+    :returns: image shape, image dtype, digest of sampled elements
+    :rtype: (:obj:`tuple` <:obj:`int`>, :obj:`str`, :obj:`int`)
+    """
+    samples = samples or DIGESTSAMPLES
+    sampled = image
+    if image.ndim and image.size > samples:
+        step = int(np.ceil(
+            (float(image.size) / samples) ** (1. / image.ndim)))
+        sampled = image[(slice(None, None, step),) * image.ndim]
+    sampled = np.ascontiguousarray(sampled).tobytes()
+    if XXHASH:
+        digest = xxhash.xxh64(sampled).intdigest()
+    else:
+        digest = zlib.crc32(sampled) & 0xffffffff
+    return tuple(image.shape), str(image.dtype), digest
+
+
 class BaseSource(object):
 
     """ source base class"""
@@ -250,6 +301,32 @@ class BaseSource(object):
         self.__images = []
         #: (:obj:`int` <>) a number of test images
         self.__isize = 11
+        #: (:obj:`int`) source frame counter of the last image or None
+        self._frameid = None
+        #: (:obj:`int`) acquisition number increased by sources
+        #:    which detect restarts of the frame counter
+        self._acquisition = 0
+        #: (:obj:`float`) time when the raw data of the last image
+        #:    was received, i.e. before decoding
+        self._fetchedtime = None
+        #: (:obj:`list` <:obj:`int`>) region window x1, y1, x2, y2
+        #:    of the provided images or None
+        self._region = None
+        #: (:obj:`int`) region down-sampling factor
+        self._binning = 1
+        #: (:obj:`str`) region down-sampling reduction function
+        self._reduction = "max"
+        #: (:obj:`bool`) the last image has been read within the region window
+        self._regionread = False
+        #: (:obj:`bool`) the region or processing of fetched images
+        #:    has been changed since the last image
+        self.__refresh = False
+        #: (:obj:`bool`) the last image has been provided after the region
+        #:    or processing has been changed, i.e. it is not a duplicate
+        self.__refreshed = False
+        #: (:obj:`tuple`) the last image with its name and metadata
+        #:    before cropping, i.e. to be processed again
+        self.__lastdata = None
 
     def getMetaData(self):
         """ get metadata
@@ -298,6 +375,161 @@ class BaseSource(object):
         return (self.__images[self.__counter % self.__isize],
                 '__random_%s__' % self.__counter, "")
 
+    def frameKey(self, image, name):
+        """ provides a key identifying the image frame, i.e.
+            the source frame counter with the acquisition number
+            if the counter is known or a sampled digest of the image data
+
+        :param image: image data
+        :type image: :class:`numpy.ndarray`
+        :param name: image name
+        :type name: :obj:`str`
+        :returns: frame key or None
+        :rtype: :obj:`tuple`
+        """
+        if self._frameid is not None:
+            return ("frame", self._acquisition, self._frameid)
+        if isinstance(image, np.ndarray):
+            return ("digest",) + framedigest(image)
+
+    def frameNumber(self):
+        """ provides the source frame counter of the last image
+
+        :returns: frame counter or None
+        :rtype: :obj:`int`
+        """
+        return self._frameid
+
+    def _markFetched(self):
+        """ marks the end of the raw data transfer, i.e.
+            the beginning of the image decoding
+        """
+        self._fetchedtime = stageTimers.clock()
+
+    def fetchedTime(self):
+        """ provides and resets the time when the raw data
+            of the last image was received
+
+        :returns: time in s of :func:`lavuelib.stageTimers.clock` or None
+        :rtype: :obj:`float`
+        """
+        fetchedtime, self._fetchedtime = self._fetchedtime, None
+        return fetchedtime
+
+    def setRegion(self, x1=None, y1=None, x2=None, y2=None, binning=1,
+                  reduction="max"):
+        """ sets the region of interest, i.e. the range window and
+            the down-sampling factor in coordinates of the provided images
+
+        :param x1: x1 position
+        :type x1: :obj:`int`
+        :param y1: y1 position
+        :type y1: :obj:`int`
+        :param x2: x2 position
+        :type x2: :obj:`int`
+        :param y2: y2 position
+        :type y2: :obj:`int`
+        :param binning: down-sampling factor
+        :type binning: :obj:`int`
+        :param reduction: reduction function, i.e. max, min, mean or sum
+        :type reduction: :obj:`str`
+        """
+        window = [x1, y1, x2, y2]
+        if all(crd is None for crd in window):
+            window = None
+        region = (window, max(int(binning or 1), 1), str(reduction or "max"))
+        if region != self.region():
+            self._region, self._binning, self._reduction = region
+            self.__refresh = True
+
+    def region(self):
+        """ provides the region of interest
+
+        :returns: x1, y1, x2, y2 window or None, down-sampling factor
+                  and reduction function
+        :rtype: (:obj:`list` <:obj:`int`>, :obj:`int`, :obj:`str`)
+        """
+        return self._region, self._binning, self._reduction
+
+    def refresh(self):
+        """ provides the last image again by :meth:`applyRegion`
+            if there is no new one, e.g. after the processing
+            of fetched images has been changed
+        """
+        self.__refresh = True
+
+    def refreshed(self):
+        """ checks if the image provided by the last :meth:`applyRegion`
+            follows a change of the region or of the processing, i.e.
+            it has to be processed even if it is the same frame
+
+        :returns: refreshed flag
+        :rtype: :obj:`bool`
+        """
+        return self.__refreshed
+
+    def applyRegion(self, image, name, metadata):
+        """ crops and down-samples the image fetched by :meth:`getData`
+            unless the source has already read only the region window.
+            The applied region is added to the metadata as sourceregion.
+            If there is no new image after the region has been changed
+            or :meth:`refresh` has been called the last one is provided again
+
+        :param image: image data
+        :type image: :class:`numpy.ndarray`
+        :param name: image name
+        :type name: :obj:`str`
+        :param metadata: json dictionary with metadata
+        :type metadata: :obj:`str`
+        :returns:  image data, image name, json dictionary with metadata
+        :rtype: (:class:`numpy.ndarray`, :obj:`str` , :obj:`str`)
+        """
+        regionread, self._regionread = self._regionread, False
+        refresh, self.__refresh = self.__refresh, False
+        self.__refreshed = refresh
+        if name is None:
+            if refresh and self.__lastdata is not None:
+                image, name, metadata = self.__lastdata
+        elif name != "__ERROR__":
+            self.__lastdata = None if regionread else (image, name, metadata)
+        if (self._region is None and self._binning == 1) or \
+           name is None or name == "__ERROR__" or \
+           not isinstance(image, np.ndarray) or not image.size:
+            return image, name, metadata
+        window = self._region or [None, None, None, None]
+        if self._region is not None and not regionread:
+            x1, y1, x2, y2 = window
+            shape = image.shape
+            cut = None
+            if len(shape) == 1 and shape[0]:
+                cut = image[x1:x2]
+            elif len(shape) == 2:
+                cut = image[x1:x2, y1:y2]
+            elif len(shape) == 3:
+                cut = image[:, x1:x2, y1:y2]
+            if cut is None or not cut.size:
+                return image, name, metadata
+            image = cut
+        factor = self._binning
+        shape = image.shape
+        binning = 1
+        if len(shape) in [2, 3] and factor > 1 and \
+           shape[-2] >= factor and shape[-1] >= factor:
+            image = blockReduction.reduce(image, factor, self._reduction)
+            binning = factor
+        mdata = {}
+        if metadata:
+            try:
+                mdata = json.loads(str(metadata))
+            except Exception as e:
+                logger.debug(str(e))
+            if not isinstance(mdata, dict):
+                mdata = {}
+        mdata["sourceregion"] = {
+            "window": window, "binning": binning,
+            "reduction": self._reduction}
+        return image, name, json.dumps(mdata)
+
     @debugmethod
     def connect(self):
         """ connects the source
@@ -474,8 +706,13 @@ class NXSFileSource(BaseSource):
                     if fid - 1 < self.__frame:
                         self.__frame = fid - 1
 
-                image = self.__handler.getImage(
-                    self.__node, self.__frame, self.__gdim)
+                if self._region is not None:
+                    image = self.__handler.getImageRegion(
+                        self.__node, self.__frame, self.__gdim, self._region)
+                    self._regionread = image is not None
+                if image is None:
+                    image = self.__handler.getImage(
+                        self.__node, self.__frame, self.__gdim)
             except Exception as e:
                 logger.warning(str(e))
             if not self.__nxsopen:
@@ -544,6 +781,119 @@ class NXSFileSource(BaseSource):
         self.__node = None
 
 
+class RawStackSource(BaseSource):
+
+    """ image source as a memory-mapped file of raw frames"""
+
+    @debugmethod
+    def __init__(self, timeout=None):
+        """ constructor
+
+        :param timeout: timeout for setting connection in ms
+        :type timeout: :obj:`int`
+        """
+        BaseSource.__init__(self, timeout)
+
+        #: (:class:`lavuelib.imageFileHandler.RawStackHandler`)
+        #: the raw stack handler
+        self.__handler = None
+        #: (:obj:`int`) the current frame
+        self.__frame = 0
+        #: (:obj:`int`) the last frame to view
+        self.__lastframe = -1
+        #: (:obj:`bool`) raw stack source follows the last frame
+        self.__last = False
+
+    @classmethod
+    def parseConfiguration(cls, configuration):
+        """ parses the configuration string, i.e.
+            filename,dtype,HEIGHTxWIDTH,header,frameheader,frame,last
+
+        :param configuration:  configuration string
+        :type configuration: :obj:`str`
+        :returns: handler parameters, frame and last flag
+        :rtype: (:obj:`dict` <:obj:`str`, :obj:`any`>, :obj:`int`,
+                 :obj:`bool`)
+        """
+        params = [pr.strip() for pr in str(configuration).split(",")]
+        params += [""] * (7 - len(params))
+        fname, dtype, shape, header, frameheader, frame, last = params[:7]
+        kwargs = {
+            "fname": fname,
+            "dtype": dtype or "uint16",
+            "shape": [int(sh) for sh in shape.lower().split("x")]
+            if shape else None,
+            "header": int(header or 0),
+            "frameheader": int(frameheader or 0),
+        }
+        try:
+            frame = int(frame.replace("m", "-"))
+        except Exception:
+            frame = -1
+        return kwargs, frame, last.lower() == "true"
+
+    @debugmethod
+    def getData(self):
+        """ provides image name, image data and metadata
+
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        if self.__handler is None:
+            return "No file name defined", "__ERROR__", ""
+        try:
+            fid = self.__handler.getFrameCount()
+            if self.__lastframe < 0:
+                if fid > - self.__lastframe:
+                    fid -= - self.__lastframe - 1
+                else:
+                    fid = min(1, fid)
+            elif fid > self.__lastframe + 1:
+                fid = self.__lastframe + 1
+            if self.__last:
+                frame = fid - 1
+            else:
+                frame = min(self.__frame, fid - 1)
+            if frame < 0 or frame == self._frameid:
+                return None, None, None
+            image = self.__handler.getImage(frame, refresh=False)
+            self._markFetched()
+            if image is not None:
+                self._frameid = frame
+                filename = "%s:%s" % (self.__handler.fname, frame)
+                self.__frame = frame + 1
+                return (np.transpose(image), '%s' % (filename), "")
+        except Exception as e:
+            logger.warning(str(e))
+            # print(str(e))
+            return str(e), "__ERROR__", ""
+        return None, None, None
+
+    @debugmethod
+    def connect(self):
+        """ connects the source
+        """
+        try:
+            kwargs, self.__lastframe, self.__last = \
+                self.parseConfiguration(self._configuration)
+            self.__handler = imageFileHandler.RawStackHandler(**kwargs)
+            self.__frame = 0
+            self._frameid = None
+            return True
+        except Exception as e:
+            self.__handler = None
+            logger.warning(str(e))
+            # print(str(e))
+            self._updaterror()
+            return False
+
+    @debugmethod
+    def disconnect(self):
+        """ disconnects the source
+        """
+        self.__handler = None
+
+
 class TangoFileSource(BaseSource):
 
     """ image source as Tango attributes describing
@@ -665,8 +1015,14 @@ class TangoFileSource(BaseSource):
                         if fid - 1 < self.__frame:
                             self.__frame = fid - 1
 
-                    image = self.__handler.getImage(
-                        self.__node, self.__frame, self.__gdim)
+                    if self._region is not None:
+                        image = self.__handler.getImageRegion(
+                            self.__node, self.__frame, self.__gdim,
+                            self._region)
+                        self._regionread = image is not None
+                    if image is None:
+                        image = self.__handler.getImage(
+                            self.__node, self.__frame, self.__gdim)
                 except Exception as e:
                     logger.warning(str(e))
                 if not self.__nxsopen:
@@ -755,6 +1111,177 @@ class TangoFileSource(BaseSource):
         self.__resetnexus()
 
 
+class DirectoryWatchSource(BaseSource):
+
+    """ image source as the newest file written into a directory"""
+
+    @debugmethod
+    def __init__(self, timeout=None):
+        """ constructor
+
+        :param timeout: timeout for setting connection in ms
+        :type timeout: :obj:`int`
+        """
+        BaseSource.__init__(self, timeout)
+        #: (:class:`lavuelib.directoryWatcher.DirectoryWatcher`)
+        #:       directory watcher
+        self.__watcher = None
+        #: (:obj:`str`) nexus field path or None for the first image field
+        self.__field = None
+        #: (:obj:`int`) number of decoding threads
+        self.__nthreads = 2
+        #: (:class:`concurrent.futures.ThreadPoolExecutor`) decoding pool
+        self.__pool = None
+        #: (:obj:`list` < (:obj:`int`, :obj:`str`, :obj:`any`) >)
+        #:       file number, file name and decoding task
+        self.__tasks = []
+        #: (:obj:`int`) number of submitted files
+        self.__counter = 0
+
+    @classmethod
+    def parseConfiguration(cls, configuration):
+        """ parses the configuration string, i.e.
+            directory,pattern,field,polling
+
+        :param configuration:  configuration string
+        :type configuration: :obj:`str`
+        :returns: directory, glob pattern, nexus field and polling flag
+        :rtype: (:obj:`str`, :obj:`str`, :obj:`str`, :obj:`bool`)
+        """
+        params = [pr.strip() for pr in str(configuration).split(",")]
+        params += [""] * (4 - len(params))
+        directory, pattern, field, polling = params[:4]
+        return directory, pattern or "*", field or None, \
+            polling.lower() == "true"
+
+    @classmethod
+    def decodeFile(cls, filename, field=None):
+        """ decodes the image file, i.e. the last frame of the image field
+            for nexus files
+
+        :param filename: image file name
+        :type filename: :obj:`str`
+        :param field: nexus field path or None for the first image field
+        :type field: :obj:`str`
+        :returns: image and json dictionary with metadata
+        :rtype: (:class:`numpy.ndarray`, :obj:`str`)
+        """
+        if filename.endswith(".nxs") or filename.endswith(".h5") \
+           or filename.endswith(".nx") or filename.endswith(".ndf"):
+            handler = imageFileHandler.NexusFieldHandler(str(filename))
+            if field is None:
+                fields = handler.findImageFields()
+                if not fields:
+                    raise Exception("No image field found in %s" % filename)
+                node = fields[sorted(fields.keys())[0]]["node"]
+            else:
+                node = handler.getNode(field)
+            return handler.getImage(node, -1, 0, refresh=False), ""
+        fh = imageFileHandler.ImageFileHandler(str(filename))
+        return fh.getImage(), fh.getMetaData()
+
+    def __submit(self, filename):
+        """ submits decoding of the file
+
+        :param filename: image file name
+        :type filename: :obj:`str`
+        """
+        self.__counter += 1
+        if self.__pool is None:
+            self.__tasks.append((self.__counter, filename, None))
+            return
+        # waiting tasks are superseded by the newer file
+        self.__tasks = [
+            task for task in self.__tasks if not task[2].cancel()]
+        self.__tasks.append(
+            (self.__counter, filename,
+             self.__pool.submit(self.decodeFile, filename, self.__field)))
+
+    @debugmethod
+    def getData(self):
+        """ provides image name, image data and metadata
+
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        watcher = self.__watcher
+        if watcher is None:
+            return "No directory defined", "__ERROR__", None
+        try:
+            files = watcher.newFiles()
+            if files:
+                self.__submit(files[-1])
+            while self.__tasks:
+                done = [task for task in self.__tasks
+                        if task[2] is None or task[2].done()]
+                if not done:
+                    break
+                counter, filename, future = done[-1]
+                self.__tasks = [
+                    task for task in self.__tasks if task[0] > counter]
+                self._markFetched()
+                try:
+                    if future is None:
+                        image, metadata = self.decodeFile(
+                            filename, self.__field)
+                    else:
+                        image, metadata = future.result()
+                except Exception as e:
+                    logger.warning(
+                        "DirectoryWatchSource: %s: %s" % (filename, str(e)))
+                    continue
+                if image is None or \
+                   (hasattr(image, "size") and image.size == 0):
+                    continue
+                self._frameid = counter
+                return (np.transpose(image), '%s' % (filename), metadata)
+        except Exception as e:
+            logger.warning(str(e))
+            # print(str(e))
+            return str(e), "__ERROR__", ""
+        return None, None, None
+
+    @debugmethod
+    def connect(self):
+        """ connects the source
+        """
+        try:
+            if not self._initiated or self.__watcher is None:
+                self.disconnect()
+                directory, pattern, self.__field, polling = \
+                    self.parseConfiguration(self._configuration)
+                self.__watcher = directoryWatcher.DirectoryWatcher(
+                    directory, pattern, polling)
+                if FUTURES:
+                    self.__pool = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.__nthreads)
+                latest = self.__watcher.latestFile()
+                if latest:
+                    self.__submit(latest)
+                self._initiated = True
+            return True
+        except Exception as e:
+            self.disconnect()
+            self._updaterror()
+            logger.warning(str(e))
+            # print(str(e))
+            return False
+
+    @debugmethod
+    def disconnect(self):
+        """ disconnects the source
+        """
+        if self.__watcher is not None:
+            self.__watcher.close()
+            self.__watcher = None
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=False)
+            self.__pool = None
+        self.__tasks = []
+        self._frameid = None
+        self._initiated = False
+
+
 class VDEOdecoder(object):
 
     """ VIDEO IMAGE LIMA decoder
@@ -1043,6 +1570,7 @@ class TangoAttrSource(BaseSource):
         :returns:  image name, image data, json dictionary with metadata
         :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
         """
+        self._frameid = None
         if self.__aproxy is None:
             return "No attribute name defined", "__ERROR__", None
         try:
@@ -1062,6 +1590,7 @@ class TangoAttrSource(BaseSource):
                         self.__bytearray = True
                 else:
                     attr = self.__aproxy.read()
+            self._markFetched()
             if str(attr.type) == "DevEncoded":
                 if PYTG_BUG_213:
                     raise Exception(
@@ -1098,6 +1627,8 @@ class TangoAttrSource(BaseSource):
                     shape = dec.shape()
                     if shape is None or shape[0] <= 0 or shape[1] <= 0:
                         return None, None, None
+                    if fnumber != "":
+                        self._frameid = fnumber
                     return (dec.decode().T,
                             '%s %s (%s)' % (
                                 self._configuration,
@@ -1291,6 +1822,7 @@ class TangoEventsSource(BaseSource):
                 if self.attr is None or not self.fresh:
                     return None, None, None
                 self.fresh = False
+                self._markFetched()
                 if str(self.attr.type) == "DevEncoded":
                     avalue = self.attr.value
                     if avalue[0] in ["RGB24", "JPEG_RGB"]:
@@ -1430,6 +1962,7 @@ class HTTPSource(BaseSource):
         if self._configuration:
             try:
                 response = self.__get()
+                self._markFetched()
                 if response.ok:
                     mdata = ""
                     name = self._configuration
@@ -1649,6 +2182,7 @@ class ZMQSource(BaseSource):
         try:
             with QtCore.QMutexLocker(self.__mutex):
                 message = self.__socket.recv_multipart(flags=zmq.NOBLOCK)
+            self._markFetched()
             topic = None
             _array = None
             shape = None
@@ -1847,6 +2381,29 @@ class ASAPOSource(BaseSource):
         #: (:obj:`str`) counter max
         self.__lastjsubmeta = None
         self.__asapoversion = 'last'
+        #: (:obj:`str`) consumer mode, i.e. "" (polling with metadata
+        #:     check), "last" or "next" (prefetching)
+        self.__mode = ""
+        #: (:obj:`int`) maximal number of prefetched messages
+        self.__prefetch = 4
+        #: (:obj:`int`) number of decoding threads
+        self.__nthreads = 2
+        #: (:class:`threading.Thread`) prefetching worker
+        self.__worker = None
+        #: (:class:`threading.Event`) stop event of the current
+        #:     prefetching worker, a new one is created for every worker
+        self.__stopevent = None
+        #: (:class:`concurrent.futures.ThreadPoolExecutor`) decoding pool
+        self.__pool = None
+        #: (:class:`collections.deque` <:class:`concurrent.futures.Future`>)
+        #:     decoding results
+        self.__results = collections.deque()
+        #: (:class:`threading.Lock`) lock of prefetching results
+        self.__resultlock = threading.Lock()
+        #: (:obj:`str`) json stream metadata not yet provided
+        self.__pendingmeta = None
+        #: (:obj:`dict` <:obj:`str`, :obj:`any`>) stream metadata
+        self.__submeta = {}
 
     @debugmethod
     def setConfiguration(self, configuration):
@@ -1857,9 +2414,17 @@ class ASAPOSource(BaseSource):
         """
         if self._configuration != configuration:
             try:
+                params = str(configuration).split(",", 6)
+                mode = params[6].strip() if len(params) > 6 else ""
+                if mode not in ["", "last", "next"]:
+                    logger.warning(
+                        "ASAPOSource: unknown consumer mode '%s'" % mode)
+                    mode = ""
                 (self.__server, self.__datasource,
                  self.__stream, self.__beamtime, self.__sourcepath,
-                 self.__token) = str(configuration).split(",", 6)
+                 self.__token) = params[:6]
+                self.__stopPipeline()
+                self.__mode = mode
                 self.__lastname = ""
                 self.__lastid = ""
                 self.__subcounter = 0
@@ -1963,6 +2528,7 @@ class ASAPOSource(BaseSource):
         """ disconnects the source
         """
         try:
+            self.__stopPipeline()
             if self.__broker is not None:
                 with QtCore.QMutexLocker(self.__mutex):
                     self.__broker = None
@@ -1971,6 +2537,20 @@ class ASAPOSource(BaseSource):
         except Exception:
             self._updaterror()
 
+    def frameKey(self, image, name):
+        """ provides a key identifying the image frame,
+            i.e. the ASAPO message name and id
+
+        :param image: image data
+        :type image: :class:`numpy.ndarray`
+        :param name: image name
+        :type name: :obj:`str`
+        :returns: frame key or None
+        :rtype: :obj:`tuple`
+        """
+        if isinstance(image, np.ndarray) and name:
+            return ("frame", name)
+
     @debugmethod
     def getData(self):
         """ provides image name, image data and metadata
@@ -1986,6 +2566,10 @@ class ASAPOSource(BaseSource):
             return "No group_id defined", "__ERROR__", None
         if not self._initiated:
             return None, None, None
+        if self.__mode:
+            self.__startPipeline()
+        if self.__worker is not None:
+            return self.__getPrefetchedData()
         imagename = ""
         submeta = {}
         jsubmeta = None
@@ -2004,9 +2588,7 @@ class ASAPOSource(BaseSource):
                 if self.__subcntmax == self.__subcounter:
                     self.__subcounter = 0
 
-                stream = self.__stream or "default"
-                if self.__stream == "**ALL**" and self.__streams:
-                    stream = self.__streams[-1]
+                stream = self.__currentStream()
 
                 if self.__lastid and self.__lastname:
                     if self.__asapoversion in ['old']:
@@ -2042,121 +2624,332 @@ class ASAPOSource(BaseSource):
             logger.warning(str(e))
 
         if metadata is not None and data is not None:
-            # print("data", str(data)[:10])
-            nameext = ""
-            if self.__lastname:
-                _, nameext = os.path.splitext(self.__lastname)
-            if nameext in [".nxs", ".h5", "nx", "ndf", "hdf"]:
-                try:
-                    handler = imageFileHandler.NexusFieldHandler()
-                    handler.frombuffer(data[:], self.__lastname)
-                    nexus_path = None
-                    if "meta" in metadata.keys() and \
-                       "nexus_path" in metadata["meta"].keys():
-                        nexus_path = metadata["meta"]["nexus_path"]
-                    frame = None
-                    if "meta" in metadata.keys() and \
-                       "nexus_image_frame" in metadata["meta"].keys():
-                        try:
-                            frame = int(
-                                metadata["meta"]["nexus_image_frame"])
-                        except Exception as e:
-                            logger.warning(str(e))
-                    node = handler.getNode(nexus_path)
+            self._markFetched()
+            return self.__decodeData(
+                data, metadata, self.__lastname, imagename,
+                submeta, jsubmeta)
+        else:
+            if jsubmeta:
+                return "", "", jsubmeta
+            return None, None, None
+
+    def __currentStream(self):
+        """ provides the name of the stream to follow
+
+        :returns: stream name
+        :rtype: :obj:`str`
+        """
+        stream = self.__stream or "default"
+        if self.__stream == "**ALL**" and self.__streams:
+            stream = self.__streams[-1]
+        return stream
+
+    def __decodeData(self, data, metadata, name, imagename,
+                     submeta, jsubmeta):
+        """ decodes the asapo payload
+
+        :param data: asapo payload
+        :type data: :class:`numpy.ndarray`
+        :param metadata: asapo message metadata
+        :type metadata: :obj:`dict` <:obj:`str`, :obj:`any`>
+        :param name: file name of the message
+        :type name: :obj:`str`
+        :param imagename: image name
+        :type imagename: :obj:`str`
+        :param submeta: stream metadata
+        :type submeta: :obj:`dict` <:obj:`str`, :obj:`any`>
+        :param jsubmeta: json string with changed stream metadata
+        :type jsubmeta: :obj:`str`
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        # print("data", str(data)[:10])
+        nameext = ""
+        if name:
+            _, nameext = os.path.splitext(name)
+        if nameext in [".nxs", ".h5", "nx", "ndf", "hdf"]:
+            image = None
+            mdata = None
+            frame = None
+            try:
+                handler = imageFileHandler.NexusFieldHandler()
+                handler.frombuffer(data[:], name)
+                nexus_path = None
+                if "meta" in metadata.keys() and \
+                   "nexus_path" in metadata["meta"].keys():
+                    nexus_path = metadata["meta"]["nexus_path"]
+                if "meta" in metadata.keys() and \
+                   "nexus_image_frame" in metadata["meta"].keys():
                     try:
-                        mdata = handler.getMetaData(node, submeta)
+                        frame = int(
+                            metadata["meta"]["nexus_image_frame"])
                     except Exception as e:
                         logger.warning(str(e))
-                    image = handler.getImage(
-                        node, frame)
+                node = handler.getNode(nexus_path)
+                try:
+                    mdata = handler.getMetaData(node, submeta)
                 except Exception as e:
                     logger.warning(str(e))
-                if image is not None:
-                    if hasattr(image, "size") and image.size == 0:
-                        if jsubmeta:
-                            return "", "", jsubmeta
-                        return None, None, None
-                    if hasattr(image, "shape") and \
-                       len(image.shape) == 3 and image.shape[0] == 1:
-                        return (np.transpose(image[0, :, :]), imagename, mdata)
-                    elif (frame is None and hasattr(image, "shape") and
-                          len(image.shape) > 2):
-                        return (np.swapaxes(image, 1, 2), imagename, mdata)
-                    else:
-                        return (np.transpose(image), imagename, mdata)
-                return None, None, None
-            elif (((type(data).__name__ == "ndarray") and
-                   np.all(data[:10] == np.frombuffer(
-                       b"###CBF: VE", dtype=np.int8))) or
-                  str(data[:10]) == "###CBF: VE"):
-                # print("[cbf source module]::metadata", metadata["filename"])
-                logger.info(
-                    "ASAPOSource.getData: "
-                    "[cbf source module]::metadata %s" % metadata["name"])
-                img = None
-                if FABIO11:
-                    try:
-                        fimg = fabio.open(BytesIO(bytes(data)))
-                        img = fimg.data
-                        mdata = imageFileHandler.CBFLoader().metadata(
-                            fimg.header.get(
-                                "_array_data.header_contents"), submeta)
-                    except Exception as e:
-                        # print(str(e))
-                        logger.warning(str(e))
-                        img = None
-                if img is None:
-                    if type(data).__name__ == "ndarray":
-                        npdata = np.array(data[:], dtype="uint8")
-                    else:
-                        try:
-                            npdata = np.frombuffer(data[:], dtype=np.uint8)
-                        except Exception:
-                            npdata = np.fromstring(data[:], dtype=np.uint8)
-                    img = imageFileHandler.CBFLoader().load(npdata)
-                    mdata = imageFileHandler.CBFLoader().metadata(
-                        npdata, submeta)
-
-                if hasattr(img, "size") and img.size == 0:
+                image = handler.getImage(
+                    node, frame)
+            except Exception as e:
+                logger.warning(str(e))
+            if image is not None:
+                if hasattr(image, "size") and image.size == 0:
                     if jsubmeta:
                         return "", "", jsubmeta
                     return None, None, None
-                return np.transpose(img), imagename, mdata
-            else:
-                # elif data[:2] in ["II\x2A\x00", "MM\x00\x2A"]:
-                # print("[tif source module]::metadata", metadata["name"])
-                logger.info(
-                    "ASAPOSource.getData:"
-                    "[tif source module]::metadata %s" % metadata["name"])
-                if PILLOW and not self.__tiffloader:
+                if hasattr(image, "shape") and \
+                   len(image.shape) == 3 and image.shape[0] == 1:
+                    return (np.transpose(image[0, :, :]), imagename, mdata)
+                elif (frame is None and hasattr(image, "shape") and
+                      len(image.shape) > 2):
+                    return (np.swapaxes(image, 1, 2), imagename, mdata)
+                else:
+                    return (np.transpose(image), imagename, mdata)
+            return None, None, None
+        elif (((type(data).__name__ == "ndarray") and
+               np.all(data[:10] == np.frombuffer(
+                   b"###CBF: VE", dtype=np.int8))) or
+              str(data[:10]) == "###CBF: VE"):
+            # print("[cbf source module]::metadata", metadata["filename"])
+            logger.info(
+                "ASAPOSource.getData: "
+                "[cbf source module]::metadata %s" % metadata["name"])
+            img = None
+            if FABIO11:
+                try:
+                    fimg = fabio.open(BytesIO(bytes(data)))
+                    img = fimg.data
+                    mdata = imageFileHandler.CBFLoader().metadata(
+                        fimg.header.get(
+                            "_array_data.header_contents"), submeta)
+                except Exception as e:
+                    # print(str(e))
+                    logger.warning(str(e))
+                    img = None
+            if img is None:
+                if type(data).__name__ == "ndarray":
+                    npdata = np.array(data[:], dtype="uint8")
+                else:
                     try:
-                        img = np.array(PIL.Image.open(BytesIO(bytes(data))))
+                        npdata = np.frombuffer(data[:], dtype=np.uint8)
                     except Exception:
-                        img = imageFileHandler.TIFLoader().load(
-                            np.frombuffer(data[:], dtype=np.uint8))
-                        self.__tiffloader = True
-                    if hasattr(img, "size") and img.size == 0:
-                        if jsubmeta:
-                            return "", "", jsubmeta
-                        return None, None, None
-                    if img is not None:
-                        return np.transpose(img), imagename, jsubmeta
-                else:
+                        npdata = np.fromstring(data[:], dtype=np.uint8)
+                img = imageFileHandler.CBFLoader().load(npdata)
+                mdata = imageFileHandler.CBFLoader().metadata(
+                    npdata, submeta)
+
+            if hasattr(img, "size") and img.size == 0:
+                if jsubmeta:
+                    return "", "", jsubmeta
+                return None, None, None
+            return np.transpose(img), imagename, mdata
+        else:
+            # elif data[:2] in ["II\x2A\x00", "MM\x00\x2A"]:
+            # print("[tif source module]::metadata", metadata["name"])
+            logger.info(
+                "ASAPOSource.getData:"
+                "[tif source module]::metadata %s" % metadata["name"])
+            if PILLOW and not self.__tiffloader:
+                try:
+                    img = np.array(PIL.Image.open(BytesIO(bytes(data))))
+                except Exception:
                     img = imageFileHandler.TIFLoader().load(
                         np.frombuffer(data[:], dtype=np.uint8))
-                    if hasattr(img, "size") and img.size == 0:
-                        if jsubmeta:
-                            return "", "", jsubmeta
-                        return None, None, None
-                    if img is not None:
-                        return np.transpose(img), imagename, jsubmeta
+                    self.__tiffloader = True
+                if hasattr(img, "size") and img.size == 0:
+                    if jsubmeta:
+                        return "", "", jsubmeta
+                    return None, None, None
+                if img is not None:
+                    return np.transpose(img), imagename, jsubmeta
+            else:
+                img = imageFileHandler.TIFLoader().load(
+                    np.frombuffer(data[:], dtype=np.uint8))
+                if hasattr(img, "size") and img.size == 0:
+                    if jsubmeta:
+                        return "", "", jsubmeta
+                    return None, None, None
+                if img is not None:
+                    return np.transpose(img), imagename, jsubmeta
 
-            #     print(
-            #       "[unknown source module]::metadata", metadata["name"])
-        else:
-            if jsubmeta:
-                return "", "", jsubmeta
-            return None, None, None
+        #     print(
+        #       "[unknown source module]::metadata", metadata["name"])
+
+    def __startPipeline(self):
+        """ starts the prefetching worker and the decoding pool
+        """
+        if not self.__mode or self.__worker is not None:
+            return
+        if not FUTURES:
+            logger.warning(
+                "ASAPOSource: concurrent.futures not available, "
+                "the '%s' consumer mode is not supported" % self.__mode)
+            return
+        # a stale worker keeps its own set stop event and pool
+        self.__stopevent = threading.Event()
+        with self.__resultlock:
+            self.__results.clear()
+            self.__pendingmeta = None
+            self.__submeta = {}
+        self.__pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=self.__nthreads)
+        self.__worker = threading.Thread(
+            target=self.__prefetchData,
+            args=(self.__stopevent, self.__pool))
+        self.__worker.daemon = True
+        self.__worker.start()
+
+    def __stopPipeline(self):
+        """ stops the prefetching worker and the decoding pool
+        """
+        worker = self.__worker
+        if worker is None:
+            return
+        self.__stopevent.set()
+        if worker is not threading.current_thread():
+            worker.join((self._timeout or 3000) / 1000.)
+        self.__worker = None
+        if self.__pool is not None:
+            self.__pool.shutdown(wait=False)
+            self.__pool = None
+        with self.__resultlock:
+            self.__results.clear()
+            self.__pendingmeta = None
+
+    def __updateStreams(self):
+        """ refreshes the stream list of the prefetching worker
+        """
+        try:
+            with QtCore.QMutexLocker(self.__mutex):
+                if self.__broker is None:
+                    return
+                submeta = self.getMetaData()
+            if submeta:
+                jsubmeta = json.dumps(submeta)
+                with self.__resultlock:
+                    self.__submeta = submeta
+                    if jsubmeta != self.__lastjsubmeta:
+                        self.__lastjsubmeta = jsubmeta
+                        self.__pendingmeta = jsubmeta
+        except Exception as e:
+            logger.warning(str(e))
+
+    def __fetchData(self):
+        """ fetches data of the next message with one broker round trip
+
+        :returns: asapo payload and message metadata
+        :rtype: (:class:`numpy.ndarray`, :obj:`dict` <:obj:`str`, :obj:`any`>)
+        """
+        with QtCore.QMutexLocker(self.__mutex):
+            if self.__broker is None:
+                return None, None
+            stream = self.__currentStream()
+            if self.__mode == "next":
+                if self.__asapoversion in ['old']:
+                    return self.__broker.get_next(
+                        self.__group_id, substream=stream, meta_only=False)
+                return self.__broker.get_next(
+                    self.__group_id, meta_only=False, stream=stream)
+            if self.__asapoversion in ['old']:
+                return self.__broker.get_last(
+                    self.__group_id, substream=stream, meta_only=False)
+            return self.__broker.get_last(meta_only=False, stream=stream)
+
+    def __prefetchData(self, stopevent, pool):
+        """ prefetches messages and submits their decoding to the pool
+            until the pipeline is stopped
+
+        :param stopevent: stop event of the worker
+        :type stopevent: :class:`threading.Event`
+        :param pool: decoding pool of the worker
+        :type pool: :class:`concurrent.futures.ThreadPoolExecutor`
+        """
+        lastname = None
+        lastid = None
+        streamtask = None
+        streamtime = 0
+        while not stopevent.is_set():
+            period = dataFetchThread.GLOBALREFRESHRATE
+            if (streamtask is None or streamtask.done()) and \
+               time.time() - streamtime > period * self.__subcntmax:
+                streamtime = time.time()
+                try:
+                    streamtask = pool.submit(self.__updateStreams)
+                except RuntimeError:
+                    # the pool has been shut down
+                    break
+            if self.__mode == "next":
+                with self.__resultlock:
+                    full = len(self.__results) >= self.__prefetch
+                if full:
+                    stopevent.wait(period / self.__prefetch)
+                    continue
+            data = None
+            metadata = None
+            try:
+                data, metadata = self.__fetchData()
+            except Exception as e:
+                # no new messages in the stream
+                logger.debug(str(e))
+            if data is None or metadata is None or \
+               (metadata["name"] == lastname and metadata["_id"] == lastid):
+                stopevent.wait(period)
+                continue
+            lastname, lastid = metadata["name"], metadata["_id"]
+            name = str(lastname or "")
+            imagename = "%s (%s)" % (name, lastid)
+            with self.__resultlock:
+                submeta = dict(self.__submeta)
+            try:
+                future = pool.submit(
+                    self.__decodeData, data, metadata, name, imagename,
+                    submeta, None)
+            except RuntimeError:
+                # the pool has been shut down
+                break
+            with self.__resultlock:
+                if stopevent.is_set():
+                    break
+                self.__results.append(future)
+                if self.__mode != "next":
+                    while len(self.__results) > self.__prefetch:
+                        self.__results.popleft()
+            if self.__mode != "next":
+                stopevent.wait(period)
+
+    def __getPrefetchedData(self):
+        """ provides the oldest ("next" mode) or the latest ("last" mode)
+            decoded message
+
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        future = None
+        with self.__resultlock:
+            jsubmeta = self.__pendingmeta
+            self.__pendingmeta = None
+            if self.__mode == "next":
+                if self.__results and self.__results[0].done():
+                    future = self.__results.popleft()
+            else:
+                done = [ft for ft in self.__results if ft.done()]
+                if done:
+                    future = done[-1]
+                    while self.__results.popleft() is not future:
+                        pass
+        result = None
+        if future is not None:
+            try:
+                result = future.result()
+            except Exception as e:
+                logger.warning(str(e))
+        if result and result[1]:
+            return result[0], result[1], result[2] or jsubmeta
+        if jsubmeta:
+            return "", "", jsubmeta
+        return None, None, None
 
 
 class HiDRASource(BaseSource):
@@ -2295,6 +3088,7 @@ class HiDRASource(BaseSource):
             # print(str(e))
 
         if metadata is not None and data is not None:
+            self._markFetched()
             # print("data", str(data)[:10])
 
             nameext = ""
@@ -2472,6 +3266,9 @@ class EpicsPVSource(BaseSource):
 
     """ image source as Epics Process variable"""
 
+    #: (:obj:`bool`) subscribe to CA monitors instead of polling
+    monitor = False
+
     @debugmethod
     def __init__(self, timeout=None):
         """ constructor
@@ -2483,12 +3280,29 @@ class EpicsPVSource(BaseSource):
         #: (:class:`epics.PV`)
         #:       epics process variable
         self.__pv = None
+        #: (:class:`epics.PV`)
+        #:       areaDetector array counter process variable
+        self.__counterpv = None
         #: (:obj:`list` < :obj:`int` >)
         #:      process variable shape
         self.__shape = None
         #: (:obj:`list` < :obj:`int` >)
         #:      process variable size
         self.__size = 0
+        #: (:obj:`int`) index of the monitor callback
+        self.__cbindex = None
+        #: (:obj:`list` < :class:`numpy.ndarray` >) monitor image buffers
+        self.__buffers = [None, None]
+        #: (:obj:`int`) index of the buffer provided by getData
+        self.__reading = 0
+        #: (:obj:`bool`) the other buffer contains a new image
+        self.__newimage = False
+        #: (:obj:`str`) frame label of the new image
+        self.__label = None
+        #: (:obj:`float`) timestamp of the last monitored value
+        self.__lasttimestamp = None
+        #: (:class:`threading.Lock`) monitor buffer lock
+        self.__lock = threading.Lock()
 
     @debugmethod
     def getData(self):
@@ -2500,6 +3314,8 @@ class EpicsPVSource(BaseSource):
 
         if self.__pv is None:
             return "No PV defined", "__ERROR__", None
+        if self.__cbindex is not None:
+            return self.__getMonitoredData()
         try:
             rawdata = self.__pv.get(as_numpy=True,
                                     timeout=float(self._timeout/1000.))
@@ -2518,6 +3334,89 @@ class EpicsPVSource(BaseSource):
             return str(e), "__ERROR__", ""
         return None, None, None
 
+    def __getMonitoredData(self):
+        """ provides the last image received by the CA monitor
+
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        with self.__lock:
+            if not self.__newimage:
+                return None, None, None
+            self.__newimage = False
+            self.__reading = 1 - self.__reading
+            image = self.__buffers[self.__reading]
+            label = self.__label
+        return (np.transpose(image),
+                '%s (%s)' % (self._configuration, label), None)
+
+    def _monitorCallback(self, value=None, timestamp=None, **kargs):
+        """ copies the monitored PV value into the free image buffer
+
+        :param value: process variable value
+        :type value: :class:`numpy.ndarray`
+        :param timestamp: process variable timestamp
+        :type timestamp: :obj:`float`
+        :param kargs: other callback parameters
+        :type kargs: :obj:`dict` < :obj:`str`, :obj:`any`>
+        """
+        if not hasattr(value, "size"):
+            return
+        if timestamp is not None:
+            # the IOC reposted the same value
+            if timestamp == self.__lasttimestamp:
+                return
+            self.__lasttimestamp = timestamp
+        if self.__shape and value.size >= self.__size:
+            value = value[:self.__size].reshape(self.__shape)
+        label = None
+        if self.__counterpv is not None:
+            label = getattr(self.__counterpv, "value", None)
+        if label is None:
+            if timestamp is not None:
+                label = datetime.datetime.fromtimestamp(
+                    timestamp).isoformat()
+            else:
+                label = currenttime()
+        with self.__lock:
+            writing = 1 - self.__reading
+            buf = self.__buffers[writing]
+            if buf is None or buf.shape != value.shape \
+               or buf.dtype != value.dtype:
+                buf = np.empty(value.shape, dtype=value.dtype)
+                self.__buffers[writing] = buf
+            np.copyto(buf, value)
+            self.__label = str(label)
+            self.__newimage = True
+
+    def __subscribe(self, pvnm):
+        """ subscribes to CA monitors of the image and counter PVs
+
+        :param pvnm: process variable name
+        :type pvnm: :obj:`str`
+        :returns: if subscribed
+        :rtype: :obj:`bool`
+        """
+        try:
+            self.__pv = epics.PV(pvnm, auto_monitor=True)
+            if pvnm.endswith("ArrayData"):
+                self.__counterpv = epics.PV(
+                    pvnm[:-len("ArrayData")] + "ArrayCounter_RBV",
+                    auto_monitor=True)
+            with self.__lock:
+                self.__buffers = [None, None]
+                self.__newimage = False
+            self.__lasttimestamp = None
+            self.__cbindex = self.__pv.add_callback(self._monitorCallback)
+            return True
+        except Exception as e:
+            logger.warning(
+                "EpicsPVSource: CA monitor not available, "
+                "the PV is polled: %s" % str(e))
+            self.__cbindex = None
+            self.__counterpv = None
+            return False
+
     @debugmethod
     def connect(self):
         """ connects the source
@@ -2526,7 +3425,6 @@ class EpicsPVSource(BaseSource):
             pvnm, pvsh = str(
                 self._configuration).strip().split(",", 1)
             if not self._initiated:
-                self.__pv = epics.PV(pvnm)
                 try:
                     shape = json.loads(pvsh)
                     self.__shape = list(reversed([int(s) for s in shape]))
@@ -2534,6 +3432,9 @@ class EpicsPVSource(BaseSource):
                 except Exception:
                     self.__size = 0
                     self.__shape = None
+                self.__unsubscribe()
+                if not self.monitor or not self.__subscribe(pvnm):
+                    self.__pv = epics.PV(pvnm)
             return True
         except Exception as e:
             self._updaterror()
@@ -2541,6 +3442,24 @@ class EpicsPVSource(BaseSource):
             # print(str(e))
             return False
 
+    def __unsubscribe(self):
+        """ removes the CA monitor callback
+        """
+        if self.__cbindex is not None and self.__pv is not None:
+            try:
+                self.__pv.remove_callback(self.__cbindex)
+            except Exception as e:
+                logger.warning(str(e))
+        self.__cbindex = None
+        self.__counterpv = None
+
+    @debugmethod
+    def disconnect(self):
+        """ disconnects the source
+        """
+        self.__unsubscribe()
+        BaseSource.disconnect(self)
+
 
 class TinePropSource(BaseSource):
 
@@ -2681,3 +3600,89 @@ class TinePropSource(BaseSource):
             except Exception as e:
                 # print(str(e))
                 logger.warning(str(e))
+
+
+class SharedMemorySource(BaseSource):
+
+    """ image source as shared memory ring of a same-host image writer,
+        configured by name[,decimation]
+    """
+
+    @debugmethod
+    def __init__(self, timeout=None):
+        """ constructor
+
+        :param timeout: timeout for setting connection in ms
+        :type timeout: :obj:`int`
+        """
+        BaseSource.__init__(self, timeout)
+        #: (:class:`lavuelib.sharedMemoryRing.SharedMemoryRingReader`)
+        #:       shared memory ring reader
+        self.__reader = None
+        #: (:obj:`str`) shared memory name or file path
+        self.__name = ""
+
+    @debugmethod
+    def getData(self):
+        """ provides image name, image data and metadata
+
+        :returns:  image name, image data, json dictionary with metadata
+        :rtype: (:obj:`str` , :class:`numpy.ndarray` , :obj:`str`)
+        """
+        reader = self.__reader
+        if reader is None:
+            return "No shared memory ring defined", "__ERROR__", None
+        try:
+            frame = reader.read()
+            if frame is None:
+                return None, None, None
+            self._markFetched()
+            image, frameid, _ = frame
+            if reader.reusable():
+                # the writer can wrap around the ring
+                # before the frame view is processed
+                image = np.array(image)
+                if not reader.intact():
+                    return None, None, None
+            self._frameid = frameid
+            self._acquisition = reader.acquisition
+            return (np.transpose(image),
+                    '%s (%s)' % (self.__name, frameid), reader.metadata)
+        except Exception as e:
+            logger.warning(str(e))
+            # print(str(e))
+            return str(e), "__ERROR__", ""
+        return None, None, None
+
+    @debugmethod
+    def connect(self):
+        """ connects the source
+        """
+        try:
+            if not self._initiated or self.__reader is None:
+                self.disconnect()
+                name = str(self._configuration).strip()
+                decimation = 1
+                params = name.rsplit(",", 1)
+                if len(params) == 2 and params[1].strip().isdigit():
+                    name = params[0].strip()
+                    decimation = int(params[1])
+                self.__name = name
+                self.__reader = sharedMemoryRing.SharedMemoryRingReader(
+                    name, decimation=decimation)
+                self._initiated = True
+            return True
+        except Exception as e:
+            self._updaterror()
+            logger.warning(str(e))
+            # print(str(e))
+            return False
+
+    @debugmethod
+    def disconnect(self):
+        """ disconnects the source
+        """
+        if self.__reader is not None:
+            self.__reader.close()
+            self.__reader = None
+        self._initiated = False
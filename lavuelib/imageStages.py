@@ -0,0 +1,551 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" image processing stages shared by the live viewer
+    and the headless image pipeline """
+
+import numpy as np
+
+from . import blockReduction
+from . import lookupTable
+from . import validityMask
+
+
+#: (:obj:`dict` <:obj:`str`, :obj:`str`>) transformation names
+#:    of transformation widget labels
+TRANSFORMATIONS = {
+    "flip (up-down)": "flip-up-down",
+    "flip (left-right)": "flip-left-right",
+    "rot90 (clockwise)": "rot90",
+    "rot270 (clockwise)": "rot270",
+    "rot180 + transpose": "rot180+transpose",
+}
+
+#: (:obj:`list` <:obj:`str`>) transformation names with transposition
+TRANSPOSITIONS = ["transpose", "rot90", "rot270", "rot180+transpose"]
+
+#: (:obj:`dict` <:obj:`str`, :obj:`str`>) unsigned to signed dtype map
+UNSIGNEDMAP = {
+    'uint8': 'int16',
+    'uint16': 'int32',
+    'uint32': 'int64',
+    'uint64': 'int64'
+}
+
+
+def appliedRegion(region, window, factor=1, function=None):
+    """ checks the range window and down-sampling applied by the image source
+
+    :param region: range window and down-sampling applied by the source
+    :type region: :obj:`dict` <:obj:`str`, :obj:`any`>
+    :param window: user range window, i.e. x1, y1, x2, y2
+    :type window: :obj:`list` <:obj:`int`>
+    :param factor: user down-sampling factor
+    :type factor: :obj:`int`
+    :param function: user down-sampling reduction function
+    :type function: :obj:`str`
+    :returns: if the window and the down-sampling are applied by the source
+              or None if the image has been prepared for another range
+    :rtype: (:obj:`bool`, :obj:`bool`)
+    """
+    if not isinstance(region, dict):
+        region = {}
+    srcwindow = list(region.get("window") or [None, None, None, None])
+    srcbinning = region.get("binning") or 1
+    window = list(window)
+    if any(crd is not None for crd in srcwindow) and srcwindow != window:
+        return None
+    if srcbinning > 1 and (srcbinning != factor or
+                           region.get("reduction") != function):
+        return None
+    return srcwindow == window, srcbinning == factor
+
+
+def cropImage(image, x1, y1, x2, y2):
+    """ cuts the range window out of the image
+
+    :param image: image or image stack
+    :type image: :class:`numpy.ndarray`
+    :param x1: x1 position
+    :type x1: :obj:`int`
+    :param y1: y1 position
+    :type y1: :obj:`int`
+    :param x2: x2 position
+    :type x2: :obj:`int`
+    :param y2: y2 position
+    :type y2: :obj:`int`
+    :returns: image window and its x,y start position
+    :rtype: (:class:`numpy.ndarray`, :obj:`list` <:obj:`int`>)
+    """
+    cut = None
+    shape = image.shape
+    if len(shape) == 1 and shape[0]:
+        cut = image[x1:x2]
+    elif len(shape) == 2:
+        cut = image[x1:x2, y1:y2]
+    elif len(shape) == 3:
+        cut = image[:, x1:x2, y1:y2]
+    if cut is not None and cut.size > 0:
+        return cut, [x1 or 0, y1 or 0]
+    return image, [0, 0]
+
+
+def downsampleImage(image, factor, function="max"):
+    """ down-samples the image by the block reduction
+
+    :param image: image or image stack
+    :type image: :class:`numpy.ndarray`
+    :param factor: down-sampling factor
+    :type factor: :obj:`int`
+    :param function: reduction function
+    :type function: :obj:`str`
+    :returns: image and x,y - invert scale
+    :rtype: (:class:`numpy.ndarray`, :obj:`list` <:obj:`int`>)
+    """
+    shape = image.shape
+    if len(shape) in [2, 3] and factor > 1 and \
+       shape[-2] >= factor and shape[-1] >= factor:
+        return blockReduction.reduce(image, factor, function), \
+            [factor, factor]
+    return image, [1, 1]
+
+
+class ImageBuffer(object):
+
+    """ circular buffer of the last images, i.e. a stack with the last
+        image in front of the buffered images and optionally their sum
+        at the end
+    """
+
+    def __init__(self, size=10, computesum=False):
+        """ constructor
+
+        :param size: number of images in the buffer
+        :type size: :obj:`int`
+        :param computesum: compute sum flag
+        :type computesum: :obj:`bool`
+        """
+        #: (:obj:`int`) number of images in the buffer
+        self.__maxindex = int(size)
+        #: (:obj:`bool`) compute sum flag
+        self.__computesum = bool(computesum)
+        #: (:obj:`bool`) is buffer full
+        self.__full = False
+        #: (:class:`numpy.ndarray`) image stack
+        self.__imagestack = None
+        #: (:obj:`int`) the current size
+        self.__current = 1
+        #: (:class:`numpy.ndarray`) the last image
+        self.__lastimage = None
+        #: (:class:`numpy.ndarray`) the image sum
+        self.__imagesum = None
+        #: (:obj:`bool`) first image flag
+        self.__first = True
+
+    def reset(self, size=None, computesum=None):
+        """ removes the buffered images
+
+        :param size: number of images in the buffer
+        :type size: :obj:`int`
+        :param computesum: compute sum flag
+        :type computesum: :obj:`bool`
+        """
+        if size is not None:
+            self.__maxindex = int(size)
+        if computesum is not None:
+            self.__computesum = bool(computesum)
+        self.__imagestack = None
+        self.__lastimage = None
+        self.__imagesum = None
+        self.__current = 1
+        self.__first = True
+        self.__full = False
+
+    def isFull(self):
+        """ is buffer full flag
+
+        :returns: is buffer full flag
+        :rtype: :obj:`bool`
+        """
+        return self.__full
+
+    def append(self, image, imagename=""):
+        """ appends the image to the buffer
+
+        :param image: numpy array with an image
+        :type image: :class:`numpy.ndarray`
+        :param imagename: image name
+        :type imagename: :obj:`str`
+        :returns: image stack and metadata
+        :rtype: (:class:`numpy.ndarray`, :obj`dict`<:obj:`str`, :obj:`str`>)
+                 or `None`
+        """
+        mdata = {}
+        ics = int(self.__computesum)
+        if ics:
+            mdata["suminthelast"] = True
+        while len(image.shape) > 2:
+            image = blockReduction.reduceStack(image, "nansum")
+        if self.__lastimage is None \
+           or self.__lastimage.shape != image.shape \
+           or self.__lastimage.dtype != image.dtype \
+           or np.nanmax((self.__lastimage - image)):
+            shape = image.shape
+            dtype = image.dtype
+
+            if self.__imagestack is not None:
+                if self.__imagestack.shape[1:] != shape or \
+                   self.__imagestack.dtype != dtype:
+                    self.__imagestack = None
+                    self.__imagesum = None
+                    self.__first = True
+                    self.__current = 1
+            if self.__imagestack is None:
+                newshape = np.concatenate(
+                    ([self.__maxindex + 1 + ics], list(shape)))
+                self.__imagestack = np.zeros(dtype=dtype, shape=newshape)
+
+            if self.__current > self.__maxindex:
+                self.__current = 1
+            if self.__current >= self.__maxindex:
+                self.__full = True
+            theoldest = None
+            if ics:
+                theoldest = np.array(self.__imagestack[self.__current])
+            self.__imagestack[self.__current] = image
+            self.__imagestack[0] = image
+            if ics:
+                if self.__imagesum is None:
+                    if self.__full is True:
+                        self.__imagesum = blockReduction.reduceStack(
+                            self.__imagestack[1:-1], "nansum")
+                    else:
+                        self.__imagesum = blockReduction.reduceStack(
+                            self.__imagestack[1:(self.__current + 1)],
+                            "nansum")
+                else:
+                    self.__imagesum = self.__imagesum + image
+                    if self.__full is True:
+                        self.__imagesum = self.__imagesum - theoldest
+                self.__imagestack[-1] = self.__imagesum
+
+            self.__lastimage = np.array(image)
+            self.__current += 1
+            if self.__first:
+                cblbl = {key: "%s:" % key
+                         for key in range(self.__maxindex + 1)}
+            else:
+                cblbl = {}
+            mdata["channellabels"] = cblbl
+            mdata["skipfirst"] = True
+            cblbl[0] = "0: the last image"
+            cblbl[self.__current - 1] = "%s: %s" % (
+                self.__current - 1, str(imagename).replace("\n", " "))
+            self.__first = False
+
+        if self.__imagestack is not None:
+            return (self.__imagestack, mdata)
+
+
+def greyImage(image, channel="sum", skipfirst=False, suminthelast=False):
+    """ selects the grey image of the image channels
+
+    :param image: image or image stack
+    :type image: :class:`numpy.ndarray`
+    :param channel: channel label, i.e. sum, mean or channel number
+    :type channel: :obj:`str`
+    :param skipfirst: the first channel contains the last image
+    :type skipfirst: :obj:`bool`
+    :param suminthelast: the last channel contains the channel sum
+    :type suminthelast: :obj:`bool`
+    :returns: grey image
+    :rtype: :class:`numpy.ndarray`
+    """
+    if len(image.shape) == 1:
+        return np.array(image).reshape((image.shape[0], 1))
+    if len(image.shape) != 3:
+        return image
+    channel = str(channel)
+    if channel.isdigit() and int(channel) < len(image):
+        return image[int(channel)]
+    if suminthelast and channel != "mean":
+        return image[-1, :, :]
+    first = 1 if skipfirst else 0
+    last = -1 if suminthelast else None
+    return blockReduction.reduceStack(
+        image[first:last, :, :], "nanmean" if channel == "mean" else "nansum")
+
+
+def correctionImage(image, factor=None):
+    """ provides the scaled correction image
+
+    :param image: background or bright field image
+    :type image: :class:`numpy.ndarray`
+    :param factor: scaling factor
+    :type factor: :obj:`float`
+    :returns: scaled correction image
+    :rtype: :class:`numpy.ndarray`
+    """
+    if image is None or factor in [1, None]:
+        return image
+    return image * factor
+
+
+def invertedBrightField(bfimage, bkgimage=None, floattype="float"):
+    """ provides the inverted bright field minus dark field image
+
+    :param bfimage: scaled bright field image
+    :type bfimage: :class:`numpy.ndarray`
+    :param bkgimage: scaled background, i.e. dark field, image
+    :type bkgimage: :class:`numpy.ndarray`
+    :param floattype: floating point type
+    :type floattype: :obj:`str`
+    :returns: inverted bright-dark field image
+    :rtype: :class:`numpy.ndarray`
+    """
+    if bfimage is None:
+        return None
+    if bkgimage is not None:
+        bfimage = bfimage - bkgimage
+    with np.errstate(divide='ignore', invalid='ignore'):
+        bfmdfimage = np.true_divide(1, bfimage, dtype=floattype)
+    bfmdfimage[np.isinf(bfmdfimage)] = np.nan
+    return bfmdfimage
+
+
+def subtractBackground(image, bkgimage):
+    """ subtracts the background image, i.e. unsigned images
+        are subtracted into signed ones
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param bkgimage: scaled background image
+    :type bkgimage: :class:`numpy.ndarray`
+    :returns: image without background
+    :rtype: :class:`numpy.ndarray`
+    """
+    if hasattr(image, "dtype") and image.dtype.name in UNSIGNEDMAP and \
+       hasattr(bkgimage, "dtype") and bkgimage.dtype.name in UNSIGNEDMAP:
+        return np.subtract(
+            image, bkgimage, dtype=UNSIGNEDMAP[image.dtype.name])
+    return image - bkgimage
+
+
+def maskPixels(image, indices, invalid=None, validity=False,
+               nanmask=True, floattype="float"):
+    """ masks pixels with NaN, zero or by the validity mask
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param indices: boolean array of masked pixels
+    :type indices: :class:`numpy.ndarray`
+    :param invalid: validity mask to update, i.e. True for invalid pixels
+    :type invalid: :class:`numpy.ndarray`
+    :param validity: mask the integer image by the validity mask
+    :type validity: :obj:`bool`
+    :param nanmask: mask with NaN values
+    :type nanmask: :obj:`bool`
+    :param floattype: floating point type
+    :type floattype: :obj:`str`
+    :returns: masked image copy and validity mask
+    :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+    """
+    if validity:
+        return validityMask.maskPixels(image, indices, invalid)
+    if nanmask:
+        image = np.array(image, dtype=floattype)
+        image[indices] = np.nan
+    else:
+        image = np.array(image)
+        image[indices] = 0
+    return image, invalid
+
+
+def maskHighValues(image, value, invalid=None, validity=False,
+                   nanmask=True, floattype="float"):
+    """ masks pixels above the high value
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param value: high mask value
+    :type value: :obj:`float`
+    :param invalid: validity mask to update, i.e. True for invalid pixels
+    :type invalid: :class:`numpy.ndarray`
+    :param validity: mask the integer image by the validity mask
+    :type validity: :obj:`bool`
+    :param nanmask: mask with NaN values
+    :type nanmask: :obj:`bool`
+    :param floattype: floating point type
+    :type floattype: :obj:`str`
+    :returns: masked image copy, validity mask and masked pixels
+    :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`,
+             :class:`numpy.ndarray`)
+    """
+    with np.errstate(invalid='ignore'):
+        indices = np.asarray(image) > value
+    image, invalid = maskPixels(
+        image, indices, invalid, validity, nanmask, floattype)
+    return image, invalid, indices
+
+
+def transformImage(image, name):
+    """ transforms the image
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param name: transformation name or widget label
+    :type name: :obj:`str`
+    :returns: transformed image view
+    :rtype: :class:`numpy.ndarray`
+    """
+    name = TRANSFORMATIONS.get(name, name)
+    if name == "flip-up-down":
+        image = np.fliplr(image)
+    elif name == "flip-left-right":
+        image = np.flipud(image)
+    elif name == "transpose":
+        image = np.swapaxes(image, 0, 1)
+    elif name == "rot90":
+        image = np.swapaxes(np.flipud(image), 0, 1)
+    elif name == "rot180":
+        image = np.flipud(np.fliplr(image))
+    elif name == "rot270":
+        image = np.swapaxes(np.fliplr(image), 0, 1)
+    elif name == "rot180+transpose":
+        image = np.swapaxes(np.fliplr(np.flipud(image)), 0, 1)
+    return image
+
+
+def scaleImage(image, scaling):
+    """ applies the intensity scaling
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param scaling: intensity scaling, i.e. linear, sqrt or log
+    :type scaling: :obj:`str`
+    :returns: scaled image
+    :rtype: :class:`numpy.ndarray`
+    """
+    if scaling in ["sqrt", "log"] and lookupTable.isTableType(image):
+        # uint8 and uint16 images are scaled by tables
+        return lookupTable.scale(image, scaling)
+    elif scaling == "sqrt":
+        return np.sqrt(np.clip(image, 0, np.inf))
+    elif scaling == "log":
+        return np.log10(np.clip(image, 10e-3, np.inf))
+    return image
+
+
+def imageStats(image, scaled, rawimage, invalid=None,
+               statswoscaling=True, flag=None):
+    """ calculates image statistics of valid pixels
+
+    :param image: display image
+    :type image: :class:`numpy.ndarray`
+    :param scaled: scaled image
+    :type scaled: :class:`numpy.ndarray`
+    :param rawimage: grey image before corrections
+    :type rawimage: :class:`numpy.ndarray`
+    :param invalid: validity mask, i.e. True for invalid pixels
+    :type invalid: :class:`numpy.ndarray`
+    :param statswoscaling: statistics without intensity scaling
+    :type statswoscaling: :obj:`bool`
+    :param flag: (max value, mean value, variance value,
+                  min scaled value, max raw value, max scaled value)
+                  to calculate
+    :type flag: [:obj:`bool`, :obj:`bool`, :obj:`bool`,
+                   :obj:`bool`, :obj:`bool`, :obj:`bool`]
+    :returns: max value, mean value, variance value,
+              min scaled value, max raw value, max scaled value
+              or None for an empty image
+    :rtype: (:obj:`float`, :obj:`float`, :obj:`float`,
+             :obj:`float`, :obj:`float`, :obj:`float`)
+    """
+    if image is None or scaled is None:
+        return None
+    if flag is None:
+        flag = [True] * 6
+    image = validityMask.validPixels(image, invalid)
+    scaled = validityMask.validPixels(scaled, invalid)
+    if image.size == 0:
+        return None
+    with np.errstate(invalid='ignore'):
+        if statswoscaling:
+            maxval = np.nanmax(image) if flag[0] else 0.0
+            meanval = np.nanmean(image) if flag[1] else 0.0
+            varval = np.nanvar(image) if flag[2] else 0.0
+            maxsval = np.nanmax(scaled) if flag[5] else 0.0
+        else:
+            maxval = np.nanmax(scaled) if flag[0] or flag[5] else 0.0
+            meanval = np.nanmean(scaled) if flag[1] else 0.0
+            varval = np.nanvar(scaled) if flag[2] else 0.0
+            maxsval = maxval
+        maxrawval = np.nanmax(rawimage) if flag[4] else 0.0
+        minval = np.nanmin(scaled) if flag[3] else 0.0
+    return (maxval, meanval, varval, minval, maxrawval, maxsval)
+
+
+def roiSum(image, coords):
+    """ calculates the roi sum
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param coords: roi coordinates, i.e. x1, y1, x2, y2 in image pixels
+    :type coords: :obj:`list` <:obj:`float`>
+    :returns: roi sum
+    :rtype: :obj:`float`
+    """
+    rcrds = list(coords)
+    for i in [0, 2]:
+        rcrds[i] = min(max(rcrds[i], -i // 2), image.shape[0])
+    for i in [1, 3]:
+        rcrds[i] = min(max(rcrds[i], -(i - 1) // 2), image.shape[1])
+    return np.nansum(image[
+        int(rcrds[0]):(int(rcrds[2]) + 1),
+        int(rcrds[1]):(int(rcrds[3]) + 1)])
+
+
+def integrationData(image, masks=None):
+    """ prepares the image and the mask for the azimuthal integration
+
+    :param image: image in the integrator orientation
+    :type image: :class:`numpy.ndarray`
+    :param masks: boolean arrays of masked pixels
+    :type masks: :obj:`list` <:class:`numpy.ndarray`>
+    :returns: image without NaN values and the integer mask or None
+    :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+    """
+    mask = None
+    if image.dtype.kind == 'f' and np.isnan(image.min()):
+        mask = np.isnan(image)
+        image = np.array(image)
+        image[mask] = 0.
+    for indices in masks or []:
+        if indices is not None:
+            if mask is None:
+                mask = np.zeros(image.shape, dtype=bool)
+            mask[indices] = True
+    if mask is not None:
+        mask = mask.astype("int")
+    return image, mask
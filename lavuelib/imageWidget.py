@@ -43,6 +43,7 @@ from . import imageSource as isr
 from . import toolWidget
 from . import memoExportDialog
 from . import sardanaUtils
+from . import stageTimers
 from .sardanaUtils import debugmethod
 
 # _VMAJOR, _VMINOR, _VPATCH = _pg.__version__.split(".") \
@@ -150,6 +151,8 @@ class ImageWidget(QtGui.QWidget):
         #: (:class:`lavuelib.controllerClient.ControllerClient`)
         #:   tango controller client
         self.__tangoclient = None
+        #: (:class:`lavuelib.stageTimers.StageTimers`) stage timers
+        self.__timers = stageTimers.StageTimers()
         #: (obj`list`) collection of last writing rois
         self.__lastrois = []
         #: (obj`list`) collection of last writing rois values
@@ -173,6 +176,8 @@ class ImageWidget(QtGui.QWidget):
         self.__maskindices = None
         #: (:class:`numpy.ndarray`) mask image value indices
         self.__maskvalueindices = None
+        #: (:class:`numpy.ndarray`) validity mask of the integer image
+        self.__invalidmask = None
         #: (:obj:`float`) file name
         self.__maskvalue = None
         #: (:obj:`str`) image name
@@ -421,6 +426,22 @@ class ImageWidget(QtGui.QWidget):
         """
         self.__tangoclient = tangoclient
 
+    def setStageTimers(self, timers):
+        """ sets stage timers of the tool and render stages
+
+        :param timers: stage timers
+        :type timers: :class:`lavuelib.stageTimers.StageTimers`
+        """
+        self.__timers = timers
+
+    def setOverlayText(self, text=None):
+        """ sets text of the image overlay
+
+        :param text: overlay text or None to hide the overlay
+        :type text: :obj:`str`
+        """
+        self.__displaywidget.setOverlayText(text)
+
     def __connectsplitters(self):
         """ connects splitters  signals
         """
@@ -885,12 +906,15 @@ class ImageWidget(QtGui.QWidget):
         self.__rawdata = rawarray
         self.__imagename = imagename
         if self.__currenttool:
-            barrays = self.__currenttool.beforeplot(array, rawarray)
-        self.__displaywidget.updateImage(
-            barrays[0] if barrays is not None else self.__data,
-            barrays[1] if barrays is not None else self.__rawdata)
+            with self.__timers.timer("tool"):
+                barrays = self.__currenttool.beforeplot(array, rawarray)
+        with self.__timers.timer("render"):
+            self.__displaywidget.updateImage(
+                barrays[0] if barrays is not None else self.__data,
+                barrays[1] if barrays is not None else self.__rawdata)
         if self.__currenttool:
-            self.__currenttool.afterplot()
+            with self.__timers.timer("tool"):
+                self.__currenttool.afterplot()
 
     def updateImage(self, array=None, rawarray=None):
         """ update the image
@@ -922,6 +946,49 @@ class ImageWidget(QtGui.QWidget):
         """
         self.__displaywidget.setAutoDownSample(autodownsample)
 
+    def setIntegerImage(self, image=None, scaledimage=None,
+                        scaling="linear", mask=None):
+        """ sets the integer image of the next scaled image
+
+        :param image: uint8 or uint16 image
+        :type image: :class:`numpy.ndarray`
+        :param scaledimage: scaled image to display
+        :type scaledimage: :class:`numpy.ndarray`
+        :param scaling: intensity scaling, i.e. linear, sqrt or log
+        :type scaling: :obj:`str`
+        :param mask: validity mask of the image, i.e. True for invalid pixels
+        :type mask: :class:`numpy.ndarray`
+        """
+        self.__displaywidget.setIntegerImage(
+            image, scaledimage, scaling, mask)
+
+    def setImageOrientation(self, image=None, orientedimage=None,
+                            transpose=False, xflip=False, yflip=False):
+        """ sets the image of the next transformed image
+            which is flipped and transposed in the display
+
+        :param image: image in the original pixel order
+        :type image: :class:`numpy.ndarray`
+        :param orientedimage: transformed image view to plot
+        :type orientedimage: :class:`numpy.ndarray`
+        :param transpose: transpose flag
+        :type transpose: :obj:`bool`
+        :param xflip: flip of the first axis after transposition
+        :type xflip: :obj:`bool`
+        :param yflip: flip of the second axis after transposition
+        :type yflip: :obj:`bool`
+        """
+        self.__displaywidget.setImageOrientation(
+            image, orientedimage, transpose, xflip, yflip)
+
+    def setLODRendering(self, reduction):
+        """ sets level of detail rendering
+
+        :param reduction: reduction function, i.e. none, max or mean
+        :type reduction: :obj:`str`
+        """
+        self.__displaywidget.setLODRendering(reduction)
+
     @QtCore.pyqtSlot(float)
     def setMinLevel(self, level=None):
         """ sets minimum intensity level
@@ -1699,6 +1766,16 @@ class ImageWidget(QtGui.QWidget):
         """
         return self.__displaywidget.extension('cuts').cutData(cid)
 
+    def cutsData(self, cids=None):
+        """ provides data of the given cuts sampled at once
+
+        :param cids: cut ids, all cuts if None
+        :type cids: :obj:`list` <:obj:`int`>
+        :returns: cut data
+        :rtype: :obj:`list` <:class:`numpy.ndarray`>
+        """
+        return self.__displaywidget.extension('cuts').cutsData(cids)
+
     def rawData(self):
         """ provides the raw data
 
@@ -2078,6 +2155,22 @@ class ImageWidget(QtGui.QWidget):
         """
         self.__maskValueIndices = maskindices
 
+    def invalidMask(self):
+        """ provides validity mask of the displayed integer image
+
+        :returns: validity mask, i.e. True for invalid pixels
+        :rtype: :class:`numpy.ndarray`
+        """
+        return self.__invalidmask
+
+    def setInvalidMask(self, invalidmask):
+        """ sets validity mask of the displayed integer image
+
+        :params invalidmask: validity mask, i.e. True for invalid pixels
+        :type invalidmask: :class:`numpy.ndarray`
+        """
+        self.__invalidmask = invalidmask
+
     def rangeWindowEnabled(self):
         """ provide info if range window enabled
 
@@ -77,9 +77,16 @@ except Exception:
     TANGOCLIENT = False
 
 from . import imageFileHandler
+from . import imageRemap
 from . import sardanaUtils
 from . import dataFetchThread
 from . import settings
+from . import stageTimers
+from . import lookupTable
+from . import blockReduction
+from . import imageStages
+from . import validityMask
+from . import nexusRecorder
 
 from .hidraServerList import HIDRASERVERLIST
 
@@ -209,7 +216,8 @@ class PartialData(object):
     }
 
     @debugmethod
-    def __init__(self, name, rawdata, metadata, x, y, tr):
+    def __init__(self, name, rawdata, metadata, x, y, tr,
+                 interpolation=None):
         """ constructor
 
         :param name: data name
@@ -224,6 +232,9 @@ class PartialData(object):
         :type y: :obj:`int`
         :param tr: transformation, e.g. fup, flr, t, r90, r180, r270, r180t
         :type tr: :obj:`str`
+        :param interpolation: rotation interpolation, i.e.
+                              nearest, bilinear or spline
+        :type interpolation: :obj:`str`
         """
         #: (:obj:`str`) data name
         self.name = name
@@ -245,6 +256,8 @@ class PartialData(object):
         self.scc = 1
         #: (:obj:`str`) transformation
         self.tr = tr
+        #: (:obj:`str`) rotation interpolation
+        self.interpolation = interpolation
         self.data()
         if hasattr(self.__data, "shape"):
             if len(self.__data.shape) > 2:
@@ -320,18 +333,16 @@ class PartialData(object):
                 try:
                     if self.tr.startswith("rot") and self.tr.endswith("t"):
                         rot = -float(self.tr[3:-1])
-                        self.__data = scipy.ndimage.rotate(
-                            rawdata, rot).T
+                        self.__data = self.__rotate(rawdata, rot).T
                     elif self.tr.startswith("rot"):
                         rot = -float(self.tr[3:])
-                        self.__data = scipy.ndimage.rotate(rawdata, rot)
+                        self.__data = self.__rotate(rawdata, rot)
                     elif self.tr.startswith("r") and self.tr.endswith("t"):
                         rot = -float(self.tr[1:-1])
-                        self.__data = scipy.ndimage.rotate(
-                            rawdata, rot).T
+                        self.__data = self.__rotate(rawdata, rot).T
                     elif self.tr.startswith("r"):
                         rot = -float(self.tr[1:])
-                        self.__data = scipy.ndimage.rotate(rawdata, rot)
+                        self.__data = self.__rotate(rawdata, rot)
                     else:
                         self.__data = rawdata
                 except Exception as e:
@@ -339,6 +350,24 @@ class PartialData(object):
                     self.__data = rawdata
         return self.__data
 
+    def __rotate(self, rawdata, angle):
+        """ rotates data by an arbitrary angle
+
+        :param rawdata: raw data
+        :type rawdata: :obj:`numpy.ndarray`
+        :param angle: rotation angle in degrees
+        :type angle: :obj:`float`
+        :returns: rotated data
+        :rtype: :obj:`numpy.ndarray`
+        """
+        order = imageRemap.INTERPOLATIONS.get(
+            self.interpolation or "bilinear", 1)
+        if order not in [0, 1] or len(rawdata.shape) != 2:
+            return scipy.ndimage.rotate(rawdata, angle, order=order)
+        remap = imageRemap.RotationRemap.get(angle, rawdata.shape, order)
+        # a fresh output as the viewer keeps the image across frames
+        return remap(rawdata)
+
     @debugmethod
     def tolist(self):
         """ converts partial data to a list
@@ -455,8 +484,10 @@ class LiveViewer(QtGui.QDialog):
         #: (:obj:`bool`) ploting flag
         self.__ploting = False
 
-        #: (:class:`filters.FilterList` ) user filters
-        self.__filters = filters.FilterList()
+        #: (:class:`filters.FilterChain` ) user filters
+        self.__filters = filters.FilterChain()
+        #: (:obj:`str`) JSON list with configuration of user filters
+        self.__filterconfig = None
 
         #: (:obj:`int`) filter state
         self.__filterstate = 0
@@ -465,6 +496,19 @@ class LiveViewer(QtGui.QDialog):
         self.__lasttime = 0
         #: (:obj:`float`) current time
         self.__currentime = 0
+        #: (:class:`lavuelib.stageTimers.StageTimers`) stage timers
+        self.__timers = stageTimers.StageTimers()
+        #: (:obj:`float`) last time of the performance metrics update
+        self.__metricstime = 0
+        #: (:obj:`bool`) write performance metrics to LavueController
+        self.__writemetrics = True
+        #: (:class:`lavuelib.nexusRecorder.NexusRecorder`) recorder
+        #:    of the image stream
+        self.__recorder = None
+        #: (:obj:`bool`) record processed instead of raw images
+        self.__recordprocessed = False
+        #: (:obj:`bool`) the current image is a new frame to record
+        self.__recordpending = False
 
         # WIDGET DEFINITIONS
         #: (:class:`lavuelib.sourceTabWidget.SourceTabWidget`) source groupbox
@@ -518,6 +562,7 @@ class LiveViewer(QtGui.QDialog):
             parent=self, tooltypes=self.__tooltypes,
             settings=self.__settings,
             rgbtooltypes=self.__rgbtooltypes)
+        self.__imagewg.setStageTimers(self.__timers)
         self.__imagewg.updateToolComboBox(
             [self.__tlaliasnames[twn]
              for twn in json.loads(str(self.__settings.toolwidgets))
@@ -562,6 +607,19 @@ class LiveViewer(QtGui.QDialog):
         self.__displayimage = None
         #: (:class:`numpy.ndarray`) scaled displayed image
         self.__scaledimage = None
+        #: (:class:`numpy.ndarray`) displayed image before transformation
+        self.__orgdisplayimage = None
+        #: ((:obj:`bool`, :obj:`bool`, :obj:`bool`)) transpose, first axis
+        #:     and second axis flips of the transformation done in the display
+        self.__orientation = None
+        #: (:class:`numpy.ndarray`) validity mask of the displayed image
+        #:     before transformation, i.e. True for masked integer pixels
+        self.__invalidmask = None
+        #: (:class:`numpy.ndarray`) validity mask of the displayed image
+        self.__displaymask = None
+        #: (:class:`numpy.ndarray`) validity mask of the merged raw image,
+        #:     i.e. True for pixels without data of any image source
+        self.__mergemask = None
 
         #: (:class:`numpy.ndarray`) background image
         self.__backgroundimage = None
@@ -597,6 +655,8 @@ class LiveViewer(QtGui.QDialog):
 
         #: (:obj:`list`< (:obj:`str`) > ) image module transformations
         self.__transformations = ['']
+        #: (:obj:`list`< (:obj:`str`) > ) image module rotation interpolations
+        self.__interpolations = ['']
         #: (:obj:`list`< (:obj:`str`) >) image module
         #                translations and transformations
         self.__trans = ['']
@@ -630,14 +690,6 @@ class LiveViewer(QtGui.QDialog):
         #: (:obj:`bool`) lazy image slider
         self.__lazyimageslider = False
 
-        #: (:obj: dict < :obj:`str` , :obj:`str` >) unsigned/signed int map
-        self.__unsignedmap = {
-            "uint8": "int16",
-            "uint16": "int32",
-            "uint32": "int64",
-            "uint64": "int64"
-            # "uint64": "float64"
-        }
         #: (:class:`Ui_LevelsGroupBox') ui_groupbox object from qtdesigner
         self.__ui = _formclass()
         self.__ui.setupUi(self)
@@ -727,7 +779,8 @@ class LiveViewer(QtGui.QDialog):
         #:    data fetch thread
         self.__dataFetchers = []
         for i, ds in enumerate(self.__datasources):
-            dft = dataFetchThread.DataFetchThread(ds, self.__exchangelists[i])
+            dft = dataFetchThread.DataFetchThread(
+                ds, self.__exchangelists[i], self.__timers)
             self.__dataFetchers.append(dft)
             self._stateUpdated.connect(dft.changeStatus)
         self.__dataFetchers[0].newDataNameFetched.connect(self._getNewData)
@@ -872,6 +925,9 @@ class LiveViewer(QtGui.QDialog):
                 "dsfactor": self.__rangewg.factor(),
                 "dsreduction": str(self.__rangewg.function()),
                 "filters": self.__filterstate,
+                "record": (self.__recorder.filename
+                           if self.__recorder is not None else ""),
+                "recordprocessed": self.__recordprocessed,
                 "imagefile": (self.__settings.imagename or ""),
                 "version": str(release.__version__),
             })
@@ -1005,7 +1061,8 @@ class LiveViewer(QtGui.QDialog):
     def _setTranslation(self, trans, sid):
         """ sets translation and optional transfromation of the given source
 
-        :param trans: x,y tranlation or x,y,transformations, e.g. 2345,354
+        :param trans: x,y tranlation or x,y,transformations[,interpolation],
+                      e.g. 2345,354 or 10,20,r12.5,nearest
         :type trans: :obj:`str`
         :param sid: source id
         :type sid: :obj:`int`
@@ -1014,6 +1071,7 @@ class LiveViewer(QtGui.QDialog):
             x = None
             y = None
             tr = ''
+            itp = ''
             strans = trans.split(",")
             if len(strans) > 0:
                 try:
@@ -1030,14 +1088,24 @@ class LiveViewer(QtGui.QDialog):
                     tr = str(strans[2]).lower()
                 except Exception:
                     pass
+            if len(strans) > 3:
+                itp = str(strans[3]).strip().lower()
+                if itp not in imageRemap.INTERPOLATIONS.keys():
+                    logger.warning(
+                        "lavuelib.liveViewer.LiveViewer._setTranslation: "
+                        "unknown interpolation '%s'" % itp)
+                    itp = ''
             while len(self.__translations) <= sid:
                 self.__translations.append((None, None))
             while len(self.__transformations) <= sid:
                 self.__transformations.append('')
+            while len(self.__interpolations) <= sid:
+                self.__interpolations.append('')
             while len(self.__trans) <= sid:
                 self.__trans.append('')
             self.__translations[sid] = (x, y)
             self.__transformations[sid] = self.__transmap.get(tr, tr)
+            self.__interpolations[sid] = itp
             self.__trans[sid] = trans
         except Exception:
             pass
@@ -1123,7 +1191,9 @@ class LiveViewer(QtGui.QDialog):
         """
         try:
             fsettings = json.loads(filters)
+            self.__filterconfig = None
             self.__filters.reset(fsettings)
+            self.__filterconfig = json.dumps(fsettings)
             label = " | ".join([flt[0].split(".")[-1]
                                 for flt in fsettings if flt[0]])
             if len(label) > 32:
@@ -1221,10 +1291,12 @@ class LiveViewer(QtGui.QDialog):
             httpurls=self.__settings.httpurls,
             autozmqtopics=self.__settings.autozmqtopics,
             nxslast=self.__settings.nxslast,
+            rawformat=self.__settings.rawformat,
             nxsopen=self.__settings.nxsopen,
             serverdict=serverdict,
             hidraport=self.__settings.hidraport,
             doocsprops=self.__settings.doocsprops,
+            shmnames=self.__settings.shmnames,
             tineprops=self.__settings.tineprops,
             epicspvnames=self.__settings.epicspvnames,
             epicspvshapes=self.__settings.epicspvshapes,
@@ -1232,7 +1304,8 @@ class LiveViewer(QtGui.QDialog):
             asapotoken=self.__settings.asapotoken,
             asapodatasources=self.__settings.asapodatasources,
             asapobeamtime=self.__settings.asapobeamtime,
-            asaposourcepath=self.__settings.asaposourcepath
+            asaposourcepath=self.__settings.asaposourcepath,
+            asapomode=self.__settings.asapomode
         )
         self._updateSource(-1, -1)
 
@@ -1360,7 +1433,8 @@ class LiveViewer(QtGui.QDialog):
                    and not imagename.endswith(".h5") \
                    and not imagename.endswith(".nx") \
                    and not imagename.endswith(".ndf") \
-                   and not imagename.endswith(".hdf"):
+                   and not imagename.endswith(".hdf") \
+                   and not imagename.endswith(".raw"):
                     fid = self.__findfid(imagename)
                 else:
                     try:
@@ -1450,6 +1524,13 @@ class LiveViewer(QtGui.QDialog):
             except Exception:
                 pass
 
+        if hasattr(options, "recordprocessed") and \
+           options.recordprocessed is not None:
+            self.__recordprocessed = bool(options.recordprocessed)
+
+        if hasattr(options, "record") and options.record is not None:
+            self.__setRecording(str(options.record))
+
         if hasattr(options, "bkgfile") and options.bkgfile:
             if not self.__settings.showsub:
                 self.__settings.showsub = True
@@ -1608,6 +1689,7 @@ class LiveViewer(QtGui.QDialog):
             self.__tangoclient.detectorROIsChanged.connect(
                 self.__imagewg.updateDetectorROIs)
             self.__imagewg.setTangoClient(self.__tangoclient)
+            self.__writemetrics = True
             self.__tangoclient.subscribe()
             self.__tangoclient.lavueStateChanged.connect(
                 self._updateLavueState)
@@ -1648,10 +1730,17 @@ class LiveViewer(QtGui.QDialog):
         self.__setSardana(self.__settings.sardana)
         self.__imagewg.setAspectLocked(self.__settings.aspectlocked)
         self.__imagewg.setAutoDownSample(self.__settings.autodownsample)
+        self.__imagewg.setLODRendering(self.__settings.lodrendering)
         self._assessTransformation(self.__trafoname)
         for i, ds in enumerate(self.__datasources):
             ds.setTimeOut(self.__settings.timeout)
         dataFetchThread.GLOBALREFRESHRATE = self.__settings.refreshrate
+        dataFetchThread.SKIPDUPLICATES = self.__settings.skipduplicates
+        imageFileHandler.ChunkDecompressor.setNumberOfThreads(
+            self.__settings.nxsthreads)
+        blockReduction.BlockReducer.setNumberOfThreads(
+            self.__settings.reductionthreads)
+        isr.EpicsPVSource.monitor = self.__settings.epicsmonitor
         self.__imagewg.setStatsWOScaling(self.__settings.statswoscaling)
         self.__imagewg.setColors(self.__settings.roiscolors)
 
@@ -1745,6 +1834,7 @@ class LiveViewer(QtGui.QDialog):
                 self.__imagewg.disconnecttool()
             if self.__tangoclient:
                 self.__tangoclient.unsubscribe()
+            self.__setRecording("", nexusRecorder.EXITTIMEOUT)
             self._storeSettings()
             self.__settings.secstream = False
             for dft in self.__dataFetchers:
@@ -1931,7 +2021,8 @@ class LiveViewer(QtGui.QDialog):
                or imagename.endswith(".h5") \
                or imagename.endswith(".nx") \
                or imagename.endswith(".ndf") \
-               or imagename.endswith(".hdf"):
+               or imagename.endswith(".hdf") \
+               or imagename.endswith(".raw"):
                 self.__frame = int(fid)
             elif fid >= 0:
                 try:
@@ -2075,6 +2166,50 @@ class LiveViewer(QtGui.QDialog):
                         self.__updateframeview(True, True)
                     else:
                         self.__updateframeview()
+            elif imagename.endswith(".raw"):
+                try:
+                    handler = imageFileHandler.RawStackHandler.fromFormat(
+                        str(imagename), self.__settings.rawformat)
+                    nframes = handler.getFrameCount()
+                    self.__settings.imagename = imagename
+                except Exception as e:
+                    logger.warning(str(e))
+                    nframes = 0
+                self.setLavueState(
+                    {"imagefile": (self.__settings.imagename or "")})
+                if not nframes:
+                    if showmessage:
+                        messageBox.MessageBox.warning(
+                            self,
+                            "lavue: File %s cannot be loaded" % imagename,
+                            "File %s without images for the raw format %s"
+                            % (imagename, self.__settings.rawformat))
+                    return
+                if fid is None or self.__frame is None:
+                    self.__frame = 0
+                if self.__frame >= nframes:
+                    self.__frame = nframes - 1
+                elif self.__frame < -nframes:
+                    self.__frame = 0
+                newimage = handler.getImage(self.__frame, refresh=False)
+                metadata = handler.getMetaData()
+                self.__fieldpath = None
+                self.__ui.frameLineEdit.textChanged.disconnect(
+                    self._spinreloadfile)
+                self.__disconnectslider()
+                self.__ui.frameHorizontalSlider.valueChanged.disconnect(
+                    self._sliderreloadfilelazy)
+                self.__ui.frameLineEdit.setToolTip(
+                    "current frame (max: %s)" % (nframes - 1))
+                self.__ui.frameHorizontalSlider.setMaximum(nframes - 1)
+                self.__ui.frameHorizontalSlider.setToolTip(
+                    "current frame (max: %s)" % (nframes - 1))
+                self.__updateframeview(True, True)
+                self.__ui.frameLineEdit.textChanged.connect(
+                    self._spinreloadfile)
+                self.__ui.frameHorizontalSlider.valueChanged.connect(
+                    self._sliderreloadfilelazy)
+                self.__connectslider()
             else:
                 try:
                     fh = imageFileHandler.ImageFileHandler(
@@ -2173,6 +2308,7 @@ class LiveViewer(QtGui.QDialog):
         cnfdlg.showscale = self.__settings.showscale
         cnfdlg.showlevels = self.__settings.showlevels
         cnfdlg.showframerate = self.__settings.showframerate
+        cnfdlg.showperformance = self.__settings.showperformance
         cnfdlg.showhisto = self.__settings.showhisto
         cnfdlg.showaddhisto = self.__settings.showaddhisto
         cnfdlg.showmask = self.__settings.showmask
@@ -2192,6 +2328,7 @@ class LiveViewer(QtGui.QDialog):
         cnfdlg.secstream = self.__settings.secstream
         cnfdlg.zeromask = self.__settings.zeromask
         cnfdlg.nanmask = self.__settings.nanmask
+        cnfdlg.validitymask = self.__settings.validitymask
         cnfdlg.negmask = self.__settings.negmask
         cnfdlg.refreshrate = dataFetchThread.GLOBALREFRESHRATE
         cnfdlg.toolrefreshtime = self.__settings.toolrefreshtime
@@ -2200,19 +2337,24 @@ class LiveViewer(QtGui.QDialog):
         cnfdlg.nrsources = self.__settings.nrsources
         cnfdlg.aspectlocked = self.__settings.aspectlocked
         cnfdlg.autodownsample = self.__settings.autodownsample
+        cnfdlg.lodrendering = self.__settings.lodrendering
         cnfdlg.keepcoords = self.__settings.keepcoords
+        cnfdlg.displaytransformation = self.__settings.displaytransformation
         cnfdlg.accelbuffersum = self.__settings.accelbuffersum
         cnfdlg.lazyimageslider = self.__settings.lazyimageslider
         cnfdlg.statswoscaling = self.__settings.statswoscaling
         cnfdlg.zmqtopics = self.__settings.zmqtopics
         cnfdlg.autozmqtopics = self.__settings.autozmqtopics
         cnfdlg.interruptonerror = self.__settings.interruptonerror
+        cnfdlg.skipduplicates = self.__settings.skipduplicates
         cnfdlg.dirtrans = self.__settings.dirtrans
         cnfdlg.tangoattrs = self.__settings.tangoattrs
         cnfdlg.tineprops = self.__settings.tineprops
         cnfdlg.epicspvnames = self.__settings.epicspvnames
         cnfdlg.epicspvshapes = self.__settings.epicspvshapes
+        cnfdlg.epicsmonitor = self.__settings.epicsmonitor
         cnfdlg.doocsprops = self.__settings.doocsprops
+        cnfdlg.shmnames = self.__settings.shmnames
         cnfdlg.tangoevattrs = self.__settings.tangoevattrs
         cnfdlg.tangofileattrs = self.__settings.tangofileattrs
         cnfdlg.tangodirattrs = self.__settings.tangodirattrs
@@ -2220,6 +2362,9 @@ class LiveViewer(QtGui.QDialog):
         cnfdlg.zmqservers = self.__settings.zmqservers
         cnfdlg.nxslast = self.__settings.nxslast
         cnfdlg.nxsopen = self.__settings.nxsopen
+        cnfdlg.nxsthreads = self.__settings.nxsthreads
+        cnfdlg.reductionthreads = self.__settings.reductionthreads
+        cnfdlg.rawformat = self.__settings.rawformat
         cnfdlg.sendrois = self.__settings.sendrois
         cnfdlg.sendresults = self.__settings.sendresults
         cnfdlg.singlerois = self.__settings.singlerois
@@ -2241,6 +2386,7 @@ class LiveViewer(QtGui.QDialog):
         cnfdlg.asapotoken = self.__settings.asapotoken
         cnfdlg.asapobeamtime = self.__settings.asapobeamtime
         cnfdlg.asaposourcepath = self.__settings.asaposourcepath
+        cnfdlg.asapomode = self.__settings.asapomode
         cnfdlg.asapodatasources = self.__settings.asapodatasources
         cnfdlg.detservers = json.dumps(self.__mergeDetServers(
             HIDRASERVERLIST if cnfdlg.defdetservers else {"pool": []},
@@ -2397,6 +2543,8 @@ class LiveViewer(QtGui.QDialog):
         self.__imagewg.setAspectLocked(self.__settings.aspectlocked)
         self.__settings.autodownsample = dialog.autodownsample
         self.__imagewg.setAutoDownSample(self.__settings.autodownsample)
+        self.__settings.lodrendering = dialog.lodrendering
+        self.__imagewg.setLODRendering(self.__settings.lodrendering)
         remasking = False
         if self.__settings.accelbuffersum != dialog.accelbuffersum:
             self.__settings.accelbuffersum = dialog.accelbuffersum
@@ -2406,6 +2554,11 @@ class LiveViewer(QtGui.QDialog):
             self.__settings.keepcoords = dialog.keepcoords
             self._assessTransformation(self.__trafoname)
             replot = True
+        if self.__settings.displaytransformation != \
+           dialog.displaytransformation:
+            self.__settings.displaytransformation = \
+                dialog.displaytransformation
+            replot = True
         if self.__settings.lazyimageslider != dialog.lazyimageslider:
             self.__settings.lazyimageslider = dialog.lazyimageslider
             self.__switchlazysignals(self.__settings.lazyimageslider)
@@ -2428,6 +2581,13 @@ class LiveViewer(QtGui.QDialog):
         self.__settings.storegeometry = dialog.storegeometry
         self.__settings.geometryfromsource = dialog.geometryfromsource
         self.__settings.interruptonerror = dialog.interruptonerror
+        self.__settings.skipduplicates = dialog.skipduplicates
+        dataFetchThread.SKIPDUPLICATES = self.__settings.skipduplicates
+        if self.__settings.showperformance != dialog.showperformance:
+            self.__settings.showperformance = dialog.showperformance
+            self.__metricstime = 0
+            if not self.__settings.showperformance:
+                self.__imagewg.setOverlayText(None)
         self.__settings.sourcedisplay = dialog.sourcedisplay
         if self.__settings.hidraport != dialog.hidraport:
             self.__settings.hidraport = dialog.hidraport
@@ -2447,9 +2607,16 @@ class LiveViewer(QtGui.QDialog):
         if self.__settings.epicspvshapes != dialog.epicspvshapes:
             self.__settings.epicspvshapes = dialog.epicspvshapes
             setsrc = True
+        if self.__settings.epicsmonitor != dialog.epicsmonitor:
+            self.__settings.epicsmonitor = dialog.epicsmonitor
+            isr.EpicsPVSource.monitor = self.__settings.epicsmonitor
+            setsrc = True
         if self.__settings.doocsprops != dialog.doocsprops:
             self.__settings.doocsprops = dialog.doocsprops
             setsrc = True
+        if self.__settings.shmnames != dialog.shmnames:
+            self.__settings.shmnames = dialog.shmnames
+            setsrc = True
         if self.__settings.tangoevattrs != dialog.tangoevattrs:
             self.__settings.tangoevattrs = dialog.tangoevattrs
             setsrc = True
@@ -2492,6 +2659,9 @@ class LiveViewer(QtGui.QDialog):
         if self.__settings.asaposourcepath != dialog.asaposourcepath:
             self.__settings.asaposourcepath = dialog.asaposourcepath
             setsrc = True
+        if self.__settings.asapomode != dialog.asapomode:
+            self.__settings.asapomode = dialog.asapomode
+            setsrc = True
         if self.__settings.autozmqtopics != dialog.autozmqtopics:
             self.__settings.autozmqtopics = dialog.autozmqtopics
             setsrc = True
@@ -2501,6 +2671,17 @@ class LiveViewer(QtGui.QDialog):
         if self.__settings.nxslast != dialog.nxslast:
             self.__settings.nxslast = dialog.nxslast
             setsrc = True
+        if self.__settings.nxsthreads != dialog.nxsthreads:
+            self.__settings.nxsthreads = dialog.nxsthreads
+            imageFileHandler.ChunkDecompressor.setNumberOfThreads(
+                self.__settings.nxsthreads)
+        if self.__settings.reductionthreads != dialog.reductionthreads:
+            self.__settings.reductionthreads = dialog.reductionthreads
+            blockReduction.BlockReducer.setNumberOfThreads(
+                self.__settings.reductionthreads)
+        if self.__settings.rawformat != dialog.rawformat:
+            self.__settings.rawformat = dialog.rawformat
+            setsrc = True
         if self.__settings.sendrois != dialog.sendrois:
             self.__settings.sendrois = dialog.sendrois
         if self.__settings.sendresults != dialog.sendresults:
@@ -2538,6 +2719,11 @@ class LiveViewer(QtGui.QDialog):
             remasking = True
             replot = True
 
+        if self.__settings.validitymask != dialog.validitymask:
+            self.__settings.validitymask = dialog.validitymask
+            remasking = True
+            replot = True
+
         if self.__settings.negmask != dialog.negmask:
             self.__settings.negmask = dialog.negmask
             remasking = True
@@ -2574,9 +2760,11 @@ class LiveViewer(QtGui.QDialog):
                 self.__datasources.append(isr.BaseSource())
                 self.__exchangelists.append(dataFetchThread.ExchangeList())
                 dft = dataFetchThread.DataFetchThread(
-                    self.__datasources[-1], self.__exchangelists[-1])
+                    self.__datasources[-1], self.__exchangelists[-1],
+                    self.__timers)
                 self.__dataFetchers.append(dft)
                 self._stateUpdated.connect(dft.changeStatus)
+        self.__updateSourceRecorder()
         self.__sourcewg.setNumberOfSources(nrsources)
         self._setSourceConfiguration()
         self.__settings.nrsources = nrsources
@@ -2797,14 +2985,19 @@ class LiveViewer(QtGui.QDialog):
             return
         self.__ploting = True
         try:
+            timers = self.__timers
             self.__filteredimage = self.__rawimage
-            # apply user range
-            self.__applyRange()
-            # apply user filters
-            self.__applyFilters()
+            with timers.timer("filters"):
+                # apply user range
+                if not self.__applyRange():
+                    # the image source provides the image of the new range
+                    return
+                # apply user filters
+                self.__applyFilters()
             if self.__settings.showmbuffer and self.__mbufferwg.isOn():
-                result = self.__mbufferwg.process(
-                    self.__filteredimage, self.__imagename)
+                with timers.timer("buffer"):
+                    result = self.__mbufferwg.process(
+                        self.__filteredimage, self.__imagename)
                 if isinstance(result, tuple) and len(result) == 2:
                     self.__filteredimage, mdata = result
                     self.__mdata.update(mdata)
@@ -2813,18 +3006,26 @@ class LiveViewer(QtGui.QDialog):
                     self.__mdata["channellabels"])
 
             # prepare or preprocess the raw image if present:
-            self.__prepareImage()
+            with timers.timer("prepare"):
+                self.__prepareImage()
+            if self.__recordpending:
+                self.__recordpending = False
+                with timers.timer("record"):
+                    self.__record()
 
             # perform transformation
             # (crdtranspose, crdleftrightflip, crdupdownflip,
             # orgtranspose, orgleftrightflip, orgupdownflip)
-            allcrds = self.__transform()
-            self.__imagewg.setTransformations(*allcrds)
+            with timers.timer("transform"):
+                allcrds = self.__transform()
+                self.__imagewg.setTransformations(*allcrds)
             # use the internal raw image to create a display image with chosen
             # scaling
-            self.__scale(self.__scalingwg.currentScaling())
+            with timers.timer("scale"):
+                self.__scale(self.__scalingwg.currentScaling())
             # calculate and update the stats for this
-            self.__calcUpdateStats()
+            with timers.timer("stats"):
+                self.__calcUpdateStats()
             # calls internally the plot function of the plot widget
             if self.__imagename is not None and self.__scaledimage is not None:
                 self.__ui.fileNameLineEdit.setText(
@@ -2888,7 +3089,8 @@ class LiveViewer(QtGui.QDialog):
                 'scaling': (
                     'linear'
                     if self.__settings.statswoscaling
-                    else currentscaling)}
+                    else currentscaling),
+                'metrics': self.__timers.metrics()}
             topic = 10001
             message = "%d %s" % (
                 topic, str(json.dumps(messagedata)).encode("ascii"))
@@ -2936,6 +3138,8 @@ class LiveViewer(QtGui.QDialog):
         lstatus = json.loads(str(status))
         status = lstatus[0]
         self.__viewFrameRate(self.__settings.showframerate)
+        self.__timers.reset()
+        self.__metricstime = 0
         for i, status in enumerate(lstatus):
             self._updateSource(status, i)
 
@@ -3004,7 +3208,7 @@ class LiveViewer(QtGui.QDialog):
                 topic, str(json.dumps(messagedata)).encode("ascii")))
 
     # @debugmethod
-    def __mergeData(self, fulldata, oldname, channels=False):
+    def mergeData(self, fulldata, oldname, channels=False):
         """ merge data parts to (name, rawdata, metadata)
 
         :param fulldata: a list of PartialData objects
@@ -3044,6 +3248,7 @@ class LiveViewer(QtGui.QDialog):
             ldata = [pdata for pdata in fulldata if pdata.name]
             if len(ldata) == 1:
                 name, rawimage, metadata = ldata[0].tolist()[:3]
+                self.__mergemask = None
             elif len(ldata) > 1:
                 pd = ldata[0]
                 shape = [pd.sx, pd.sy]
@@ -3080,13 +3285,22 @@ class LiveViewer(QtGui.QDialog):
                 else:
                     nshape = (shape[0] - nx, shape[1] - ny)
 
-                if self.__settings.nanmask:
+                # integer images keep their type with a validity mask
+                validity = self.__settings.validitymask and \
+                    np.dtype(dtype).kind in "iu"
+                if self.__settings.nanmask and not validity:
                     dtype = self.__settings.floattype
                 rawimage = np.zeros(shape=nshape, dtype=dtype)
-                if self.__settings.nanmask:
+                if self.__settings.nanmask and not validity:
                     rawimage.fill(np.nan)
+                self.__mergemask = np.ones(nshape[-2:], dtype=bool) \
+                    if validity else None
                 for i, pd in enumerate(ldata):
                     lsh = len(pd.data().shape)
+                    if self.__mergemask is not None:
+                        self.__mergemask[
+                            pd.x - nx: pd.sx + pd.x - nx,
+                            pd.y - ny: pd.sy + pd.y - ny] = False
                     if lsh == 2:
                         if scc == 1:
                             rawimage[
@@ -3150,6 +3364,10 @@ class LiveViewer(QtGui.QDialog):
                     tr = self.__transformations[i]
                 else:
                     tr = ''
+                if i < len(self.__interpolations):
+                    itp = self.__interpolations[i]
+                else:
+                    itp = ''
                 logger.debug(
                     "lavuelib.liveViewer.LiveViewer.__getNewData "
                     "%s: %s %s %s, [%s, %s]" %
@@ -3158,8 +3376,10 @@ class LiveViewer(QtGui.QDialog):
                      x or "", y or "")
                 )
                 fulldata.append(
-                    PartialData(name, rawimage, metadata, x, y, tr))
+                    PartialData(name, rawimage, metadata, x, y, tr,
+                                itp))
 
+        mergestart = stageTimers.clock()
         self.__intmaxvalue = None
         if self.__settings.negmask:
             imvtb = [fd.intmaxvalue() for fd in fulldata]
@@ -3173,16 +3393,34 @@ class LiveViewer(QtGui.QDialog):
         if len(fulldata) == 1:
             name, rawimage, metadata = fulldata[0].tolist()[:3]
         else:
-            name, rawimage, metadata = self.__mergeData(
+            name, rawimage, metadata = self.mergeData(
                 fulldata, str(self.__imagename).strip(),
                 self.__settings.imagechannels)
+        self.__timers.add("merge", stageTimers.clock() - mergestart)
+        self.displayImage(name, rawimage, metadata)
+        for dft in self.__dataFetchers:
+            dft.ready()
+
+    def displayImage(self, name, rawimage, metadata=None):
+        """ processes and plots the image with the current settings
+
+        :param name: image name
+        :type name: :obj:`str`
+        :param rawimage: raw image
+        :type rawimage: :class:`numpy.ndarray`
+        :param metadata: JSON dictionary with metadata
+        :type metadata: :obj:`str`
+        """
         if hasattr(rawimage, "dtype") and str(rawimage.dtype) == 'object' \
            and rawimage:
             rawimage = "%s string (%s) cannot be read" % (name, rawimage)
             name = "__ERROR__"
-        if str(self.__imagename).strip() == str(name).strip() and not metadata:
-            for dft in self.__dataFetchers:
-                dft.ready()
+        # the last image was cropped or filtered by the data fetch thread
+        sourceregion = isinstance(self.__mdata, dict) and (
+            "sourceregion" in self.__mdata or "prefilters" in self.__mdata)
+        if str(self.__imagename).strip() == str(name).strip() and \
+           not metadata and not sourceregion:
+            self.__timers.count("duplicates")
             return
         if name == "__ERROR__":
             if self.__settings.interruptonerror:
@@ -3194,14 +3432,10 @@ class LiveViewer(QtGui.QDialog):
                     "Viewing will be interrupted", str(errortext))
             else:
                 self.__sourcewg.setErrorStatus(name)
-            for dft in self.__dataFetchers:
-                dft.ready()
             return
         self.__sourcewg.setErrorStatus("")
 
         if name is None:
-            for dft in self.__dataFetchers:
-                dft.ready()
             return
         # first time:
         if str(self.__metadata) != str(metadata) and str(metadata).strip():
@@ -3235,7 +3469,8 @@ class LiveViewer(QtGui.QDialog):
                 logger.warning(str(e))
                 # print(str(e))
         elif str(name).strip():
-            if self.__imagename is None or str(self.__imagename) != str(name):
+            if self.__imagename is None or sourceregion or \
+               str(self.__imagename) != str(name):
                 self.__imagename, self.__metadata \
                     = name, metadata
                 if not isinstance(rawimage, basestring):
@@ -3250,10 +3485,104 @@ class LiveViewer(QtGui.QDialog):
             self.__updateframerate(self.__currenttime - self.__lasttime)
         self.__lasttime = self.__currenttime
 
+        self.__recordpending = self.__recorder is not None
         self._plot()
-        QtCore.QCoreApplication.processEvents()
+        with self.__timers.timer("render"):
+            QtCore.QCoreApplication.processEvents()
+        self.__timers.frameDone()
+        self.__updatePerformanceMetrics()
+
+    def stageTimers(self):
+        """ provides the stage timers of the image hot path
+
+        :returns: stage timers
+        :rtype: :class:`lavuelib.stageTimers.StageTimers`
+        """
+        return self.__timers
+
+    def __updatePerformanceMetrics(self):
+        """ updates the performance overlay and the PerformanceMetrics
+            attribute of LavueController at most once per second
+        """
+        if self.__currenttime - self.__metricstime < 1.:
+            return
+        self.__metricstime = self.__currenttime
+        recording = {}
+        if self.__recorder is not None:
+            recording = {"recorded": self.__recorder.written,
+                         "recorddropped": self.__recorder.dropped}
+        if self.__settings.showperformance:
+            summary = self.__timers.summary()
+            if recording:
+                summary += "\nrecorded %d, dropped %d" % (
+                    recording["recorded"], recording["recorddropped"])
+            self.__imagewg.setOverlayText(summary)
+        if self.__tangoclient is not None and self.__writemetrics:
+            metrics = self.__timers.metrics()
+            metrics.update(recording)
+            try:
+                self.__imagewg.writeAttribute(
+                    "PerformanceMetrics", json.dumps(metrics))
+            except Exception as e:
+                # LavueController without the PerformanceMetrics attribute
+                logger.warning(str(e))
+                self.__writemetrics = False
+
+    def __setRecording(self, filename, timeout=0):
+        """ starts recording of the image stream to the NeXus file
+            or stops it if the file name is empty
+
+        :param filename: NeXus file name
+        :type filename: :obj:`str`
+        :param timeout: maximal waiting time for writing of queued frames
+                        of the previous recording in s, 0 stops it
+                        in the background
+        :type timeout: :obj:`float`
+        """
+        recorder = self.__recorder
+        if recorder is not None:
+            if recorder.filename == filename and recorder.isRunning():
+                return
+            self.__recorder = None
+            # the writer thread writes the queued frames and logs them
+            recorder.stop(timeout)
+        if filename:
+            try:
+                self.__recorder = nexusRecorder.NexusRecorder(
+                    filename,
+                    chunk=self.__settings.recordchunk,
+                    compression=self.__settings.recordcompression,
+                    queuesize=self.__settings.recordqueuesize)
+                self.__recorder.start()
+            except Exception as e:
+                self.__recorder = None
+                logger.warning(str(e))
+        self.__updateSourceRecorder()
+
+    def __updateSourceRecorder(self):
+        """ passes the recorder of raw images to the data fetch thread
+            which records fetched images before the source region and filters
+        """
+        recorder = None
+        if not self.__recordprocessed and len(self.__dataFetchers) == 1:
+            recorder = self.__recorder
         for dft in self.__dataFetchers:
-            dft.ready()
+            dft.setRecorder(recorder)
+
+    def __record(self):
+        """ passes the current processed image or the raw image
+            merged from several sources to the recorder
+        """
+        if self.__recordprocessed:
+            image = self.__displayimage
+        elif len(self.__dataFetchers) == 1:
+            # recorded by the data fetch thread
+            return
+        else:
+            image = self.__rawimage
+        if isinstance(image, np.ndarray) and image.size:
+            self.__recorder.record(
+                np.transpose(image), self.__imagename, self.__mdata)
 
     # @debugmethod
     def __updateframeview(self, status=False, slider=False):
@@ -3320,23 +3649,19 @@ class LiveViewer(QtGui.QDialog):
         if len(self.__filteredimage.shape) == 3:
             self.__channelwg.setNumberOfChannels(
                 self.__filteredimage.shape[0] - ics)
+            skipfirst = bool(self.__mdata.get("skipfirst"))
             if not self.__channelwg.colorChannel():
-                if ics:
-                    self.__rawgreyimage = self.__filteredimage[-1, :, :]
-                elif ("skipfirst" in self.__mdata.keys() and
-                      self.__mdata["skipfirst"]):
-                    self.__rawgreyimage = np.nansum(
-                        self.__filteredimage[1:, :, :], 0)
-                else:
-                    self.__rawgreyimage = np.nansum(self.__filteredimage, 0)
+                self.__rawgreyimage = imageStages.greyImage(
+                    self.__filteredimage, "sum", skipfirst, ics)
                 if self.rgb():
                     self.setrgb(False)
             else:
                 try:
                     if len(self.__filteredimage) - ics >= \
                        self.__channelwg.colorChannel():
-                        self.__rawgreyimage = self.__filteredimage[
-                            self.__channelwg.colorChannel() - 1]
+                        self.__rawgreyimage = imageStages.greyImage(
+                            self.__filteredimage,
+                            str(self.__channelwg.colorChannel() - 1))
                         if self.rgb():
                             self.setrgb(False)
                             self.__levelswg.showGradient(True)
@@ -3345,13 +3670,8 @@ class LiveViewer(QtGui.QDialog):
                         if self.rgb():
                             self.setrgb(False)
                             self.__levelswg.showGradient(True)
-                        if "skipfirst" in self.__mdata.keys() and \
-                           self.__mdata["skipfirst"]:
-                            self.__rawgreyimage = np.nanmean(
-                                self.__filteredimage[1:, :, :], 0)
-                        else:
-                            self.__rawgreyimage = np.nanmean(
-                                self.__filteredimage, 0)
+                        self.__rawgreyimage = imageStages.greyImage(
+                            self.__filteredimage, "mean", skipfirst, ics)
                     elif self.__filteredimage.shape[0] - ics > 1:
                         if not self.rgb():
                             self.setrgb(True)
@@ -3433,28 +3753,16 @@ class LiveViewer(QtGui.QDialog):
                 self.setrgb(False)
                 self.__channelwg.showGradient(True)
                 self.__levelswg.showGradient(True)
-            self.__rawgreyimage = np.array(
-                self.__filteredimage).reshape(
-                    (self.__filteredimage.shape[0], 1))
+            self.__rawgreyimage = imageStages.greyImage(
+                self.__filteredimage)
             self.__channelwg.setNumberOfChannels(0)
 
         self.__displayimage = self.__rawgreyimage
 
         if self.__dobkgsubtraction and self.__scbackgroundimage is not None:
             try:
-                if (hasattr(self.__rawgreyimage, "dtype") and
-                   self.__rawgreyimage.dtype.name in
-                    self.__unsignedmap.keys()) \
-                   and (hasattr(self.__scbackgroundimage, "dtype") and
-                   self.__scbackgroundimage.dtype.name in
-                        self.__unsignedmap.keys()):
-                    self.__displayimage = np.subtract(
-                        self.__rawgreyimage, self.__scbackgroundimage,
-                        dtype=self.__unsignedmap[
-                            self.__rawgreyimage.dtype.name])
-                else:
-                    self.__displayimage = \
-                        self.__rawgreyimage - self.__scbackgroundimage
+                self.__displayimage = imageStages.subtractBackground(
+                    self.__rawgreyimage, self.__scbackgroundimage)
             except Exception:
                 self._checkBkgSubtraction(0)
                 self.__backgroundimage = None
@@ -3489,18 +3797,22 @@ class LiveViewer(QtGui.QDialog):
                     "to the current image",
                     text, str(value))
 
+        # integer images keep their type and masked pixels
+        # are marked in the validity mask
+        invalid = None
+        validity = self.__settings.validitymask and \
+            validityMask.isIntegerImage(self.__displayimage)
+        if validity and validityMask.matches(
+                self.__displayimage, self.__mergemask):
+            invalid = self.__mergemask
         if self.__settings.showmask and self.__imagewg.applyMask() and \
            self.__imagewg.maskIndices() is not None:
             # set all masked (non-zero values) to zero by index
             try:
-                if not self.__settings.nanmask:
-                    self.__displayimage = np.array(self.__displayimage)
-                    self.__displayimage[self.__imagewg.maskIndices()] = 0
-                else:
-                    self.__displayimage = np.array(
-                        self.__displayimage,
-                        dtype=self.__settings.floattype)
-                    self.__displayimage[self.__imagewg.maskIndices()] = np.nan
+                self.__displayimage, invalid = imageStages.maskPixels(
+                    self.__displayimage, self.__imagewg.maskIndices(),
+                    invalid, validity, self.__settings.nanmask,
+                    self.__settings.floattype)
             except IndexError:
                 self.__maskwg.noImage()
                 self.__imagewg.setApplyMask(False)
@@ -3521,23 +3833,11 @@ class LiveViewer(QtGui.QDialog):
                maskvalue < 0 and self.__intmaxvalue is not None:
                 maskvalue += self.__intmaxvalue
             try:
-                if self.__settings.nanmask:
-                    self.__displayimage = np.array(
-                        self.__displayimage,
-                        dtype=self.__settings.floattype)
-                    with np.warnings.catch_warnings():
-                        np.warnings.filterwarnings(
-                            'ignore', r'invalid value encountered in greater')
-                        self.__imagewg.setMaskValueIndices(
-                            self.__displayimage > maskvalue)
-                        self.__displayimage[
-                            self.__imagewg.maskValueIndices()] = np.nan
-                else:
-                    self.__displayimage = np.array(self.__displayimage)
-                    self.__imagewg.setMaskValueIndices(
-                        self.__displayimage > maskvalue)
-                    self.__displayimage[
-                            self.__imagewg.maskValueIndices()] = 0
+                self.__displayimage, invalid, indices = \
+                    imageStages.maskHighValues(
+                        self.__displayimage, maskvalue, invalid, validity,
+                        self.__settings.nanmask, self.__settings.floattype)
+                self.__imagewg.setMaskValueIndices(indices)
             except IndexError:
                 # self.__highvaluemaskwg.noValue()
                 import traceback
@@ -3548,6 +3848,7 @@ class LiveViewer(QtGui.QDialog):
                     self, "lavue: Cannot apply high value mask"
                     " to the current image",
                     text, str(value))
+        self.__invalidmask = invalid
 
     # @debugmethod
     def __transform(self):
@@ -3564,26 +3865,19 @@ class LiveViewer(QtGui.QDialog):
         orgupdownflip = False
         orgleftrightflip = False
         orgtranspose = False
+        self.__orgdisplayimage = self.__displayimage
         if self.__trafoname == "none":
             pass
         elif self.__trafoname == "flip (up-down)":
             orgupdownflip = True
             if self.__settings.keepcoords:
                 crdupdownflip = True
-            elif self.__displayimage is not None:
-                self.__displayimage = np.fliplr(self.__displayimage)
         elif self.__trafoname == "flip (left-right)":
             orgleftrightflip = True
             if self.__settings.keepcoords:
                 crdleftrightflip = True
-            elif self.__displayimage is not None:
-                self.__displayimage = np.flipud(self.__displayimage)
         elif self.__trafoname == "transpose":
             orgtranspose = True
-            if self.__displayimage is not None:
-                self.__displayimage = np.swapaxes(
-                    self.__displayimage, 0, 1)
-                # self.__displayimage = np.transpose(self.__displayimage)
             if self.__settings.keepcoords:
                 crdtranspose = True
         elif self.__trafoname == "rot90 (clockwise)":
@@ -3592,39 +3886,18 @@ class LiveViewer(QtGui.QDialog):
             if self.__settings.keepcoords:
                 crdtranspose = True
                 crdupdownflip = True
-                if self.__displayimage is not None:
-                    self.__displayimage = np.swapaxes(
-                        self.__displayimage, 0, 1)
-                    # self.__displayimage = np.transpose(self.__displayimage)
-            elif self.__displayimage is not None:
-                # self.__displayimage = np.transpose(
-                #     np.flipud(self.__displayimage))
-                self.__displayimage = np.swapaxes(
-                    np.flipud(self.__displayimage), 0, 1)
         elif self.__trafoname == "rot180":
             orgupdownflip = True
             orgleftrightflip = True
             if self.__settings.keepcoords:
                 crdupdownflip = True
                 crdleftrightflip = True
-            elif self.__displayimage is not None:
-                self.__displayimage = np.flipud(
-                    np.fliplr(self.__displayimage))
         elif self.__trafoname == "rot270 (clockwise)":
             orgtranspose = True
             orgleftrightflip = True
             if self.__settings.keepcoords:
                 crdtranspose = True
                 crdleftrightflip = True
-                if self.__displayimage is not None:
-                    self.__displayimage = np.swapaxes(
-                        self.__displayimage, 0, 1)
-                    # self.__displayimage = np.transpose(self.__displayimage)
-            elif self.__displayimage is not None:
-                self.__displayimage = np.swapaxes(
-                    np.fliplr(self.__displayimage), 0, 1)
-                # self.__displayimage = np.transpose(
-                #     np.fliplr(self.__displayimage))
         elif self.__trafoname == "rot180 + transpose":
             orgtranspose = True
             orgupdownflip = True
@@ -3633,40 +3906,101 @@ class LiveViewer(QtGui.QDialog):
                 crdtranspose = True
                 crdupdownflip = True
                 crdleftrightflip = True
-                if self.__displayimage is not None:
-                    # self.__displayimage = np.transpose(self.__displayimage)
-                    self.__displayimage = np.swapaxes(
-                        self.__displayimage, 0, 1)
-            elif self.__displayimage is not None:
-                self.__displayimage = np.swapaxes(
-                    np.fliplr(np.flipud(self.__displayimage)), 0, 1)
-                # self.__displayimage = np.transpose(
-                #     np.fliplr(np.flipud(self.__displayimage)))
+        if self.__displayimage is not None:
+            # the kept coordinates flip the axes instead of the image
+            if not self.__settings.keepcoords:
+                trafoname = self.__trafoname
+            elif orgtranspose:
+                trafoname = "transpose"
+            else:
+                trafoname = "none"
+            self.__displayimage = imageStages.transformImage(
+                self.__displayimage, trafoname)
+        self.__orientation = None
+        self.__displaymask = self.__invalidmask
+        if self.__displayimage is not self.__orgdisplayimage:
+            # the flipped and transposed views are equivalent to
+            # the transposition followed by flips of the displayed axes
+            orientation = (
+                orgtranspose,
+                orgleftrightflip and not self.__settings.keepcoords,
+                orgupdownflip and not self.__settings.keepcoords)
+            if self.__settings.displaytransformation:
+                self.__orientation = orientation
+            if self.__invalidmask is not None:
+                self.__displaymask = self.__orient(
+                    self.__invalidmask, *orientation)
+        self.__imagewg.setInvalidMask(self.__displaymask)
         return (crdtranspose, crdleftrightflip, crdupdownflip,
                 orgtranspose, orgleftrightflip, orgupdownflip)
 
+    @classmethod
+    def __orient(cls, image, transpose, xflip, yflip):
+        """ provides the transformed view of the image
+
+        :param image: image
+        :type image: :class:`numpy.ndarray`
+        :param transpose: transpose flag
+        :type transpose: :obj:`bool`
+        :param xflip: flip of the first axis after transposition
+        :type xflip: :obj:`bool`
+        :param yflip: flip of the second axis after transposition
+        :type yflip: :obj:`bool`
+        :returns: transformed image view
+        :rtype: :class:`numpy.ndarray`
+        """
+        if transpose:
+            image = np.swapaxes(image, 0, 1)
+        if xflip:
+            image = np.flipud(image)
+        if yflip:
+            image = np.fliplr(image)
+        return image
+
+    # @debugmethod
+    def __updateSourceRegion(self):
+        """ pushes the user range into the image source
+            so that only the range window is read and processed
+        """
+        region = (None, None, None, None, 1, "max")
+        if self.__settings.showrange and len(self.__dataFetchers) == 1:
+            region = tuple(self.__rangewg.rangeWindow()) + (
+                self.__rangewg.factor(), self.__rangewg.function())
+        for dft in self.__dataFetchers:
+            dft.setRegion(*region)
+
     # @debugmethod
     def __applyRange(self):
         """ applies user range
+
+        :returns: False if the image has been cropped or down-sampled
+                  by the image source for another range, i.e. it is stale
+        :rtype: :obj:`bool`
         """
+        self.__updateSourceRegion()
+        window = [None, None, None, None]
+        factor = 1
+        function = None
+        if self.__settings.showrange:
+            window = list(self.__rangewg.rangeWindow())
+            factor = self.__rangewg.factor()
+            function = self.__rangewg.function()
+        # range applied by the image source
+        applied = imageStages.appliedRegion(
+            self.__mdata.get("sourceregion")
+            if isinstance(self.__mdata, dict) else None,
+            window, factor, function)
+        if applied is None:
+            return False
+        cropped, binned = applied
         if self.__settings.showrange and \
            self.__filteredimage is not None:
-            x1, y1, x2, y2 = self.__rangewg.rangeWindow()
-            position = [None, None]
-            if x1 is not None or y1 is not None or \
-               x2 is not None or y2 is not None:
-                position = self.__setrange(x1, y1, x2, y2)
-            scale = [None, None]
-            factor = self.__rangewg.factor()
-            if factor > 1:
-                function = self.__rangewg.function()
-                scale = self.__npresize(factor, function)
-            if self.__trafoname in ["transpose",
-                                    "rot90 (clockwise)",
-                                    "rot270 (clockwise)",
-                                    "rot180 + transpose"]:
-                position = [position[1], position[0]]
-                scale = [scale[1], scale[0]]
+            x1, y1, x2, y2 = window
+            if any(crd is not None for crd in window) and not cropped:
+                self.__setrange(x1, y1, x2, y2)
+            if factor > 1 and not binned:
+                self.__npresize(factor, function)
+        return True
 
     # @debugmethod
     def __setrange(self, x1, y1, x2, y2):
@@ -3683,18 +4017,8 @@ class LiveViewer(QtGui.QDialog):
         :returns: x,y - start x,y-position
         :rtype: (:obj:`int`, :obj:`int`)
         """
-        image = None
-        position = [0, 0]
-        shape = self.__filteredimage.shape
-        if len(shape) == 1 and shape[0]:
-            image = self.__filteredimage[x1:x2]
-        elif len(shape) == 2:
-            image = self.__filteredimage[x1:x2, y1:y2]
-        elif len(shape) == 3:
-            image = self.__filteredimage[:, x1:x2, y1:y2]
-        if image is not None and image.size > 0:
-            self.__filteredimage = image
-            position = [x1 or 0, y1 or 0]
+        self.__filteredimage, position = imageStages.cropImage(
+            self.__filteredimage, x1, y1, x2, y2)
         return position
 
     # @debugmethod
@@ -3709,34 +4033,12 @@ class LiveViewer(QtGui.QDialog):
         :rtype: (:obj:`int`, :obj:`int`)
         """
         shape = self.__filteredimage.shape
-        scale = [1, 1]
-        if len(shape) > 1 and factor > 1:
-            w = shape[-2] // factor
-            h = shape[-1] // factor
-            ww = w * factor
-            hh = h * factor
-            if ww < factor or hh < factor:
-                nfactor = max(min(int(shape[-2]), int(shape[-1])), 1)
-                self.__rangewg.setFactor(nfactor)
-                factor = 1
-                w = shape[-2] // factor
-                h = shape[-1] // factor
-                ww = w * factor
-                hh = h * factor
-
-            if len(shape) == 2 and factor > 1:
-                self.__filteredimage = \
-                    getattr(
-                        self.__filteredimage[:ww, :hh].
-                        reshape(w, factor, h, factor),
-                        function)((-1, -3))
-            elif len(shape) == 3:
-                self.__filteredimage = \
-                    getattr(
-                        self.__filteredimage[:, :ww, :hh].
-                        reshape(shape[0], w, factor, h, factor),
-                        function)((-1, -3))
-            scale = [factor, factor]
+        if len(shape) > 1 and factor > 1 and \
+           (shape[-2] < factor or shape[-1] < factor):
+            nfactor = max(min(int(shape[-2]), int(shape[-1])), 1)
+            self.__rangewg.setFactor(nfactor)
+        self.__filteredimage, scale = imageStages.downsampleImage(
+            self.__filteredimage, factor, function)
         return scale
 
     @debugmethod
@@ -3763,41 +4065,51 @@ class LiveViewer(QtGui.QDialog):
             "dsreduction": str(self.__rangewg.function())})
         self._plot()
 
+    # @debugmethod
+    def __updateSourceFilters(self):
+        """ passes the filter configuration to the data fetch thread
+            which applies the leading thread-safe filters
+            by its own filter chain
+        """
+        config = None
+        if self.__filterstate and len(self.__dataFetchers) == 1:
+            config = self.__filterconfig
+        for dft in self.__dataFetchers:
+            dft.setFilters(config)
+
     # @debugmethod
     def __applyFilters(self):
         """ applies user filters
         """
         # self.__filteredimage = self.__rawimage
-        if self.__filterstate:
-            for flt in self.__filters:
-                try:
-                    if self.__filteredimage is not None:
-                        image = flt(
-                            self.__filteredimage,
-                            self.__imagename,
-                            self.__metadata,
-                            self.__imagewg
-                        )
-                        fltmdata = None
-                        if isinstance(image, tuple):
-                            if len(image) >= 2:
-                                image, fltmdata = image[:2]
-                            if len(image) == 1:
-                                image = image
-                        if image is not None and (
-                                hasattr(image, "size") and image.size > 1):
-                            self.__filteredimage = image
-                        if isinstance(fltmdata, dict):
-                            self.__mdata.update(fltmdata)
-                except Exception as e:
-                    self.__filterswg.setState(0)
-                    import traceback
-                    value = traceback.format_exc()
-                    messageBox.MessageBox.warning(
-                        self, "lavue: problems in applying filters",
-                        "%s" % str(e),
-                        "%s" % value)
-                    # print(str(e))
+        self.__updateSourceFilters()
+        if self.__filterstate and self.__filteredimage is not None:
+            # filters applied by the data fetch thread
+            start = self.__mdata.get("prefilters", 0) \
+                if isinstance(self.__mdata, dict) else 0
+            self.__filteredimage, fltmdata = self.__filters.apply(
+                self.__filteredimage,
+                self.__imagename,
+                self.__metadata,
+                self.__imagewg,
+                start=start,
+                onerror=self.__filterError
+            )
+            self.__mdata.update(fltmdata)
+
+    def __filterError(self, error):
+        """ shows the filter error and switches filters off
+
+        :param error: filter exception
+        :type error: :class:`Exception`
+        """
+        self.__filterswg.setState(0)
+        import traceback
+        value = traceback.format_exc()
+        messageBox.MessageBox.warning(
+            self, "lavue: problems in applying filters",
+            "%s" % str(error),
+            "%s" % value)
 
     # @debugmethod
     def __scale(self, scalingtype):
@@ -3807,20 +4119,38 @@ class LiveViewer(QtGui.QDialog):
         :type scalingtype: :obj:`str`
         """
         self.__imagewg.setScalingType(scalingtype)
-        if self.__displayimage is None:
-            self.__scaledimage = None
-        elif scalingtype == "sqrt":
-            self.__scaledimage = np.clip(self.__displayimage, 0, np.inf)
-            self.__scaledimage = np.sqrt(self.__scaledimage)
-        elif scalingtype == "log":
-            self.__scaledimage = np.clip(self.__displayimage, 10e-3, np.inf)
-            self.__scaledimage = np.log10(self.__scaledimage)
+        self.__imagewg.setIntegerImage()
+        self.__imagewg.setImageOrientation()
+        # the transformation done in the display keeps the pixel order
+        image = self.__orgdisplayimage \
+            if self.__orientation is not None else self.__displayimage
+        mask = self.__invalidmask \
+            if self.__orientation is not None else self.__displaymask
+        if image is None:
+            scaledimage = None
+        elif scalingtype in ["sqrt", "log"]:
+            scaledimage = imageStages.scaleImage(image, scalingtype)
+            if lookupTable.isTableType(image):
+                # uint8 and uint16 images are colored by tables
+                self.__imagewg.setIntegerImage(
+                    image, scaledimage, scalingtype, mask)
+        elif mask is not None and lookupTable.isTableType(image):
+            # invalid pixels are colored by the integer image table
+            scaledimage = image
+            self.__imagewg.setIntegerImage(
+                image, scaledimage, scalingtype, mask)
         elif _VMAJOR == '0' and _VMINOR == '9' and int(_VPATCH) > 7:
             # (for 0.9.8 <= version < 0.10.0 i.e. ubuntu 16.04)
-            self.__scaledimage = self.__displayimage.astype(
-                self.__settings.floattype)
+            scaledimage = image.astype(self.__settings.floattype)
+        else:
+            scaledimage = image
+        if self.__orientation is not None and scaledimage is not None:
+            self.__scaledimage = self.__orient(
+                scaledimage, *self.__orientation)
+            self.__imagewg.setImageOrientation(
+                scaledimage, self.__scaledimage, *self.__orientation)
         else:
-            self.__scaledimage = self.__displayimage
+            self.__scaledimage = scaledimage
 
     # @debugmethod
     def __calcStats(self, flag):
@@ -3836,25 +4166,13 @@ class LiveViewer(QtGui.QDialog):
         :rtype: [:obj:`str`, :obj:`str`, :obj:`str`, :obj:`str`,
                     :obj:`str`, :obj:`str`]
         """
-        if self.__settings.statswoscaling and self.__displayimage is not None \
-           and self.__displayimage.size > 0:
-            maxval = np.nanmax(self.__displayimage) if flag[0] else 0.0
-            meanval = np.nanmean(self.__displayimage) if flag[1] else 0.0
-            varval = np.nanvar(self.__displayimage) if flag[2] else 0.0
-            maxsval = np.nanmax(self.__scaledimage) if flag[5] else 0.0
-        elif (not self.__settings.statswoscaling
-              and self.__scaledimage is not None
-              and self.__displayimage.size > 0):
-            maxval = np.nanmax(self.__scaledimage) \
-                     if flag[0] or flag[5] else 0.0
-            meanval = np.nanmean(self.__scaledimage) if flag[1] else 0.0
-            varval = np.nanvar(self.__scaledimage) if flag[2] else 0.0
-            maxsval = maxval
-        else:
+        # pixels of the validity mask are excluded
+        stats = imageStages.imageStats(
+            self.__displayimage, self.__scaledimage, self.__rawgreyimage,
+            self.__displaymask, self.__settings.statswoscaling, flag)
+        if stats is None:
             return 0.0, 0.0, 0.0, 0.0, 0.0, 0.0
-        maxrawval = np.nanmax(self.__rawgreyimage) if flag[4] else 0.0
-        minval = np.nanmin(self.__scaledimage) if flag[3] else 0.0
-        return (maxval, meanval, varval, minval, maxrawval,  maxsval)
+        return stats
 
     @debugmethod
     @QtCore.pyqtSlot(str)
@@ -4080,7 +4398,8 @@ class LiveViewer(QtGui.QDialog):
         """ sets the chrrent image as the background image
         """
         if self.__rawgreyimage is not None:
-            self.__backgroundimage = self.__rawgreyimage
+            # a copy as sources and filters may reuse the frame buffers
+            self.__backgroundimage = np.array(self.__rawgreyimage)
             self._updateBkgScale(False)
             self.__bkgsubwg.setDisplayedName(str(self.__imagename))
         else:
@@ -4091,14 +4410,9 @@ class LiveViewer(QtGui.QDialog):
     def _updateBkgScale(self, fetchscale=True):
         if fetchscale:
             self.__backgroundscale = self.__bkgsubwg.bkgScalingFactor()
-        if self.__backgroundimage is None:
-            self.__scbackgroundimage = None
-        elif self.__backgroundscale in [1, None] \
-                or not self.__settings.showsubsf:
-            self.__scbackgroundimage = self.__backgroundimage
-        else:
-            self.__scbackgroundimage = \
-                self.__backgroundimage * self.__backgroundscale
+        self.__scbackgroundimage = imageStages.correctionImage(
+            self.__backgroundimage,
+            self.__backgroundscale if self.__settings.showsubsf else None)
         self.__updatebfmdf()
 
     @debugmethod
@@ -4106,14 +4420,9 @@ class LiveViewer(QtGui.QDialog):
     def _updateBFScale(self, fetchscale=True):
         if fetchscale:
             self.__brightfieldscale = self.__bkgsubwg.bfScalingFactor()
-        if self.__brightfieldimage is None:
-            self.__scbrightfieldimage = None
-        elif self.__brightfieldscale in [1, None] \
-                or not self.__settings.showsubsf:
-            self.__scbrightfieldimage = self.__brightfieldimage
-        else:
-            self.__scbrightfieldimage = \
-                self.__brightfieldimage * self.__brightfieldscale
+        self.__scbrightfieldimage = imageStages.correctionImage(
+            self.__brightfieldimage,
+            self.__brightfieldscale if self.__settings.showsubsf else None)
         self.__updatebfmdf()
 
     @debugmethod
@@ -4122,7 +4431,8 @@ class LiveViewer(QtGui.QDialog):
         """ sets the chrrent image as the brightfield image
         """
         if self.__rawgreyimage is not None:
-            self.__brightfieldimage = self.__rawgreyimage
+            # a copy as sources and filters may reuse the frame buffers
+            self.__brightfieldimage = np.array(self.__rawgreyimage)
             self._updateBFScale(False)
             self.__bkgsubwg.setDisplayedBFName(str(self.__imagename))
         else:
@@ -4131,39 +4441,25 @@ class LiveViewer(QtGui.QDialog):
     def __updatebfmdf(self):
         """ sets brightfield - darkfield image
         """
-        if self.__scbrightfieldimage is not None and \
-           self.__scbackgroundimage is not None:
-            try:
-                with np.errstate(divide='ignore', invalid='ignore'):
-                    self.__bfmdfimage = np.true_divide(
-                        1,
-                        (self.__scbrightfieldimage
-                         - self.__scbackgroundimage),
-                        dtype=self.__settings.floattype)
-                self.__bfmdfimage[np.isinf(self.__bfmdfimage)] = np.nan
-            except Exception as e:
-                logger.warning(str(e))
-                self._checkBFSubtraction(0)
-                self.__brightfieldimage = None
-                self.__scbrightfieldimage = None
-                self.__dobfsubtraction = False
-                import traceback
-                value = traceback.format_exc()
-                text = messageBox.MessageBox.getText(
-                    "lavue: Bright field image does not match "
-                    "to the current image")
-                messageBox.MessageBox.warning(
-                    self, "lavue: Bright field image does not match "
-                    "to the current image",
-                    text, str(value))
-                self.__bfmdfimage = None
-        elif self.__scbrightfieldimage is not None:
-            with np.errstate(divide='ignore', invalid='ignore'):
-                self.__bfmdfimage = np.true_divide(
-                    1, self.__scbrightfieldimage,
-                    dtype=self.__settings.floattype)
-                self.__bfmdfimage[np.isinf(self.__bfmdfimage)] = np.nan
-        else:
+        try:
+            self.__bfmdfimage = imageStages.invertedBrightField(
+                self.__scbrightfieldimage, self.__scbackgroundimage,
+                self.__settings.floattype)
+        except Exception as e:
+            logger.warning(str(e))
+            self._checkBFSubtraction(0)
+            self.__brightfieldimage = None
+            self.__scbrightfieldimage = None
+            self.__dobfsubtraction = False
+            import traceback
+            value = traceback.format_exc()
+            text = messageBox.MessageBox.getText(
+                "lavue: Bright field image does not match "
+                "to the current image")
+            messageBox.MessageBox.warning(
+                self, "lavue: Bright field image does not match "
+                "to the current image",
+                text, str(value))
             self.__bfmdfimage = None
 
     @debugmethod
@@ -4176,6 +4472,7 @@ class LiveViewer(QtGui.QDialog):
         """
         if self.__filterstate != state:
             self.__filterstate = state
+            self.__updateSourceFilters()
             for flt in self.__filters:
                 try:
                     if state:
@@ -0,0 +1,147 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+
+""" lookup tables of intensity scaling and color mapping
+    for integer detector images """
+
+import numpy as np
+
+#: (:obj:`list` <:class:`numpy.dtype`>) data types mapped by lookup tables
+TABLETYPES = [np.dtype("uint8"), np.dtype("uint16")]
+
+#: (:obj:`int`) number of pixels looked up at once
+CHUNKSIZE = 1 << 16
+
+#: (:obj:`dict` <(:obj:`str`, :obj:`str`), :class:`numpy.ndarray`>)
+#:    scaling tables with (scaling, dtype) keys
+_SCALINGTABLES = {}
+
+
+def isTableType(image):
+    """ checks if the image can be mapped by lookup tables
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :returns: lookup table flag
+    :rtype: :obj:`bool`
+    """
+    return isinstance(image, np.ndarray) and image.dtype in TABLETYPES
+
+
+def scalingTable(scaling, dtype):
+    """ provides the intensity scaling table of the integer data type
+
+    :param scaling: intensity scaling, i.e. linear, sqrt or log
+    :type scaling: :obj:`str`
+    :param dtype: integer data type
+    :type dtype: :class:`numpy.dtype`
+    :returns: scaled values of all integers of the data type
+    :rtype: :class:`numpy.ndarray`
+    """
+    dtype = np.dtype(dtype)
+    key = (scaling, dtype.str)
+    if key not in _SCALINGTABLES:
+        values = np.arange(np.iinfo(dtype).max + 1, dtype="float64")
+        if scaling == "sqrt":
+            values = np.sqrt(values)
+        elif scaling == "log":
+            values = np.log10(np.clip(values, 10e-3, np.inf))
+        _SCALINGTABLES[key] = values.astype("float32")
+    return _SCALINGTABLES[key]
+
+
+def take(table, image, order="K"):
+    """ maps the integer image by the lookup table in cache-sized chunks,
+        i.e. without a temporary array of indices
+
+    :param table: lookup table
+    :type table: :class:`numpy.ndarray`
+    :param image: integer image
+    :type image: :class:`numpy.ndarray`
+    :param order: memory layout of the mapped image, i.e. K or C
+    :type order: :obj:`str`
+    :returns: mapped image
+    :rtype: :class:`numpy.ndarray`
+    """
+    if order == "K" and not image.flags.c_contiguous and \
+       image.flags.f_contiguous:
+        # transposed images are mapped in their memory order
+        return take(table, image.T).T
+    output = np.empty(image.shape, dtype=table.dtype)
+    if image.ndim < 2:
+        np.take(table, image, out=output)
+        return output
+    rows = max(CHUNKSIZE // max(image[0].size, 1), 1)
+    for i in range(0, image.shape[0], rows):
+        np.take(table, image[i:i + rows], out=output[i:i + rows])
+    return output
+
+
+def scale(image, scaling):
+    """ applies the intensity scaling by the lookup table
+
+    :param image: integer image
+    :type image: :class:`numpy.ndarray`
+    :param scaling: intensity scaling, i.e. linear, sqrt or log
+    :type scaling: :obj:`str`
+    :returns: scaled image
+    :rtype: :class:`numpy.ndarray`
+    """
+    return take(scalingTable(scaling, image.dtype), image)
+
+
+def colorTable(scaling, dtype, levels, lut=None):
+    """ provides the table of ARGB32 colors of all integers
+        of the data type
+
+    :param scaling: intensity scaling, i.e. linear, sqrt or log
+    :type scaling: :obj:`str`
+    :param dtype: integer data type
+    :type dtype: :class:`numpy.dtype`
+    :param levels: minimal and maximal scaled levels
+    :type levels: [:obj:`float`, :obj:`float`]
+    :param lut: color lookup table with rgb(a) or gray uint8 values
+    :type lut: :class:`numpy.ndarray`
+    :returns: ARGB32 colors
+    :rtype: :class:`numpy.ndarray`
+    """
+    if lut is None:
+        lut = np.arange(256, dtype="uint8")
+    lut = np.asarray(lut)
+    minlev, maxlev = float(levels[0]), float(levels[1])
+    ncolors = lut.shape[0]
+    levdiff = (maxlev - minlev) or 1.
+    indices = (scalingTable(scaling, dtype) - minlev) * (ncolors / levdiff)
+    indices = np.clip(indices, 0, ncolors - 1).astype("int32")
+    lut = lut.astype("uint32")
+    if lut.ndim == 1 or lut.shape[1] == 1:
+        gray = lut.reshape(ncolors)
+        colors = (gray << 16) | (gray << 8) | gray
+        alpha = 255
+    else:
+        colors = (lut[:, 0] << 16) | (lut[:, 1] << 8) | lut[:, 2]
+        alpha = lut[:, 3] if lut.shape[1] > 3 else 255
+    colors = colors | (np.asarray(alpha, dtype="uint32") << 24)
+    return colors[indices]
@@ -24,12 +24,13 @@
 
 """ Memory Buffer widget """
 
-import numpy as np
 import sys
 from .qtuic import uic
 from pyqtgraph import QtCore, QtGui
 import os
 
+from . import imageStages
+
 
 if sys.version_info > (3,):
     unicode = str
@@ -70,19 +71,9 @@ class MemoryBufferGroupBox(QtGui.QGroupBox):
         self.__isOn = False
         #: (:obj:`bool`) compute sum flag
         self.__computeSum = False
-        #: (:obj:`bool`) is buffer full
-        self.__full = False
-
-        #: (:class:`numpy.ndarray`) image stack
-        self.__imagestack = None
-        #: (:obj:`int`) the current size
-        self.__current = 1
-        #: (:class:`numpy.ndarray`) the last image
-        self.__lastimage = None
-        #: (:class:`numpy.ndarray`) the image sum
-        self.__imagesum = None
-        #: (:obj:`bool`)
-        self.__first = True
+        #: (:class:`lavuelib.imageStages.ImageBuffer`) image buffer
+        self.__buffer = imageStages.ImageBuffer(
+            self.__maxindex, self.__computeSum)
 
         self.__ui.sizeSpinBox.setStyleSheet("")
         self.__ui.sizeSpinBox.setEnabled(False)
@@ -184,12 +175,7 @@ class MemoryBufferGroupBox(QtGui.QGroupBox):
     def initialize(self):
         """ initialize the filter
         """
-        self.__imagestack = None
-        self.__lastimage = None
-        self.__imagesum = None
-        self.__current = 1
-        self.__first = True
-        self.__full = False
+        self.__buffer.reset(self.__maxindex, self.__computeSum)
         self.__ui.sizeSpinBox.setStyleSheet("")
 
     def process(self, image, imagename):
@@ -204,121 +190,13 @@ class MemoryBufferGroupBox(QtGui.QGroupBox):
                  or `None`
         """
         if self.__isOn and image is not None:
-            mdata = {}
-            ics = int(self.__computeSum)
-            if ics:
-                mdata["suminthelast"] = True
-            while len(image.shape) > 2:
-                image = np.nansum(image, 0)
-            if self.__lastimage is None \
-               or self.__lastimage.shape != image.shape \
-               or self.__lastimage.dtype != image.dtype \
-               or np.nanmax((self.__lastimage - image)):
-                shape = image.shape
-                dtype = image.dtype
-
-                if self.__imagestack is not None:
-                    if self.__imagestack.shape[1:] != shape or \
-                       self.__imagestack.dtype != dtype:
-                        self.__imagestack = None
-                        self.__imagesum = None
-                        self.__first = True
-                        self.__current = 1
-                if self.__imagestack is None:
-                    newshape = np.concatenate(
-                        ([self.__maxindex + 1 + ics],
-                         list(shape)))
-                    self.__imagestack = np.zeros(dtype=dtype, shape=newshape)
-
-                if self.__current > self.__maxindex:
-                    self.__current = 1
-                if self.__current >= self.__maxindex:
-                    self.__full = True
-                    self.__ui.sizeSpinBox.setStyleSheet(
-                        "color: black;"
-                        "background-color: paleGreen;")
-                lshape = len(self.__imagestack.shape)
-                theoldest = None
-                if lshape == 3:
-                    if ics:
-                        theoldest = np.array(
-                            self.__imagestack[self.__current, :, :])
-                    self.__imagestack[self.__current, :, :] = image
-                    self.__imagestack[0, :, :] = image
-                    if ics:
-                        if self.__imagesum is None:
-                            if self.__full is True:
-                                self.__imagesum = np.nansum(
-                                    self.__imagestack[1:-1, :, :], 0)
-                            else:
-                                self.__imagesum = np.nansum(
-                                    self.__imagestack[
-                                        1:(self.__current + 1), :, :], 0)
-                        else:
-                            self.__imagesum = self.__imagesum + image
-                            if self.__full is True:
-                                self.__imagesum = self.__imagesum - theoldest
-                        self.__imagestack[-1, :, :] = self.__imagesum
-                elif lshape == 2:
-                    if ics:
-                        theoldest = np.array(
-                            self.__imagestack[self.__current, :])
-                    self.__imagestack[self.__current, :] = image
-                    self.__imagestack[0, :] = image
-                    if ics:
-                        if self.__imagesum is None:
-                            if self.__full is True:
-                                self.__imagesum = np.nansum(
-                                    self.__imagestack[1:-1, :], 0)
-                            else:
-                                self.__imagesum = np.nansum(
-                                    self.__imagestack[
-                                        1:(self.__current + 1), :], 0)
-                        else:
-                            self.__imagesum = self.__imagesum + image
-                            if self.__full is True:
-                                self.__imagesum = self.__imagesum - theoldest
-                        self.__imagestack[-1, :] = self.__imagesum
-                elif lshape == 1:
-                    if ics:
-                        theoldest = np.array(self.__imagestack[self.__current])
-                    self.__imagestack[self.__current] = image
-                    self.__imagestack[0] = image
-                    if ics:
-                        if self.__imagesum is None:
-                            if self.__full is True:
-                                self.__imagesum = np.nansum(
-                                    self.__imagestack[1:-1], 0)
-                            else:
-                                self.__imagesum = np.nansum(
-                                    self.__imagestack[
-                                        1:(self.__current + 1)], 0)
-                        else:
-                            self.__imagesum = self.__imagesum + image
-                            if self.__full is True:
-                                self.__imagesum = self.__imagesum - theoldest
-                        self.__imagestack[-1] = self.__imagesum
-
-                self.__lastimage = np.array(image)
-                self.__current += 1
-                if self.__first:
-                    cblbl = {key: "%s:" % key
-                             for key in range(self.__maxindex + 1)}
-                else:
-                    cblbl = {}
-                mdata["channellabels"] = cblbl
-                mdata["skipfirst"] = True
-                if ics:
-                    mdata["suminthelast"] = True
-                cblbl[0] = "0: the last image"
-                # if imagename:
-                #     imagename = imagename.replace("\n", " ")
-                cblbl[self.__current - 1] = "%s: %s" % (
-                    self.__current - 1, imagename.replace("\n", " "))
-                self.__first = False
-
-            if self.__imagestack is not None:
-                return (self.__imagestack, mdata)
+            full = self.__buffer.isFull()
+            result = self.__buffer.append(image, imagename)
+            if not full and self.__buffer.isFull():
+                self.__ui.sizeSpinBox.setStyleSheet(
+                    "color: black;"
+                    "background-color: paleGreen;")
+            return result
 
     def changeView(self, show=False):
         """ shows or hides the histogram widget
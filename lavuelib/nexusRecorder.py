@@ -0,0 +1,346 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+
+""" background recording of image frames into a NeXus file """
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import numpy as np
+
+try:
+    import queue as Queue
+except ImportError:
+    import Queue
+
+from . import filewriter
+from .imageNexusExporter import WRITERS, getcompression
+
+if sys.version_info > (3,):
+    unicode = str
+
+logger = logging.getLogger("lavue")
+
+#: (:obj:`int`) chunk size of the per-frame metadata fields
+METACHUNK = 256
+
+#: (:obj:`float`) maximal time of pending frames before flushing in s
+FLUSHTIME = 1.0
+
+#: (:obj:`float`) maximal waiting time for writing of queued frames
+#:    when the viewer is closed in s
+EXITTIMEOUT = 10.0
+
+
+class NexusRecorder(object):
+
+    """ appends image frames to a chunked NeXus field on a writer thread
+
+        Frames are passed by a bounded queue, i.e. if the writer falls
+        behind new frames are dropped and counted instead of blocking
+        the caller. The file is switched to the SWMR mode after its
+        structure is created, so it can be read during the recording.
+    """
+
+    def __init__(self, filename, fieldname="data", chunk=8,
+                 compression="2", queuesize=64, swmr=True, writer=None):
+        """ constructor
+
+        :param filename: NeXus file name
+        :type filename: :obj:`str`
+        :param fieldname: name of the image field
+        :type fieldname: :obj:`str`
+        :param chunk: number of frames in a field chunk
+        :type chunk: :obj:`int`
+        :param compression: deflate level or filterid:opt1,opt2,...
+        :type compression: :obj:`str`
+        :param queuesize: maximal number of frames waiting to be written
+        :type queuesize: :obj:`int`
+        :param swmr: single writer multiple readers mode
+        :type swmr: :obj:`bool`
+        :param writer: h5 writer module: "h5cpp" or "h5py"
+        :type writer: :obj:`str`
+        """
+        if not writer:
+            if "h5cpp" in WRITERS.keys():
+                writer = "h5cpp"
+            else:
+                writer = "h5py"
+        if writer not in WRITERS.keys():
+            raise Exception("Writer '%s' cannot be opened" % writer)
+        #: (:obj:`str`) NeXus file name
+        self.filename = str(filename)
+        #: (:obj:`str`) name of the image field
+        self.fieldname = str(fieldname or "data")
+        #: (:obj:`int`) number of frames in a field chunk
+        self.chunk = max(int(chunk), 1)
+        #: (:obj:`int` or :obj:`list` < :obj:`int` >) compression options
+        self.compression = getcompression(compression)
+        #: (:obj:`bool`) single writer multiple readers mode
+        self.swmr = swmr
+        #: (:obj:`module`) h5 writer module
+        self.__wrmodule = WRITERS[writer.lower()]
+        #: (:class:`Queue.Queue`) frames waiting to be written
+        self.__queue = Queue.Queue(max(int(queuesize), 1))
+        #: (:class:`threading.Event`) stop event of the writer thread
+        self.__stopevent = threading.Event()
+        #: (:class:`threading.Thread`) writer thread
+        self.__thread = None
+        #: (:class:`lavuelib.filewriter.FTFile`) NeXus file
+        self.__file = None
+        #: (:obj:`dict` <:obj:`str`, :class:`lavuelib.filewriter.FTField`>)
+        #:     recorded fields
+        self.__fields = {}
+        #: (:obj:`tuple` <:obj:`int`>) frame shape
+        self.__shape = None
+        #: (:class:`numpy.dtype`) frame data type
+        self.__dtype = None
+        #: (:obj:`int`) number of written frames
+        self.written = 0
+        #: (:obj:`int`) number of dropped frames
+        self.dropped = 0
+        #: (:obj:`str`) error message of the writer thread
+        self.error = ""
+
+    def start(self):
+        """ starts the writer thread unless it is running or stopping
+        """
+        if self.__thread is not None:
+            if self.__thread.is_alive():
+                return
+            self.__thread = None
+        self.__stopevent.clear()
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def isRunning(self):
+        """ provides if the writer thread is running
+
+        :returns: if the writer thread is running
+        :rtype: :obj:`bool`
+        """
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def record(self, image, name=None, metadata=None, timestamp=None):
+        """ passes a copy of the frame to the writer thread
+
+        :param image: image frame
+        :type image: :class:`numpy.ndarray`
+        :param name: frame name
+        :type name: :obj:`str`
+        :param metadata: frame metadata
+        :type metadata: :obj:`dict` <:obj:`str`, :obj:`any`> or :obj:`str`
+        :param timestamp: frame timestamp, if None the current time
+        :type timestamp: :obj:`float`
+        :returns: if the frame was queued
+        :rtype: :obj:`bool`
+        """
+        if not self.isRunning() or self.__stopevent.is_set():
+            return False
+        if self.__queue.full():
+            self.dropped += 1
+            return False
+        if timestamp is None:
+            timestamp = time.time()
+        if isinstance(metadata, dict):
+            try:
+                metadata = json.dumps(metadata)
+            except Exception:
+                metadata = str(metadata)
+        try:
+            self.__queue.put_nowait(
+                (np.array(image, copy=True), timestamp,
+                 str(name or ""), str(metadata or "")))
+        except Queue.Full:
+            self.dropped += 1
+            return False
+        return True
+
+    def stop(self, timeout=None):
+        """ stops recording, the writer thread writes the queued frames
+            and closes the file
+
+        :param timeout: maximal waiting time for the writer thread in s,
+                        None waits until the file is closed and 0
+                        returns immediately
+        :type timeout: :obj:`float`
+        """
+        thread = self.__thread
+        if thread is None:
+            return
+        self.__stopevent.set()
+        if thread is not threading.current_thread() and \
+           (timeout is None or timeout > 0):
+            thread.join(timeout)
+        if not thread.is_alive():
+            self.__thread = None
+
+    def __run(self):
+        """ writes frames from the queue in chunks
+        """
+        frames = []
+        first = None
+        try:
+            while True:
+                try:
+                    frame = self.__queue.get(timeout=0.1)
+                except Queue.Empty:
+                    frame = None
+                if frame is not None:
+                    if not frames:
+                        first = time.time()
+                    frames.append(frame)
+                stop = frame is None and self.__stopevent.is_set()
+                if frames and (
+                        len(frames) >= self.chunk or stop or
+                        time.time() - first >= FLUSHTIME):
+                    self.__write(frames)
+                    frames = []
+                if stop:
+                    break
+        except Exception as e:
+            self.error = str(e)
+            logger.warning(
+                "NexusRecorder: recording to '%s' failed: %s"
+                % (self.filename, str(e)))
+            self.dropped += len(frames)
+            self.__stopevent.set()
+            while not self.__queue.empty():
+                self.__queue.get_nowait()
+                self.dropped += 1
+        finally:
+            self.__close()
+            logger.info(
+                "NexusRecorder: %s frames recorded to '%s', %s dropped"
+                % (self.written, self.filename, self.dropped))
+
+    def __write(self, frames):
+        """ appends frames to the recorded fields
+
+        :param frames: frames with their timestamps, names and metadata
+        :type frames: :obj:`list` < (:class:`numpy.ndarray`, :obj:`float`,
+                      :obj:`str`, :obj:`str`) >
+        """
+        if self.__file is None:
+            self.__create(frames[0][0])
+        selected = [fr for fr in frames
+                    if fr[0].shape == self.__shape and
+                    fr[0].dtype == self.__dtype]
+        if len(selected) < len(frames):
+            logger.warning(
+                "NexusRecorder: %s frames of a shape or type different "
+                "from %s %s dropped"
+                % (len(frames) - len(selected), self.__shape, self.__dtype))
+            self.dropped += len(frames) - len(selected)
+        nframes = len(selected)
+        if not nframes:
+            return
+        start = self.written
+        block = np.stack([fr[0] for fr in selected])
+        fields = self.__fields
+        for key, value in [
+                (self.fieldname, block),
+                ("timestamp", np.array([fr[1] for fr in selected])),
+                ("name", np.array([fr[2] for fr in selected], dtype=object)),
+                ("metadata",
+                 np.array([fr[3] for fr in selected], dtype=object))]:
+            fields[key].grow(0, nframes)
+            fields[key][start:start + nframes, ...] = value
+        self.__file.flush()
+        self.written += nframes
+
+    def __create(self, image):
+        """ creates the NeXus entry with the recorded fields
+
+        :param image: first frame
+        :type image: :class:`numpy.ndarray`
+        """
+        self.__shape = image.shape
+        self.__dtype = image.dtype
+        if os.path.exists(self.filename):
+            fl = filewriter.open_file(
+                self.filename, readonly=False, libver='latest',
+                writer=self.__wrmodule)
+        else:
+            fl = filewriter.create_file(
+                self.filename, overwrite=False, libver='latest',
+                writer=self.__wrmodule)
+        self.__file = fl
+        root = fl.root()
+        names = root.names()
+        entryname = "entry"
+        index = 1
+        while entryname in names:
+            index += 1
+            entryname = "entry_%s" % index
+        entry = root.create_group(entryname, "NXentry")
+        entry.create_field("start_time", "string").write(
+            unicode(fl.currenttime()))
+        node = entry.create_group("data", "NXdata")
+        node.attributes.create("signal", "string").write(self.fieldname)
+        cfilter = None
+        if self.compression:
+            cfilter = filewriter.data_filter(node)
+            if isinstance(self.compression, int):
+                cfilter.rate = self.compression
+            else:
+                cfilter.filterid = self.compression[0]
+                cfilter.options = tuple(self.compression[1:])
+        shape = list(self.__shape)
+        self.__fields = {
+            self.fieldname: node.create_field(
+                self.fieldname, str(self.__dtype),
+                shape=[0] + shape, chunk=[self.chunk] + shape,
+                dfilter=cfilter),
+            "timestamp": node.create_field(
+                "timestamp", "float64", shape=[0], chunk=[METACHUNK]),
+            "name": node.create_field(
+                "name", "string", shape=[0], chunk=[METACHUNK]),
+            "metadata": node.create_field(
+                "metadata", "string", shape=[0], chunk=[METACHUNK]),
+        }
+        self.__fields["timestamp"].attributes.create(
+            "units", "string").write(u"s")
+        if self.swmr:
+            try:
+                fl.reopen(readonly=False, swmr=True)
+            except Exception as e:
+                logger.warning(
+                    "NexusRecorder: SWMR mode of '%s' cannot be set: %s"
+                    % (self.filename, str(e)))
+
+    def __close(self):
+        """ closes the NeXus file
+        """
+        if self.__file is not None:
+            for field in self.__fields.values():
+                field.close()
+            self.__fields = {}
+            self.__file.close()
+            self.__file = None
@@ -28,21 +28,35 @@ import json
 import numpy as np
 from scipy import ndimage
 
+from ..filters import BaseFilter
 
-class HGap(object):
+
+class HGap(BaseFilter):
 
     """ Horizontal gap filter"""
 
+    #: (:obj:`bool`) filter does not use the image widget
+    threadsafe = True
+
     def __init__(self, configuration=None):
         """ constructor
 
         :param configuration: JSON list with horizontal gap pixels to add
         :type configuration: :obj:`str`
         """
+        BaseFilter.__init__(self, configuration)
         #: (:obj:`list` <:obj: `str`>) list of indexes for gap
         self.__indexes = [
             int(idx) for idx in json.loads(configuration)]
 
+    def gaps(self):
+        """ provides gap pixels inserted by the filter
+
+        :returns: axis and indexes of the inserted zero pixels
+        :rtype: (:obj:`int`, :obj:`list` <:obj:`int`>)
+        """
+        return 1, self.__indexes
+
     def __call__(self, image, imagename, metadata, imagewg):
         """ call method
 
@@ -60,20 +74,32 @@ class HGap(object):
         return np.insert(image, self.__indexes, 0, axis=1)
 
 
-class VGap(object):
+class VGap(BaseFilter):
 
     """ Vertical gap filter"""
 
+    #: (:obj:`bool`) filter does not use the image widget
+    threadsafe = True
+
     def __init__(self, configuration=None):
         """ constructor
 
         :param configuration: JSON list with vertical gap pixels to add
         :type configuration: :obj:`str`
         """
+        BaseFilter.__init__(self, configuration)
         #: (:obj:`list` <:obj: `str`>) list of indexes for gap
         self.__indexes = [
             int(idx) for idx in json.loads(configuration)]
 
+    def gaps(self):
+        """ provides gap pixels inserted by the filter
+
+        :returns: axis and indexes of the inserted zero pixels
+        :rtype: (:obj:`int`, :obj:`list` <:obj:`int`>)
+        """
+        return 0, self.__indexes
+
     def __call__(self, image, imagename, metadata, imagewg):
         """ call method
 
@@ -109,3 +135,7 @@ def rot45(image, imagename, metadata, imagewg):
        and np.isnan(image.min()):
         image = np.nan_to_num(image)
     return ndimage.rotate(image, 45)
+
+
+#: (:obj:`bool`) filter does not use the image widget
+rot45.threadsafe = True
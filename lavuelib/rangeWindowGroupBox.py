@@ -88,7 +88,8 @@ class RangeWindowGroupBox(QtGui.QWidget):
         self.factorChanged.emit()
 
     def function(self):
-        """ provides the reduction function name, i.e. max, min, mean, sum
+        """ provides the reduction function name, i.e. max, min, mean, sum,
+            median or their nan variants, e.g. nanmax
 
         :returns:  function name
         :rtype: :obj:`str`
@@ -98,7 +99,8 @@ class RangeWindowGroupBox(QtGui.QWidget):
     def setFunction(self, name):
         """ sets the reduction function
 
-        :param name:  function name, i.e. max, min, mean, sum
+        :param name:  function name, i.e. max, min, mean, sum,
+                      median or their nan variants, e.g. nanmax
         :type name: :obj:`str`
         """
         text = self.__ui.functionComboBox.currentText()
@@ -0,0 +1,322 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+
+""" outlines of diffractogram integration regions computed by
+    a vectorized marching-squares contour of shared 2theta and chi maps """
+
+import math
+import threading
+import numpy as np
+
+#: (:obj:`int`) maximal number of cached region outlines
+MAXREGIONS = 64
+
+#: (:obj:`list` < (:obj:`int`, :obj:`int`) >) pairs of crossed cell edges,
+#:    i.e. 0: top, 1: right, 2: bottom, 3: left, of non-saddle cells
+_EDGEPAIRS = [(0, 1), (0, 2), (0, 3), (1, 2), (1, 3), (2, 3)]
+
+
+def _cellSegments(data, level):
+    """ provides contour segments of all grid cells by edge ids
+
+    :param data: 2d data
+    :type data: :class:`numpy.ndarray`
+    :param level: contour level
+    :type level: :obj:`float`
+    :returns: array of segments given by pairs of crossed edge ids
+    :rtype: :class:`numpy.ndarray`
+    """
+    nx, ny = data.shape
+    nh = nx * (ny - 1)
+    above = data > level
+    pa = above[:-1, :-1]
+    pb = above[:-1, 1:]
+    pc = above[1:, 1:]
+    pd = above[1:, :-1]
+    crossed = [pa != pb, pb != pc, pd != pc, pa != pd]
+    ci, cj = np.mgrid[0:nx - 1, 0:ny - 1]
+    edges = [
+        ci * (ny - 1) + cj,
+        nh + ci * ny + cj + 1,
+        (ci + 1) * (ny - 1) + cj,
+        nh + ci * ny + cj,
+    ]
+    saddle = crossed[0] & crossed[1] & crossed[2] & crossed[3]
+    segments = []
+    for e1, e2 in _EDGEPAIRS:
+        others = [crossed[e] for e in range(4) if e not in (e1, e2)]
+        cells = crossed[e1] & crossed[e2] & ~others[0] & ~others[1]
+        segments.append(
+            np.stack([edges[e1][cells], edges[e2][cells]], axis=-1))
+    if saddle.any():
+        # the center value decides which corners are connected
+        center = (data[:-1, :-1] + data[:-1, 1:] +
+                  data[1:, 1:] + data[1:, :-1]) / 4. > level
+        joined = saddle & (center == pa)
+        split = saddle & (center != pa)
+        for cells, pairs in [(joined, [(0, 1), (2, 3)]),
+                             (split, [(3, 0), (1, 2)])]:
+            for e1, e2 in pairs:
+                segments.append(
+                    np.stack([edges[e1][cells], edges[e2][cells]], axis=-1))
+    return np.concatenate(segments)
+
+
+def _edgePoints(data, level, ids):
+    """ provides interpolated level crossings of cell edges
+
+    :param data: 2d data
+    :type data: :class:`numpy.ndarray`
+    :param level: contour level
+    :type level: :obj:`float`
+    :param ids: edge ids
+    :type ids: :class:`numpy.ndarray`
+    :returns: (row, column) points of the edges
+    :rtype: :class:`numpy.ndarray`
+    """
+    nx, ny = data.shape
+    nh = nx * (ny - 1)
+    horizontal = ids < nh
+    vids = ids - nh
+    i = np.where(horizontal, ids // (ny - 1), vids // ny)
+    j = np.where(horizontal, ids % (ny - 1), vids % ny)
+    i2 = np.where(horizontal, i, i + 1)
+    j2 = np.where(horizontal, j + 1, j)
+    v1 = data[i, j]
+    v2 = data[i2, j2]
+    t = (level - v1) / (v2 - v1)
+    points = np.empty((len(ids), 2), dtype="float64")
+    points[:, 0] = i + np.where(horizontal, 0., t)
+    points[:, 1] = j + np.where(horizontal, t, 0.)
+    return points
+
+
+def isocurve(data, level=0.):
+    """ finds connected contour lines of the 2d data by marching squares
+
+    :param data: 2d data, NaN values are above the level
+    :type data: :class:`numpy.ndarray`
+    :param level: contour level
+    :type level: :obj:`float`
+    :returns: list of (row, column) point arrays of contour lines
+    :rtype: :obj:`list` <:class:`numpy.ndarray`>
+    """
+    data = np.asarray(data, dtype="float64")
+    if data.ndim != 2 or min(data.shape) < 2:
+        return []
+    if np.isnan(data).any():
+        data = np.where(np.isnan(data), np.inf, data)
+    segments = _cellSegments(data, level)
+    if not len(segments):
+        return []
+    ids, inverse = np.unique(segments, return_inverse=True)
+    segments = inverse.reshape(segments.shape)
+    # neighbours of every crossed edge, each edge belongs to two cells
+    neighbours = -np.ones((len(ids), 2), dtype="int64")
+    nodes = segments.ravel()
+    partners = segments[:, ::-1].ravel()
+    order = np.argsort(nodes, kind="mergesort")
+    nodes = nodes[order]
+    partners = partners[order]
+    first = np.ones(len(nodes), dtype=bool)
+    first[1:] = nodes[1:] != nodes[:-1]
+    neighbours[nodes[first], 0] = partners[first]
+    neighbours[nodes[~first], 1] = partners[~first]
+    points = _edgePoints(data, level, ids)
+
+    visited = np.zeros(len(ids), dtype=bool)
+    lines = []
+    # open lines start at the data border, closed lines anywhere
+    starts = list(np.nonzero(neighbours[:, 1] < 0)[0]) + list(range(len(ids)))
+    nbs = neighbours.tolist()
+    for start in starts:
+        if visited[start]:
+            continue
+        line = [start]
+        visited[start] = True
+        previous, current = -1, start
+        while True:
+            n1, n2 = nbs[current]
+            nxt = n2 if n1 == previous else n1
+            if nxt < 0:
+                break
+            if visited[nxt]:
+                if nxt == start:
+                    line.append(start)
+                break
+            line.append(nxt)
+            visited[nxt] = True
+            previous, current = current, nxt
+        lines.append(points[line])
+    return lines
+
+
+def _trim(value, lowbound, upbound):
+    """ trims angle value to bounds in deg
+
+    :param value: value to trim
+    :type value: :obj:`float`
+    :param lowbound: lower bound of value
+    :type lowbound: :obj:`float`
+    :param upbound: upper bound of value
+    :type upbound: :obj:`float`
+    :returns: trimmed value
+    :rtype: :obj:`float`
+    """
+    while value >= upbound:
+        value -= 360
+    while value < lowbound:
+        value += 360
+    return value
+
+
+def regionFunction(tth, chi, radstart, radend, azstart, azend):
+    """ provides the function which is negative inside the region
+        and positive outside
+
+    :param tth: 2theta map in rad
+    :type tth: :class:`numpy.ndarray`
+    :param chi: chi map in rad
+    :type chi: :class:`numpy.ndarray`
+    :param radstart: start of radial region in deg
+    :type radstart: :obj:`float`
+    :param radend: end of radial region in deg
+    :type radend: :obj:`float`
+    :param azstart: start of azimuth region in deg
+    :type azstart: :obj:`float`
+    :param azend: end of azimuth region in deg
+    :type azend: :obj:`float`
+    :returns: region function
+    :rtype: :class:`numpy.ndarray`
+    """
+    rb = _trim(radstart, 0, 360) * math.pi / 180.
+    re = _trim(radend, 0, 360) * math.pi / 180.
+    fun = np.maximum(rb - tth, tth - re)
+    if azend - azstart < 360:
+        ab = _trim(azstart, -180, 180) * math.pi / 180.
+        ae = _trim(azend, -180, 180) * math.pi / 180.
+        if ab <= ae:
+            chifun = np.maximum(ab - chi, chi - ae)
+        else:
+            # the region crosses the chi discontinuity
+            chifun = np.minimum(ab - chi, chi - ae)
+        fun = np.maximum(fun, chifun)
+    return fun
+
+
+class RegionContours(object):
+
+    """ outlines of integration regions cached per geometry,
+        image shape and angle ranges
+    """
+
+    def __init__(self, geometrymaps, maxregions=MAXREGIONS):
+        """ constructor
+
+        :param geometrymaps: coordinate maps of the detector geometry
+        :type geometrymaps: :class:`lavuelib.geometryMaps.GeometryMaps`
+        :param maxregions: maximal number of cached region outlines
+        :type maxregions: :obj:`int`
+        """
+        #: (:class:`lavuelib.geometryMaps.GeometryMaps`) coordinate maps
+        self.__geometrymaps = geometrymaps
+        #: (:obj:`int`) maximal number of cached region outlines
+        self.maxregions = maxregions
+        #: (:class:`threading.Lock`) cache lock
+        self.__lock = threading.Lock()
+        #: (:obj:`tuple`) geometry key and shape of the region outlines
+        self.__mapkey = None
+        #: (:obj:`dict` <:obj:`tuple`, :obj:`list`>) region outlines
+        self.__lines = {}
+        #: (:obj:`list` <:obj:`tuple`>) keys of outlines in cached order
+        self.__order = []
+
+    def isCached(self, shape):
+        """ checks if angle maps of the geometry and shape are cached
+
+        :param shape: image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :returns: cached flag
+        :rtype: :obj:`bool`
+        """
+        return self.__geometrymaps.isCached("theta", shape) and \
+            self.__geometrymaps.isCached("chi", shape)
+
+    def maps(self, shape):
+        """ provides pixel center 2theta and chi maps
+
+        :param shape: image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :returns: 2theta and chi maps in rad
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+        """
+        tth = self.__geometrymaps.map("theta", shape)
+        chi = self.__geometrymaps.map("chi", shape)
+        if tth is None or chi is None:
+            raise ValueError("RegionContours: geometry is not set")
+        key = (self.__geometrymaps.key(), tuple(shape[:2]))
+        with self.__lock:
+            if key != self.__mapkey:
+                self.__mapkey = key
+                self.__lines = {}
+                self.__order = []
+        return tth, chi
+
+    def lines(self, shape, radstart, radend, azstart, azend):
+        """ provides outline of the integration region
+
+        :param shape: image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :param radstart: start of radial region in deg
+        :type radstart: :obj:`float`
+        :param radend: end of radial region in deg
+        :type radend: :obj:`float`
+        :param azstart: start of azimuth region in deg
+        :type azstart: :obj:`float`
+        :param azend: end of azimuth region in deg
+        :type azend: :obj:`float`
+        :returns: list of region lines with (x, y) points
+                  of the displayed image
+        :rtype:  :obj:`list` < :obj:`list` < (float, float) > >
+        """
+        if azend - azstart >= 360:
+            azstart = 0
+            azend = 360
+        tth, chi = self.maps(shape)
+        key = (float(radstart), float(radend), float(azstart), float(azend))
+        with self.__lock:
+            if key in self.__lines:
+                return self.__lines[key]
+        fun = regionFunction(tth, chi, radstart, radend, azstart, azend)
+        # map values are given at pixel centers
+        lines = [[(p[0] + 0.5, p[1] + 0.5) for p in line.tolist()]
+                 for line in isocurve(fun, 0.)]
+        with self.__lock:
+            if key not in self.__lines:
+                self.__order.append(key)
+                while len(self.__order) > self.maxregions:
+                    self.__lines.pop(self.__order.pop(0), None)
+            self.__lines[key] = lines
+        return lines
@@ -0,0 +1,188 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+
+""" fixed-capacity row buffers """
+
+import threading
+import numpy as np
+
+
+class RingBuffer(object):
+
+    """ circular buffer of 1d rows with a zero-copy chronological view
+
+        Each row is stored twice, i.e. at i and i + capacity, so the last
+        rows always form a contiguous window of the storage array.
+    """
+
+    def __init__(self, capacity=1024, dtype=None):
+        """ constructor
+
+        :param capacity: maximal number of rows
+        :type capacity: :obj:`int`
+        :param dtype: row data type, if None the type of the first row
+        :type dtype: :class:`numpy.dtype` or :obj:`str`
+        """
+        #: (:obj:`int`) maximal number of rows
+        self.__capacity = max(int(capacity), 1)
+        #: (:class:`numpy.dtype`) row data type
+        self.__dtype = np.dtype(dtype) if dtype is not None else None
+        #: (:class:`numpy.ndarray`) mirrored storage of 2 * capacity rows
+        self.__data = None
+        #: (:obj:`int`) storage index of the next row
+        self.__next = 0
+        #: (:obj:`int`) number of stored rows
+        self.__count = 0
+        #: (:class:`threading.Lock`) buffer lock
+        self.__lock = threading.Lock()
+
+    @property
+    def capacity(self):
+        """ maximal number of rows
+
+        :returns: maximal number of rows
+        :rtype: :obj:`int`
+        """
+        return self.__capacity
+
+    @property
+    def dtype(self):
+        """ row data type
+
+        :returns: row data type
+        :rtype: :class:`numpy.dtype`
+        """
+        return self.__dtype
+
+    def __len__(self):
+        """ number of stored rows
+
+        :returns: number of stored rows
+        :rtype: :obj:`int`
+        """
+        return self.__count
+
+    def setCapacity(self, capacity):
+        """ sets the maximal number of rows keeping the last ones
+
+        :param capacity: maximal number of rows
+        :type capacity: :obj:`int`
+        """
+        capacity = max(int(capacity), 1)
+        with self.__lock:
+            if capacity == self.__capacity:
+                return
+            last = self.__view()
+            self.__capacity = capacity
+            self.__data = None
+            self.__next = 0
+            self.__count = 0
+            if last is not None:
+                for row in last[-capacity:]:
+                    self.__append(row)
+
+    def setDType(self, dtype):
+        """ sets the row data type and resets the buffer if it changes
+
+        :param dtype: row data type, if None the type of the first row
+        :type dtype: :class:`numpy.dtype` or :obj:`str`
+        """
+        dtype = np.dtype(dtype) if dtype is not None else None
+        with self.__lock:
+            if dtype != self.__dtype:
+                self.__dtype = dtype
+                self.__reset()
+
+    def reset(self):
+        """ removes all rows
+        """
+        with self.__lock:
+            self.__reset()
+
+    def __reset(self):
+        """ removes all rows without locking
+        """
+        self.__data = None
+        self.__next = 0
+        self.__count = 0
+
+    def append(self, row):
+        """ appends a row, the buffer is reset when the row length changes
+
+        :param row: 1d row
+        :type row: :class:`numpy.ndarray`
+        """
+        row = np.asarray(row)
+        with self.__lock:
+            self.__append(row)
+
+    def __append(self, row):
+        """ appends a row without locking
+
+        :param row: 1d row
+        :type row: :class:`numpy.ndarray`
+        """
+        if self.__data is None or self.__data.shape[1] != row.shape[0]:
+            dtype = self.__dtype if self.__dtype is not None else row.dtype
+            self.__data = np.empty(
+                (2 * self.__capacity, row.shape[0]), dtype=dtype)
+            self.__next = 0
+            self.__count = 0
+        self.__data[self.__next] = row
+        self.__data[self.__next + self.__capacity] = row
+        self.__next = (self.__next + 1) % self.__capacity
+        self.__count = min(self.__count + 1, self.__capacity)
+
+    def view(self):
+        """ provides the stored rows from the oldest to the newest one
+            as a view of the buffer storage
+
+        :returns: (count, row length) array or None if empty
+        :rtype: :class:`numpy.ndarray`
+        """
+        with self.__lock:
+            return self.__view()
+
+    def copy(self):
+        """ provides a copy of the stored rows from the oldest
+            to the newest one, i.e. safe against concurrent appends
+
+        :returns: (count, row length) array or None if empty
+        :rtype: :class:`numpy.ndarray`
+        """
+        with self.__lock:
+            view = self.__view()
+            return np.array(view) if view is not None else None
+
+    def __view(self):
+        """ provides the stored rows without locking
+
+        :returns: (count, row length) array or None if empty
+        :rtype: :class:`numpy.ndarray`
+        """
+        if not self.__count:
+            return None
+        start = (self.__next - self.__count) % self.__capacity
+        return self.__data[start:start + self.__count]
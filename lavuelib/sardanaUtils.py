@@ -52,6 +52,23 @@ if sys.version_info > (3,):
     unicode = str
 
 
+def _shortrepr(obj):
+    """ provides a short representation of debugged arguments,
+        i.e. shapes and types of arrays instead of their values
+
+    :param obj: any object
+    :type obj: :class:`any`
+    :returns: short representation
+    :rtype: :obj:`str`
+    """
+    if isinstance(obj, (tuple, list)):
+        return "(%s)" % ", ".join(_shortrepr(it) for it in obj)
+    if hasattr(obj, "shape") and hasattr(obj, "dtype"):
+        return "<%s %s %s>" % (
+            type(obj).__name__, tuple(obj.shape), obj.dtype)
+    return str(obj)
+
+
 def debugmethod(method):
     """ debug wrapper for methods
     :param method: any class method
@@ -62,19 +79,21 @@ def debugmethod(method):
     if logger.getEffectiveLevel() >= 10:
         @functools.wraps(method)
         def decmethod(*args, **kwargs):
+            if not logger.isEnabledFor(logging.DEBUG):
+                return method(*args, **kwargs)
             name = "%s.%s.%s" % (
                 args[0].__class__.__module__,
                 args[0].__class__.__name__,
                 method.__name__
             )
             if args[1:]:
-                margs = " with %s " % str(args[1:])
+                margs = " with %s " % _shortrepr(args[1:])
             else:
                 margs = ""
             logger.debug("%s: excecuted %s" % (name, margs))
             ret = method(*args, **kwargs)
             logger.debug("%s: returns %s" % (
-                name, str(ret) if ret is not None else ''))
+                name, _shortrepr(ret) if ret is not None else ''))
             return ret
         return decmethod
     else:
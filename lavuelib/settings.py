@@ -32,6 +32,8 @@ import sys
 import json
 from pyqtgraph import QtCore
 
+from . import geometryMaps
+
 if sys.version_info > (3,):
     unicode = str
 
@@ -93,12 +95,19 @@ class Settings(object):
         self.showlevels = True
         #: (:obj:`bool`) show frame rate widget
         self.showframerate = True
+        #: (:obj:`bool`) show performance overlay with stage times
+        self.showperformance = False
         #: (:obj:`bool`) image aspect ratio locked
         self.aspectlocked = False
         #: (:obj:`bool`) auto down sample
         self.autodownsample = False
+        #: (:obj:`str`) level of detail rendering reduction,
+        #:     i.e. none, max or mean
+        self.lodrendering = "none"
         #: (:obj:`bool`) keep original coordinates
         self.keepcoords = False
+        #: (:obj:`bool`) image transformations in the display
+        self.displaytransformation = False
         #: (:obj:`bool`) accelerate buffer sum
         self.accelbuffersum = False
         #: (:obj:`bool`) lazy image slider
@@ -109,6 +118,13 @@ class Settings(object):
         self.hidraport = "50001"
         #: (:obj:`str`) maximal number of images in memory buffer
         self.maxmbuffersize = "1000"
+        #: (:obj:`int`) number of frames in a chunk of the recorded field
+        self.recordchunk = 8
+        #: (:obj:`str`) compression of the recorded field, i.e. deflate
+        #:    level or filterid:opt1,opt2,... , "0" for no compression
+        self.recordcompression = "2"
+        #: (:obj:`int`) maximal number of frames waiting to be recorded
+        self.recordqueuesize = 64
         #: (:obj:`int`) number of image sources
         self.nrsources = 1
         #: (:obj:`int`) image source timeout for connection
@@ -123,6 +139,8 @@ class Settings(object):
         self.zeromask = False
         #: (:obj:`bool`) nan mask enabled
         self.nanmask = True
+        #: (:obj:`bool`) integer images masked by a validity mask
+        self.validitymask = False
         #: (:obj:`bool`) adding maximal type value to negative high value mask
         self.negmask = False
         #: (:obj:`bool`) security stream options
@@ -135,6 +153,8 @@ class Settings(object):
         self.toolpollinginterval = 1.0
         #: (:obj:`bool`) interrupt on error
         self.interruptonerror = True
+        #: (:obj:`bool`) skip frames identical to the last fetched frame
+        self.skipduplicates = False
         #: (:obj:`str`) last image file name
         self.imagename = None
         #: (:obj:`str`) calibration file name
@@ -168,9 +188,14 @@ class Settings(object):
         #: (:obj:`str`) JSON dictionary with {label: epics PV shape}
         #  for Epics PV source
         self.epicspvshapes = '{}'
+        #: (:obj:`bool`) Epics PV source subscribes to CA monitors
+        self.epicsmonitor = False
         #: (:obj:`str`) JSON dictionary with {label: doocs property}
         #  for DOOCS Property source
         self.doocsprops = '{}'
+        #: (:obj:`str`) JSON dictionary with {label: shared memory ring}
+        #  for Shared Memory source
+        self.shmnames = '{}'
         #: (:obj:`str`) JSON dictionary with {label: tango attribute}
         #  for Tango Attribute Events source
         self.tangoevattrs = '{}'
@@ -194,6 +219,13 @@ class Settings(object):
         self.nxsopen = False
         #: (:obj:`bool`) nexus file source starts from the last image
         self.nxslast = False
+        #: (:obj:`int`) number of nexus chunk decompression threads
+        self.nxsthreads = 0
+        #: (:obj:`int`) number of block reduction threads
+        self.reductionthreads = 0
+        #: (:obj:`str`) JSON dictionary with the raw stack file format,
+        #  i.e. dtype, shape, header and frameheader
+        self.rawformat = '{}'
         #: (:obj:`list` < :obj:`str`>) hidra detector server list
         self.detservers = "[]"
 
@@ -205,6 +237,8 @@ class Settings(object):
         self.asapobeamtime = ""
         #: (:obj:`str`) asapo sourcepath
         self.asaposourcepath = ""
+        #: (:obj:`str`) asapo consumer mode, i.e. poll, last or next
+        self.asapomode = "poll"
         #: (:obj:`list` < :obj:`str` > ) asapo datasources
         self.asapodatasources = []
 
@@ -264,6 +298,9 @@ class Settings(object):
         self.detname = ""
         #: (:obj:`str`) detector splineFile
         self.detsplinefile = ""
+        #: (:class:`lavuelib.geometryMaps.GeometryMaps`) coordinate maps
+        #:     of the detector geometry shared by geometry tools
+        self.geometrymaps = geometryMaps.GeometryMaps(self)
         #: (:obj:`int`) number of points for diffractogram
         self.diffnpt = 1000
         #: (:obj:`bool`) correct solid angle flag
@@ -411,6 +448,10 @@ class Settings(object):
             "Configuration/ShowFrameRate", type=str))
         if qstval.lower() == "false":
             self.showframerate = False
+        qstval = str(settings.value(
+            "Configuration/ShowPerformanceOverlay", type=str))
+        if qstval.lower() == "true":
+            self.showperformance = True
         qstval = str(settings.value("Configuration/ShowHistogram", type=str))
         if qstval.lower() == "false":
             self.showhisto = False
@@ -456,10 +497,17 @@ class Settings(object):
         qstval = str(settings.value("Configuration/AutoDownSample", type=str))
         if qstval.lower() == "true":
             self.autodownsample = True
+        qstval = str(settings.value("Configuration/LODRendering", type=str))
+        if qstval.lower() in ["none", "max", "mean"]:
+            self.lodrendering = qstval.lower()
         qstval = str(settings.value(
             "Configuration/KeepOriginalCoordinates", type=str))
         if qstval.lower() == "true":
             self.keepcoords = True
+        qstval = str(settings.value(
+            "Configuration/DisplayTransformation", type=str))
+        if qstval.lower() == "true":
+            self.displaytransformation = True
         qstval = str(settings.value(
             "Configuration/AccelerateBufferSum", type=str))
         if qstval.lower() == "true":
@@ -474,6 +522,21 @@ class Settings(object):
         qstval = str(settings.value("Configuration/NXSLastImage", type=str))
         if qstval.lower() == "true":
             self.nxslast = True
+        qstval = str(settings.value(
+            "Configuration/NXSDecompressionThreads", type=str))
+        try:
+            self.nxsthreads = max(int(qstval), 0)
+        except Exception:
+            pass
+        qstval = str(settings.value(
+            "Configuration/ReductionThreads", type=str))
+        try:
+            self.reductionthreads = max(int(qstval), 0)
+        except Exception:
+            pass
+        qstval = str(settings.value("Configuration/RawFileFormat", type=str))
+        if qstval:
+            self.rawformat = qstval
         qstval = str(settings.value(
             "Configuration/SingleROIAliases", type=str))
         if qstval.lower() == "true":
@@ -505,6 +568,22 @@ class Settings(object):
             int(self.maxmbuffersize)
         except Exception:
             self.maxmbuffersize = "1000"
+        qstval = str(settings.value(
+            "Configuration/RecordingChunkSize", type=str))
+        try:
+            self.recordchunk = max(int(qstval), 1)
+        except Exception:
+            pass
+        qstval = str(settings.value(
+            "Configuration/RecordingCompression", type=str))
+        if qstval:
+            self.recordcompression = qstval
+        qstval = str(settings.value(
+            "Configuration/RecordingQueueSize", type=str))
+        try:
+            self.recordqueuesize = max(int(qstval), 1)
+        except Exception:
+            pass
         qstval = str(settings.value("Configuration/SourceTimeout", type=str))
         try:
             int(qstval)
@@ -526,6 +605,10 @@ class Settings(object):
             "Configuration/MaskingAsNAN", type=str))
         if qstval.lower() == "false":
             self.nanmask = False
+        qstval = str(settings.value(
+            "Configuration/IntegerValidityMask", type=str))
+        if qstval.lower() == "true":
+            self.validitymask = True
         qstval = str(settings.value(
             "Configuration/AddMaxValueToNegativeMask", type=str))
         if qstval.lower() == "true":
@@ -576,6 +659,10 @@ class Settings(object):
             self.interruptonerror = False
         elif qstval.lower() == "true":
             self.interruptonerror = True
+        qstval = str(
+            settings.value("Configuration/SkipDuplicateFrames", type=str))
+        if qstval.lower() == "true":
+            self.skipduplicates = True
         qstval = str(
             settings.value("Configuration/LastImageFileName", type=str))
         if qstval:
@@ -668,6 +755,11 @@ class Settings(object):
         else:
             self.asaposourcepath = ""
 
+        qstval = str(settings.value(
+            "Configuration/ASAPOConsumerMode", type=str))
+        if qstval in ["poll", "last", "next"]:
+            self.asapomode = qstval
+
         qstval = \
             settings.value(
                 "Configuration/HidraDetectorServers", type=str)
@@ -717,12 +809,21 @@ class Settings(object):
             settings.value("Configuration/EpicsPVShapes", type=str))
         if qstval:
             self.epicspvshapes = qstval
+        qstval = str(
+            settings.value("Configuration/EpicsMonitor", type=str))
+        if qstval.lower() == "true":
+            self.epicsmonitor = True
 
         qstval = str(
             settings.value("Configuration/DOOCSProperties", type=str))
         if qstval:
             self.doocsprops = qstval
 
+        qstval = str(
+            settings.value("Configuration/SharedMemoryNames", type=str))
+        if qstval:
+            self.shmnames = qstval
+
         qstval = str(
             settings.value("Configuration/TangoEventsAttributes", type=str))
         if qstval:
@@ -922,6 +1023,9 @@ class Settings(object):
         settings.setValue(
             "Configuration/ShowFrameRate",
             self.showframerate)
+        settings.setValue(
+            "Configuration/ShowPerformanceOverlay",
+            self.showperformance)
         settings.setValue(
             "Configuration/ShowHistogram",
             self.showhisto)
@@ -976,6 +1080,15 @@ class Settings(object):
         settings.setValue(
             "Configuration/MaxBufferSize",
             self.maxmbuffersize)
+        settings.setValue(
+            "Configuration/RecordingChunkSize",
+            self.recordchunk)
+        settings.setValue(
+            "Configuration/RecordingCompression",
+            self.recordcompression)
+        settings.setValue(
+            "Configuration/RecordingQueueSize",
+            self.recordqueuesize)
         settings.setValue(
             "Configuration/SecAutoPort",
             self.secautoport)
@@ -988,6 +1101,9 @@ class Settings(object):
         settings.setValue(
             "Configuration/MaskingAsNAN",
             self.nanmask)
+        settings.setValue(
+            "Configuration/IntegerValidityMask",
+            self.validitymask)
         settings.setValue(
             "Configuration/AddMaxValueToNegativeMask",
             self.negmask)
@@ -997,6 +1113,9 @@ class Settings(object):
         settings.setValue(
             "Configuration/InterruptOnError",
             self.interruptonerror)
+        settings.setValue(
+            "Configuration/SkipDuplicateFrames",
+            self.skipduplicates)
         settings.setValue(
             "Configuration/SourceTimeout",
             self.timeout)
@@ -1009,9 +1128,15 @@ class Settings(object):
         settings.setValue(
             "Configuration/AutoDownSample",
             self.autodownsample)
+        settings.setValue(
+            "Configuration/LODRendering",
+            self.lodrendering)
         settings.setValue(
             "Configuration/KeepOriginalCoordinates",
             self.keepcoords)
+        settings.setValue(
+            "Configuration/DisplayTransformation",
+            self.displaytransformation)
         settings.setValue(
             "Configuration/AccelerateBufferSum",
             self.accelbuffersum)
@@ -1060,6 +1185,9 @@ class Settings(object):
         settings.setValue(
             "Configuration/ASAPOSourcePath",
             self.asaposourcepath)
+        settings.setValue(
+            "Configuration/ASAPOConsumerMode",
+            self.asapomode)
         settings.setValue(
             "Configuration/HidraDetectorServers",
             self.detservers)
@@ -1087,9 +1215,15 @@ class Settings(object):
         settings.setValue(
             "Configuration/EpicsPVShapes",
             self.epicspvshapes)
+        settings.setValue(
+            "Configuration/EpicsMonitor",
+            self.epicsmonitor)
         settings.setValue(
             "Configuration/DOOCSProperties",
             self.doocsprops)
+        settings.setValue(
+            "Configuration/SharedMemoryNames",
+            self.shmnames)
         settings.setValue(
             "Configuration/TangoEventsAttributes",
             self.tangoevattrs)
@@ -1111,6 +1245,15 @@ class Settings(object):
         settings.setValue(
             "Configuration/NXSFileOpen",
             self.nxsopen)
+        settings.setValue(
+            "Configuration/NXSDecompressionThreads",
+            self.nxsthreads)
+        settings.setValue(
+            "Configuration/ReductionThreads",
+            self.reductionthreads)
+        settings.setValue(
+            "Configuration/RawFileFormat",
+            self.rawformat)
         settings.setValue(
             "Configuration/StoreGeometry",
             self.storegeometry)
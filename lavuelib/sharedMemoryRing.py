@@ -0,0 +1,441 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+
+""" shared-memory ring of image frames for same-host image writers """
+
+import os
+import mmap
+import struct
+import time
+import numpy as np
+
+#: (:obj:`str`) directory of POSIX shared memory objects
+SHMDIR = "/dev/shm"
+
+#: (:obj:`bytes`) ring magic string
+MAGIC = b"LAVUESHM"
+
+#: (:obj:`int`) ring layout version
+VERSION = 2
+
+#: (:obj:`int`) maximal number of frame dimensions
+MAXDIMS = 4
+
+#: (:obj:`str`) ring header format, i.e. magic, version, number of slots,
+#:    slot data size in bytes and write index, i.e. number of written frames
+HEADERFORMAT = "<8sIIQQ"
+
+#: (:obj:`int`) offset of the write index in the ring header
+INDEXOFFSET = 24
+
+#: (:obj:`int`) ring header size in bytes
+HEADERSIZE = 64
+
+#: (:obj:`str`) slot header format, i.e. sequence number, frame id,
+#:    timestamp, number of dimensions, dtype string, shape
+#:    and size of json metadata stored after the frame data
+SLOTFORMAT = "<QqdI4x16s%sQQ" % MAXDIMS
+
+#: (:obj:`int`) slot header size in bytes
+SLOTHEADERSIZE = 128
+
+#: (:obj:`int`) alignment of slot data in bytes
+ALIGNMENT = 64
+
+#: (:obj:`float`) number of read intervals a read frame is used for,
+#:    i.e. until the next read frame is processed
+USEINTERVALS = 2.
+
+
+def ringPath(name):
+    """ provides the file path of the shared memory ring
+
+    :param name: shared memory name or file path
+    :type name: :obj:`str`
+    :returns: file path
+    :rtype: :obj:`str`
+    """
+    name = str(name).strip()
+    if os.sep in name:
+        return name
+    return os.path.join(SHMDIR, name)
+
+
+def metadataBytes(metadata):
+    """ provides json metadata encoded to be stored in a ring slot
+
+    :param metadata: json dictionary with metadata
+    :type metadata: :obj:`str`
+    :returns: encoded metadata
+    :rtype: :obj:`bytes`
+    """
+    if not metadata:
+        return b""
+    if isinstance(metadata, bytes):
+        return metadata
+    return metadata.encode("utf-8")
+
+
+def _slotStride(slotsize):
+    """ provides the distance between two ring slots
+
+    :param slotsize: slot data size in bytes
+    :type slotsize: :obj:`int`
+    :returns: slot header and aligned data size in bytes
+    :rtype: :obj:`int`
+    """
+    return SLOTHEADERSIZE + \
+        (slotsize + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class SharedMemoryRingWriter(object):
+
+    """ writes image frames into a shared memory ring
+
+        Every slot is guarded by a sequence lock, i.e. its sequence
+        number is odd while the frame is being written. The write index
+        is updated after the slot is complete.
+    """
+
+    def __init__(self, name, nslots=8, slotsize=None, shape=None,
+                 dtype="uint16"):
+        """ constructor
+
+        :param name: shared memory name or file path
+        :type name: :obj:`str`
+        :param nslots: number of ring slots
+        :type nslots: :obj:`int`
+        :param slotsize: maximal frame size in bytes
+        :type slotsize: :obj:`int`
+        :param shape: maximal frame shape used if slotsize is None
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :param dtype: frame data type used if slotsize is None
+        :type dtype: :obj:`str`
+        """
+        if slotsize is None:
+            if shape is None:
+                raise ValueError(
+                    "SharedMemoryRingWriter: slotsize or shape required")
+            slotsize = int(np.prod(shape)) * np.dtype(dtype).itemsize
+        #: (:obj:`str`) file path of the shared memory ring
+        self.path = ringPath(name)
+        #: (:obj:`int`) number of ring slots
+        self.nslots = max(int(nslots), 1)
+        #: (:obj:`int`) slot data size in bytes
+        self.slotsize = max(int(slotsize), 1)
+        #: (:obj:`int`) distance between two ring slots
+        self.__stride = _slotStride(self.slotsize)
+        #: (:obj:`int`) number of written frames
+        self.__index = 0
+        size = HEADERSIZE + self.nslots * self.__stride
+        # readers of a former ring keep their mapping of the removed file
+        # and reopen the ring when its inode changes
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            os.ftruncate(fd, size)
+            #: (:class:`mmap.mmap`) shared memory map
+            self.__mmap = mmap.mmap(fd, size)
+        finally:
+            os.close(fd)
+        struct.pack_into(
+            HEADERFORMAT, self.__mmap, 0,
+            MAGIC, VERSION, self.nslots, self.slotsize, 0)
+
+    def write(self, image, frameid=None, timestamp=None, metadata=None):
+        """ copies the frame into the next ring slot
+
+        :param image: image frame
+        :type image: :class:`numpy.ndarray`
+        :param frameid: frame id, if None the frame number is used
+        :type frameid: :obj:`int`
+        :param timestamp: frame timestamp, if None the current time
+        :type timestamp: :obj:`float`
+        :param metadata: json dictionary with metadata
+        :type metadata: :obj:`str`
+        :returns: frame id
+        :rtype: :obj:`int`
+        """
+        image = np.asarray(image)
+        if image.dtype.hasobject or image.ndim > MAXDIMS:
+            raise ValueError(
+                "SharedMemoryRingWriter: unsupported frame %s %s"
+                % (image.shape, image.dtype))
+        mdata = metadataBytes(metadata)
+        if image.nbytes + len(mdata) > self.slotsize:
+            raise ValueError(
+                "SharedMemoryRingWriter: frame of %s bytes with %s bytes "
+                "of metadata exceeds the slot size %s"
+                % (image.nbytes, len(mdata), self.slotsize))
+        mm = self.__mmap
+        index = self.__index
+        if frameid is None:
+            frameid = index
+        if timestamp is None:
+            timestamp = time.time()
+        offset = HEADERSIZE + (index % self.nslots) * self.__stride
+        seq = struct.unpack_from("<Q", mm, offset)[0]
+        # an interrupted writer may have left an odd sequence number
+        seq += seq % 2
+        struct.pack_into("<Q", mm, offset, seq + 1)
+        target = np.ndarray(
+            image.shape, dtype=image.dtype, buffer=mm,
+            offset=offset + SLOTHEADERSIZE)
+        np.copyto(target, image)
+        if mdata:
+            start = offset + SLOTHEADERSIZE + image.nbytes
+            mm[start:start + len(mdata)] = mdata
+        shape = list(image.shape) + [0] * (MAXDIMS - image.ndim)
+        struct.pack_into(
+            SLOTFORMAT, mm, offset,
+            seq + 1, int(frameid), float(timestamp), image.ndim,
+            image.dtype.str.encode("ascii"), *(shape + [len(mdata)]))
+        struct.pack_into("<Q", mm, offset, seq + 2)
+        self.__index = index + 1
+        struct.pack_into("<Q", mm, INDEXOFFSET, self.__index)
+        return frameid
+
+    def close(self, unlink=False):
+        """ closes the ring
+
+        :param unlink: remove the shared memory object
+        :type unlink: :obj:`bool`
+        """
+        if self.__mmap is not None:
+            self.__mmap.close()
+            self.__mmap = None
+        if unlink and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class SharedMemoryRingReader(object):
+
+    """ provides zero-copy read-only views of the last ring frames
+
+        The views point to the shared memory, so a frame is valid until
+        the writer wraps around the ring, i.e. the number of slots should
+        cover the time the frame is in use. Readers whose frames can be
+        overwritten meanwhile, see :meth:`reusable`, should copy the frame
+        and check if it is intact.
+        Several readers can follow one ring, each with its own decimation.
+    """
+
+    def __init__(self, name, retries=10, decimation=1):
+        """ constructor
+
+        :param name: shared memory name or file path
+        :type name: :obj:`str`
+        :param retries: number of retries if the slot is being written
+        :type retries: :obj:`int`
+        :param decimation: minimal number of written frames
+                           between two read frames
+        :type decimation: :obj:`int`
+        """
+        #: (:obj:`str`) file path of the shared memory ring
+        self.path = ringPath(name)
+        #: (:obj:`int`) number of retries if the slot is being written
+        self.__retries = retries
+        #: (:obj:`int`) minimal number of written frames
+        #:    between two read frames
+        self.decimation = max(int(decimation), 1)
+        #: (:class:`mmap.mmap`) shared memory map
+        self.__mmap = None
+        #: (:obj:`int`) inode of the mapped file
+        self.__inode = None
+        #: (:obj:`int`) number of ring slots
+        self.nslots = 0
+        #: (:obj:`int`) slot data size in bytes
+        self.slotsize = 0
+        #: (:obj:`int`) distance between two ring slots
+        self.__stride = 0
+        #: (:obj:`int`) write index of the last read frame
+        self.__lastindex = 0
+        #: (:obj:`tuple` <:obj:`int`>) slot offset and sequence number
+        #:    of the last read frame
+        self.__lastslot = None
+        #: (:obj:`int`) number of frames written between
+        #:    the two last read frames
+        self.lag = 0
+        #: (:obj:`int`) acquisition number, i.e. a number of
+        #:    writer restarts since the reader was created
+        self.acquisition = 0
+        #: (:obj:`float`) writer time between the two last read frames
+        #:    in s, i.e. it decays slowly after a longer interval, or None
+        self.interval = None
+        #: (:obj:`float`) writer time between two written frames in s
+        #:    or None
+        self.period = None
+        #: (:obj:`float`) timestamp of the last read frame
+        self.__lasttime = None
+        #: (:obj:`str`) json dictionary with metadata of the last read frame
+        self.metadata = ""
+        self.__open()
+
+    def __open(self):
+        """ maps the shared memory ring
+        """
+        with open(self.path, "rb") as fl:
+            inode = os.fstat(fl.fileno()).st_ino
+            mm = mmap.mmap(fl.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, nslots, slotsize, _ = struct.unpack_from(
+            HEADERFORMAT, mm, 0)
+        if magic != MAGIC or version != VERSION:
+            mm.close()
+            raise ValueError(
+                "SharedMemoryRingReader: %s is not a lavue ring"
+                % self.path)
+        self.close()
+        if self.__inode is not None and self.__inode != inode:
+            self.acquisition += 1
+        self.__mmap = mm
+        self.__inode = inode
+        self.nslots = nslots
+        self.slotsize = slotsize
+        self.__stride = _slotStride(slotsize)
+        self.__lastindex = 0
+        self.__lastslot = None
+        self.__lasttime = None
+
+    def __recreated(self):
+        """ checks if the writer has recreated the ring
+
+        :returns: if the ring file was replaced
+        :rtype: :obj:`bool`
+        """
+        try:
+            return os.stat(self.path).st_ino != self.__inode
+        except OSError:
+            return False
+
+    def writeIndex(self):
+        """ provides the number of frames written to the ring
+
+        :returns: write index
+        :rtype: :obj:`int`
+        """
+        return struct.unpack_from("<Q", self.__mmap, INDEXOFFSET)[0]
+
+    def read(self):
+        """ provides the last frame if it was not read before
+
+        :returns: read-only image view, frame id and timestamp
+                  or None if there is no new frame
+        :rtype: (:class:`numpy.ndarray`, :obj:`int`, :obj:`float`)
+        """
+        if self.__mmap is None:
+            self.__open()
+        index = self.writeIndex()
+        if index == self.__lastindex:
+            if self.__recreated():
+                self.__open()
+            return None
+        if index < self.__lastindex:
+            # the writer has restarted
+            self.__lastindex = 0
+            self.__lasttime = None
+            self.acquisition += 1
+            if not index:
+                return None
+        elif self.__lastindex and \
+                index - self.__lastindex < self.decimation:
+            return None
+        for _ in range(self.__retries):
+            offset = HEADERSIZE + ((index - 1) % self.nslots) * self.__stride
+            header = struct.unpack_from(SLOTFORMAT, self.__mmap, offset)
+            seq = header[0]
+            if seq and not seq % 2:
+                ndim = header[3]
+                shape = header[5:5 + ndim]
+                dtype = np.dtype(header[4].rstrip(b"\0").decode("ascii"))
+                image = np.ndarray(
+                    shape, dtype=dtype, buffer=self.__mmap,
+                    offset=offset + SLOTHEADERSIZE)
+                start = offset + SLOTHEADERSIZE + image.nbytes
+                mdata = self.__mmap[start:start + header[5 + MAXDIMS]]
+                if struct.unpack_from("<Q", self.__mmap, offset)[0] == seq:
+                    self.metadata = mdata.decode("utf-8")
+                    self.lag = index - self.__lastindex
+                    self.__updateRates(header[2])
+                    self.__lastindex = index
+                    self.__lastslot = (offset, seq)
+                    return image, header[1], header[2]
+            index = self.writeIndex()
+        return None
+
+    def __updateRates(self, timestamp):
+        """ updates the read interval and the writer period
+            from the timestamps of read frames
+
+        :param timestamp: timestamp of the read frame
+        :type timestamp: :obj:`float`
+        """
+        last, self.__lasttime = self.__lasttime, timestamp
+        if last is None or self.lag <= 0 or timestamp <= last:
+            self.interval = None
+            self.period = None
+            return
+        interval = timestamp - last
+        self.period = interval / self.lag
+        if self.interval is not None:
+            interval = max(interval, (interval + self.interval) / 2.)
+        self.interval = interval
+
+    def reusable(self):
+        """ checks if the writer can reuse the slot of the last read frame
+            while the frame is in use, i.e. the other slots are written
+            within the next read intervals
+
+        :returns: if the last read frame can be overwritten
+                  or the write rate is unknown
+        :rtype: :obj:`bool`
+        """
+        if self.period is None or self.interval is None:
+            return True
+        return (self.nslots - 1) * self.period < \
+            USEINTERVALS * self.interval
+
+    def intact(self):
+        """ checks if the slot of the last read frame
+            has not been overwritten since it was read
+
+        :returns: if the last read frame is intact
+        :rtype: :obj:`bool`
+        """
+        if self.__mmap is None or self.__lastslot is None:
+            return False
+        offset, seq = self.__lastslot
+        return struct.unpack_from("<Q", self.__mmap, offset)[0] == seq
+
+    def close(self):
+        """ unmaps the shared memory ring
+        """
+        if self.__mmap is not None:
+            try:
+                self.__mmap.close()
+            except BufferError:
+                # frame views are still in use, mmap is released with them
+                pass
+            self.__mmap = None
@@ -68,6 +68,14 @@ _nxsfileformclass, _nxsfilebaseclass = uic.loadUiType(
     os.path.join(os.path.dirname(os.path.abspath(__file__)),
                  "ui", "NXSFileSourceWidget.ui"))
 
+_rawstackformclass, _rawstackbaseclass = uic.loadUiType(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 "ui", "RawStackSourceWidget.ui"))
+
+_dirwatchformclass, _dirwatchbaseclass = uic.loadUiType(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 "ui", "DirectoryWatchSourceWidget.ui"))
+
 _zmqformclass, _zmqbaseclass = uic.loadUiType(
     os.path.join(os.path.dirname(os.path.abspath(__file__)),
                  "ui", "ZMQSourceWidget.ui"))
@@ -84,6 +92,10 @@ _epicspvformclass, _epicspvbaseclass = uic.loadUiType(
     os.path.join(os.path.dirname(os.path.abspath(__file__)),
                  "ui", "EpicsPVSourceWidget.ui"))
 
+_shmformclass, _shmbaseclass = uic.loadUiType(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                 "ui", "SharedMemorySourceWidget.ui"))
+
 __all__ = [
     'SourceBaseWidget',
     'HidraSourceWidget',
@@ -94,8 +106,11 @@ __all__ = [
     'DOOCSPropSourceWidget',
     'ZMQSourceWidget',
     'NXSFileSourceWidget',
+    'RawStackSourceWidget',
+    'DirectoryWatchSourceWidget',
     'TinePropSourceWidget',
     'EpicsPVSourceWidget',
+    'SharedMemorySourceWidget',
     'ASAPOSourceWidget',
     # 'FixTestSourceWidget',
     'TestSourceWidget',
@@ -717,6 +732,8 @@ class ASAPOSourceWidget(SourceBaseWidget):
         self.__sourcepath = ""
         #: (:obj:`str`>) asapo token
         self.__token = ""
+        #: (:obj:`str`>) asapo consumer mode
+        self.__mode = "poll"
 
         #: (:obj:`list` <:obj:`str`> >) datasource list
         self.__datasources = []
@@ -776,7 +793,7 @@ class ASAPOSourceWidget(SourceBaseWidget):
         :returns configuration: configuration string
         :rtype configuration: :obj:`str`
         """
-        return "%s,%s,%s,%s,%s,%s" % (
+        configuration = "%s,%s,%s,%s,%s,%s" % (
             self.__server,
             str(self._ui.asapodatasourceComboBox.currentText()),
             str(self._ui.asapostreamComboBox.currentText()),
@@ -784,11 +801,14 @@ class ASAPOSourceWidget(SourceBaseWidget):
             self.__sourcepath,
             self.__token
         )
+        if self.__mode and self.__mode != "poll":
+            configuration += ",%s" % self.__mode
+        return configuration
 
     def updateMetaData(self, asaposerver=None, asapotoken=None,
                        asapobeamtime=None,
                        asapodatasources=None, asapostreams=None,
-                       asaposourcepath=None,
+                       asaposourcepath=None, asapomode=None,
                        disconnect=True,
                        **kargs):
         """ update source input parameters
@@ -805,6 +825,8 @@ class ASAPOSourceWidget(SourceBaseWidget):
         :type asapostreams: :obj:`list` <:obj:`str`> >
         :param asaposourcepath: source path
         :type asaposourcepath: :obj:`str`
+        :param asapomode: consumer mode, i.e. poll, last or next
+        :type asapomode: :obj:`str`
         :param disconnect: disconnect on update
         :type disconnect: :obj:`bool`
         :param kargs:  source widget input parameter dictionary
@@ -836,6 +858,8 @@ class ASAPOSourceWidget(SourceBaseWidget):
             self.__beamtime = asapobeamtime
         if asaposourcepath is not None:
             self.__sourcepath = asaposourcepath
+        if asapomode is not None:
+            self.__mode = asapomode
         updatecombo = False
         if isinstance(asapostreams, list):
             with QtCore.QMutexLocker(self.__mutex):
@@ -2086,6 +2110,349 @@ class NXSFileSourceWidget(SourceBaseWidget):
         return re.sub("[^a-zA-Z0-9_]+", "_", label)
 
 
+class RawStackSourceWidget(SourceBaseWidget):
+
+    """ raw stack file source widget """
+
+    #: (:obj:`str`) source name
+    name = "Raw File"
+    #: (:obj:`str`) source alias
+    alias = "rawfile"
+    #: (:obj:`str`) datasource class name
+    datasource = "RawStackSource"
+
+    def __init__(self, parent=None):
+        """ constructor
+
+        :param parent: parent object
+        :type parent: :class:`pyqtgraph.QtCore.QObject`
+        """
+        SourceBaseWidget.__init__(self, parent)
+
+        self._ui = _rawstackformclass()
+        self._ui.setupUi(self)
+
+        #: (:obj:`list` <:obj:`str`>) subwidget object names
+        self.widgetnames = [
+            "rawFileLabel", "rawFileLineEdit",
+            "rawDtypeLabel", "rawDtypeComboBox",
+            "rawShapeLabel", "rawShapeLineEdit",
+            "rawHeaderLabel", "rawHeaderSpinBox",
+            "rawFrameHeaderLabel", "rawFrameHeaderSpinBox",
+            "rawFrameLabel", "rawFrameSpinBox"
+        ]
+        #: (:obj:`bool`) raw stack source follows the last frame
+        self.__rawlast = False
+        #: (:obj:`str`) the last raw stack file
+        self.__rawlastfile = "."
+
+        self._detachWidgets()
+
+        self._ui.rawFileLineEdit.textEdited.connect(self.updateButton)
+        self._ui.rawShapeLineEdit.textEdited.connect(self.updateButton)
+        self._ui.rawDtypeComboBox.editTextChanged.connect(self.updateButton)
+        self._ui.rawHeaderSpinBox.valueChanged.connect(self.updateButton)
+        self._ui.rawFrameHeaderSpinBox.valueChanged.connect(
+            self.updateButton)
+        self._ui.rawFrameSpinBox.valueChanged.connect(
+            self._updateFrameSpinBox)
+        self._ui.rawFileLineEdit.installEventFilter(self)
+
+    @QtCore.pyqtSlot()
+    def _updateFrameSpinBox(self):
+        """ update raw stack frame spinbox
+        """
+        disconnected = False
+        if self._connected:
+            disconnected = True
+            self.sourceStateChanged.emit(0)
+        self.updateButton()
+        if disconnected:
+            self.sourceStateChanged.emit(-1)
+
+    def eventFilter(self, obj, event):
+        """ event filter
+
+        :param obj: qt object
+        :type obj: :class: `pyqtgraph.QtCore.QObject`
+        :param event: qt event
+        :type event: :class: `pyqtgraph.QtCore.QEvent`
+        :returns: status flag
+        :rtype: :obj:`bool`
+        """
+        if self._connected or obj is not self._ui.rawFileLineEdit:
+            return False
+        if event.type() in [QtCore.QEvent.MouseButtonDblClick]:
+            fileDialog = QtGui.QFileDialog()
+            fileout = fileDialog.getOpenFileName(
+                self._ui.rawFileLineEdit, 'Load file', self.__rawlastfile)
+            if isinstance(fileout, tuple):
+                filename = str(fileout[0])
+            else:
+                filename = str(fileout)
+            if filename:
+                self._ui.rawFileLineEdit.setText(filename)
+                self.__rawlastfile = filename
+                self.updateButton()
+            return True
+        return False
+
+    @QtCore.pyqtSlot()
+    def updateButton(self):
+        """ update slot for raw stack file source
+        """
+        if not self.active:
+            return
+        rfl, rdt, rsh, rhd, rfh, rfm, rawlast = self.__configuration()
+        if not rfl or not rdt or not re.match(r"^\d+(x\d+)*$", rsh):
+            self.buttonEnabled.emit(False)
+        else:
+            self.buttonEnabled.emit(True)
+            self.sourceLabelChanged.emit()
+
+    def __configuration(self):
+        """ provides configuration for the current image source
+
+        :returns configuration: configuration tuple
+        :rtype configuration: :obj:`tuple`
+        """
+        rfl = str(self._ui.rawFileLineEdit.text()).strip()
+        rdt = str(self._ui.rawDtypeComboBox.currentText()).strip()
+        rsh = str(self._ui.rawShapeLineEdit.text()).strip().lower()
+        rhd = int(self._ui.rawHeaderSpinBox.value())
+        rfh = int(self._ui.rawFrameHeaderSpinBox.value())
+        rfm = int(self._ui.rawFrameSpinBox.value())
+        return (rfl, rdt, rsh, rhd, rfh, rfm, self.__rawlast)
+
+    def configuration(self):
+        """ provides configuration for the current image source
+
+        :returns configuration: configuration string
+        :rtype configuration: :obj:`str`
+        """
+        return "%s,%s,%s,%s,%s,%s,%s" % self.__configuration()
+
+    def connectWidget(self):
+        """ connects widget
+        """
+        self._connected = True
+        self._ui.rawFileLineEdit.setReadOnly(True)
+        self._ui.rawShapeLineEdit.setReadOnly(True)
+        self._ui.rawDtypeComboBox.setEnabled(False)
+        self._ui.rawHeaderSpinBox.setEnabled(False)
+        self._ui.rawFrameHeaderSpinBox.setEnabled(False)
+
+    def disconnectWidget(self):
+        """ disconnects widget
+        """
+        self._connected = False
+        self._ui.rawFileLineEdit.setReadOnly(False)
+        self._ui.rawShapeLineEdit.setReadOnly(False)
+        self._ui.rawDtypeComboBox.setEnabled(True)
+        self._ui.rawHeaderSpinBox.setEnabled(True)
+        self._ui.rawFrameHeaderSpinBox.setEnabled(True)
+
+    def updateMetaData(self, nxslast=None, rawformat=None, **kargs):
+        """ update source input parameters
+
+        :param nxslast: file sources start from the last image
+        :type nxslast: :obj:`bool`
+        :param rawformat: JSON dictionary with the default raw format,
+                          i.e. dtype, shape, header and frameheader
+        :type rawformat: :obj:`str`
+        :param kargs:  source widget input parameter dictionary
+        :type kargs: :obj:`dict` < :obj:`str`, :obj:`any`>
+        """
+        update = False
+        if nxslast is not None:
+            if self.__rawlast != nxslast:
+                self.__rawlast = nxslast
+                update = True
+        if rawformat is not None and \
+           not str(self._ui.rawShapeLineEdit.text()).strip():
+            try:
+                fmt = json.loads(rawformat or "{}")
+                if fmt.get("dtype"):
+                    self._ui.rawDtypeComboBox.setEditText(
+                        str(fmt["dtype"]))
+                if fmt.get("shape"):
+                    self._ui.rawShapeLineEdit.setText(
+                        "x".join(str(sh) for sh in fmt["shape"]))
+                self._ui.rawHeaderSpinBox.setValue(
+                    int(fmt.get("header") or 0))
+                self._ui.rawFrameHeaderSpinBox.setValue(
+                    int(fmt.get("frameheader") or 0))
+                update = True
+            except Exception as e:
+                logger.warning(str(e))
+        if update:
+            self.updateButton()
+        self.sourceLabelChanged.emit()
+
+    def configure(self, configuration):
+        """ set configuration for the current image source, i.e.
+            filename,dtype,HEIGHTxWIDTH,header,frameheader,frame
+
+        :param configuration: configuration string
+        :type configuration: :obj:`str`
+        """
+        cnflst = [cnf.strip() for cnf in configuration.split(",")]
+        cnflst += [""] * (6 - len(cnflst))
+        self._ui.rawFileLineEdit.setText(cnflst[0])
+        if cnflst[1]:
+            self._ui.rawDtypeComboBox.setEditText(cnflst[1])
+        self._ui.rawShapeLineEdit.setText(cnflst[2])
+        for spinbox, value, default in [
+                (self._ui.rawHeaderSpinBox, cnflst[3], 0),
+                (self._ui.rawFrameHeaderSpinBox, cnflst[4], 0),
+                (self._ui.rawFrameSpinBox, cnflst[5].replace("m", "-"), -1)]:
+            try:
+                spinbox.setValue(int(value))
+            except Exception:
+                spinbox.setValue(default)
+        self.updateButton()
+
+    def label(self):
+        """ return a label of the current detector
+
+        :return: label of the current detector
+        :rtype: :obj:`str`
+        """
+        label = str(self._ui.rawFileLineEdit.text()).strip()
+        return re.sub("[^a-zA-Z0-9_]+", "_", label)
+
+
+class DirectoryWatchSourceWidget(SourceBaseWidget):
+
+    """ directory watch source widget """
+
+    #: (:obj:`str`) source name
+    name = "Directory Watch"
+    #: (:obj:`str`) source alias
+    alias = "dirwatch"
+    #: (:obj:`str`) datasource class name
+    datasource = "DirectoryWatchSource"
+
+    def __init__(self, parent=None):
+        """ constructor
+
+        :param parent: parent object
+        :type parent: :class:`pyqtgraph.QtCore.QObject`
+        """
+        SourceBaseWidget.__init__(self, parent)
+
+        self._ui = _dirwatchformclass()
+        self._ui.setupUi(self)
+
+        #: (:obj:`list` <:obj:`str`>) subwidget object names
+        self.widgetnames = [
+            "dirDirectoryLabel", "dirDirectoryLineEdit",
+            "dirPatternLabel", "dirPatternLineEdit",
+            "dirFieldLabel", "dirFieldLineEdit",
+            "dirPollingLabel", "dirPollingCheckBox"
+        ]
+        #: (:obj:`str`) the last watched directory
+        self.__lastdirectory = "."
+
+        self._detachWidgets()
+
+        self._ui.dirDirectoryLineEdit.textEdited.connect(self.updateButton)
+        self._ui.dirPatternLineEdit.textEdited.connect(self.updateButton)
+        self._ui.dirFieldLineEdit.textEdited.connect(self.updateButton)
+        self._ui.dirPollingCheckBox.stateChanged.connect(self.updateButton)
+        self._ui.dirDirectoryLineEdit.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        """ event filter
+
+        :param obj: qt object
+        :type obj: :class: `pyqtgraph.QtCore.QObject`
+        :param event: qt event
+        :type event: :class: `pyqtgraph.QtCore.QEvent`
+        :returns: status flag
+        :rtype: :obj:`bool`
+        """
+        if self._connected or obj is not self._ui.dirDirectoryLineEdit:
+            return False
+        if event.type() in [QtCore.QEvent.MouseButtonDblClick]:
+            fileDialog = QtGui.QFileDialog()
+            dirname = str(fileDialog.getExistingDirectory(
+                self._ui.dirDirectoryLineEdit, 'Watch directory',
+                self.__lastdirectory))
+            if dirname:
+                self._ui.dirDirectoryLineEdit.setText(dirname)
+                self.__lastdirectory = dirname
+                self.updateButton()
+            return True
+        return False
+
+    @QtCore.pyqtSlot()
+    def updateButton(self):
+        """ update slot for directory watch source
+        """
+        if not self.active:
+            return
+        if not str(self._ui.dirDirectoryLineEdit.text()).strip():
+            self.buttonEnabled.emit(False)
+        else:
+            self.buttonEnabled.emit(True)
+            self.sourceLabelChanged.emit()
+
+    def configuration(self):
+        """ provides configuration for the current image source
+
+        :returns configuration: configuration string
+        :rtype configuration: :obj:`str`
+        """
+        return "%s,%s,%s,%s" % (
+            str(self._ui.dirDirectoryLineEdit.text()).strip(),
+            str(self._ui.dirPatternLineEdit.text()).strip() or "*",
+            str(self._ui.dirFieldLineEdit.text()).strip(),
+            self._ui.dirPollingCheckBox.isChecked())
+
+    def connectWidget(self):
+        """ connects widget
+        """
+        self._connected = True
+        self._ui.dirDirectoryLineEdit.setReadOnly(True)
+        self._ui.dirPatternLineEdit.setReadOnly(True)
+        self._ui.dirFieldLineEdit.setReadOnly(True)
+        self._ui.dirPollingCheckBox.setEnabled(False)
+
+    def disconnectWidget(self):
+        """ disconnects widget
+        """
+        self._connected = False
+        self._ui.dirDirectoryLineEdit.setReadOnly(False)
+        self._ui.dirPatternLineEdit.setReadOnly(False)
+        self._ui.dirFieldLineEdit.setReadOnly(False)
+        self._ui.dirPollingCheckBox.setEnabled(True)
+
+    def configure(self, configuration):
+        """ set configuration for the current image source, i.e.
+            directory,pattern,field,polling
+
+        :param configuration: configuration string
+        :type configuration: :obj:`str`
+        """
+        cnflst = [cnf.strip() for cnf in configuration.split(",")]
+        cnflst += [""] * (4 - len(cnflst))
+        self._ui.dirDirectoryLineEdit.setText(cnflst[0])
+        self._ui.dirPatternLineEdit.setText(cnflst[1] or "*")
+        self._ui.dirFieldLineEdit.setText(cnflst[2])
+        self._ui.dirPollingCheckBox.setChecked(cnflst[3].lower() == "true")
+        self.updateButton()
+
+    def label(self):
+        """ return a label of the current detector
+
+        :return: label of the current detector
+        :rtype: :obj:`str`
+        """
+        label = str(self._ui.dirDirectoryLineEdit.text()).strip()
+        return re.sub("[^a-zA-Z0-9_]+", "_", label)
+
+
 class ZMQSourceWidget(SourceBaseWidget):
 
     """ test source widget """
@@ -2516,6 +2883,161 @@ class DOOCSPropSourceWidget(SourceBaseWidget):
         return re.sub("[^a-zA-Z0-9_]+", "_", label)
 
 
+class SharedMemorySourceWidget(SourceBaseWidget):
+
+    """ shared memory source widget """
+
+    #: (:obj:`str`) source name
+    name = "Shared Memory"
+    #: (:obj:`str`) source alias
+    alias = "shm"
+    #: (:obj:`tuple` <:obj:`str`>) capitalized required packages
+    requires = ()
+    #: (:obj:`str`) datasource class name
+    datasource = "SharedMemorySource"
+
+    def __init__(self, parent=None):
+        """ constructor
+
+        :param parent: parent object
+        :type parent: :class:`pyqtgraph.QtCore.QObject`
+        """
+        SourceBaseWidget.__init__(self, parent)
+
+        self._ui = _shmformclass()
+        self._ui.setupUi(self)
+
+        #: (:obj:`list` <:obj:`str`>) subwidget object names
+        self.widgetnames = [
+            "shmnameLabel", "shmnameComboBox"
+        ]
+
+        #: (:obj:`dict` <:obj:`str`, :obj:`str`>) dictionary with
+        #:                     (label, shared memory ring) items
+        self.__shmnames = {}
+        #: (:obj:`list` <:obj:`str`>) user shared memory rings
+        self.__usernames = []
+
+        self._detachWidgets()
+
+        #: (:obj:`str`) default tip
+        self.__defaulttip = self._ui.shmnameComboBox.toolTip()
+
+        self._connectComboBox(self._ui.shmnameComboBox)
+        self._ui.shmnameComboBox.installEventFilter(self)
+
+    def eventFilter(self, obj, event):
+        """ event filter
+
+        :param obj: qt object
+        :type obj: :class: `pyqtgraph.QtCore.QObject`
+        :param event: qt event
+        :type event: :class: `pyqtgraph.QtCore.QEvent`
+        :returns: status flag
+        :rtype: :obj:`bool`
+        """
+        return self.eventObjectFilter(
+            event,
+            combobox=self._ui.shmnameComboBox,
+            varname="shmnames",
+            atdict=self.__shmnames,
+            atlist=self.__usernames
+        )
+
+    @QtCore.pyqtSlot()
+    def updateButton(self):
+        """ update slot for shared memory source
+        """
+        if not self.active:
+            return
+        currentname = self.configuration()
+        if not currentname:
+            self.buttonEnabled.emit(False)
+        else:
+            self.buttonEnabled.emit(True)
+            self.sourceLabelChanged.emit()
+        self._ui.shmnameComboBox.setToolTip(
+            currentname or self.__defaulttip)
+
+    def configuration(self):
+        """ provides configuration for the current image source
+
+        :returns configuration: configuration string
+        :rtype configuration: :obj:`str`
+        """
+        currentname = str(self._ui.shmnameComboBox.currentText()).strip()
+        if currentname in self.__shmnames.keys():
+            currentname = str(self.__shmnames[currentname]).strip()
+        return currentname
+
+    def updateMetaData(self, shmnames=None, **kargs):
+        """ update source input parameters
+
+        :param shmnames: json dictionary with
+                           (label, shared memory ring) items
+        :type shmnames: :obj:`str`
+        :param kargs:  source widget input parameter dictionary
+        :type kargs: :obj:`dict` < :obj:`str`, :obj:`any`>
+        """
+        if shmnames is not None:
+            self.__shmnames = json.loads(shmnames)
+            self._updateComboBox(
+                self._ui.shmnameComboBox,
+                self.__shmnames, self.__usernames)
+        self.sourceLabelChanged.emit()
+
+    def configure(self, configuration):
+        """ set configuration for the current image source
+
+        :param configuration: configuration string
+        :type configuration: :obj:`str`
+        """
+        iid = self._ui.shmnameComboBox.findText(configuration)
+        if iid == -1:
+            self._ui.shmnameComboBox.addItem(configuration)
+            iid = self._ui.shmnameComboBox.findText(configuration)
+        self._ui.shmnameComboBox.setCurrentIndex(iid)
+
+    @QtCore.pyqtSlot()
+    def updateComboBox(self):
+        """ updates ComboBox
+        """
+        self._updateComboBox(
+            self._ui.shmnameComboBox, self.__shmnames, self.__usernames)
+        self.updateButton()
+
+    def disconnectWidget(self):
+        """ disconnects widget
+        """
+        self._connected = False
+        self._ui.shmnameComboBox.lineEdit().setReadOnly(False)
+        self._ui.shmnameComboBox.setEnabled(True)
+
+    def connectWidget(self):
+        """ connects widget
+        """
+        self._connected = True
+        self._ui.shmnameComboBox.lineEdit().setReadOnly(True)
+        self._ui.shmnameComboBox.setEnabled(False)
+        currentname = str(self._ui.shmnameComboBox.currentText()).strip()
+        names = self.__shmnames.keys()
+        if currentname not in names and \
+           currentname not in self.__usernames:
+            self.__usernames.append(currentname)
+            self._updateComboBox(
+                self._ui.shmnameComboBox, self.__shmnames,
+                self.__usernames)
+
+    def label(self):
+        """ return a label of the current detector
+
+        :return: label of the current detector
+        :rtype: :obj:`str`
+        """
+        label = str(self._ui.shmnameComboBox.currentText()).strip()
+        return re.sub("[^a-zA-Z0-9_]+", "_", label)
+
+
 #: ( :obj:`dict` < :obj:`str`, any > ) source widget properties
 swproperties = []
 for nm in __all__:
@@ -0,0 +1,208 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+
+""" lightweight timers of the image processing stages """
+
+import threading
+import time
+
+#: (:obj:`function`) monotonic clock in seconds
+clock = getattr(time, "perf_counter", time.time)
+
+#: (:obj:`list` <:obj:`str`>) timed stages of the image hot path
+STAGES = ["fetch", "decode", "merge", "filters", "buffer", "prepare",
+          "record", "transform", "scale", "stats", "tool", "render"]
+
+#: (:obj:`list` <:obj:`str`>) frame counters
+COUNTERS = ["frames", "dropped", "duplicates"]
+
+
+class StageTimer(object):
+
+    """ context manager which adds its execution time to a stage """
+
+    def __init__(self, timers, stage):
+        """ constructor
+
+        :param timers: stage timers
+        :type timers: :class:`StageTimers`
+        :param stage: stage name
+        :type stage: :obj:`str`
+        """
+        #: (:class:`StageTimers`) stage timers
+        self.__timers = timers
+        #: (:obj:`str`) stage name
+        self.__stage = stage
+        #: (:obj:`float`) start time in s
+        self.__start = None
+
+    def __enter__(self):
+        self.__start = clock()
+        return self
+
+    def __exit__(self, *args):
+        self.__timers.add(self.__stage, clock() - self.__start)
+
+
+class StageTimers(object):
+
+    """ per-stage latencies and frame counters of the image hot path
+
+        Stage times are summed up until :meth:`frameDone` is called, so
+        a stage executed more than once per frame, e.g. fetching of
+        several image sources, is reported as one value. The averages
+        are exponential moving averages of the last frames.
+    """
+
+    def __init__(self, smoothing=0.1):
+        """ constructor
+
+        :param smoothing: weight of the last frame in the moving averages
+        :type smoothing: :obj:`float`
+        """
+        #: (:obj:`float`) weight of the last frame in the moving averages
+        self.__smoothing = smoothing
+        #: (:class:`threading.Lock`) timers lock
+        self.__lock = threading.Lock()
+        #: (:obj:`dict` <:obj:`str`, :obj:`float`>) current frame times in s
+        self.__current = {}
+        #: (:obj:`dict` <:obj:`str`, [:obj:`float`, :obj:`float`,
+        #:    :obj:`float`]>) last, average and maximal stage times in s
+        self.__times = {}
+        #: (:obj:`dict` <:obj:`str`, :obj:`int`>) frame counters
+        self.__counters = dict((cnt, 0) for cnt in COUNTERS)
+        #: (:obj:`float`) time of the last frame in s
+        self.__lastframe = None
+        #: (:obj:`float`) average frame period in s
+        self.__period = None
+
+    def timer(self, stage):
+        """ provides a context manager measuring the stage time
+
+        :param stage: stage name
+        :type stage: :obj:`str`
+        :returns: stage timer
+        :rtype: :class:`StageTimer`
+        """
+        return StageTimer(self, stage)
+
+    def add(self, stage, duration):
+        """ adds the stage time to the current frame
+
+        :param stage: stage name
+        :type stage: :obj:`str`
+        :param duration: stage time in s
+        :type duration: :obj:`float`
+        """
+        with self.__lock:
+            self.__current[stage] = self.__current.get(stage, 0.) + duration
+
+    def count(self, counter, value=1):
+        """ increases the frame counter
+
+        :param counter: counter name, i.e. frames, dropped or duplicates
+        :type counter: :obj:`str`
+        :param value: counter increment
+        :type value: :obj:`int`
+        """
+        with self.__lock:
+            self.__counters[counter] = self.__counters.get(counter, 0) + value
+
+    def frameDone(self):
+        """ updates the stage averages with times of the current frame
+        """
+        now = clock()
+        sm = self.__smoothing
+        with self.__lock:
+            current, self.__current = self.__current, {}
+            for stage in set(current.keys()) | set(self.__times.keys()):
+                value = current.get(stage, 0.)
+                times = self.__times.get(stage)
+                if times is None:
+                    self.__times[stage] = [value, value, value]
+                else:
+                    times[0] = value
+                    times[1] += sm * (value - times[1])
+                    times[2] = max(times[2], value)
+            self.__counters["frames"] += 1
+            if self.__lastframe is not None:
+                period = now - self.__lastframe
+                if self.__period is None:
+                    self.__period = period
+                else:
+                    self.__period += sm * (period - self.__period)
+            self.__lastframe = now
+
+    def reset(self):
+        """ resets stage times and frame counters
+        """
+        with self.__lock:
+            self.__current = {}
+            self.__times = {}
+            self.__counters = dict((cnt, 0) for cnt in COUNTERS)
+            self.__lastframe = None
+            self.__period = None
+
+    def metrics(self):
+        """ provides stage times in ms, frame counters and frame rate
+
+        :returns: performance metrics
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        with self.__lock:
+            stages = dict(
+                (stage, {
+                    "last": round(times[0] * 1000., 3),
+                    "mean": round(times[1] * 1000., 3),
+                    "max": round(times[2] * 1000., 3)})
+                for stage, times in self.__times.items())
+            metrics = dict(self.__counters)
+            period = self.__period
+        metrics["stages"] = stages
+        metrics["framerate"] = round(1. / period, 3) if period else None
+        metrics["slowest"] = max(
+            stages.keys(), key=lambda st: stages[st]["mean"]) \
+            if stages else None
+        return metrics
+
+    def summary(self):
+        """ provides a text summary of the metrics
+
+        :returns: multi-line text with mean stage times
+        :rtype: :obj:`str`
+        """
+        metrics = self.metrics()
+        stages = metrics["stages"]
+        order = [st for st in STAGES if st in stages] + \
+            sorted(st for st in stages if st not in STAGES)
+        lines = ["%-9s %8.2f ms%s" % (
+            st, stages[st]["mean"],
+            " *" if st == metrics["slowest"] else "")
+            for st in order]
+        if metrics["framerate"]:
+            lines.append("rate      %8.1f Hz" % metrics["framerate"])
+        lines.append("frames %d, dropped %d, duplicates %d" % (
+            metrics["frames"], metrics["dropped"], metrics["duplicates"]))
+        return "\n".join(lines)
@@ -40,7 +40,7 @@ import pyqtgraph as _pg
 import logging
 import random
 import json
-from pyqtgraph import QtCore, QtGui, functions
+from pyqtgraph import QtCore, QtGui
 from enum import Enum
 
 from . import geometryDialog
@@ -52,8 +52,19 @@ from . import motorWatchThread
 from . import edDictDialog
 from . import edListDialog
 from . import commandThread
+from . import ringBuffer
+from . import imageStages
+from . import validityMask
+from . import regionContour
 from .sardanaUtils import debugmethod
 
+try:
+    import concurrent.futures
+    #: (:obj:`bool`) concurrent.futures can be imported
+    FUTURES = True
+except ImportError:
+    FUTURES = False
+
 try:
     try:
         import tango
@@ -1965,6 +1976,9 @@ class LineCutToolWidget(ToolBaseWidget):
         self.__curves = []
         #: (:obj:`int`) current plot number
         self.__nrplots = 0
+        #: (:obj:`dict` <:obj:`int`, (:obj:`tuple`, :class:`numpy.ndarray`,
+        #:    :obj:`list` <:obj:`float`>)>) x-coordinates of cuts
+        self.__xcache = {}
 
         #: (:class:`lavuelib.settings.Settings`) configuration settings
         self.__settings = self._mainwidget.settings()
@@ -2152,37 +2166,25 @@ class LineCutToolWidget(ToolBaseWidget):
                             cr.setPen(_pg.hsvColor(i/float(nrplots)))
             coords = self._mainwidget.cutCoords()
             rws = self._mainwidget.rangeWindowScale()
+            dts = self._mainwidget.cutsData()
             for i in range(nrplots):
-                dt = self._mainwidget.cutData(i)
+                dt = dts[i] if i < len(dts) else None
                 if dt is not None:
                     if self.__settings.nanmask:
                         if dt.dtype.kind == 'f' and np.isnan(dt.min()):
                             dt = np.nan_to_num(dt)
-                    if self.__xindex:
-                        if i < len(coords):
-                            crds = coords[i]
-                        else:
-                            crds = [0, 0, 1, 1, 0.00001]
-                        if self.__xindex == 2:
-                            dx = np.linspace(crds[1], crds[3], len(dt))
-                        else:
-                            dx = np.linspace(crds[0], crds[2], len(dt))
+                    if i < len(coords):
+                        crds = coords[i]
+                    else:
+                        crds = [0, 0, 1, 1, 0.00001]
+                    dx, xlist = self.__xcoordinates(i, crds, len(dt), rws)
+                    if dx is not None:
                         self.__curves[i].setData(x=dx, y=dt)
-                        if self.__settings.sendresults:
-                            xl.append([float(e) for e in dx])
-                            yl.append([float(e) for e in dt])
                     else:
-                        if rws > 1.0:
-                            dx = np.linspace(0, len(dt - 1) * rws, len(dt))
-                            self.__curves[i].setData(x=dx, y=dt)
-                            if self.__settings.sendresults:
-                                xl.append([float(e) for e in dx])
-                                yl.append([float(e) for e in dt])
-                        else:
-                            self.__curves[i].setData(y=dt)
-                            if self.__settings.sendresults:
-                                xl.append(list(range(len(dt))))
-                                yl.append([float(e) for e in dt])
+                        self.__curves[i].setData(y=dt)
+                    if self.__settings.sendresults:
+                        xl.append(xlist)
+                        yl.append(np.asarray(dt, dtype=float).tolist())
 
                     self.__curves[i].setVisible(True)
                 else:
@@ -2190,6 +2192,41 @@ class LineCutToolWidget(ToolBaseWidget):
             if self.__settings.sendresults:
                 self.__sendresults(xl, yl)
 
+    def __xcoordinates(self, cid, crds, npts, rws):
+        """ provides cached x-coordinates of the cut plot
+
+        :param cid: cut id
+        :type cid: :obj:`int`
+        :param crds: cut coordinates
+        :type crds: :obj:`list` <:obj:`float`>
+        :param npts: number of cut points
+        :type npts: :obj:`int`
+        :param rws: range window scale
+        :type rws: :obj:`float`
+        :returns: x-coordinates or None for points, x-coordinate list
+        :rtype: (:class:`numpy.ndarray`, :obj:`list` <:obj:`float`>)
+        """
+        if self.__xindex == 2:
+            key = (self.__xindex, crds[1], crds[3], npts)
+        elif self.__xindex:
+            key = (self.__xindex, crds[0], crds[2], npts)
+        else:
+            key = (self.__xindex, rws if rws > 1.0 else None, npts)
+        cached = self.__xcache.get(cid)
+        if cached is None or cached[0] != key:
+            if self.__xindex:
+                dx = np.linspace(key[1], key[2], npts)
+                xlist = dx.tolist()
+            elif rws > 1.0:
+                dx = np.linspace(0, npts * rws, npts)
+                xlist = dx.tolist()
+            else:
+                dx = None
+                xlist = list(range(npts))
+            cached = (key, dx, xlist)
+            self.__xcache[cid] = cached
+        return cached[1], cached[2]
+
     def _plotCut(self):
         """ plot the current 1d Cut
         """
@@ -2208,32 +2245,19 @@ class LineCutToolWidget(ToolBaseWidget):
                 if self.__settings.nanmask:
                     if dt.dtype.kind == 'f' and np.isnan(dt.min()):
                         dt = np.nan_to_num(dt)
-                if self.__xindex:
-                    crds = [0, 0, 1, 1, 0.00001]
-                    if self._mainwidget.currentCut() > -1:
-                        crds = self._mainwidget.cutCoords()[
-                            self._mainwidget.currentCut()]
-                    if self.__xindex == 2:
-                        dx = np.linspace(crds[1], crds[3], len(dt))
-                    else:
-                        dx = np.linspace(crds[0], crds[2], len(dt))
+                crds = [0, 0, 1, 1, 0.00001]
+                if self._mainwidget.currentCut() > -1:
+                    crds = self._mainwidget.cutCoords()[
+                        self._mainwidget.currentCut()]
+                rws = self._mainwidget.rangeWindowScale()
+                dx, xlist = self.__xcoordinates(-1, crds, len(dt), rws)
+                if dx is not None:
                     self.__curves[0].setData(x=dx, y=dt)
-                    if self.__settings.sendresults:
-                        xl.append([float(e) for e in dx])
-                        yl.append([float(e) for e in dt])
                 else:
-                    rws = self._mainwidget.rangeWindowScale()
-                    if rws > 1.0:
-                        dx = np.linspace(0, len(dt - 1) * rws, len(dt))
-                        self.__curves[0].setData(x=dx, y=dt)
-                        if self.__settings.sendresults:
-                            xl.append([float(e) for e in dx])
-                            yl.append([float(e) for e in dt])
-                    else:
-                        self.__curves[0].setData(y=dt)
-                        if self.__settings.sendresults:
-                            xl.append(list(range(len(dt))))
-                            yl.append([float(e) for e in dt])
+                    self.__curves[0].setData(y=dt)
+                if self.__settings.sendresults:
+                    xl.append(xlist)
+                    yl.append(np.asarray(dt, dtype=float).tolist())
                 self.__curves[0].setVisible(True)
             else:
                 self.__curves[0].setVisible(False)
@@ -2559,6 +2583,11 @@ class ProjectionToolWidget(ToolBaseWidget):
                     npfun = np.nansum
                 else:
                     npfun = np.nanmean
+                invalid = self._mainwidget.invalidMask()
+                if not self.__funindex and invalid is not None:
+                    # invalid pixels of integer images are not averaged
+                    dts = validityMask.maskedImage(dts, invalid)
+                    npfun = validityMask.nanmean
 
                 if self.__dsrows == "ERROR":
                     sx = []
@@ -2570,7 +2599,7 @@ class ProjectionToolWidget(ToolBaseWidget):
                             if isinstance(self.__dsrows, slice):
                                 sx = npfun(dts[:, self.__dsrows], axis=1)
                             else:
-                                sx = dts[:, self.__dsrows]
+                                sx = np.ma.getdata(dts[:, self.__dsrows])
                     except Exception:
                         sx = []
 
@@ -2593,7 +2622,7 @@ class ProjectionToolWidget(ToolBaseWidget):
                             if isinstance(self.__dscolumns, slice):
                                 sy = npfun(dts[self.__dscolumns, :], axis=0)
                             else:
-                                sy = dts[self.__dscolumns, :]
+                                sy = np.ma.getdata(dts[self.__dscolumns, :])
                     except Exception:
                         sy = []
                 else:
@@ -2736,8 +2765,15 @@ class OneDToolWidget(ToolBaseWidget):
         self.__accumulate = False
         #: ((:obj:`int`) buffer size
         self.__buffersize = 1024
-        #: ((:class:`ndarray`) buffer
-        self.__buffer = None
+        #: ((:class:`lavuelib.ringBuffer.RingBuffer`) accumulation buffer
+        self.__buffer = ringBuffer.RingBuffer(self.__buffersize)
+        #: ((:obj:`bool`) accumulate rows in a background thread
+        self.__accuthread = False
+        #: ((:class:`concurrent.futures.ThreadPoolExecutor`)
+        #:    accumulation executor
+        self.__executor = None
+        #: ((:class:`concurrent.futures.Future`) last accumulation task
+        self.__accufuture = None
 
         #: (:class:`lavuelib.settings.Settings`) configuration settings
         self.__settings = self._mainwidget.settings()
@@ -2783,6 +2819,13 @@ class OneDToolWidget(ToolBaseWidget):
             if "reset" in cnf.keys():
                 if cnf["reset"]:
                     self._resetAccu()
+            if "buffer_dtype" in cnf.keys():
+                try:
+                    self.__buffer.setDType(cnf["buffer_dtype"] or None)
+                except Exception as e:
+                    logger.warning(str(e))
+            if "buffer_thread" in cnf.keys():
+                self.__accuthread = bool(cnf["buffer_thread"])
             if "labels" in cnf.keys():
                 self.__labels = cnf["labels"]
                 self.deactivate()
@@ -2811,6 +2854,9 @@ class OneDToolWidget(ToolBaseWidget):
         cnf["collect"] = self.__accumulate
         cnf["xrow"] = self.__ui.xCheckBox.isChecked()
         cnf["labels"] = self.__labels
+        dtype = self.__buffer.dtype
+        cnf["buffer_dtype"] = dtype.name if dtype is not None else ""
+        cnf["buffer_thread"] = self.__accuthread
         return json.dumps(cnf)
 
     def afterplot(self):
@@ -2830,22 +2876,55 @@ class OneDToolWidget(ToolBaseWidget):
         """
 
         if self.__accumulate:
-            dts = rawarray
-            newrow = np.sum(dts[:, self.__dsrows], axis=1)
-            if self.__buffer is not None and \
-               self.__buffer.shape[1] == newrow.shape[0]:
-                if self.__buffer.shape[0] >= self.__buffersize:
-                    self.__buffer = np.vstack(
-                        [self.__buffer[
-                            self.__buffer.shape[0] - self.__buffersize + 1:,
-                            :],
-                         newrow]
-                    )
-                else:
-                    self.__buffer = np.vstack([self.__buffer, newrow])
+            if self.__accuthread and FUTURES:
+                if self.__executor is None:
+                    self.__executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=1)
+                # the row of the previous image is summed during rendering
+                # and appended in the GUI thread, i.e. the plotted view
+                # is not changed by the executor
+                self.__appendRow()
+                self.__accufuture = self.__executor.submit(
+                    self.__sumRow, rawarray, list(self.__dsrows),
+                    self.__buffer.dtype)
+                if not len(self.__buffer):
+                    self.__appendRow()
             else:
-                self.__buffer = np.array([newrow])
-            return np.transpose(self.__buffer), rawarray
+                row = self.__sumRow(
+                    rawarray, self.__dsrows, self.__buffer.dtype)
+                if row is not None:
+                    self.__buffer.append(row)
+            view = self.__buffer.view()
+            if view is not None:
+                return np.transpose(view), rawarray
+
+    def __appendRow(self):
+        """ appends the row summed by the last accumulation task
+            to the accumulation buffer
+        """
+        if self.__accufuture is not None:
+            row = self.__accufuture.result()
+            self.__accufuture = None
+            if row is not None:
+                self.__buffer.append(row)
+
+    @classmethod
+    def __sumRow(cls, dts, dsrows, dtype):
+        """ sums the selected rows
+
+        :param dts: 2d raw image array
+        :type dts: :class:`numpy.ndarray`
+        :param dsrows: selected rows
+        :type dsrows: :obj:`list` <:obj:`int`>
+        :param dtype: sum data type
+        :type dtype: :class:`numpy.dtype`
+        :returns: sum of the selected rows or None
+        :rtype: :class:`numpy.ndarray`
+        """
+        try:
+            return np.sum(dts[:, dsrows], axis=1, dtype=dtype)
+        except Exception as e:
+            logger.warning(str(e))
 
     def activate(self):
         """ activates tool widget
@@ -2864,6 +2943,10 @@ class OneDToolWidget(ToolBaseWidget):
         self.__curves = []
         self.__nrplots = 0
         self._mainwidget.onedshowlegend(False)
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=True)
+            self.__executor = None
+            self.__accufuture = None
 
     @QtCore.pyqtSlot()
     def _setLabels(self):
@@ -2887,7 +2970,10 @@ class OneDToolWidget(ToolBaseWidget):
     def _resetAccu(self):
         """ reset accumulation buffer
         """
-        self.__buffer = None
+        if self.__accufuture is not None:
+            self.__accufuture.result()
+            self.__accufuture = None
+        self.__buffer.reset()
         self._mainwidget.emitTCC()
 
     @QtCore.pyqtSlot()
@@ -2899,6 +2985,8 @@ class OneDToolWidget(ToolBaseWidget):
             self.__ui.accuPushButton.setText("Stop")
         else:
             self.__accumulate = False
+            # the row of the last image is kept
+            self.__appendRow()
             self.__ui.accuPushButton.setText("Collect")
         self._mainwidget.emitTCC()
 
@@ -2914,6 +3002,7 @@ class OneDToolWidget(ToolBaseWidget):
             # print(str(e))
             logger.warning(str(e))
             self.__buffersize = 1024
+        self.__buffer.setCapacity(self.__buffersize)
 
     @QtCore.pyqtSlot(int)
     def _updateXRow(self, value):
@@ -3159,22 +3248,12 @@ class AngleQToolWidget(ToolBaseWidget):
         self.__lastradial = None
         #: (:class:`numpy.array`) angle array cache
         self.__lastangle = None
-        #: (:obj:`float`) energy cache
-        self.__lastenergy = None
+        #: (:obj:`tuple` <:obj:`float`>) geometry key cache
+        self.__lastgeometry = None
         #: (:obj:`float`) radmax cache
         self.__lastradmax = None
         #: (:obj:`float`) plotindex cache
         self.__lastpindex = None
-        #: (:obj:`float`) detdistance cache
-        self.__lastdistance = None
-        #: (:obj:`float`) center x cache
-        self.__lastcenterx = None
-        #: (:obj:`float`) center y cache
-        self.__lastcentery = None
-        #: (:obj:`float`) pixelsizeycache
-        self.__lastpsizex = None
-        #: (:obj:`float`) pixelsizey cache
-        self.__lastpsizey = None
         #: (:class:`numpy.array`) x array cache
         self.__lastx = None
         #: (:class:`numpy.array`) y array cache
@@ -3356,28 +3435,16 @@ class AngleQToolWidget(ToolBaseWidget):
         """
         recalc = False
         if self.__lastradial is None or self.__lastangle is None or \
-           self.__lastenergy is None or self.__lastradmax is None or \
-           self.__lastpindex is None or self.__lastdistance is None or \
-           self.__lastcenterx is None or self.__lastcentery is None or \
-           self.__lastpsizex is None or self.__lastpsizey is None or \
+           self.__lastgeometry is None or self.__lastradmax is None or \
+           self.__lastpindex is None or \
            self.__lastx is None or self.__lasty is None:
             recalc = True
-        elif self.__lastenergy != self.__settings.energy:
+        elif self.__lastgeometry != self.__settings.geometrymaps.key():
             recalc = True
         elif self.__lastradmax != self.__radmax:
             recalc = True
         elif self.__lastpindex != self.__plotindex:
             recalc = True
-        elif self.__lastdistance != self.__settings.detdistance:
-            recalc = True
-        elif self.__lastcenterx != self.__settings.centerx:
-            recalc = True
-        elif self.__lastcentery != self.__settings.centery:
-            recalc = True
-        elif self.__lastpsizex != self.__settings.pixelsizex:
-            recalc = True
-        elif self.__lastpsizey != self.__settings.pixelsizey:
-            recalc = True
         elif (isinstance(radial, np.ndarray) and
               not np.array_equal(self.__lastradial, radial)):
             recalc = True
@@ -3424,14 +3491,9 @@ class AngleQToolWidget(ToolBaseWidget):
             self.__lasty = self.__settings.centery + \
                 fac * np.cos(angle * math.pi / 180) \
                 / self.__settings.pixelsizey
-            self.__lastenergy = self.__settings.energy
+            self.__lastgeometry = self.__settings.geometrymaps.key()
             self.__lastradmax = self.__radmax
             self.__lastpindex = self.__plotindex
-            self.__lastdistance = self.__settings.detdistance
-            self.__lastcenterx = self.__settings.centerx
-            self.__lastcentery = self.__settings.centery
-            self.__lastpsizex = self.__settings.pixelsizex
-            self.__lastpsizey = self.__settings.pixelsizey
             self.__lastradial = radial
             self.__lastangle = angle
             self.__rangechanged = False
@@ -3442,6 +3504,18 @@ class AngleQToolWidget(ToolBaseWidget):
             return self.__inter(np.transpose(
                 [self.__lastx, self.__lasty], axes=[1, 2, 0]))
 
+    @classmethod
+    def __corners(cls, shape):
+        """ provides image corner positions
+
+        :param shape: image shape
+        :type shape: :obj:`tuple` <:obj:`int`>
+        :returns: x and y positions of the corners
+        :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+        """
+        return (np.array([0, 0, shape[0], shape[0]]),
+                np.array([0, shape[1], 0, shape[1]]))
+
     def __calculateRadMax(self, pindex, rdata=None):
         """ recalculates radmax
 
@@ -3461,15 +3535,9 @@ class AngleQToolWidget(ToolBaseWidget):
                 rstart = self.__radthstart \
                     if self.__radthstart is not None else 0
                 if self.__radthend is None:
-                    _, _, th0 = self.__pixel2theta(0, 0, False)
-                    _, _, th1 = self.__pixel2theta(0, rdata.shape[1], False)
-                    _, _, th2 = self.__pixel2theta(rdata.shape[0], 0, False)
-                    _, _, th3 = self.__pixel2theta(
-                        rdata.shape[0], rdata.shape[1], False)
-                    try:
-                        rmax = max(th0, th1, th2, th3)
-                    except TypeError:
-                        rmax = None
+                    _, _, ths = self.__settings.geometrymaps.pixel2theta(
+                        *self.__corners(rdata.shape), xy=False)
+                    rmax = float(np.max(ths)) if ths is not None else None
                 else:
                     rmax = (self.__radthend - rstart) * math.pi / 180.
                 if self.__radthsize is not None:
@@ -3490,15 +3558,9 @@ class AngleQToolWidget(ToolBaseWidget):
                 rstart = self.__radqstart \
                     if self.__radqstart is not None else 0
                 if self.__radqend is None:
-                    _, _, q0 = self.__pixel2q(0, 0, False)
-                    _, _, q1 = self.__pixel2q(0, rdata.shape[1], False)
-                    _, _, q2 = self.__pixel2q(rdata.shape[0], 0, False)
-                    _, _, q3 = self.__pixel2q(
-                        rdata.shape[0], rdata.shape[1], False)
-                    try:
-                        rmax = max(q0, q1, q2, q3)
-                    except TypeError:
-                        rmax = None
+                    _, _, qs = self.__settings.geometrymaps.pixel2q(
+                        *self.__corners(rdata.shape), xy=False)
+                    rmax = float(np.max(qs)) if qs is not None else None
                 else:
                     rmax = (self.__radqend - rstart)
                 if self.__radqsize is not None:
@@ -3621,7 +3683,8 @@ class AngleQToolWidget(ToolBaseWidget):
         ilabel = self._mainwidget.scalingLabel()
         if self.__plotindex == 0:
             if self.__gspaceindex == 0:
-                thetax, thetay, thetatotal = self.__pixel2theta(x, y)
+                thetax, thetay, thetatotal = \
+                    self.__settings.geometrymaps.pixel2theta(x, y)
                 if thetax is not None:
                     message = "th_x = %f deg, th_y = %f deg," \
                               " th_tot = %f deg, %s = %.2f" \
@@ -3630,7 +3693,7 @@ class AngleQToolWidget(ToolBaseWidget):
                                  thetatotal * 180 / math.pi,
                                  ilabel, intensity)
             else:
-                qx, qy, q = self.__pixel2q(x, y)
+                qx, qy, q = self.__settings.geometrymaps.pixel2q(x, y)
                 if qx is not None:
                     message = u"q_x = %f 1/\u212B, q_y = %f 1/\u212B, " \
                               u"q = %f 1/\u212B, %s = %.2f" \
@@ -3670,63 +3733,6 @@ class AngleQToolWidget(ToolBaseWidget):
 
         self._mainwidget.setDisplayedText(message)
 
-    def __pixel2theta(self, xdata, ydata, xy=True):
-        """ converts coordinates from pixel positions to theta angles
-
-        :param xdata: x pixel position
-        :type xdata: :obj:`float`
-        :param ydata: y-pixel position
-        :type ydata: :obj:`float`
-        :param xy: flag
-        :type xy: :obj:`bool`
-        :returns: x-theta, y-theta, total-theta
-        :rtype: (:obj:`float`, :obj:`float`, :obj:`float`)
-        """
-        thetax = None
-        thetay = None
-        thetatotal = None
-        if self.__settings.energy > 0 and self.__settings.detdistance > 0:
-            xcentered = xdata - self.__settings.centerx
-            ycentered = ydata - self.__settings.centery
-            if xy:
-                thetax = math.atan(
-                    xcentered * self.__settings.pixelsizex / 1000.
-                    / self.__settings.detdistance)
-                thetay = math.atan(
-                    ycentered * self.__settings.pixelsizey / 1000.
-                    / self.__settings.detdistance)
-            r = math.sqrt(
-                (xcentered * self.__settings.pixelsizex / 1000.) ** 2
-                + (ycentered * self.__settings.pixelsizey / 1000.) ** 2)
-            thetatotal = math.atan(
-                r / self.__settings.detdistance)
-        return thetax, thetay, thetatotal
-
-    def __pixel2q(self, xdata, ydata, xy=True):
-        """ converts coordinates from pixel positions to q-space coordinates
-
-        :param xdata: x pixel position
-        :type xdata: :obj:`float`
-        :param ydata: y-pixel position
-        :type ydata: :obj:`float`
-        :param xy: flag
-        :type xy: :obj:`bool`
-        :returns: q_x, q_y, q_total
-        :rtype: (:obj:`float`, :obj:`float`, :obj:`float`)
-        """
-        qx = None
-        qy = None
-        q = None
-        if self.__settings.energy > 0 and self.__settings.detdistance > 0:
-            thetax, thetay, thetatotal = self.__pixel2theta(
-                xdata, ydata, xy)
-            wavelength = 12398.4193 / self.__settings.energy
-            if xy:
-                qx = 4 * math.pi / wavelength * math.sin(thetax/2.)
-                qy = 4 * math.pi / wavelength * math.sin(thetay/2.)
-            q = 4 * math.pi / wavelength * math.sin(thetatotal/2.)
-        return qx, qy, q
-
     def __tipmessage(self):
         """ provides geometry messate
 
@@ -4090,6 +4096,9 @@ class DiffractogramToolWidget(ToolBaseWidget):
         #: ( :obj:`list` <  :obj:`list` <  :obj:`list` < (float, float) > > >)
         #    list of region lines
         self.__regions = []
+        #: (:class:`lavuelib.regionContour.RegionContours`)
+        #:    region outlines cached per geometry and ranges
+        self.__regioncontours = None
 
         #: (:obj:`list` < (int, int, int) > ) list with region colors
         self.__colors = []
@@ -4126,6 +4135,8 @@ class DiffractogramToolWidget(ToolBaseWidget):
 
         #: (:class:`lavuelib.settings.Settings`) configuration settings
         self.__settings = self._mainwidget.settings()
+        self.__regioncontours = regionContour.RegionContours(
+            self.__settings.geometrymaps)
         self.setColors(self.__settings.roiscolors)
         #: (:obj:`list` < [:class:`pyqtgraph.QtCore.pyqtSignal`, :obj:`str`] >)
         #: list of [signal, slot] object to connect
@@ -4770,21 +4781,9 @@ class DiffractogramToolWidget(ToolBaseWidget):
                     x = txdata
                     y = tydata
             ilabel = self._mainwidget.scalingLabel()
-            chi = None
-            with QtCore.QMutexLocker(self.__settings.aimutex):
-                if self.__settings.ai is not None:
-                    chi = self.__settings.ai.chi(
-                        np.array([y - 0.5]), np.array([x - 0.5]))
-                    if len(chi):
-                        chi = chi[0]
+            chi = self.__lookup("chi", x, y)
             if self.__unitindex in [2, 3]:
-                tth = None
-                with QtCore.QMutexLocker(self.__settings.aimutex):
-                    if self.__settings.ai is not None:
-                        tth = self.__settings.ai.tth(
-                            np.array([y - 0.5]), np.array([x - 0.5])),
-                        if len(tth):
-                            tth = tth[0]
+                tth = self.__lookup("theta", x, y)
                 if tth is not None and chi is not None:
                     unit = "rad"
                     if self.__unitindex == 2:
@@ -4803,20 +4802,13 @@ class DiffractogramToolWidget(ToolBaseWidget):
                     message = "x, y = [%s, %s], %s = %.2f" % (
                         x, y, ilabel, intensity)
             elif self.__unitindex in [0, 1]:
-                qa = None
-                with QtCore.QMutexLocker(self.__settings.aimutex):
-                    if self.__settings.ai is not None:
-                        qa = self.__settings.ai.qFunction(
-                            np.array([y - 0.5]), np.array([x - 0.5])),
-                        if len(qa):
-                            qa = qa[0]
+                qa = self.__lookup("q", x, y)
                 if qa is not None and chi is not None:
                     unit = u"1/\u212B"
                     chi = chi * 180./math.pi
                     if self.__unitindex == 0:
                         unit = "1/nm"
-                    if self.__unitindex == 1:
-                        qa = qa / 10.
+                        qa = qa * 10.
                     message = "x, y = [%s, %s], q = %f %s, chi = %f %s," \
                               " %s = %.2f" \
                               % (x, y, qa, unit,
@@ -4826,13 +4818,7 @@ class DiffractogramToolWidget(ToolBaseWidget):
                     message = "x, y = [%s, %s], %s = %.2f" % (
                         x, y, ilabel, intensity)
             elif self.__unitindex in [4]:
-                ra = None
-                with QtCore.QMutexLocker(self.__settings.aimutex):
-                    if self.__settings.ai is not None:
-                        ra = self.__settings.ai.rFunction(
-                            np.array([y - 0.5]), np.array([x - 0.5])),
-                        if len(ra):
-                            ra = ra[0] * 1000.
+                ra = self.__lookup("radius", x, y)
                 if ra is not None and chi is not None:
                     chi = chi * 180./math.pi
                     message = "x, y = [%s, %s], r = %f %s, chi = %f %s," \
@@ -4974,26 +4960,20 @@ class DiffractogramToolWidget(ToolBaseWidget):
                         unit = "r_mm"
                     else:
                         unit = self.__units[self.__unitindex]
-                    dts = dts if trans else dts.T
-                    mask = None
-                    if dts.dtype.kind == 'f' and np.isnan(dts.min()):
-                        mask = np.isnan(dts)
-                        dts = np.array(dts)
-                        dts[mask] = 0.
-                        if mask is not None:
-                            mask = mask.astype("int")
+                    masks = []
                     if self.__settings.showhighvaluemask and \
                        self._mainwidget.maskValue() is not None and \
                        self._mainwidget.maskValueIndices() is not None:
-                        if mask is None:
-                            mask = np.zeros(dts.shape)
-                        mask[self._mainwidget.maskValueIndices().T] = 1
+                        masks.append(self._mainwidget.maskValueIndices().T)
                     if self.__settings.showmask and \
                        self._mainwidget.applyMask() and \
                        self._mainwidget.maskIndices() is not None:
-                        if mask is None:
-                            mask = np.zeros(dts.shape)
-                        mask[self._mainwidget.maskIndices().T] = 1
+                        masks.append(self._mainwidget.maskIndices().T)
+                    invalid = self._mainwidget.invalidMask()
+                    if invalid is not None and invalid.any():
+                        masks.append(invalid if trans else invalid.T)
+                    dts, mask = imageStages.integrationData(
+                        dts if trans else dts.T, masks)
                     for i in range(nrplots):
                         try:
                             with QtCore.QMutexLocker(self.__settings.aimutex):
@@ -5368,7 +5348,43 @@ class DiffractogramToolWidget(ToolBaseWidget):
         self.__updateaz()
         self.__updaterad()
         self.updateRangeTip()
-        self.runProgress(["findregions"], "_updateRegionsAndPlot")
+        with QtCore.QMutexLocker(self.__settings.aimutex):
+            cached = self.__settings.ai is not None and \
+                self.__regioncontours.isCached(self.__regionShape())
+        if cached:
+            # outlines of cached angle maps are updated interactively
+            self.findregions()
+            self._updateRegionsAndPlot()
+        else:
+            self.runProgress(["findregions"], "_updateRegionsAndPlot")
+
+    def __regionShape(self):
+        """ provides shape of the current image
+
+        :returns: image shape
+        :rtype: (:obj:`int`, :obj:`int`)
+        """
+        dts = self._mainwidget.rawData()
+        if dts is not None and dts.shape and len(dts.shape) == 2:
+            return dts.shape
+        return (1000, 1000)
+
+    def __lookup(self, name, x, y):
+        """ provides the geometry map value of the current image pixel
+
+        :param name: map name, i.e. theta, chi, q or radius
+        :type name: :obj:`str`
+        :param x: x pixel position
+        :type x: :obj:`float`
+        :param y: y pixel position
+        :type y: :obj:`float`
+        :returns: map value or None
+        :rtype: :obj:`float`
+        """
+        with QtCore.QMutexLocker(self.__settings.aimutex):
+            if self.__settings.ai is not None:
+                return self.__settings.geometrymaps.lookup(
+                    name, x, y, self.__regionShape())
 
     # @debugmethod
     def findregions(self):
@@ -5378,6 +5394,7 @@ class DiffractogramToolWidget(ToolBaseWidget):
         regions = []
         with QtCore.QMutexLocker(self.__settings.aimutex):
             aistat = self.__settings.ai is not None
+        shape = self.__regionShape()
         for i in range(nrplots):
             if ((self.__azrange and self.__azrange[i]) or
                (self.__radrange and self.__radrange[i])) and aistat:
@@ -5390,14 +5407,16 @@ class DiffractogramToolWidget(ToolBaseWidget):
                 radend = self.__radend[i] \
                     if self.__radend[i] is not None else 70
                 try:
-                    regions.append(
-                        self.__findregion(radstart, radend, azstart, azend))
+                    with QtCore.QMutexLocker(self.__settings.aimutex):
+                        regions.append(
+                            self.__regioncontours.lines(
+                                shape, radstart, radend, azstart, azend))
                 except Exception as e:
                     try:
                         logger.warning(str(e))
                         # print(str(e))
                         regions.append(
-                            self.__findregion2(
+                            self.__findregion(
                                 radstart, radend, azstart, azend))
                     except Exception as e2:
                         logger.warning(str(e2))
@@ -5443,79 +5462,6 @@ class DiffractogramToolWidget(ToolBaseWidget):
         logger.debug("closing Progress ENDED")
         return status
 
-    def __findregion2(self, radstart, radend, azstart, azend):
-        """ find region defined by angle range using image masking method
-
-        :param radstart: start of radial region
-        :type radstart: :obj:`float`
-        :param radend: end of radial region
-        :type radend: :obj:`float`
-        :param azstart: start of azimuth region
-        :type azstart: :obj:`float`
-        :param azend: end of azimuth region
-        :type azend: :obj:`float`
-        :returns: list of region lines
-        :rtype:  :obj:`list` < :obj:`list` < (float, float) > >
-        """
-        if azend - azstart >= 360:
-            azstart = 0
-            azend = 360
-        with QtCore.QMutexLocker(self.__settings.aimutex):
-            aistat = self.__settings.ai is not None
-        if aistat:
-            dts = self._mainwidget.rawData()
-
-            if dts is not None and dts.shape and len(dts.shape) == 2:
-                shape = dts.T.shape
-            else:
-                shape = [1000., 1000.]
-            with QtCore.QMutexLocker(self.__settings.aimutex):
-                tta = self.__settings.ai.twoThetaArray(shape)
-                cha = self.__settings.ai.chiArray(shape)
-            rb = self.__degtrim(radstart, 0, 360) * math.pi / 180.
-            re = self.__degtrim(radend, 0, 360) * math.pi / 180.
-
-            ab = self.__degtrim(azstart, -180, 180) * math.pi / 180.
-            ae = self.__degtrim(azend, -180, 180) * math.pi / 180.
-
-            lines = []
-
-            if azend - azstart < 360:
-                chmask = (cha < ab) | (cha > ae)
-                ttaa = (tta - rb) * (tta - re)
-                ttaa[chmask] = 6
-                rblines = functions.isocurve(
-                    ttaa, 0, connected=True)
-                logger.debug("RUN1 %s " % len(rblines))
-
-                thmask = (tta < rb) | (tta > re)
-                chaa = (cha - ab) * (cha - ae)
-                chaa[thmask] = 6
-                ablines = functions.isocurve(
-                    chaa, 0, connected=True)
-                logger.debug("RUN2 %s " % len(ablines))
-            else:
-                ttaa = (tta - rb) * (tta - re)
-                rblines = functions.isocurve(
-                    ttaa, 0, connected=True)
-                logger.debug("RUN4 %s " % len(rblines))
-
-            for line in rblines:
-                lines.append([(p[1], p[0]) for p in line])
-            if azend - azstart < 360:
-                for line in ablines:
-                    lines.append([(p[1], p[0]) for p in line])
-            # for line in relines:
-            #     lines.append([(p[1], p[0]) for p in line])
-
-            # print(lines)
-            return lines
-            # self._mainwidget.updateRegions(lines)
-
-        else:
-            return []
-            # self._mainwidget.updateRegions([[(0, 0)]])
-
     def __findregion(self, radstart, radend, azstart, azend):
         """ find region defined by angle range using Newton method
 
@@ -6322,7 +6268,8 @@ class MaximaToolWidget(ToolBaseWidget):
             x, y = txdata, tydata
         ilabel = self._mainwidget.scalingLabel()
         if self.__gspaceindex == 0:
-            thetax, thetay, thetatotal = self.__pixel2theta(x, y)
+            thetax, thetay, thetatotal = \
+                self.__settings.geometrymaps.pixel2theta(x, y)
             if thetax is not None:
                 message = "th_x = %f deg, th_y = %f deg," \
                           " th_tot = %f deg, %s = %.2f" \
@@ -6331,7 +6278,7 @@ class MaximaToolWidget(ToolBaseWidget):
                              thetatotal * 180 / math.pi,
                              ilabel, intensity)
         elif self.__gspaceindex == 1:
-            qx, qy, q = self.__pixel2q(x, y)
+            qx, qy, q = self.__settings.geometrymaps.pixel2q(x, y)
             if qx is not None:
                 message = u"q_x = %f 1/\u212B, q_y = %f 1/\u212B, " \
                           u"q = %f 1/\u212B, %s = %.2f" \
@@ -6341,63 +6288,6 @@ class MaximaToolWidget(ToolBaseWidget):
                 x, y, ilabel, intensity)
         self._mainwidget.setDisplayedText(message)
 
-    def __pixel2theta(self, xdata, ydata, xy=True):
-        """ converts coordinates from pixel positions to theta angles
-
-        :param xdata: x pixel position
-        :type xdata: :obj:`float`
-        :param ydata: y-pixel position
-        :type ydata: :obj:`float`
-        :param xy: flag
-        :type xy: :obj:`bool`
-        :returns: x-theta, y-theta, total-theta
-        :rtype: (:obj:`float`, :obj:`float`, :obj:`float`)
-        """
-        thetax = None
-        thetay = None
-        thetatotal = None
-        if self.__settings.energy > 0 and self.__settings.detdistance > 0:
-            xcentered = xdata - self.__settings.centerx
-            ycentered = ydata - self.__settings.centery
-            if xy:
-                thetax = math.atan(
-                    xcentered * self.__settings.pixelsizex / 1000.
-                    / self.__settings.detdistance)
-                thetay = math.atan(
-                    ycentered * self.__settings.pixelsizey / 1000.
-                    / self.__settings.detdistance)
-            r = math.sqrt(
-                (xcentered * self.__settings.pixelsizex / 1000.) ** 2
-                + (ycentered * self.__settings.pixelsizey / 1000.) ** 2)
-            thetatotal = math.atan(
-                r / self.__settings.detdistance)
-        return thetax, thetay, thetatotal
-
-    def __pixel2q(self, xdata, ydata, xy=True):
-        """ converts coordinates from pixel positions to q-space coordinates
-
-        :param xdata: x pixel position
-        :type xdata: :obj:`float`
-        :param ydata: y-pixel position
-        :type ydata: :obj:`float`
-        :param xy: flag
-        :type xy: :obj:`bool`
-        :returns: q_x, q_y, q_total
-        :rtype: (:obj:`float`, :obj:`float`, :obj:`float`)
-        """
-        qx = None
-        qy = None
-        q = None
-        if self.__settings.energy > 0 and self.__settings.detdistance > 0:
-            thetax, thetay, thetatotal = self.__pixel2theta(
-                xdata, ydata, xy)
-            wavelength = 12398.4193 / self.__settings.energy
-            if xy:
-                qx = 4 * math.pi / wavelength * math.sin(thetax/2.)
-                qy = 4 * math.pi / wavelength * math.sin(thetay/2.)
-            q = 4 * math.pi / wavelength * math.sin(thetatotal/2.)
-        return qx, qy, q
-
     def __tipmessage(self):
         """ provides geometry messate
 
@@ -6911,6 +6801,11 @@ class QROIProjToolWidget(ToolBaseWidget):
                     npfun = np.nansum
                 else:
                     npfun = np.nanmean
+                invalid = self._mainwidget.invalidMask()
+                if not self.__funindex and invalid is not None:
+                    # invalid pixels of integer images are not averaged
+                    dts = validityMask.maskedImage(dts, invalid)
+                    npfun = validityMask.nanmean
 
                 if self.__dsrows == "ERROR":
                     sx = []
@@ -6922,7 +6817,7 @@ class QROIProjToolWidget(ToolBaseWidget):
                             if isinstance(self.__dsrows, slice):
                                 sx = npfun(dts[:, self.__dsrows], axis=1)
                             else:
-                                sx = dts[:, self.__dsrows]
+                                sx = np.ma.getdata(dts[:, self.__dsrows])
                     except Exception:
                         sx = []
 
@@ -6942,7 +6837,7 @@ class QROIProjToolWidget(ToolBaseWidget):
                             if isinstance(self.__dscolumns, slice):
                                 sy = npfun(dts[self.__dscolumns, :], axis=0)
                             else:
-                                sy = dts[self.__dscolumns, :]
+                                sy = np.ma.getdata(dts[self.__dscolumns, :])
                     except Exception:
                         sy = []
                 else:
@@ -7244,7 +7139,8 @@ class QROIProjToolWidget(ToolBaseWidget):
                 y = tydata
         ilabel = self._mainwidget.scalingLabel()
         if self.__gspaceindex == 0:
-            thetax, thetay, thetatotal = self.__pixel2theta(x, y)
+            thetax, thetay, thetatotal = \
+                self.__settings.geometrymaps.pixel2theta(x, y)
             if thetax is not None:
                 message = "th_x = %f deg, th_y = %f deg," \
                           " th_tot = %f deg, %s = %.2f" \
@@ -7253,7 +7149,7 @@ class QROIProjToolWidget(ToolBaseWidget):
                              thetatotal * 180 / math.pi,
                              ilabel, intensity)
         else:
-            qx, qy, q = self.__pixel2q(x, y)
+            qx, qy, q = self.__settings.geometrymaps.pixel2q(x, y)
             if qx is not None:
                 message = u"q_x = %f 1/\u212B, q_y = %f 1/\u212B, " \
                           u"q = %f 1/\u212B, %s = %.2f" \
@@ -7261,57 +7157,6 @@ class QROIProjToolWidget(ToolBaseWidget):
 
         self._mainwidget.updateDisplayedText(message)
 
-    def __pixel2theta(self, xdata, ydata):
-        """ converts coordinates from pixel positions to theta angles
-
-        :param xdata: x pixel position
-        :type xdata: :obj:`float`
-        :param ydata: y-pixel position
-        :type ydata: :obj:`float`
-        :returns: x-theta, y-theta, total-theta
-        :rtype: (:obj:`float`, :obj:`float`, :obj:`float`)
-        """
-        thetax = None
-        thetay = None
-        thetatotal = None
-        if self.__settings.energy > 0 and self.__settings.detdistance > 0:
-            xcentered = xdata - self.__settings.centerx
-            ycentered = ydata - self.__settings.centery
-            thetax = math.atan(
-                xcentered * self.__settings.pixelsizex / 1000.
-                / self.__settings.detdistance)
-            thetay = math.atan(
-                ycentered * self.__settings.pixelsizey / 1000.
-                / self.__settings.detdistance)
-            r = math.sqrt(
-                (xcentered * self.__settings.pixelsizex / 1000.) ** 2
-                + (ycentered * self.__settings.pixelsizey / 1000.) ** 2)
-            thetatotal = math.atan(
-                r / self.__settings.detdistance)
-        return thetax, thetay, thetatotal
-
-    def __pixel2q(self, xdata, ydata):
-        """ converts coordinates from pixel positions to q-space coordinates
-
-        :param xdata: x pixel position
-        :type xdata: :obj:`float`
-        :param ydata: y-pixel position
-        :type ydata: :obj:`float`
-        :returns: q_x, q_y, q_total
-        :rtype: (:obj:`float`, :obj:`float`, :obj:`float`)
-        """
-        qx = None
-        qy = None
-        q = None
-        if self.__settings.energy > 0 and self.__settings.detdistance > 0:
-            thetax, thetay, thetatotal = self.__pixel2theta(
-                xdata, ydata)
-            wavelength = 12398.4193 / self.__settings.energy
-            qx = 4 * math.pi / wavelength * math.sin(thetax/2.)
-            qy = 4 * math.pi / wavelength * math.sin(thetay/2.)
-            q = 4 * math.pi / wavelength * math.sin(thetatotal/2.)
-        return qx, qy, q
-
     def __tipmessage(self):
         """ provides geometry messate
 
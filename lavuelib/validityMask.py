@@ -0,0 +1,125 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+
+""" validity masks of integer images, i.e. masked pixels are kept
+    in the native data type as zeros and marked by a boolean mask """
+
+import numpy as np
+
+#: (:obj:`int`) ARGB32 color of invalid pixels
+MASKCOLOR = 0xFFFF00FF
+
+
+def isIntegerImage(image):
+    """ checks if the image is masked by a validity mask
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :returns: integer image flag
+    :rtype: :obj:`bool`
+    """
+    return isinstance(image, np.ndarray) and image.dtype.kind in "iu"
+
+
+def maskPixels(image, indices, invalid=None):
+    """ sets masked pixels to zero and marks them in the validity mask
+
+    :param image: integer image
+    :type image: :class:`numpy.ndarray`
+    :param indices: boolean array of masked pixels
+    :type indices: :class:`numpy.ndarray`
+    :param invalid: validity mask to update, i.e. True for invalid pixels
+    :type invalid: :class:`numpy.ndarray`
+    :returns: masked image copy and validity mask
+    :rtype: (:class:`numpy.ndarray`, :class:`numpy.ndarray`)
+    """
+    image = np.array(image)
+    image[indices] = 0
+    if invalid is None:
+        invalid = np.array(indices, dtype=bool)
+    else:
+        invalid = invalid | indices
+    return image, invalid
+
+
+def matches(image, invalid):
+    """ checks if the validity mask covers the image pixels
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param invalid: validity mask
+    :type invalid: :class:`numpy.ndarray`
+    :returns: if the mask can be applied to the image
+    :rtype: :obj:`bool`
+    """
+    return invalid is not None and image is not None and \
+        invalid.shape == image.shape[:invalid.ndim]
+
+
+def validPixels(image, invalid):
+    """ provides values of valid pixels
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param invalid: validity mask
+    :type invalid: :class:`numpy.ndarray`
+    :returns: valid pixel values or the image if there is no mask
+    :rtype: :class:`numpy.ndarray`
+    """
+    if not matches(image, invalid) or not invalid.any():
+        return image
+    return image[~invalid]
+
+
+def maskedImage(image, invalid):
+    """ provides the masked array view of the image
+        for projections of valid pixels
+
+    :param image: image
+    :type image: :class:`numpy.ndarray`
+    :param invalid: validity mask
+    :type invalid: :class:`numpy.ndarray`
+    :returns: masked array or the image if there is no mask
+    :rtype: :class:`numpy.ma.MaskedArray` or :class:`numpy.ndarray`
+    """
+    if not matches(image, invalid) or invalid.shape != image.shape:
+        return image
+    return np.ma.masked_array(image, mask=invalid)
+
+
+def nanmean(image, axis=None):
+    """ provides the mean value of valid pixels
+
+    :param image: image or masked array
+    :type image: :class:`numpy.ndarray` or :class:`numpy.ma.MaskedArray`
+    :param axis: reduction axis
+    :type axis: :obj:`int`
+    :returns: mean values, NaN for empty slices
+    :rtype: :class:`numpy.ndarray`
+    """
+    if isinstance(image, np.ma.MaskedArray):
+        return np.ma.filled(
+            np.ma.mean(image, axis=axis).astype("float64"), np.nan)
+    return np.nanmean(image, axis=axis)
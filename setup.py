@@ -71,7 +71,8 @@ QRCDIR = os.path.join(NAME, "qrc")
 PLGNSDIR = os.path.join(NAME, "plugins")
 #: (:obj:`list` < :obj:`str` >) executable scripts
 SCRIPTS = ['lavuemonitor', 'lavuezmqstreamfromtango',
-           'LavueController', 'lavuezmqstreamtest']
+           'LavueController', 'lavuezmqstreamtest', 'lavueheadless',
+           'lavueshmstreamtest']
 #: (:obj:`list` < :obj:`str` >) executable GUI scripts
 GUISCRIPTS = ['lavue', 'lavuetaurus']
 
@@ -56,6 +56,7 @@ except Exception:
 import argparse
 import lavuelib
 import lavuelib.liveViewer
+import lavuelib.imageSource
 from pyqtgraph import QtGui
 from pyqtgraph import QtCore
 from pyqtgraph.Qt import QtTest
@@ -1005,6 +1006,80 @@ class ASAPOImageSourceTest(unittest.TestCase):
         self.assertTrue(iid < 12000)
         self.assertEqual(fnames[0].strip(), "scan05c_3.cbf")
 
+    def getPrefetchedData(self, source, timeout=10):
+        start = time.time()
+        while time.time() - start < timeout:
+            image, name, mdata = source.getData()
+            if name:
+                return image, name, mdata
+            time.sleep(0.01)
+        return None, None, None
+
+    def test_source_next(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        fname = "%s/%s" % (os.path.abspath(path), "test/images/00001.tif")
+        asapo_consumer.filename = fname
+        asapo_consumer.usermeta = None
+        asapo_consumer.streams = ["stream1", "stream2"]
+        image = fabio.open(fname).data
+
+        source = lavuelib.imageSource.ASAPOSource()
+        source.setConfiguration(
+            "haso.desy.de:8500,detector,stream1,123124,,"
+            "2asaldskjsalkdjflsakjflksj,next")
+        self.assertTrue(source.connect())
+        try:
+            ids = []
+            for _ in range(5):
+                img, name, mdata = self.getPrefetchedData(source)
+                self.assertTrue(np.allclose(img, image.T))
+                fnames = name.split("(")
+                self.assertEqual(fnames[0].strip(), "00001.tif")
+                ids.append(int(fnames[1][:-1]))
+                if mdata:
+                    self.assertEqual(
+                        json.loads(mdata),
+                        {"asapostreams": ["stream1", "stream2"]})
+            # get_next follows the stream without skipping messages
+            self.assertEqual(ids, list(range(ids[0], ids[0] + 5)))
+            self.assertTrue(ids[0] > 14000)
+            self.assertTrue(ids[0] < 15000)
+        finally:
+            source.disconnect()
+        self.assertEqual(source.getData()[1], "__ERROR__")
+
+    def test_source_last(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        fname = "%s/%s" % (os.path.abspath(path), "test/images/00002.tif")
+        asapo_consumer.filename = fname
+        asapo_consumer.usermeta = None
+        asapo_consumer.streams = ["stream1", "stream2"]
+        image = fabio.open(fname).data
+
+        source = lavuelib.imageSource.ASAPOSource()
+        source.setConfiguration(
+            "haso.desy.de:8500,detector,default,123124,,"
+            "2asaldskjsalkdjflsakjflksj,last")
+        self.assertTrue(source.connect())
+        try:
+            lastid = 0
+            for _ in range(3):
+                img, name, _ = self.getPrefetchedData(source)
+                self.assertTrue(np.allclose(img, image.T))
+                fnames = name.split("(")
+                self.assertEqual(fnames[0].strip(), "00002.tif")
+                iid = int(fnames[1][:-1])
+                self.assertTrue(iid > lastid)
+                self.assertTrue(iid > 11000)
+                self.assertTrue(iid < 12000)
+                lastid = iid
+        finally:
+            source.disconnect()
+
 
 if __name__ == '__main__':
     if app is None:
@@ -0,0 +1,149 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import time
+import warnings
+import numpy as np
+
+from lavuelib import blockReduction
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class BlockReductionTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+        self.__minsize = blockReduction.MINPARALLELSIZE
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        blockReduction.BlockReducer.setNumberOfThreads(0)
+        blockReduction.MINPARALLELSIZE = self.__minsize
+
+    def reference(self, image, factor, reduction):
+        shape = image.shape
+        result = np.empty(
+            shape[:-2] + (-(-shape[-2] // factor), -(-shape[-1] // factor)))
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            for i in range(result.shape[-2]):
+                for j in range(result.shape[-1]):
+                    result[..., i, j] = getattr(np, reduction)(
+                        image[..., i * factor:(i + 1) * factor,
+                              j * factor:(j + 1) * factor],
+                        axis=(-1, -2))
+        return result
+
+    def checkReductions(self):
+        for shape in [(37, 53), (3, 20, 31), (9, 9)]:
+            for dtype in ["uint16", "int32", "float32"]:
+                image = np.random.randint(0, 1000, size=shape).astype(dtype)
+                if dtype == "float32":
+                    image[image > 900] = np.nan
+                for factor in [2, 3, 4, 10]:
+                    for reduction in blockReduction.REDUCTIONS:
+                        for img in [image, np.swapaxes(image, -1, -2)]:
+                            with warnings.catch_warnings():
+                                warnings.simplefilter("ignore")
+                                reduced = blockReduction.reduce(
+                                    img, factor, reduction)
+                            self.assertTrue(
+                                np.allclose(
+                                    reduced,
+                                    self.reference(img, factor, reduction),
+                                    equal_nan=True, rtol=1e-5),
+                                "%s %s %s %s" % (
+                                    shape, dtype, factor, reduction))
+                            if reduction in ["max", "min"]:
+                                self.assertEqual(reduced.dtype, img.dtype)
+
+    def test_reduce(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        self.checkReductions()
+        image = np.random.randint(0, 1000, size=(20, 30)).astype("uint16")
+        self.assertTrue(blockReduction.reduce(image, 1, "max") is image)
+        out = np.zeros((7, 10), dtype="float32")
+        self.assertTrue(
+            blockReduction.reduce(image, 3, "mean", out=out) is out)
+        self.assertTrue(np.allclose(out, self.reference(image, 3, "mean")))
+        self.assertRaises(
+            ValueError, blockReduction.reduce, image, 3, "mean",
+            np.zeros((6, 10)))
+        self.assertRaises(
+            ValueError, blockReduction.reduce, image, 3, "std")
+
+    def test_threads(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        blockReduction.BlockReducer.setNumberOfThreads(3)
+        blockReduction.MINPARALLELSIZE = 1
+        self.checkReductions()
+
+    def test_reduce_stack(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        blockReduction.BlockReducer.setNumberOfThreads(2)
+        blockReduction.MINPARALLELSIZE = 1
+        stack = np.random.rand(5, 30, 20)
+        stack[stack > 0.9] = np.nan
+        for reduction in blockReduction.REDUCTIONS:
+            for stk in [stack, stack[:, 0, :], stack.astype("uint8")]:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    reduced = blockReduction.reduceStack(stk, reduction)
+                    expected = getattr(np, reduction)(stk, axis=0)
+                self.assertEqual(reduced.dtype, expected.dtype)
+                self.assertTrue(
+                    np.allclose(reduced, expected, equal_nan=True))
+
+
+if __name__ == '__main__':
+    unittest.main()
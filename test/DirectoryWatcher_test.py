@@ -0,0 +1,169 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import time
+import shutil
+import tempfile
+import numpy as np
+import h5py
+
+from lavuelib import directoryWatcher
+from lavuelib import imageSource
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class DirectoryWatcherTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+        self._images = np.random.randint(
+            0, 1000, size=(4, 23, 17)).astype("uint16")
+        self._dir = tempfile.mkdtemp()
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        shutil.rmtree(self._dir)
+
+    def writeImage(self, name, image):
+        fname = os.path.join(self._dir, name)
+        with h5py.File(fname, "w") as fl:
+            fl.create_dataset("data", data=image[np.newaxis])
+        return fname
+
+    def checkWatcher(self, polling):
+        open(os.path.join(self._dir, "old.h5"), "w").close()
+        watcher = directoryWatcher.DirectoryWatcher(
+            self._dir, "*.h5", polling)
+        self.assertEqual(watcher.mode, "polling" if polling else "inotify")
+        self.assertEqual(watcher.newFiles(), [])
+        self.assertEqual(
+            watcher.latestFile(), os.path.join(self._dir, "old.h5"))
+
+        fl = open(os.path.join(self._dir, "open.h5"), "w")
+        fl.write("0")
+        fl.flush()
+        self.assertEqual(watcher.newFiles(), [])
+        open(os.path.join(self._dir, "skip.txt"), "w").close()
+        open(os.path.join(self._dir, ".hidden.h5"), "w").close()
+        # polling takes a file as complete if it has not changed
+        fl.write("1")
+        fl.close()
+        if polling:
+            self.assertEqual(watcher.newFiles(), [])
+        self.assertEqual(
+            watcher.newFiles(), [os.path.join(self._dir, "open.h5")])
+        self.assertEqual(watcher.newFiles(), [])
+        watcher.close()
+
+    def test_inotify(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if not directoryWatcher.INOTIFY:
+            return
+        self.checkWatcher(False)
+
+    def test_polling(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        self.checkWatcher(True)
+        self.assertRaises(
+            ValueError, directoryWatcher.DirectoryWatcher,
+            os.path.join(self._dir, "missing"))
+
+    def test_source(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        for polling in [False, True]:
+            first = self.writeImage("first_%s.h5" % polling, self._images[0])
+            source = imageSource.DirectoryWatchSource()
+            self.assertEqual(source.getData()[1], "__ERROR__")
+            source.setConfiguration("%s,*.h5,,%s" % (self._dir, polling))
+            self.assertTrue(source.connect())
+            image, name = None, None
+            for _ in range(100):
+                image, name, _ = source.getData()
+                if name is not None:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(name, first)
+            self.assertTrue(
+                np.array_equal(image, np.transpose(self._images[0])))
+            frameid = source.frameNumber()
+
+            for i in [1, 2]:
+                self.writeImage("img%s.h5" % i, self._images[i])
+            last = self.writeImage("img3.h5", self._images[3])
+            image, name = None, None
+            for _ in range(100):
+                image, name, _ = source.getData()
+                if name is not None:
+                    break
+                time.sleep(0.01)
+            self.assertEqual(name, last)
+            self.assertTrue(
+                np.array_equal(image, np.transpose(self._images[3])))
+            self.assertTrue(source.frameNumber() > frameid)
+            self.assertEqual(source.getData(), (None, None, None))
+            source.disconnect()
+            for name in os.listdir(self._dir):
+                os.remove(os.path.join(self._dir, name))
+
+        source.setConfiguration(
+            "%s,*.h5,/data" % os.path.join(self._dir, "missing"))
+        self.assertFalse(source.connect())
+        self.assertEqual(source.getData()[1], "__ERROR__")
+        self.assertEqual(
+            imageSource.DirectoryWatchSource.parseConfiguration(
+                "/tmp/pilatus"),
+            ("/tmp/pilatus", "*", None, False))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -29,6 +29,7 @@ import struct
 import binascii
 import time
 import logging
+import datetime
 import numpy as np
 import fabio
 
@@ -44,6 +45,7 @@ except Exception:
 import argparse
 import lavuelib
 import lavuelib.liveViewer
+import lavuelib.imageSource
 from pyqtgraph import QtGui
 from pyqtgraph import QtCore
 from pyqtgraph.Qt import QtTest
@@ -252,6 +254,77 @@ class EpicsImageSourceTest(unittest.TestCase):
         self.assertTrue(np.allclose(res3[0], lastimage))
         self.assertTrue(np.allclose(res3[1], lastimage))
 
+    def test_monitor(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        monitor = lavuelib.imageSource.EpicsPVSource.monitor
+        lavuelib.imageSource.EpicsPVSource.monitor = True
+        try:
+            source = lavuelib.imageSource.EpicsPVSource(3000)
+            source.setConfiguration("13SIM1:image1:ArrayData,[3,2]")
+            self.assertTrue(source.connect())
+            pv = epics.pvs["13SIM1:image1:ArrayData"]
+            counter = epics.pvs["13SIM1:image1:ArrayCounter_RBV"]
+            self.assertEqual(pv.auto_monitor, True)
+            self.assertEqual(len(pv.callbacks), 1)
+            self.assertEqual(source.getData(), (None, None, None))
+
+            data1 = np.arange(6, dtype="uint16")
+            counter.post(11)
+            pv.post(data1, timestamp=1000.5)
+            data1[:] = 100
+            image, name, _ = source.getData()
+            self.assertTrue(np.array_equal(
+                image, np.arange(6).reshape(2, 3).T))
+            self.assertEqual(name, "13SIM1:image1:ArrayData,[3,2] (11)")
+            # no update from the IOC
+            self.assertEqual(source.getData(), (None, None, None))
+            # reposted value
+            pv.post(data1, timestamp=1000.5)
+            self.assertEqual(source.getData(), (None, None, None))
+
+            # double buffering
+            data2 = np.arange(6, 12, dtype="uint16")
+            counter.post(12)
+            pv.post(data2, timestamp=1001.5)
+            image2, name, _ = source.getData()
+            self.assertEqual(name, "13SIM1:image1:ArrayData,[3,2] (12)")
+            counter.post(13)
+            pv.post(data2 + 10, timestamp=1002.5)
+            self.assertTrue(np.array_equal(
+                image2, np.arange(6, 12).reshape(2, 3).T))
+            image3, name, _ = source.getData()
+            self.assertTrue(np.array_equal(
+                image3, np.arange(16, 22).reshape(2, 3).T))
+
+            source.disconnect()
+            self.assertEqual(len(pv.callbacks), 0)
+        finally:
+            lavuelib.imageSource.EpicsPVSource.monitor = monitor
+
+    def test_monitor_timestamp(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        monitor = lavuelib.imageSource.EpicsPVSource.monitor
+        lavuelib.imageSource.EpicsPVSource.monitor = True
+        try:
+            source = lavuelib.imageSource.EpicsPVSource(3000)
+            source.setConfiguration("00SIM0:cam2:,[]")
+            self.assertTrue(source.connect())
+            pv = epics.pvs["00SIM0:cam2:"]
+            data = np.arange(6, dtype="float32")
+            pv.post(data, timestamp=1000.5)
+            image, name, _ = source.getData()
+            self.assertTrue(np.array_equal(image, data))
+            self.assertEqual(
+                name, "00SIM0:cam2:,[] (%s)" % datetime.datetime.
+                fromtimestamp(1000.5).isoformat())
+            source.disconnect()
+        finally:
+            lavuelib.imageSource.EpicsPVSource.monitor = monitor
+
 
 if __name__ == '__main__':
     if app is None:
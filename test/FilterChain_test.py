@@ -0,0 +1,191 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import json
+import random
+import binascii
+import time
+import numpy as np
+
+from lavuelib import filters
+from lavuelib.plugins import filters as pfilters
+
+if sys.version_info > (3,):
+    long = int
+
+
+class AddOne(filters.BaseFilter):
+
+    """ in-place filter with a known output shape """
+
+    inplace = True
+    threadsafe = True
+
+    def outputShape(self, shape):
+        return shape
+
+    def __call__(self, image, imagename, metadata, imagewg, out=None):
+        np.add(image, 1, out=out)
+        return out, {"addone": True}
+
+
+class Fail(filters.BaseFilter):
+
+    """ filter raising an exception """
+
+    def __call__(self, image, imagename, metadata, imagewg):
+        raise ValueError("fail")
+
+
+# test fixture
+class FilterChainTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        pass
+
+    def test_gaps(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        for shape in [(37, 53), (3, 20, 31)]:
+            image = np.random.randint(0, 1000, size=shape).astype("int32")
+            configlist = []
+            for _ in range(self.__rnd.randint(1, 4)):
+                name = self.__rnd.choice(["HGap", "VGap"])
+                size = shape[1] if name == "HGap" else shape[0]
+                indexes = [self.__rnd.randint(-size, size)
+                           for _ in range(self.__rnd.randint(0, 5))]
+                configlist.append(
+                    ["lavuelib.plugins.filters.%s" % name,
+                     json.dumps(indexes)])
+            chain = filters.FilterChain()
+            chain.reset(configlist)
+            expected = image
+            for flt in chain:
+                expected = flt(expected, "", "", None)
+            results = [chain.apply(image, "", "", None)[0]
+                       for _ in range(3)]
+            for result in results:
+                self.assertTrue(np.array_equal(result, expected))
+            # the returned images are kept intact by the next frames
+            self.assertTrue(results[0] is not results[1])
+            self.assertTrue(results[0] is not results[2])
+            self.assertEqual(chain.threadSafeCount(), len(configlist))
+
+        chain = filters.FilterChain()
+        chain.reset([["lavuelib.plugins.filters.VGap", "[3, 40]"]])
+        self.assertRaises(
+            IndexError, chain.apply, np.zeros((10, 10)), "", "", None)
+
+    def test_inplace(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.rand(20, 30)
+        image[3, 4] = np.nan
+        original = np.array(image)
+        chain = filters.FilterChain()
+        chain.reset([["lavuelib.plugins.filters.rot45", ""]])
+        self.assertEqual(chain.threadSafeCount(), 1)
+        result = chain.apply(image, "", "", None)[0]
+        self.assertTrue(np.array_equal(image, original, equal_nan=True))
+        self.assertTrue(
+            np.allclose(result, pfilters.rot45(np.array(image), "", "", None)))
+
+        chain = filters.FilterChain()
+        chain.reset([["lavuelib.plugins.filters.HGap", "[5]"]])
+        addone = AddOne()
+        chain.append(addone)
+        result, mdata = chain.apply(original, "", "", None)
+        expected = np.insert(original, [5], 0, axis=1) + 1
+        self.assertTrue(np.allclose(result, expected, equal_nan=True))
+        self.assertEqual(mdata, {"addone": True})
+        # the gap pixels are cleared in the reused output
+        kept = chain.apply(original, "", "", None)[0]
+        chain.apply(original + 1, "", "", None)
+        result, mdata = chain.apply(original, "", "", None)
+        self.assertTrue(np.allclose(result, expected, equal_nan=True))
+        self.assertTrue(np.allclose(kept, expected, equal_nan=True))
+
+        # the input image is copied before an in-place filter
+        chain = filters.FilterChain()
+        chain.append(addone)
+        result = chain.apply(original, "", "", None)[0]
+        self.assertTrue(np.array_equal(image, original, equal_nan=True))
+        self.assertTrue(np.allclose(result, original + 1, equal_nan=True))
+
+    def test_range(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.rand(20, 30)
+        chain = filters.FilterChain()
+        version = chain.version()
+        chain.reset([["lavuelib.plugins.filters.VGap", "[2]"],
+                     ["lavuelib.filters.BaseFilter", ""],
+                     ["lavuelib.plugins.filters.HGap", "[1]"]])
+        self.assertTrue(chain.version() > version)
+        self.assertEqual(chain.threadSafeCount(), 1)
+        first = chain.apply(image, "", "", None, stop=1)[0]
+        self.assertEqual(first.shape, (21, 30))
+        result = chain.apply(first, "", "", None, start=1)[0]
+        self.assertEqual(result.shape, (21, 31))
+        self.assertTrue(
+            np.array_equal(
+                result,
+                np.insert(np.insert(image, [2], 0, axis=0), [1], 0, axis=1)))
+
+        chain.insert(1, Fail())
+        errors = []
+        result = chain.apply(image, "", "", None, onerror=errors.append)[0]
+        self.assertEqual(result.shape, (21, 31))
+        self.assertEqual(len(errors), 1)
+        self.assertTrue(isinstance(errors[0], ValueError))
+        self.assertRaises(ValueError, chain.apply, image, "", "", None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import time
+import numpy as np
+
+from lavuelib import imageSource
+from lavuelib import dataFetchThread
+
+if sys.version_info > (3,):
+    long = int
+
+
+class CounterSource(imageSource.BaseSource):
+
+    """ source with a frame counter """
+
+    def __init__(self, frames):
+        imageSource.BaseSource.__init__(self)
+        self.frames = list(frames)
+
+    def getData(self):
+        image, self._frameid = self.frames.pop(0)
+        return image, "frame", ""
+
+
+# test fixture
+class FrameDigestTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        dataFetchThread.SKIPDUPLICATES = False
+
+    def test_digest(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(0, 1000, size=(300, 200)).astype("int32")
+        digest = imageSource.framedigest(image)
+        self.assertEqual(digest[:2], ((300, 200), "int32"))
+        self.assertEqual(digest, imageSource.framedigest(image.copy()))
+        self.assertEqual(
+            digest, imageSource.framedigest(np.asfortranarray(image)))
+        self.assertNotEqual(
+            digest, imageSource.framedigest(image.astype("uint32")))
+        self.assertNotEqual(digest, imageSource.framedigest(image.T))
+        changed = image.copy()
+        changed[3, 3] += 1
+        self.assertNotEqual(digest, imageSource.framedigest(changed))
+
+        sampled = imageSource.framedigest(image, 1000)
+        changed = image.copy()
+        changed[0, 0] += 1
+        self.assertNotEqual(sampled, imageSource.framedigest(changed, 1000))
+        changed = image.copy()
+        changed[1, 1] += 1
+        self.assertEqual(sampled, imageSource.framedigest(changed, 1000))
+
+    def test_duplicates(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(0, 1000, size=(30, 20)).astype("int16")
+        source = imageSource.BaseSource()
+        thread = dataFetchThread.DataFetchThread(
+            source, dataFetchThread.ExchangeList())
+        isdup = thread._DataFetchThread__isDuplicate
+        self.assertFalse(isdup(image, "a"))
+        self.assertFalse(isdup(image, "b"))
+        dataFetchThread.SKIPDUPLICATES = True
+        self.assertFalse(isdup(image, "a"))
+        self.assertTrue(isdup(image.copy(), "b"))
+        self.assertFalse(isdup(image + 1, "c"))
+        self.assertFalse(isdup(image, "d"))
+        self.assertFalse(isdup("error", "__ERROR__"))
+        self.assertFalse(isdup(image, None))
+        self.assertFalse(isdup("", ""))
+        self.assertTrue(isdup(image, "e"))
+        thread.changeStatus(True)
+        self.assertFalse(isdup(image, "f"))
+
+        source = CounterSource(
+            [(image, 1), (image + 1, 1), (image, 2), (image, None),
+             (image, None)])
+        thread.setDataSource(source)
+        keys = []
+        for _ in range(5):
+            img, name, _ = source.getData()
+            keys.append(isdup(img, name))
+        self.assertEqual(keys, [False, True, False, False, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import math
+import random
+import binascii
+import time
+import numpy as np
+
+from lavuelib import settings
+
+if sys.version_info > (3,):
+    long = int
+
+
+class FlatIntegrator(object):
+
+    """ azimuthal integrator of a flat detector perpendicular to the beam
+    """
+
+    def __init__(self, dist, poni1, poni2):
+        self.dist = dist
+        self.poni1 = poni1
+        self.poni2 = poni2
+        self.rot1 = self.rot2 = self.rot3 = 0.
+        self.pixel1 = self.pixel2 = 1e-4
+        self.wavelength = 1e-10
+
+    def positions(self, shape):
+        d1, d2 = np.mgrid[0:shape[0], 0:shape[1]] + 0.5
+        return d1 * self.pixel1 - self.poni1, d2 * self.pixel2 - self.poni2
+
+    def twoThetaArray(self, shape):
+        p1, p2 = self.positions(shape)
+        return np.arctan2(np.hypot(p1, p2), self.dist)
+
+    def chiArray(self, shape):
+        p1, p2 = self.positions(shape)
+        return np.arctan2(p1, p2)
+
+    def qArray(self, shape):
+        return 4e-9 * math.pi / self.wavelength * np.sin(
+            self.twoThetaArray(shape) / 2.)
+
+    def rArray(self, shape):
+        return np.hypot(*self.positions(shape))
+
+
+# test fixture
+class GeometryMapsTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+        self._settings = settings.Settings()
+        self._settings.centerx = self.__rnd.uniform(10, 50)
+        self._settings.centery = self.__rnd.uniform(10, 50)
+        self._settings.energy = self.__rnd.uniform(5000, 20000)
+        self._settings.detdistance = self.__rnd.uniform(100, 1000)
+        self._settings.pixelsizex = self.__rnd.uniform(50, 200)
+        self._settings.pixelsizey = self.__rnd.uniform(50, 200)
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        self._settings.secsocket.close(linger=0)
+        self._settings.seccontext.destroy()
+
+    def pixel2theta(self, xdata, ydata):
+        st = self._settings
+        xcentered = (xdata - st.centerx) * st.pixelsizex / 1000.
+        ycentered = (ydata - st.centery) * st.pixelsizey / 1000.
+        return (math.atan(xcentered / st.detdistance),
+                math.atan(ycentered / st.detdistance),
+                math.atan(math.sqrt(xcentered ** 2 + ycentered ** 2)
+                          / st.detdistance))
+
+    def test_conversions(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        geometry = self._settings.geometrymaps
+        wavelength = 12398.4193 / self._settings.energy
+        for _ in range(10):
+            x = self.__rnd.uniform(-100, 100)
+            y = self.__rnd.uniform(-100, 100)
+            expected = self.pixel2theta(x, y)
+            thetas = geometry.pixel2theta(x, y)
+            self.assertTrue(all(isinstance(th, float) for th in thetas))
+            self.assertTrue(np.allclose(thetas, expected))
+            qs = geometry.pixel2q(x, y)
+            self.assertTrue(np.allclose(
+                qs, [4 * math.pi / wavelength * math.sin(th / 2.)
+                     for th in expected]))
+            self.assertEqual(
+                geometry.pixel2q(x, y, False)[:2], (None, None))
+
+        xs = np.random.uniform(-100, 100, 20)
+        ys = np.random.uniform(-100, 100, 20)
+        _, _, ths = geometry.pixel2theta(xs, ys, False)
+        self.assertTrue(np.allclose(
+            ths, [self.pixel2theta(x, y)[2] for x, y in zip(xs, ys)]))
+
+        self._settings.energy = 0
+        self.assertEqual(geometry.pixel2theta(1, 2), (None, None, None))
+        self.assertEqual(geometry.pixel2q(1, 2), (None, None, None))
+        self.assertEqual(geometry.map("q", (10, 10)), None)
+
+    def test_maps(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        geometry = self._settings.geometrymaps
+        shape = (67, 45)
+        theta = geometry.map("theta", shape)
+        self.assertEqual(theta.shape, shape)
+        self.assertEqual(theta.dtype, np.float32)
+        self.assertTrue(geometry.map("theta", shape) is theta)
+        for _ in range(10):
+            x = self.__rnd.randint(0, shape[0] - 1)
+            y = self.__rnd.randint(0, shape[1] - 1)
+            # map values are given at pixel centers
+            _, _, th = geometry.pixel2theta(x + 0.5, y + 0.5)
+            _, _, q = geometry.pixel2q(x + 0.5, y + 0.5)
+            self.assertAlmostEqual(theta[x, y], th, 6)
+            self.assertAlmostEqual(
+                geometry.lookup("theta", x + 0.7, y + 0.2, shape), th, 6)
+            self.assertAlmostEqual(geometry.lookup("q", x, y, shape), q, 5)
+            st = self._settings
+            xoff = (x + 0.5 - st.centerx) * st.pixelsizex / 1000.
+            yoff = (y + 0.5 - st.centery) * st.pixelsizey / 1000.
+            self.assertAlmostEqual(
+                geometry.lookup("radius", x, y, shape),
+                math.hypot(xoff, yoff), 3)
+            self.assertAlmostEqual(
+                geometry.lookup("chi", x, y, shape),
+                math.atan2(yoff, xoff), 5)
+        self.assertEqual(geometry.lookup("q", -1, 0, shape), None)
+        self.assertEqual(geometry.lookup("q", 0, shape[1], shape), None)
+        self.assertRaises(ValueError, geometry.map, "phi", shape)
+        self.assertTrue(geometry.isCached("theta", shape))
+        self.assertTrue(not geometry.isCached("radius", (10, 10)))
+
+        key = geometry.key()
+        self._settings.detrot1 = 0.1
+        self.assertTrue(geometry.key() != key)
+        self.assertTrue(geometry.map("theta", shape) is not theta)
+        self._settings.centerx += 10
+        self.assertTrue(not np.allclose(
+            geometry.map("theta", shape), theta))
+
+    def test_integrator(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        ai = FlatIntegrator(0.25, 0.0112, 0.0153)
+        self._settings.ai = ai
+        geometry = self._settings.geometrymaps
+        shape = (320, 240)
+        key = geometry.key()
+        p1, p2 = ai.positions((240, 320))
+        theta = geometry.map("theta", shape)
+        self.assertEqual(theta.shape, shape)
+        self.assertEqual(theta.dtype, np.float32)
+        self.assertTrue(np.allclose(theta, ai.twoThetaArray((240, 320)).T))
+        self.assertTrue(np.allclose(
+            geometry.map("chi", shape), np.arctan2(p1, p2).T))
+        self.assertTrue(np.allclose(
+            geometry.map("radius", shape), np.hypot(p1, p2).T * 1000.))
+        self.assertTrue(np.allclose(
+            geometry.map("q", shape), ai.qArray((240, 320)).T / 10.))
+
+        ai.rot1 = 0.1
+        self.assertTrue(geometry.key() != key)
+        self.assertTrue(not geometry.isCached("theta", shape))
+        self._settings.ai = None
+        self._settings.energy = 0
+        self.assertEqual(geometry.map("theta", shape), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import time
+import itertools
+import numpy as np
+
+from pyqtgraph import QtCore, QtGui
+
+from lavuelib import imageDisplayWidget
+
+#  Qt-application
+app = None
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class ImageOrientationTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+        global app
+        if app is None:
+            app = QtGui.QApplication.instance() or QtGui.QApplication([])
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        pass
+
+    def orient(self, image, transpose, xflip, yflip):
+        if transpose:
+            image = np.swapaxes(image, 0, 1)
+        if xflip:
+            image = np.flipud(image)
+        if yflip:
+            image = np.fliplr(image)
+        return image
+
+    def test_orientation(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        dw = imageDisplayWidget.ImageDisplayWidget()
+        base = np.random.rand(13, 7)
+        for flags in itertools.product([False, True], repeat=3):
+            view = self.orient(base, *flags)
+            dw.setImageOrientation(base, view, *flags)
+            dw.updateImage(view, view)
+            item = dw.image()
+            self.assertTrue(np.array_equal(item.image, base))
+            self.assertEqual(item.image.strides, base.strides)
+            self.assertTrue(dw.rawData() is view)
+            for k in range(base.shape[0]):
+                for m in range(base.shape[1]):
+                    point = item.mapToView(QtCore.QPointF(k + 0.5, m + 0.5))
+                    i = int(np.floor(point.x()))
+                    j = int(np.floor(point.y()))
+                    self.assertEqual(view[i, j], base[k, m])
+
+        other = np.random.rand(5, 9)
+        dw.setImageOrientation()
+        dw.updateImage(other, other)
+        item = dw.image()
+        self.assertTrue(np.array_equal(item.image, other))
+        self.assertTrue(item.transform().isIdentity())
+        dw.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
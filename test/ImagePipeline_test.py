@@ -0,0 +1,153 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import time
+import json
+import numpy as np
+
+from lavuelib import imagePipeline
+from lavuelib import imageSource
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class ImagePipelineTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        pass
+
+    def test_range_transformation(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(0, 1000, size=(64, 48)).astype("uint16")
+        pipeline = imagePipeline.ImagePipeline(state={
+            "rangewindow": "10:50,m40:",
+            "dsfactor": 2,
+            "dsreduction": "sum",
+            "transformation": "rot90 (clockwise)",
+            "scaling": "sqrt",
+        })
+        frame = pipeline.process(image, "img1")
+        expected = image[10:50, 8:].reshape(20, 2, 20, 2).sum((-1, -3))
+        expected = np.swapaxes(np.flipud(expected), 0, 1)
+        self.assertEqual(frame["imagename"], "img1")
+        self.assertTrue(np.array_equal(frame["image"], expected))
+        self.assertTrue(
+            np.allclose(frame["scaledimage"], np.sqrt(expected)))
+        self.assertEqual(frame["stats"]["maxval"], float(expected.max()))
+        self.assertEqual(frame["stats"]["scaling"], "linear")
+        self.assertAlmostEqual(
+            frame["stats"]["minval"], float(np.sqrt(expected.min())))
+        self.assertEqual(frame["rois"], {})
+        self.assertEqual(frame["diffractograms"], [])
+
+        cut = image[10:50, 8:]
+        frame = pipeline.process(cut, "img2", json.dumps(
+            {"sourceregion": {"window": [10, -40, 50, None]}}))
+        self.assertTrue(np.array_equal(frame["image"], expected))
+        self.assertEqual(pipeline.process(cut, "img3", json.dumps(
+            {"sourceregion": {"window": [0, -40, 50, None]}})), None)
+
+    def test_corrections(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(0, 1000, size=(30, 20)).astype("uint16")
+        bkg = np.random.randint(0, 1000, size=(30, 20)).astype("uint16")
+        pipeline = imagePipeline.ImagePipeline()
+        pipeline._ImagePipeline__bkgimage = bkg
+        pipeline.setState({"maskhighvalue": 500, "rois": json.dumps(
+            {"roi1": [[2, 3, 10, 12], [0, 0, 100, 100]]})})
+        frame = pipeline.process(image, "img1")
+        expected = image.astype("int32") - bkg
+        self.assertEqual(frame["image"].dtype, np.float64)
+        self.assertTrue(np.isnan(frame["image"][expected > 500]).all())
+        expected = np.where(expected > 500, np.nan, expected)
+        self.assertTrue(np.array_equal(
+            frame["image"], expected, equal_nan=True))
+        self.assertEqual(
+            frame["rois"],
+            {"roi1": [float(np.nansum(expected[2:11, 3:13])),
+                      float(np.nansum(expected))]})
+
+        pipeline.setState({"maskhighvalue": None, "nanmask": False,
+                           "mbuffer": 3})
+        frames = [pipeline.process(image + i, "img%s" % i)["image"]
+                  for i in range(5)]
+        self.assertTrue(np.array_equal(
+            frames[-1],
+            np.sum([image.astype("int64") + i for i in range(2, 5)], 0) -
+            bkg))
+
+    def test_frames(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = imagePipeline.createSource("test", "")
+        self.assertTrue(isinstance(source, imageSource.BaseSource))
+        self.assertRaises(Exception, imagePipeline.createSource, "unknown")
+        pipeline = imagePipeline.ImagePipeline(
+            source, {"transformation": "transpose"})
+        frames = list(pipeline.frames(0.001, 3))
+        self.assertEqual(
+            [fr["imagename"] for fr in frames],
+            ["__random_1__", "__random_2__", "__random_3__"])
+        for fr in frames:
+            self.assertEqual(fr["image"].shape, (256, 512))
+            message = imagePipeline.resultMessage(fr)
+            self.assertEqual(message["command"], "results")
+            self.assertEqual(
+                message["maxval"], float(np.nanmax(fr["image"])))
+            json.dumps(message)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,176 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import time
+import threading
+import numpy as np
+
+from lavuelib import imagePyramid
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class ImagePyramidTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        pass
+
+    def reference(self, image, factor, reduction):
+        sx = -(-image.shape[0] // factor)
+        sy = -(-image.shape[1] // factor)
+        res = np.zeros((sx, sy), dtype="float64")
+        for i in range(sx):
+            for j in range(sy):
+                block = image[i * factor:(i + 1) * factor,
+                              j * factor:(j + 1) * factor]
+                res[i, j] = getattr(np, reduction)(block)
+        return res
+
+    def waitReady(self, pyramid):
+        for _ in range(1000):
+            if pyramid.ready():
+                break
+            time.sleep(0.01)
+        self.assertTrue(pyramid.ready())
+
+    def test_blockreduce(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        for shape in [(5, 7), (16, 16), (33, 20)]:
+            image = np.random.randint(0, 1000, size=shape).astype("uint16")
+            for factor in [2, 4, 3]:
+                for reduction in ["max", "min", "mean", "sum"]:
+                    reduced = imagePyramid.blockreduce(
+                        image, factor, reduction)
+                    self.assertTrue(
+                        np.allclose(
+                            reduced,
+                            self.reference(image, factor, reduction)))
+            self.assertTrue(
+                imagePyramid.blockreduce(image, 1, "max") is image)
+
+    def test_pyramid(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(0, 1000, size=(130, 70)).astype("int32")
+        pyramid = imagePyramid.ImagePyramid("max", minsize=16)
+        self.assertEqual(pyramid.crop(0, 0, 10, 10, 2), (None, 0, 0))
+        pyramid.setImage(image)
+        self.waitReady(pyramid)
+        for factor in [1, 2, 4, 8, 16]:
+            level = imagePyramid.blockreduce(image, factor, "max")
+            crop, x0, y0 = pyramid.crop(17, 9, 100, 50, factor)
+            self.assertEqual(x0, 17 // factor * factor)
+            self.assertEqual(y0, 9 // factor * factor)
+            self.assertTrue(
+                np.array_equal(
+                    crop,
+                    level[17 // factor:-(-100 // factor),
+                          9 // factor:-(-50 // factor)]))
+
+        crop, x0, y0 = pyramid.crop(0, 0, 130, 70, 32)
+        self.assertTrue(
+            np.array_equal(
+                crop, imagePyramid.blockreduce(image, 32, "max")))
+
+        pyramid.setReduction("mean")
+        self.waitReady(pyramid)
+        crop, x0, y0 = pyramid.crop(0, 0, 130, 70, 4)
+        self.assertTrue(
+            np.allclose(crop, self.reference(image, 4, "mean")))
+
+        pyramid.setImage(None)
+        self.assertTrue(pyramid.ready())
+        self.assertEqual(pyramid.crop(0, 0, 10, 10, 2), (None, 0, 0))
+
+    def test_worker(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(0, 1000, size=(130, 70)).astype("int32")
+        built = threading.Event()
+        resume = threading.Event()
+
+        def callback():
+            built.set()
+            resume.wait(10)
+
+        pyramid = imagePyramid.ImagePyramid(
+            "max", minsize=16, callback=callback)
+        pyramid.setImage(image)
+        self.assertTrue(built.wait(10))
+        # the worker is stopped after the first level
+        self.assertFalse(pyramid.ready())
+        crop, x0, y0 = pyramid.crop(0, 0, 130, 70, 2)
+        self.assertTrue(np.array_equal(
+            crop, imagePyramid.blockreduce(image, 2, "max")))
+        # crops of missing levels are reduced from the finest built level
+        for factor in [4, 8, 64]:
+            level = imagePyramid.blockreduce(image, factor, "max")
+            crop, x0, y0 = pyramid.crop(17, 9, 100, 50, factor)
+            self.assertEqual((x0, y0), (17 // factor * factor,
+                                        9 // factor * factor))
+            self.assertTrue(
+                np.array_equal(
+                    crop,
+                    level[17 // factor:-(-100 // factor),
+                          9 // factor:-(-50 // factor)]))
+        pyramid.callback = None
+        resume.set()
+        self.waitReady(pyramid)
+        crop, x0, y0 = pyramid.crop(0, 0, 130, 70, 64)
+        self.assertTrue(np.array_equal(
+            crop, imagePyramid.blockreduce(image, 64, "max")))
+
+
+if __name__ == '__main__':
+    unittest.main()
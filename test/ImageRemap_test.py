@@ -0,0 +1,150 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import time
+import numpy as np
+import scipy.ndimage
+import pyqtgraph.functions as fn
+
+from lavuelib import imageRemap
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class ImageRemapTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        imageRemap.RotationRemap.clearCache()
+
+    def test_nearest(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(0, 60000, size=(71, 53)).astype("uint16")
+        for angle in [-30., 12.5, 45., 100., -170.]:
+            remap = imageRemap.RotationRemap.get(angle, image.shape, 0)
+            rotated = remap(image)
+            expected = scipy.ndimage.rotate(
+                image, angle, order=0, mode="grid-constant")
+            self.assertEqual(rotated.shape, expected.shape)
+            self.assertEqual(rotated.dtype, image.dtype)
+            self.assertTrue(np.array_equal(rotated, expected))
+
+    def test_bilinear(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.rand(71, 53) * 1000
+        for angle in [-30., 12.5, 45., 100., -170.]:
+            remap = imageRemap.RotationRemap.get(angle, image.shape, 1)
+            rotated = remap(image)
+            expected = scipy.ndimage.rotate(
+                image, angle, order=1, mode="grid-constant")
+            self.assertEqual(rotated.shape, expected.shape)
+            self.assertTrue(np.allclose(rotated, expected, atol=1e-2))
+
+    def test_buffer(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image1 = np.random.randint(0, 1000, size=(40, 30)).astype("int32")
+        image2 = np.random.randint(0, 1000, size=(40, 30)).astype("int32")
+        remap = imageRemap.RotationRemap.get(30, image1.shape, 1)
+        self.assertTrue(
+            remap is imageRemap.RotationRemap.get(30, image1.shape, 1))
+        self.assertTrue(
+            remap is not imageRemap.RotationRemap.get(30, image1.shape, 0))
+        out = remap(image1)
+        res = remap(image2, out)
+        self.assertTrue(res is out)
+        expected = scipy.ndimage.rotate(
+            image2.astype("float64"), 30, order=1, mode="grid-constant")
+        self.assertTrue(np.abs(res - expected).max() <= 0.51)
+        res = remap(image2.astype("float32"), out)
+        self.assertTrue(res is not out)
+        self.assertEqual(res.dtype, np.float32)
+        self.assertRaises(ValueError, remap, image1.T)
+        self.assertRaises(
+            ValueError, imageRemap.RotationRemap, 30, image1.shape, 3)
+
+    def test_linecut(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        if not hasattr(np, "product"):
+            np.product = np.prod
+        image = np.random.rand(61, 47) * 1000
+        params = [
+            ((40.3, 1.0), ((0.8, 0.6), (-0.6, 0.8)), (3.2, 5.1)),
+            ((25.0, 4.0), ((0.0, 1.0), (-1.0, 0.0)), (30.5, 2.5)),
+            ((80.0, 3.0), ((1.0, 0.0), (0.0, 1.0)), (-10.0, 20.0)),
+        ]
+        for order in ["C", "F"]:
+            img = np.asarray(image, order=order)
+            sampler = imageRemap.LineCutSampler(params, img.shape, order)
+            profiles = sampler(img)
+            self.assertEqual(len(profiles), len(params))
+            for prm, prof in zip(params, profiles):
+                shape, vectors, origin = prm
+                expected = fn.affineSlice(
+                    img, shape=[int(np.ceil(sh)) for sh in shape],
+                    vectors=vectors, origin=origin, axes=(0, 1), order=1)
+                expected = expected.mean(axis=1)
+                self.assertEqual(prof.shape, expected.shape)
+                self.assertTrue(np.allclose(prof, expected))
+        self.assertEqual(
+            sampler.keys,
+            [imageRemap.LineCutSampler.key(prm, img.shape, "F")
+             for prm in params])
+        self.assertEqual(imageRemap.LineCutSampler([], img.shape)(img), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
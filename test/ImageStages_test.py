@@ -0,0 +1,229 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import time
+import numpy as np
+
+from lavuelib import imageStages
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class ImageStagesTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        pass
+
+    def test_region(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        window = [10, None, 50, 40]
+        self.assertEqual(
+            imageStages.appliedRegion(None, window, 2, "max"),
+            (False, False))
+        self.assertEqual(
+            imageStages.appliedRegion(
+                {"window": window, "binning": 2, "reduction": "max"},
+                window, 2, "max"),
+            (True, True))
+        self.assertEqual(
+            imageStages.appliedRegion(
+                {"window": [0, None, 50, 40]}, window, 2, "max"), None)
+        self.assertEqual(
+            imageStages.appliedRegion(
+                {"binning": 2, "reduction": "sum"}, window, 2, "max"), None)
+
+        image = np.random.randint(0, 1000, size=(64, 48))
+        cut, position = imageStages.cropImage(image, *window)
+        self.assertTrue(np.array_equal(cut, image[10:50, :40]))
+        self.assertEqual(position, [10, 0])
+        cut, position = imageStages.cropImage(image, 100, 0, 120, None)
+        self.assertTrue(cut is image)
+        self.assertEqual(position, [0, 0])
+
+        small, scale = imageStages.downsampleImage(image, 4, "sum")
+        self.assertEqual(scale, [4, 4])
+        self.assertTrue(np.array_equal(
+            small, image.reshape(16, 4, 12, 4).sum((-1, -3))))
+        same, scale = imageStages.downsampleImage(image[:3], 4, "sum")
+        self.assertEqual(scale, [1, 1])
+        self.assertEqual(same.shape, (3, 48))
+
+    def test_buffer_channels(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        images = [np.random.randint(0, 1000, size=(8, 6)).astype("uint16")
+                  for _ in range(5)]
+        buf = imageStages.ImageBuffer(3, computesum=True)
+        for i, image in enumerate(images):
+            stack, mdata = buf.append(image, "img%s" % i)
+            self.assertEqual(buf.isFull(), i >= 2)
+        self.assertEqual(stack.shape, (5, 8, 6))
+        self.assertTrue(mdata["skipfirst"])
+        self.assertTrue(mdata["suminthelast"])
+        self.assertTrue(np.array_equal(stack[0], images[-1]))
+        expected = np.sum(images[2:], 0)
+        self.assertTrue(np.array_equal(stack[-1], expected))
+        _, mdata = buf.append(images[-1], "img4")
+        self.assertTrue("skipfirst" not in mdata)
+
+        self.assertTrue(np.array_equal(
+            imageStages.greyImage(stack, "sum", True, True), expected))
+        self.assertTrue(np.allclose(
+            imageStages.greyImage(stack, "mean", True, True),
+            np.mean(images[2:], 0)))
+        self.assertTrue(
+            np.array_equal(imageStages.greyImage(stack, "0"), images[-1]))
+        buf.reset(2, False)
+        self.assertTrue(not buf.isFull())
+        stack, _ = buf.append(images[0], "img0")
+        self.assertEqual(stack.shape, (3, 8, 6))
+        self.assertTrue(np.array_equal(
+            imageStages.greyImage(stack, "sum", True),
+            images[0].astype("uint64")))
+        self.assertEqual(
+            imageStages.greyImage(np.arange(4)).shape, (4, 1))
+
+    def test_corrections_masks(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(0, 1000, size=(8, 6)).astype("uint16")
+        bkg = np.random.randint(0, 1000, size=(8, 6)).astype("uint16")
+        bf = np.random.randint(1000, 2000, size=(8, 6)).astype("uint16")
+        result = imageStages.subtractBackground(image, bkg)
+        self.assertEqual(result.dtype, np.int32)
+        self.assertTrue(np.array_equal(result, image.astype("int32") - bkg))
+        self.assertTrue(imageStages.correctionImage(bkg, 1) is bkg)
+        self.assertTrue(np.array_equal(
+            imageStages.correctionImage(bkg, 2.), bkg * 2.))
+        bfmdf = imageStages.invertedBrightField(bf, bkg, "float32")
+        self.assertEqual(bfmdf.dtype, np.float32)
+        self.assertTrue(np.allclose(bfmdf, 1. / (bf.astype(float) - bkg)))
+        self.assertEqual(imageStages.invertedBrightField(None, bkg), None)
+
+        indices = image > 500
+        masked, invalid = imageStages.maskPixels(image, indices)
+        self.assertEqual(invalid, None)
+        self.assertTrue(np.isnan(masked[indices]).all())
+        masked, invalid = imageStages.maskPixels(
+            image, indices, nanmask=False)
+        self.assertEqual(masked.dtype, np.uint16)
+        self.assertTrue((masked[indices] == 0).all())
+        masked, invalid, hindices = imageStages.maskHighValues(
+            image, 500, None, True)
+        self.assertTrue(np.array_equal(hindices, indices))
+        self.assertTrue(np.array_equal(invalid, indices))
+        self.assertTrue((masked[indices] == 0).all())
+        self.assertTrue(np.array_equal(masked[~indices], image[~indices]))
+
+    def test_transform_scale_stats(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(1, 1000, size=(8, 6)).astype("int32")
+        self.assertTrue(np.array_equal(
+            imageStages.transformImage(image, "rot90 (clockwise)"),
+            imageStages.transformImage(image, "rot90")))
+        self.assertTrue(np.array_equal(
+            imageStages.transformImage(image, "rot90"),
+            np.swapaxes(np.flipud(image), 0, 1)))
+        self.assertTrue(
+            imageStages.transformImage(image, "none") is image)
+        self.assertTrue(np.allclose(
+            imageStages.scaleImage(image, "log"), np.log10(image)))
+        self.assertTrue(imageStages.scaleImage(image, "linear") is image)
+
+        scaled = np.sqrt(image)
+        invalid = image > 800
+        valid = image[~invalid]
+        stats = imageStages.imageStats(image, scaled, image, invalid)
+        self.assertEqual(stats[0], valid.max())
+        self.assertAlmostEqual(stats[1], valid.mean())
+        self.assertAlmostEqual(stats[3], np.sqrt(valid.min()))
+        self.assertEqual(stats[4], image.max())
+        stats = imageStages.imageStats(
+            image, scaled, image, None, False,
+            [True, False, False, False, False, False])
+        self.assertAlmostEqual(stats[0], scaled.max())
+        self.assertEqual(stats[1:5], (0.0, 0.0, 0.0, 0.0))
+        self.assertEqual(
+            imageStages.imageStats(image[:0], scaled[:0], image), None)
+
+    def test_rois_integration(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.rand(8, 6)
+        self.assertAlmostEqual(
+            imageStages.roiSum(image, [2, 1, 4, 3]), image[2:5, 1:4].sum())
+        self.assertAlmostEqual(
+            imageStages.roiSum(image, [-3, -2, 20, 20]), image.sum())
+
+        dts, mask = imageStages.integrationData(image)
+        self.assertTrue(dts is image)
+        self.assertEqual(mask, None)
+        nimage = np.array(image)
+        nimage[1, 2] = np.nan
+        indices = np.zeros(image.shape, dtype=bool)
+        indices[3, 4] = True
+        dts, mask = imageStages.integrationData(nimage, [None, indices])
+        self.assertEqual(dts[1, 2], 0.)
+        self.assertTrue(np.isnan(nimage[1, 2]))
+        self.assertEqual(mask.dtype.kind, "i")
+        self.assertEqual(int(mask.sum()), 2)
+        self.assertEqual(mask[1, 2], 1)
+        self.assertEqual(mask[3, 4], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -28,6 +28,7 @@
 import sys
 import os
 import unittest
+import json
 try:
     import tango
 except ImportError:
@@ -447,6 +448,74 @@ class LavueControllerTest(unittest.TestCase):
 
         self.__lcsu.proxy.unsubscribe_event(cb_id)
 
+    def test_WriteDetectorROIsValues(self):
+        """Test for WriteDetectorROIsValues"""
+        print("Run: %s.%s() " % (
+            self.__class__.__name__, sys._getframe().f_code.co_name))
+        testvalues = [
+            [[[1.23, 12.321, 83.323, 146.32],
+              ["Pilatus", "Pilatus", "Pilatus", "Pilatus"]],
+             {"Pilatus": [1.23, 12.321, 83.323, 146.32]},
+             [["PilatusSums",
+               [1.23, 12.321, 83.323, 146.32]]]],
+            [[[1.23, 12.321, 83.323, 146.32],
+              ["Pilatus1", "Pilatus1", "Pilatus1", "Pilatus2"]],
+             {"Pilatus1": [1.23, 12.321, 83.323], "Pilatus2": [146.32]},
+             [["Pilatus1Sums",
+               [1.23, 12.321, 83.323]],
+              ["Pilatus2Sum",
+               [146.32]]]],
+            [[[16.1], ["lambda"]],
+             {"lambda": [16.1]},
+             [["LambdaSum",
+               [16.1]]]],
+            [[[12323.0], ["__null__"]],
+             {"__null__": [12323.0]},
+             [["Sum",
+               [12323.]]]],
+        ]
+
+        queue = Queue.Queue()
+        cb = TangoCB(queue)
+        cb_id = self.__lcsu.proxy.subscribe_event(
+            "DetectorROIsValues", tango.EventType.CHANGE_EVENT, cb)
+        elem = queue.get(block=True, timeout=3)
+
+        for wvl in testvalues:
+            self.__lcsu.proxy.WriteDetectorROIsValues(wvl[0])
+            rvl = self.__lcsu.proxy.DetectorROIsValues
+            self.assertEqual(json.loads(rvl), wvl[1])
+            elem = queue.get(block=True, timeout=3)
+            self.assertEqual(json.loads(elem), wvl[1])
+            for at, vl in wvl[2]:
+                rvl = self.__lcsu.proxy.read_attribute(at).value
+                if at.endswith("Sums"):
+                    self.assertTrue(np.array_equal(np.array(vl), rvl))
+                else:
+                    self.assertEqual(vl[0], rvl)
+
+        self.__lcsu.proxy.unsubscribe_event(cb_id)
+
+        self.__lcsu.proxy.WriteDetectorROIsValues(
+            [[16.1, 3.], ["lambda", "pilatus"]])
+        scb = TangoCB(queue)
+        scb_id = self.__lcsu.proxy.subscribe_event(
+            "LambdaSum", tango.EventType.CHANGE_EVENT, scb)
+        elem = queue.get(block=True, timeout=3)
+        self.assertEqual(elem, 16.1)
+        self.__lcsu.proxy.WriteDetectorROIsValues(
+            [[17.5, 3.], ["lambda", "pilatus"]])
+        elem = queue.get(block=True, timeout=3)
+        self.assertEqual(elem, 17.5)
+        self.__lcsu.proxy.WriteDetectorROIsValues(
+            [[17.5, 4.], ["lambda", "pilatus"]])
+        self.assertTrue(queue.empty())
+        self.__lcsu.proxy.unsubscribe_event(scb_id)
+
+        self.assertRaises(
+            tango.DevFailed, self.__lcsu.proxy.WriteDetectorROIsValues,
+            [[17.5, 4.], ["lambda"]])
+
     def test_Energy(self):
         """Test for Energy"""
         print("Run: %s.%s() " % (
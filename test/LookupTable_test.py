@@ -0,0 +1,129 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import time
+import numpy as np
+
+from lavuelib import lookupTable
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class LookupTableTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        pass
+
+    def test_istabletype(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        for dtype in ["uint8", "uint16"]:
+            self.assertTrue(
+                lookupTable.isTableType(np.zeros((3, 4), dtype=dtype)))
+        for dtype in ["int16", "uint32", "int32", "float32", "float64"]:
+            self.assertTrue(
+                not lookupTable.isTableType(np.zeros((3, 4), dtype=dtype)))
+        self.assertTrue(not lookupTable.isTableType(None))
+
+    def test_scale(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        for dtype, high in [("uint8", 256), ("uint16", 65536)]:
+            image = np.random.randint(
+                0, high, size=(301, 257)).astype(dtype)
+            for img in [image, image.T, image[::2, 3:], image[:1, :]]:
+                sqrt = lookupTable.scale(img, "sqrt")
+                self.assertEqual(sqrt.shape, img.shape)
+                self.assertTrue(
+                    np.allclose(sqrt, np.sqrt(np.clip(img, 0, np.inf))))
+                log = lookupTable.scale(img, "log")
+                self.assertTrue(
+                    np.allclose(log, np.log10(np.clip(img, 10e-3, np.inf))))
+                linear = lookupTable.scale(img, "linear")
+                self.assertTrue(np.array_equal(linear, img))
+                table = lookupTable.scalingTable("log", img.dtype)
+                cimg = lookupTable.take(table, img, order="C")
+                self.assertTrue(cimg.flags.c_contiguous)
+                self.assertTrue(np.array_equal(cimg, log))
+
+    def test_colortable(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        lut = np.random.randint(0, 256, size=(512, 3)).astype("uint8")
+        table = lookupTable.colorTable("sqrt", "uint16", [10., 200.], lut)
+        self.assertEqual(table.shape, (65536,))
+        self.assertEqual(table.dtype, np.dtype("uint32"))
+        values = np.array([0, 100, 1000, 20000, 40000, 65535])
+        indices = np.clip(
+            (np.sqrt(values) - 10.) * 512 / 190., 0, 511).astype(int)
+        for value, index in zip(values, indices):
+            color = int(table[value])
+            self.assertEqual(color >> 24, 255)
+            self.assertEqual((color >> 16) & 255, lut[index, 0])
+            self.assertEqual((color >> 8) & 255, lut[index, 1])
+            self.assertEqual(color & 255, lut[index, 2])
+
+        rgba = np.random.randint(0, 256, size=(256, 4)).astype("uint8")
+        table = lookupTable.colorTable("log", "uint8", [0., 2.], rgba)
+        self.assertEqual(table.shape, (256,))
+        self.assertEqual(int(table[0]) >> 24, rgba[0, 3])
+        self.assertEqual(int(table[255]) & 255, rgba[-1, 2])
+
+        table = lookupTable.colorTable("linear", "uint8", [0., 256.])
+        self.assertEqual(int(table[0]), 0xff000000)
+        self.assertEqual(int(table[255]), 0xffffffff)
+        self.assertEqual(int(table[128]), 0xff808080)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,161 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import time
+import numpy as np
+import h5py
+
+from lavuelib import imageFileHandler
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class NexusChunkReaderTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+        self._images = np.random.randint(
+            0, 1000, size=(5, 67, 45)).astype("uint16")
+        with h5py.File(self._fname, "w") as fl:
+            fl.create_dataset(
+                "gzip", data=self._images, chunks=(1, 16, 20),
+                compression="gzip", shuffle=True)
+            fl.create_dataset(
+                "bigendian", data=self._images.astype(">i4"),
+                chunks=(2, 30, 45), compression="gzip")
+            fl.create_dataset(
+                "contiguous", data=self._images)
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        imageFileHandler.ChunkDecompressor.setNumberOfThreads(0)
+        if os.path.isfile(self._fname):
+            os.remove(self._fname)
+
+    def getImages(self, node):
+        images = []
+        for frame, growing in [(-1, 0), (0, 0), (3, 0), (5, 0),
+                               (10, 1), (-2, 2), (None, 0)]:
+            images.append(
+                imageFileHandler.NexusFieldHandler.getImage(
+                    node, frame, growing))
+        return images
+
+    def checkImages(self, images):
+        expected = [self._images[-1], self._images[0], self._images[3],
+                    None, self._images[:, 10, :], self._images[:, :, -2],
+                    self._images]
+        for image, exp in zip(images, expected):
+            if exp is None:
+                self.assertEqual(image, None)
+            else:
+                self.assertTrue(np.array_equal(image, exp))
+
+    def test_gzip_shuffle(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        handler = imageFileHandler.NexusFieldHandler(self._fname)
+        node = handler.getNode("/gzip")
+        serial = self.getImages(node)
+        self.checkImages(serial)
+        self.assertEqual(tuple(node.chunks), (1, 16, 20))
+        self.assertEqual(
+            [fid for fid, _ in node.filters],
+            [imageFileHandler.ChunkDecompressor.SHUFFLE,
+             imageFileHandler.ChunkDecompressor.DEFLATE])
+
+        imageFileHandler.ChunkDecompressor.setNumberOfThreads(3)
+        image = imageFileHandler.ChunkDecompressor.read(
+            node, (2, slice(None), slice(None)))
+        self.assertTrue(np.array_equal(image, self._images[2]))
+        parallel = self.getImages(node)
+        self.checkImages(parallel)
+
+    def test_bigendian(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        imageFileHandler.ChunkDecompressor.setNumberOfThreads(2)
+        handler = imageFileHandler.NexusFieldHandler(self._fname)
+        node = handler.getNode("/bigendian")
+        images = self.getImages(node)
+        self.checkImages(images)
+        image = imageFileHandler.ChunkDecompressor.read(
+            node, (slice(None), 40, slice(None)))
+        self.assertEqual(image.dtype, np.dtype(">i4"))
+        self.assertTrue(np.array_equal(image, self._images[:, 40, :]))
+
+    def test_contiguous(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        imageFileHandler.ChunkDecompressor.setNumberOfThreads(2)
+        handler = imageFileHandler.NexusFieldHandler(self._fname)
+        node = handler.getNode("/contiguous")
+        images = self.getImages(node)
+        self.assertEqual(node.chunks, None)
+        self.assertEqual(
+            imageFileHandler.ChunkDecompressor.read(
+                node, (0, slice(None), slice(None))),
+            None)
+        self.checkImages(images)
+
+    def test_unshuffle(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        data = np.arange(11, dtype="uint32")
+        shuffled = data.view(np.uint8).reshape(11, 4).T.tobytes() + b"ab"
+        unshuffled = imageFileHandler.ChunkDecompressor._unshuffle(
+            shuffled, 4)
+        self.assertEqual(unshuffled, data.tobytes() + b"ab")
+
+
+if __name__ == '__main__':
+    unittest.main()
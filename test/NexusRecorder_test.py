@@ -0,0 +1,228 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import json
+import time
+import numpy as np
+import h5py
+
+from lavuelib import nexusRecorder
+from lavuelib import imageSource
+from lavuelib import dataFetchThread
+
+if sys.version_info > (3,):
+    long = int
+
+
+class FrameSource(imageSource.BaseSource):
+
+    """ source with numbered frames """
+
+    def __init__(self, image):
+        imageSource.BaseSource.__init__(self)
+        self.image = image
+        self.counter = 0
+
+    def getData(self):
+        self.counter += 1
+        return self.image + self.counter, "frame_%s" % self.counter, ""
+
+
+# test fixture
+class NexusRecorderTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+        self._fname = '%s/%s%s.nxs' % (
+            os.getcwd(), self.__class__.__name__, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+        self._images = np.random.randint(
+            0, 1000, size=(11, 37, 23)).astype("uint16")
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        if os.path.isfile(self._fname):
+            os.remove(self._fname)
+
+    def waitFor(self, recorder, written):
+        for _ in range(100):
+            if recorder.written >= written:
+                break
+            time.sleep(0.05)
+
+    def test_record(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        recorder = nexusRecorder.NexusRecorder(
+            self._fname, chunk=4, compression="2", queuesize=100,
+            writer="h5py")
+        self.assertTrue(not recorder.record(self._images[0]))
+        recorder.start()
+        self.assertTrue(recorder.isRunning())
+        for i, image in enumerate(self._images):
+            self.assertTrue(
+                recorder.record(image, "image_%s" % i, {"frame": i}, 10. + i))
+        self.waitFor(recorder, 8)
+        with h5py.File(self._fname, "r", libver="latest", swmr=True) as fl:
+            self.assertTrue(fl["entry/data/data"].shape[0] >= 8)
+        recorder.stop()
+        self.assertTrue(not recorder.isRunning())
+        self.assertEqual(recorder.written, 11)
+        self.assertEqual(recorder.dropped, 0)
+        self.assertEqual(recorder.error, "")
+
+        with h5py.File(self._fname, "r") as fl:
+            node = fl["entry/data"]
+            self.assertEqual(node.attrs["signal"], "data")
+            field = node["data"]
+            self.assertEqual(field.chunks, (4, 37, 23))
+            self.assertEqual(field.compression, "gzip")
+            self.assertTrue(np.array_equal(field[...], self._images))
+            self.assertTrue(np.array_equal(
+                node["timestamp"][...], 10. + np.arange(11)))
+            for i in range(11):
+                name = node["name"][i]
+                metadata = node["metadata"][i]
+                if not isinstance(name, str):
+                    name = name.decode()
+                    metadata = metadata.decode()
+                self.assertEqual(name, "image_%s" % i)
+                self.assertEqual(json.loads(metadata), {"frame": i})
+
+        recorder = nexusRecorder.NexusRecorder(
+            self._fname, fieldname="frames", compression="0", writer="h5py")
+        recorder.start()
+        recorder.record(self._images[3])
+        recorder.record(self._images[4:6])
+        recorder.stop()
+        self.assertEqual(recorder.written, 1)
+        self.assertEqual(recorder.dropped, 1)
+        with h5py.File(self._fname, "r") as fl:
+            self.assertEqual(sorted(fl.keys()), ["entry", "entry_2"])
+            field = fl["entry_2/data/frames"]
+            self.assertEqual(field.compression, None)
+            self.assertTrue(np.array_equal(field[...], self._images[3:4]))
+
+    def test_dropped(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        images = np.random.randint(
+            0, 1000, size=(4, 256, 256)).astype("int32")
+        recorder = nexusRecorder.NexusRecorder(
+            self._fname, chunk=2, compression="6", queuesize=1,
+            writer="h5py")
+        recorder.start()
+        nframes = 200
+        queued = sum(recorder.record(images[i % 4]) for i in range(nframes))
+        recorder.stop()
+        self.assertTrue(recorder.written >= 1)
+        self.assertEqual(recorder.written, queued)
+        self.assertEqual(recorder.written + recorder.dropped, nframes)
+        with h5py.File(self._fname, "r") as fl:
+            field = fl["entry/data/data"]
+            self.assertEqual(field.shape, (queued, 256, 256))
+            self.assertTrue(np.array_equal(field[0], images[0]))
+
+        # the queued frames are written after a non-blocking stop
+        recorder = nexusRecorder.NexusRecorder(
+            self._fname, chunk=2, queuesize=64, writer="h5py")
+        recorder.start()
+        queued = sum(recorder.record(images[i % 4]) for i in range(20))
+        recorder.stop(0)
+        self.assertFalse(recorder.record(images[0]))
+        for _ in range(1000):
+            if not recorder.isRunning():
+                break
+            time.sleep(0.01)
+        self.assertFalse(recorder.isRunning())
+        self.assertEqual(recorder.written, queued)
+        recorder.stop()
+
+    def waitForData(self, elist, name):
+        for _ in range(100):
+            if elist.readData()[0] == name:
+                break
+            time.sleep(0.05)
+        return elist.readData()
+
+    def test_fetch_thread(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = self._images[0].T
+        source = FrameSource(image)
+        elist = dataFetchThread.ExchangeList()
+        thread = dataFetchThread.DataFetchThread(source, elist)
+        thread.setRegion(2, 4, 12, 14, 2, "sum")
+        recorder = nexusRecorder.NexusRecorder(self._fname, writer="h5py")
+        recorder.start()
+        thread.setRecorder(recorder)
+        thread.changeStatus(True)
+        thread.start()
+        try:
+            # raw frames are fetched without the source region
+            name, data, metadata = self.waitForData(elist, "frame_1")
+            self.assertEqual(name, "frame_1")
+            self.assertTrue(np.array_equal(data, image + 1))
+            self.assertEqual(metadata, "")
+            self.waitFor(recorder, 1)
+            thread.setRecorder(None)
+            thread.ready()
+            name, data, metadata = self.waitForData(elist, "frame_2")
+            self.assertEqual(data.shape, (5, 5))
+            self.assertTrue("sourceregion" in json.loads(metadata))
+        finally:
+            thread.stop()
+            thread.wait()
+        recorder.stop()
+        self.assertEqual(recorder.written, 1)
+        with h5py.File(self._fname, "r") as fl:
+            field = fl["entry/data/data"]
+            self.assertEqual(field.shape, (1, 37, 23))
+            self.assertTrue(np.array_equal(field[0], self._images[0] + 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
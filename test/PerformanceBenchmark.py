@@ -0,0 +1,893 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+
+""" reproducible performance benchmarks of lavue image sources, decoders
+and processing stages
+
+The benchmarks use synthetic frames of configurable size and data type,
+local stand-ins of the image sources, i.e. an HDF5 file, an HTTP server,
+a ZMQ publisher and the fake pyepics module, and write machine-readable
+JSON results, e.g.
+
+    python -m test.PerformanceBenchmark --sizes 1M,4M,16M \\
+        --dtypes uint16,uint32,float32 --repeat 20 -o benchmark.json
+"""
+
+import os
+import sys
+import json
+import time
+import struct
+import argparse
+import platform
+import tempfile
+import shutil
+import threading
+import functools
+import logging
+
+import numpy as np
+import fabio
+import h5py
+
+try:
+    from . import epicsfake
+except Exception:
+    import epicsfake
+
+try:
+    import zmq
+    #: (:obj:`bool`) pyzmq imported
+    ZMQ = True
+except ImportError:
+    #: (:obj:`bool`) pyzmq imported
+    ZMQ = False
+
+import lavuelib
+from lavuelib import imageSource as isr
+from lavuelib import imageFileHandler
+from lavuelib import imagePipeline
+from lavuelib import imageStages
+from lavuelib import filters
+from lavuelib.plugins import filters as pfilters
+
+if sys.version_info > (3,):
+    from http.server import SimpleHTTPRequestHandler
+    from socketserver import TCPServer
+else:
+    from SimpleHTTPServer import SimpleHTTPRequestHandler
+    from SocketServer import TCPServer
+
+
+#: (:obj:`dict` <:obj:`str`, (:obj:`int`, :obj:`int`)>) frame shapes
+SIZES = {
+    "1M": (1024, 1024),
+    "2M": (2048, 1024),
+    "4M": (2048, 2048),
+    "8M": (4096, 2048),
+    "16M": (4096, 4096),
+}
+
+#: (:obj:`list` <:obj:`str`>) default data types
+DTYPES = ["uint16", "uint32", "float32"]
+
+#: (:obj:`dict` <:obj:`str`, :obj:`int`>) LIMA video image modes
+VDEOMODES = {"uint8": 0, "uint16": 1, "uint32": 2, "uint64": 3}
+
+#: (:obj:`dict` <:obj:`str`, :obj:`dict` <:obj:`str`, :obj:`any`>>)
+#:    configurations of tools with beforeplot hooks
+TOOLCONFIGS = {
+    "1d-plot": {"collect": True, "buffer_size": 100, "rows_to_plot": "0:8"},
+    "maxima": {},
+    "angle/q": {},
+    "diffractogram": {},
+}
+
+#: (:obj:`list` <:obj:`str`>) viewer configurations of command line
+#:    options, i.e. display, memorybuffer, rangewindow, mask,
+#:    transformation and scaling
+VIEWERCONFIGS = ["display", "memorybuffer", "rangewindow", "mask",
+                 "transformation", "scaling"]
+
+#: (:obj:`float`) source polling timeout in s
+SOURCETIMEOUT = 10.
+
+logger = logging.getLogger("lavue")
+
+
+class QuietHTTPRequestHandler(SimpleHTTPRequestHandler):
+
+    """ http request handler without access logs
+    """
+
+    def log_message(self, *args):
+        """ skips access logs
+        """
+
+
+class BenchmarkHTTPServer(TCPServer):
+
+    """ local http server of frame files
+    """
+
+    allow_reuse_address = True
+
+    def run(self):
+        """ serves requests
+        """
+        try:
+            self.serve_forever()
+        finally:
+            self.server_close()
+
+
+def statistics(times):
+    """ calculates latency statistics
+
+    :param times: measured latencies in s
+    :type times: :obj:`list` <:obj:`float`>
+    :returns: latency statistics in ms and frames per second
+    :rtype: :obj:`dict` <:obj:`str`, :obj:`float`>
+    """
+    tms = np.array(times, dtype="float64") * 1000.
+    mean = float(tms.mean())
+    return {
+        "repeat": len(times),
+        "mean_ms": mean,
+        "median_ms": float(np.median(tms)),
+        "min_ms": float(tms.min()),
+        "max_ms": float(tms.max()),
+        "std_ms": float(tms.std()),
+        "fps": (1000. / mean) if mean > 0 else None,
+    }
+
+
+def measure(command, repeat, warmup=1):
+    """ measures latency of the command
+
+    :param command: command with the frame counter as an argument
+    :type command: :obj:`function`
+    :param repeat: number of measurements
+    :type repeat: :obj:`int`
+    :param warmup: number of calls before measurements
+    :type warmup: :obj:`int`
+    :returns: latency statistics in ms and frames per second
+    :rtype: :obj:`dict` <:obj:`str`, :obj:`float`>
+    """
+    for i in range(warmup):
+        command(i)
+    times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        command(warmup + i)
+        times.append(time.perf_counter() - start)
+    return statistics(times)
+
+
+def syntheticFrames(shape, dtype, nframes=3, seed=0):
+    """ creates synthetic detector frames with a background, a few peaks
+        and hot pixels
+
+    :param shape: frame shape
+    :type shape: (:obj:`int`, :obj:`int`)
+    :param dtype: data type
+    :type dtype: :obj:`str`
+    :param nframes: number of different frames
+    :type nframes: :obj:`int`
+    :param seed: random seed
+    :type seed: :obj:`int`
+    :returns: synthetic frames
+    :rtype: :obj:`list` <:class:`numpy.ndarray`>
+    """
+    rnd = np.random.RandomState(seed)
+    xx = np.arange(shape[0], dtype="float32")[:, None]
+    yy = np.arange(shape[1], dtype="float32")[None, :]
+    peaks = np.zeros(shape, dtype="float32")
+    for _ in range(5):
+        x0 = rnd.uniform(0, shape[0])
+        y0 = rnd.uniform(0, shape[1])
+        peaks += 1000. * np.exp(
+            -((xx - x0) ** 2 + (yy - y0) ** 2) / 800.)
+    frames = []
+    for i in range(nframes):
+        frame = rnd.poisson(10 + i, size=shape).astype("float32") + peaks
+        hot = rnd.randint(0, frame.size, size=max(frame.size // 100000, 1))
+        frame.flat[hot] = 60000.
+        frames.append(frame.astype(dtype))
+    return frames
+
+
+class Benchmark(object):
+
+    """ performance benchmark of lavue sources, decoders and
+        processing stages
+    """
+
+    def __init__(self, options):
+        """ constructor
+
+        :param options: command line options
+        :type options: :class:`argparse.Namespace`
+        """
+        #: (:class:`argparse.Namespace`) command line options
+        self.options = options
+        #: (:obj:`list` <:obj:`dict` <:obj:`str`, :obj:`any`>>) results
+        self.results = []
+        #: (:obj:`str`) temporary directory
+        self.__tmpdir = tempfile.mkdtemp(prefix="lavuebenchmark")
+        #: (:class:`pyqtgraph.QtGui.QApplication`) Qt application
+        self.__app = None
+        #: (:class:`lavuelib.liveViewer.LiveViewer`) lavue live viewer
+        self.__viewer = None
+
+    def run(self):
+        """ runs selected benchmarks
+
+        :returns: benchmark report
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        groups = self.options.groups.split(",")
+        try:
+            for size in self.options.sizes.split(","):
+                shape = SIZES[size] if size in SIZES else tuple(
+                    int(s) for s in size.split("x"))
+                for dtype in self.options.dtypes.split(","):
+                    frames = syntheticFrames(
+                        shape, dtype, seed=self.options.seed)
+                    for group in groups:
+                        getattr(self, "_benchmark%s" % group.capitalize())(
+                            size, frames)
+        finally:
+            self.close()
+        return {
+            "environment": self.environment(),
+            "parameters": {
+                "sizes": self.options.sizes.split(","),
+                "dtypes": self.options.dtypes.split(","),
+                "repeat": self.options.repeat,
+                "groups": groups,
+                "seed": self.options.seed,
+            },
+            "results": self.results,
+        }
+
+    def close(self):
+        """ closes the live viewer and removes temporary files
+        """
+        self.__closeViewer()
+        shutil.rmtree(self.__tmpdir, ignore_errors=True)
+
+    @classmethod
+    def environment(cls):
+        """ provides versions of the benchmark environment
+
+        :returns: environment description
+        :rtype: :obj:`dict` <:obj:`str`, :obj:`any`>
+        """
+        return {
+            "lavue": lavuelib.__version__,
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "fabio": fabio.version,
+            "h5py": h5py.__version__,
+            "zmq": zmq.pyzmq_version() if ZMQ else None,
+            "platform": platform.platform(),
+            "processor": platform.processor(),
+            "cpus": os.cpu_count(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        }
+
+    def record(self, group, name, size, frame, stats=None, error=None):
+        """ records a benchmark result
+
+        :param group: benchmark group, e.g. sources, decoders or stages
+        :type group: :obj:`str`
+        :param name: benchmark name
+        :type name: :obj:`str`
+        :param size: frame size label
+        :type size: :obj:`str`
+        :param frame: benchmark frame
+        :type frame: :class:`numpy.ndarray`
+        :param stats: latency statistics
+        :type stats: :obj:`dict` <:obj:`str`, :obj:`float`>
+        :param error: error message
+        :type error: :obj:`str`
+        """
+        result = {
+            "group": group,
+            "name": name,
+            "size": size,
+            "shape": list(frame.shape),
+            "dtype": str(frame.dtype),
+            "pixels": int(frame.size),
+        }
+        if stats:
+            result.update(stats)
+            result["mpixels_per_s"] = \
+                frame.size * stats["fps"] / 1.e6 if stats["fps"] else None
+        if error:
+            result["error"] = str(error)
+        self.results.append(result)
+        if not self.options.quiet:
+            if error:
+                print("%-10s %-24s %5s %-8s  ERROR: %s" % (
+                    group, name, size, frame.dtype, error))
+            else:
+                print("%-10s %-24s %5s %-8s %9.3f ms %9.1f fps" % (
+                    group, name, size, frame.dtype,
+                    stats["median_ms"], stats["fps"] or 0))
+            sys.stdout.flush()
+
+    def __measure(self, group, name, size, frame, command, warmup=1):
+        """ measures and records the command latency
+
+        :param group: benchmark group
+        :type group: :obj:`str`
+        :param name: benchmark name
+        :type name: :obj:`str`
+        :param size: frame size label
+        :type size: :obj:`str`
+        :param frame: benchmark frame
+        :type frame: :class:`numpy.ndarray`
+        :param command: command with the frame counter as an argument
+        :type command: :obj:`function`
+        :param warmup: number of calls before measurements
+        :type warmup: :obj:`int`
+        """
+        try:
+            stats = measure(command, self.options.repeat, warmup)
+            self.record(group, name, size, frame, stats)
+        except Exception as e:
+            self.record(group, name, size, frame, error=e)
+
+    def __filename(self, name):
+        """ provides a temporary file name
+
+        :param name: base file name
+        :type name: :obj:`str`
+        :returns: file name in the temporary directory
+        :rtype: :obj:`str`
+        """
+        return os.path.join(self.__tmpdir, name)
+
+    def __tiffbytes(self, frame):
+        """ encodes the frame as TIFF
+
+        :param frame: image frame
+        :type frame: :class:`numpy.ndarray`
+        :returns: TIFF file content
+        :rtype: :obj:`bytes`
+        """
+        fname = self.__filename("frame.tif")
+        fabio.tifimage.TifImage(data=frame).write(fname)
+        with open(fname, "rb") as fl:
+            return fl.read()
+
+    def __cbfbytes(self, frame):
+        """ encodes the frame as CBF with the byte offset compression
+
+        :param frame: image frame
+        :type frame: :class:`numpy.ndarray`
+        :returns: CBF file content
+        :rtype: :obj:`bytes`
+        """
+        fname = self.__filename("frame.cbf")
+        fabio.cbfimage.CbfImage(data=frame.astype("int32")).write(fname)
+        with open(fname, "rb") as fl:
+            return fl.read()
+
+    @classmethod
+    def __vdeobytes(cls, frame, framenumber=0):
+        """ encodes the frame as LIMA VIDEO_IMAGE
+
+        :param frame: image frame
+        :type frame: :class:`numpy.ndarray`
+        :param framenumber: frame number
+        :type framenumber: :obj:`int`
+        :returns: LIMA VIDEO_IMAGE data
+        :rtype: (:obj:`str`, :obj:`bytes`)
+        """
+        hformat = '!IHHqiiHHHH'
+        endian = ord(struct.pack('=H', 1).decode()[-1])
+        header = struct.pack(
+            hformat, 0x5644454f, 1, VDEOMODES[str(frame.dtype)],
+            framenumber, frame.shape[1], frame.shape[0], endian,
+            struct.calcsize(hformat), 0, 0)
+        return ("VIDEO_IMAGE", header + frame.tobytes())
+
+    def _benchmarkDecoders(self, size, frames):
+        """ benchmarks CBF, TIFF and VDEO decoders
+
+        :param size: frame size label
+        :type size: :obj:`str`
+        :param frames: synthetic frames
+        :type frames: :obj:`list` <:class:`numpy.ndarray`>
+        """
+        frame = frames[0]
+        tif = np.frombuffer(self.__tiffbytes(frame), dtype=np.uint8)
+        self.__measure(
+            "decoders", "tiff", size, frame, self.__checked(
+                frame, lambda i: imageFileHandler.TIFLoader().load(tif)))
+        if frame.dtype.kind in "iu":
+            cbf = np.frombuffer(self.__cbfbytes(frame), dtype=np.uint8)
+            self.__measure(
+                "decoders", "cbf", size, frame, self.__checked(
+                    frame, lambda i: imageFileHandler.CBFLoader().load(cbf)))
+        if str(frame.dtype) in VDEOMODES:
+            vdeo = self.__vdeobytes(frame)
+
+            def decode(i):
+                decoder = isr.VDEOdecoder()
+                decoder.load(vdeo)
+                return decoder.decode()
+
+            self.__measure(
+                "decoders", "vdeo", size, frame,
+                self.__checked(frame, decode))
+
+    @classmethod
+    def __checked(cls, frame, command):
+        """ provides a command which checks the size of the decoded image
+
+        :param frame: encoded frame
+        :type frame: :class:`numpy.ndarray`
+        :param command: decoding command
+        :type command: :obj:`function`
+        :returns: checked decoding command
+        :rtype: :obj:`function`
+        """
+        def decode(i):
+            image = command(i)
+            if not hasattr(image, "size") or image.size != frame.size:
+                raise Exception("decoded image does not match the frame")
+            return image
+        return decode
+
+    def __fetch(self, source, feed=None):
+        """ provides a command which feeds and fetches a frame
+
+        :param source: image source
+        :type source: :class:`lavuelib.imageSource.BaseSource`
+        :param feed: command which feeds the frame with a given counter
+        :type feed: :obj:`function`
+        :returns: fetch command
+        :rtype: :obj:`function`
+        """
+        def fetch(i):
+            if feed is not None:
+                feed(i)
+            start = time.time()
+            while True:
+                image, name, _ = source.getData()
+                if name == "__ERROR__":
+                    raise Exception(image)
+                if name is not None and hasattr(image, "shape"):
+                    return image
+                if time.time() - start > SOURCETIMEOUT:
+                    raise Exception("source timeout")
+                time.sleep(0.0001)
+        return fetch
+
+    def __benchmarkSource(self, name, size, frame, source, feed=None):
+        """ benchmarks the image source
+
+        :param name: source name
+        :type name: :obj:`str`
+        :param size: frame size label
+        :type size: :obj:`str`
+        :param frame: benchmark frame
+        :type frame: :class:`numpy.ndarray`
+        :param source: image source
+        :type source: :class:`lavuelib.imageSource.BaseSource`
+        :param feed: command which feeds the frame with a given counter
+        :type feed: :obj:`function`
+        """
+        try:
+            if not source.connect():
+                raise Exception("cannot connect the source")
+        except Exception as e:
+            self.record("sources", name, size, frame, error=e)
+            return
+        try:
+            self.__measure(
+                "sources", name, size, frame, self.__fetch(source, feed))
+        finally:
+            source.disconnect()
+
+    def _benchmarkSources(self, size, frames):
+        """ benchmarks image sources with local stand-ins
+
+        :param size: frame size label
+        :type size: :obj:`str`
+        :param frames: synthetic frames
+        :type frames: :obj:`list` <:class:`numpy.ndarray`>
+        """
+        frame = frames[0]
+
+        fname = self.__filename("frames.h5")
+        with h5py.File(fname, "w") as fl:
+            fl.create_dataset(
+                "data", data=np.stack(frames),
+                chunks=(1,) + frame.shape)
+        source = isr.NXSFileSource()
+        source.setConfiguration("%s,/data,-1,0,True,False" % fname)
+        self.__benchmarkSource("nxsfile", size, frame, source)
+
+        with open(self.__filename("frame.tif"), "wb") as fl:
+            fl.write(self.__tiffbytes(frame))
+        server = BenchmarkHTTPServer(
+            ("127.0.0.1", 0),
+            functools.partial(
+                QuietHTTPRequestHandler, directory=self.__tmpdir))
+        thread = threading.Thread(target=server.run)
+        thread.start()
+        try:
+            source = isr.HTTPSource()
+            source.setConfiguration(
+                "http://127.0.0.1:%s/frame.tif" % server.server_address[1])
+            self.__benchmarkSource("http", size, frame, source)
+        finally:
+            server.shutdown()
+            thread.join()
+
+        if ZMQ:
+            self.__benchmarkZMQ(size, frames)
+
+        if isr.PYEPICS:
+            self.__benchmarkEpics(size, frames)
+
+    def __benchmarkZMQ(self, size, frames):
+        """ benchmarks the ZMQ source with a local publisher
+
+        :param size: frame size label
+        :type size: :obj:`str`
+        :param frames: synthetic frames
+        :type frames: :obj:`list` <:class:`numpy.ndarray`>
+        """
+        context = zmq.Context()
+        pub = context.socket(zmq.PUB)
+        try:
+            port = pub.bind_to_random_port("tcp://127.0.0.1")
+            source = isr.ZMQSource()
+            source.setConfiguration("localhost:%s/benchmark" % port)
+            messages = [
+                [b"benchmark", frm.tobytes(),
+                 json.dumps(list(frm.shape)).encode(),
+                 json.dumps(str(frm.dtype)).encode(), b""]
+                for frm in frames]
+
+            def feed(i):
+                msg = list(messages[i % len(messages)])
+                msg[-1] = ("benchmark_%s" % i).encode()
+                pub.send_multipart(msg)
+
+            self.__benchmarkSource("zmq", size, frames[0], source, feed)
+        finally:
+            pub.close(linger=0)
+            context.term()
+
+    def __benchmarkEpics(self, size, frames):
+        """ benchmarks the Epics PV source in the CA monitor mode
+
+        :param size: frame size label
+        :type size: :obj:`str`
+        :param frames: synthetic frames
+        :type frames: :obj:`list` <:class:`numpy.ndarray`>
+        """
+        epics = sys.modules.get("epics")
+        if not epicsfake.faked and not hasattr(epics, "pvs"):
+            return
+        pvname = "BENCH:image1:ArrayData"
+        monitor = isr.EpicsPVSource.monitor
+        isr.EpicsPVSource.monitor = True
+        try:
+            source = isr.EpicsPVSource()
+            shape = list(reversed(frames[0].shape))
+            source.setConfiguration("%s,%s" % (pvname, json.dumps(shape)))
+            values = [np.ascontiguousarray(frm).ravel() for frm in frames]
+
+            def feed(i):
+                epics.pvs[pvname].post(
+                    values[i % len(values)], timestamp=float(i))
+
+            self.__benchmarkSource(
+                "epicspv", size, frames[0], source, feed)
+        finally:
+            isr.EpicsPVSource.monitor = monitor
+
+    def _benchmarkStages(self, size, frames):
+        """ benchmarks processing stages shared by the live viewer
+            and the headless pipeline
+
+        :param size: frame size label
+        :type size: :obj:`str`
+        :param frames: synthetic frames
+        :type frames: :obj:`list` <:class:`numpy.ndarray`>
+        """
+        frame = frames[0]
+        maskfile = self.__maskFile(frame)
+        maskindices = np.transpose(
+            imagePipeline.loadImage(maskfile)) != 0
+        sx, sy = frame.shape
+        rois = {"roi": [[sx // 8, sy // 8, sx // 2, sy // 2],
+                        [sx // 2, sy // 4, sx - 1, sy - 1]]}
+        gaps = json.dumps([sx // 4, sx // 2])
+        fltlist = json.dumps([
+            ["lavuelib.plugins.filters.HGap", gaps],
+            ["lavuelib.plugins.filters.VGap", gaps]])
+        mbuffer = imageStages.ImageBuffer(10)
+        stack = np.stack(frames)
+        bkg = frames[-1]
+
+        stages = [
+            ("downsampling",
+             lambda fr, i: imageStages.downsampleImage(fr, 2, "max")),
+            ("rangewindow",
+             lambda fr, i: np.array(
+                 imageStages.cropImage(fr, 0, 0, sx // 2, sy // 2)[0])),
+            ("memorybuffer",
+             lambda fr, i: mbuffer.append(fr, "frame_%s" % i)),
+            ("channel",
+             lambda fr, i: imageStages.greyImage(stack, "sum")),
+            ("background",
+             lambda fr, i: imageStages.subtractBackground(fr, bkg)),
+            ("mask",
+             lambda fr, i: imageStages.maskPixels(fr, maskindices)),
+            ("maskhighvalue",
+             lambda fr, i: imageStages.maskHighValues(fr, 50000)),
+            ("transformation",
+             lambda fr, i: np.array(imageStages.transformImage(fr, "rot90"))),
+            ("scaling-log",
+             lambda fr, i: imageStages.scaleImage(fr, "log")),
+            ("scaling-sqrt",
+             lambda fr, i: imageStages.scaleImage(fr, "sqrt")),
+            ("stats",
+             lambda fr, i: imageStages.imageStats(fr, fr, fr)),
+            ("roisums",
+             lambda fr, i: [imageStages.roiSum(fr, crd)
+                            for crd in rois["roi"]]),
+        ]
+        for name, stage in stages:
+            self.__measure(
+                "stages", name, size, frame,
+                functools.partial(self.__frameCommand, stage, frames))
+
+        try:
+            pipeline = imagePipeline.ImagePipeline(state={
+                "maskfile": maskfile, "scaling": "log", "rois": rois})
+            self.__measure(
+                "stages", "process", size, frame,
+                lambda i: pipeline.process(
+                    frames[i % len(frames)], "frame_%s" % i))
+        except Exception as e:
+            self.record("stages", "process", size, frame, error=e)
+
+        for name in ["HGap", "VGap"]:
+            flt = getattr(pfilters, name)(gaps)
+            self.__measure(
+                "filters", name, size, frame,
+                lambda i: flt(frames[i % len(frames)], "", "", None))
+        chain = filters.FilterChain()
+        chain.reset(json.loads(fltlist))
+        self.__measure(
+            "filters", "FilterChain", size, frame,
+            lambda i: chain.apply(frames[i % len(frames)], "", "", None)[0])
+
+    @classmethod
+    def __frameCommand(cls, stage, frames, i):
+        """ calls the stage for the i-th frame
+
+        :param stage: stage with the frame and the counter as arguments
+        :type stage: :obj:`function`
+        :param frames: synthetic frames
+        :type frames: :obj:`list` <:class:`numpy.ndarray`>
+        :param i: frame counter
+        :type i: :obj:`int`
+        :returns: stage result
+        :rtype: :obj:`any`
+        """
+        return stage(frames[i % len(frames)], i)
+
+    def __maskFile(self, frame):
+        """ writes a mask file of the frame shape
+
+        :param frame: benchmark frame
+        :type frame: :class:`numpy.ndarray`
+        :returns: mask file name
+        :rtype: :obj:`str`
+        """
+        maskfile = self.__filename("mask.tif")
+        mask = np.zeros(frame.shape, dtype="uint8")
+        mask[::7, ::5] = 1
+        fabio.tifimage.TifImage(data=np.transpose(mask)).write(maskfile)
+        return maskfile
+
+    def __openViewer(self, **options):
+        """ opens the live viewer configured by command line options
+
+        :param options: command line options, e.g. tool or mbuffer
+        :type options: :obj:`dict` <:obj:`str`, :obj:`any`>
+        :returns: lavue live viewer
+        :rtype: :class:`lavuelib.liveViewer.LiveViewer`
+        """
+        from pyqtgraph import QtCore, QtGui
+        import lavuelib.liveViewer
+        self.__closeViewer()
+        if self.__app is None:
+            self.__app = QtGui.QApplication.instance() or \
+                QtGui.QApplication([])
+            self.__app.setOrganizationName("DESY")
+            self.__app.setApplicationName("LaVue: benchmarks")
+            self.__app.setOrganizationDomain("desy.de")
+        # every configuration starts from the default settings
+        QtCore.QSettings().clear()
+        cnf = argparse.Namespace(
+            mode='expert', source='test', instance='benchmarks',
+            tool='intensity', log='error', start=False)
+        for key, value in options.items():
+            setattr(cnf, key, value)
+        self.__viewer = lavuelib.liveViewer.LiveViewer(options=cnf)
+        return self.__viewer
+
+    def __closeViewer(self):
+        """ closes the live viewer
+        """
+        if self.__viewer is not None:
+            self.__viewer.close()
+            self.__viewer = None
+
+    def __measureViewer(self, name, size, frames, **options):
+        """ measures and records the image display of the live viewer
+            and its stage times
+
+        :param name: benchmark name
+        :type name: :obj:`str`
+        :param size: frame size label
+        :type size: :obj:`str`
+        :param frames: synthetic frames
+        :type frames: :obj:`list` <:class:`numpy.ndarray`>
+        :param options: command line options of the viewer
+        :type options: :obj:`dict` <:obj:`str`, :obj:`any`>
+        :returns: lavue live viewer
+        :rtype: :class:`lavuelib.liveViewer.LiveViewer`
+        """
+        frame = frames[0]
+        try:
+            viewer = self.__openViewer(**options)
+        except Exception as e:
+            self.record("gui", name, size, frame, error=e)
+            return
+        timers = viewer.stageTimers()
+        timers.reset()
+        stagetimes = {}
+
+        def display(i):
+            viewer.displayImage(
+                "frame_%s" % i, frames[i % len(frames)])
+            # the first call is the warmup
+            if i:
+                stages = timers.metrics()["stages"]
+                for stage in stages.keys():
+                    stagetimes.setdefault(stage, []).append(
+                        stages[stage]["last"] / 1000.)
+
+        self.__measure("gui", name, size, frame, display)
+        for stage in sorted(stagetimes.keys()):
+            self.record(
+                "viewer", "%s/%s" % (name, stage), size, frame,
+                statistics(stagetimes[stage]))
+        return viewer
+
+    def _benchmarkGui(self, size, frames):
+        """ benchmarks merging of image sources and image display
+            of the live viewer with processing stages and tools
+
+        :param size: frame size label
+        :type size: :obj:`str`
+        :param frames: synthetic frames
+        :type frames: :obj:`list` <:class:`numpy.ndarray`>
+        """
+        frame = frames[0]
+        sx, sy = frame.shape
+        configs = {
+            "display": {},
+            "memorybuffer": {"mbuffer": 10},
+            "rangewindow": {
+                "rangewindow": "%s:%s,%s:%s" % (0, sx // 2, 0, sy // 2),
+                "dsfactor": 2},
+            "mask": {"maskfile": self.__maskFile(frame)},
+            "transformation": {"transformation": "rot90 (clockwise)"},
+            "scaling": {"scaling": "log"},
+        }
+        for name in VIEWERCONFIGS:
+            viewer = self.__measureViewer(
+                name, size, frames, **configs[name])
+
+        if viewer is not None:
+            from lavuelib import liveViewer
+
+            def mergeData(i):
+                fulldata = [
+                    liveViewer.PartialData(
+                        "frame_%s_%s" % (i, sl),
+                        frames[(i + sl) % len(frames)],
+                        None, 0, None if sl else 0, "none")
+                    for sl in range(2)]
+                return viewer.mergeData(fulldata, "")
+
+            self.__measure("gui", "mergeData", size, frame, mergeData)
+
+        for alias, cnf in TOOLCONFIGS.items():
+            self.__measureViewer(
+                "tool-%s" % alias, size, frames, tool=alias,
+                toolconfig=json.dumps(cnf) if cnf else None)
+        self.__closeViewer()
+
+
+def main():
+    """ the main function
+    """
+    parser = argparse.ArgumentParser(
+        description="performance benchmarks of lavue image sources, "
+        "decoders and processing stages")
+    parser.add_argument(
+        "--sizes", dest="sizes", default="1M,4M,16M",
+        help="frame sizes, i.e. %s or WxH, e.g. 1M,4M,16M" %
+        ", ".join(SIZES.keys()))
+    parser.add_argument(
+        "--dtypes", dest="dtypes", default=",".join(DTYPES),
+        help="frame data types, e.g. uint16,uint32,float32")
+    parser.add_argument(
+        "--groups", dest="groups", default="decoders,sources,stages,gui",
+        help="benchmark groups, i.e. decoders, sources, stages, gui")
+    parser.add_argument(
+        "-r", "--repeat", dest="repeat", type=int, default=20,
+        help="number of measurements of each benchmark")
+    parser.add_argument(
+        "--seed", dest="seed", type=int, default=0,
+        help="random seed of synthetic frames")
+    parser.add_argument(
+        "-o", "--output", dest="output",
+        help="output JSON file name, the standard output if not set")
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", default=False, dest="quiet",
+        help="do not print the progress")
+    options = parser.parse_args()
+
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    logging.basicConfig(format="%(levelname)s: %(message)s")
+    logger.setLevel(logging.ERROR)
+    if not options.output:
+        options.quiet = True
+
+    report = Benchmark(options).run()
+    if options.output:
+        with open(options.output, "w") as fl:
+            json.dump(report, fl, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
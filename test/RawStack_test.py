@@ -0,0 +1,178 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import time
+import numpy as np
+
+from lavuelib import imageFileHandler
+from lavuelib import imageSource
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class RawStackTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+        self._fname = '%s/%s%s.raw' % (
+            os.getcwd(), self.__class__.__name__, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+        self._images = np.random.randint(
+            0, 60000, size=(6, 7, 9)).astype("<u2")
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        if os.path.isfile(self._fname):
+            os.remove(self._fname)
+
+    def writeFrames(self, images, header=0, frameheader=0, mode="wb"):
+        with open(self._fname, mode) as fl:
+            if header:
+                fl.write(b"H" * header)
+            for image in images:
+                if frameheader:
+                    fl.write(b"F" * frameheader)
+                fl.write(image.tobytes())
+
+    def test_handler(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        self.writeFrames(self._images[:4], header=100, frameheader=13)
+        handler = imageFileHandler.RawStackHandler.fromFormat(
+            self._fname,
+            '{"dtype": "uint16", "shape": [7, 9], '
+            '"header": 100, "frameheader": 13}')
+        self.assertEqual(handler.framesize, 13 + 7 * 9 * 2)
+        self.assertEqual(handler.getFrameCount(), 4)
+        for i in range(4):
+            image = handler.getImage(i)
+            self.assertTrue(np.array_equal(image, self._images[i]))
+            self.assertFalse(image.flags.writeable)
+        self.assertTrue(np.array_equal(handler.getImage(), self._images[3]))
+        self.assertTrue(
+            np.array_equal(handler.getImage(-4), self._images[0]))
+        self.assertEqual(handler.getImage(4), None)
+        self.assertEqual(handler.getImage(-5), None)
+
+        # a growing file with an incomplete frame
+        with open(self._fname, "ab") as fl:
+            fl.write(b"F" * 13 + self._images[4].tobytes()[:50])
+        self.assertEqual(handler.getFrameCount(), 4)
+        with open(self._fname, "ab") as fl:
+            fl.write(self._images[4].tobytes()[50:])
+        self.assertEqual(handler.getFrameCount(), 5)
+        self.assertTrue(np.array_equal(handler.getImage(), self._images[4]))
+
+    def test_handler_format(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        images = self._images.astype(">i4")
+        self.writeFrames(images, frameheader=8)
+        handler = imageFileHandler.RawStackHandler(
+            self._fname, dtype=">i4", shape=(7, 9), frameheader=8,
+            framesize=8 + 7 * 9 * 4)
+        self.assertEqual(handler.getFrameCount(), 6)
+        self.assertTrue(np.array_equal(handler.getImage(2), images[2]))
+        self.assertEqual(
+            imageFileHandler.RawStackHandler(
+                self._fname, dtype="float32", shape=[3]).dtype,
+            np.dtype("<f4"))
+
+        self.assertRaises(
+            ValueError, imageFileHandler.RawStackHandler, self._fname)
+        self.assertRaises(
+            ValueError, imageFileHandler.RawStackHandler, self._fname,
+            shape=[7, 9], framesize=10)
+        empty = imageFileHandler.RawStackHandler(
+            self._fname + ".none", shape=[7, 9])
+        self.assertEqual(empty.getFrameCount(), 0)
+        self.assertEqual(empty.getImage(), None)
+
+    def test_source(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        self.writeFrames(self._images[:3], header=4, frameheader=2)
+        source = imageSource.RawStackSource()
+        self.assertEqual(source.getData()[1], "__ERROR__")
+        source.setConfiguration(
+            "%s,uint16,7x9,4,2,-1,False" % self._fname)
+        self.assertTrue(source.connect())
+        for i in range(3):
+            image, name, metadata = source.getData()
+            self.assertTrue(
+                np.array_equal(image, np.transpose(self._images[i])))
+            self.assertEqual(name, "%s:%s" % (self._fname, i))
+            self.assertEqual(source.frameNumber(), i)
+        self.assertEqual(source.getData(), (None, None, None))
+        self.writeFrames(self._images[3:5], frameheader=2, mode="ab")
+        self.assertEqual(source.getData()[1], "%s:3" % self._fname)
+        self.assertEqual(source.getData()[1], "%s:4" % self._fname)
+        self.assertEqual(source.getData(), (None, None, None))
+        source.disconnect()
+
+        source.setConfiguration("%s,uint16,7x9,4,2,-1,True" % self._fname)
+        self.assertTrue(source.connect())
+        image, name, _ = source.getData()
+        self.assertEqual(name, "%s:4" % self._fname)
+        self.assertTrue(np.array_equal(image, np.transpose(self._images[4])))
+        self.assertEqual(source.getData(), (None, None, None))
+        self.writeFrames(self._images[5:], frameheader=2, mode="ab")
+        self.assertEqual(source.getData()[1], "%s:5" % self._fname)
+
+        source.setConfiguration("%s,uint16,7x9,4,2,1" % self._fname)
+        self.assertTrue(source.connect())
+        self.assertEqual(source.getData()[1], "%s:0" % self._fname)
+        self.assertEqual(source.getData()[1], "%s:1" % self._fname)
+        self.assertEqual(source.getData(), (None, None, None))
+
+        source.setConfiguration("%s,uint16,,4,2" % self._fname)
+        self.assertFalse(source.connect())
+
+
+if __name__ == '__main__':
+    unittest.main()
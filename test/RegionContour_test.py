@@ -0,0 +1,176 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import math
+import random
+import binascii
+import time
+import numpy as np
+
+from lavuelib import regionContour
+from lavuelib import geometryMaps
+
+if sys.version_info > (3,):
+    long = int
+
+
+class FlatIntegrator(object):
+
+    """ azimuthal integrator of a flat detector perpendicular to the beam
+    """
+
+    def __init__(self, dist, poni1, poni2):
+        self.dist = dist
+        self.poni1 = poni1
+        self.poni2 = poni2
+        self.rot1 = self.rot2 = self.rot3 = 0.
+        self.pixel1 = self.pixel2 = 1.
+        self.calls = 0
+
+    def __positions(self, shape):
+        self.calls += 1
+        d1, d2 = np.mgrid[0:shape[0], 0:shape[1]] + 0.5
+        return d1 - self.poni1, d2 - self.poni2
+
+    def twoThetaArray(self, shape):
+        p1, p2 = self.__positions(shape)
+        return np.arctan2(np.hypot(p1, p2), self.dist)
+
+    def chiArray(self, shape):
+        p1, p2 = self.__positions(shape)
+        return np.arctan2(p1, p2)
+
+
+class GeometrySettings(object):
+
+    """ settings with the detector geometry of the azimuthal integrator
+    """
+
+    def __init__(self, ai):
+        for name in geometryMaps.GEOMETRY:
+            setattr(self, name, 0.)
+        self.ai = ai
+
+
+# test fixture
+class RegionContourTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        pass
+
+    def test_isocurve(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        cx = self.__rnd.uniform(150, 250)
+        cy = self.__rnd.uniform(100, 200)
+        radius = self.__rnd.uniform(50, 90)
+        i, j = np.mgrid[0:300, 0:400]
+        lines = regionContour.isocurve(np.hypot(j - cx, i - cy) - radius)
+        self.assertEqual(len(lines), 1)
+        line = lines[0]
+        self.assertTrue(np.allclose(line[0], line[-1]))
+        self.assertTrue(np.allclose(
+            np.hypot(line[:, 1] - cx, line[:, 0] - cy), radius, atol=0.01))
+
+        lines = regionContour.isocurve(j - 10.5 + 0 * i)
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(len(lines[0]), 300)
+        self.assertTrue(np.allclose(lines[0][:, 1], 10.5))
+
+        lines = regionContour.isocurve(np.array([[1., -1.], [-1., 1.]]))
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(regionContour.isocurve(np.ones((5, 5))), [])
+        self.assertEqual(regionContour.isocurve(np.ones((5,))), [])
+
+    def test_regions(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        ai = FlatIntegrator(250., 110.2, 150.7)
+        maps = geometryMaps.GeometryMaps(GeometrySettings(ai))
+        contours = regionContour.RegionContours(maps, maxregions=2)
+        shape = (320, 240)
+        self.assertTrue(not contours.isCached(shape))
+        lines = contours.lines(shape, 10, 20, 0, 360)
+        self.assertTrue(contours.isCached(shape))
+        self.assertEqual(ai.calls, 2)
+        self.assertEqual(len(lines), 2)
+        for line, deg in zip(
+                sorted(lines, key=len), [10, 20]):
+            pts = np.array(line)
+            radius = 250. * math.tan(deg * math.pi / 180.)
+            self.assertTrue(np.allclose(
+                np.hypot(pts[:, 0] - 150.7, pts[:, 1] - 110.2), radius,
+                atol=0.1))
+
+        self.assertTrue(contours.lines(shape, 10, 20, 0, 360) is lines)
+        sector = contours.lines(shape, 5, 15, -30, 60)
+        self.assertEqual(len(sector), 1)
+        pts = np.array(sector[0])
+        tth = np.arctan2(
+            np.hypot(pts[:, 0] - 150.7, pts[:, 1] - 110.2), 250.)
+        chi = np.arctan2(pts[:, 1] - 110.2, pts[:, 0] - 150.7)
+        ontth = np.minimum(abs(tth - math.radians(5)),
+                           abs(tth - math.radians(15))) < 3e-3
+        onchi = np.minimum(abs(chi - math.radians(-30)),
+                           abs(chi - math.radians(60))) < 3e-2
+        self.assertTrue((ontth | onchi).all())
+        self.assertTrue(ontth.any() and onchi.any())
+
+        contours.lines(shape, 1, 3, 170, 200)
+        self.assertTrue(
+            contours.lines(shape, 10, 20, 0, 360) is not lines)
+        self.assertEqual(ai.calls, 2)
+
+        ai.poni1 = 100.
+        self.assertTrue(not contours.isCached(shape))
+        contours.lines(shape, 10, 20, 0, 360)
+        self.assertEqual(ai.calls, 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import time
+import numpy as np
+
+from lavuelib import ringBuffer
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class RingBufferTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        pass
+
+    def stack(self, rows, size):
+        """ the previous vstack accumulation """
+        buf = None
+        for row in rows:
+            if buf is not None and buf.shape[1] == row.shape[0]:
+                if buf.shape[0] >= size:
+                    buf = np.vstack([buf[buf.shape[0] - size + 1:, :], row])
+                else:
+                    buf = np.vstack([buf, row])
+            else:
+                buf = np.array([row])
+        return buf
+
+    def test_append(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        size = self.__rnd.randint(1, 20)
+        rows = [np.random.randint(0, 1000, size=13)
+                for _ in range(self.__rnd.randint(1, 60))]
+        buf = ringBuffer.RingBuffer(size)
+        self.assertEqual(buf.view(), None)
+        self.assertEqual(buf.copy(), None)
+        for i, row in enumerate(rows):
+            buf.append(row)
+            view = buf.view()
+            self.assertTrue(np.array_equal(
+                view, self.stack(rows[:i + 1], size)))
+            self.assertEqual(len(buf), min(i + 1, size))
+            self.assertEqual(view.dtype, row.dtype)
+            # a view of the storage
+            self.assertFalse(view.flags.owndata)
+            copy = buf.copy()
+            self.assertTrue(np.array_equal(copy, view))
+            self.assertTrue(copy.flags.owndata)
+        buf.append(rows[0] + 1000)
+        self.assertFalse(np.array_equal(buf.copy(), copy))
+        self.assertTrue(np.array_equal(
+            copy, self.stack(rows, size)))
+
+    def test_reshape(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        buf = ringBuffer.RingBuffer(5, dtype="float32")
+        for i in range(7):
+            buf.append(np.arange(4) + i)
+        self.assertEqual(buf.view().dtype, np.float32)
+        self.assertTrue(np.array_equal(
+            buf.view(), np.arange(4)[None, :] + np.arange(2, 7)[:, None]))
+
+        buf.setCapacity(3)
+        self.assertTrue(np.array_equal(
+            buf.view(), np.arange(4)[None, :] + np.arange(4, 7)[:, None]))
+        buf.append(np.arange(4) + 7)
+        self.assertTrue(np.array_equal(
+            buf.view(), np.arange(4)[None, :] + np.arange(5, 8)[:, None]))
+
+        buf.append(np.arange(6))
+        self.assertTrue(np.array_equal(buf.view(), [np.arange(6)]))
+
+        buf.setDType(None)
+        self.assertEqual(buf.view(), None)
+        buf.append(np.arange(6, dtype="int16"))
+        self.assertEqual(buf.view().dtype, np.int16)
+        buf.reset()
+        self.assertEqual(len(buf), 0)
+        self.assertEqual(buf.view(), None)
+
+
+if __name__ == '__main__':
+    unittest.main()
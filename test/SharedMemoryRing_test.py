@@ -0,0 +1,307 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import time
+import json
+import numpy as np
+
+from lavuelib import sharedMemoryRing
+from lavuelib import imageSource
+from lavuelib import imagePipeline
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class SharedMemoryRingTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+        self._fname = '%s/%s%s.shm' % (
+            os.getcwd(), self.__class__.__name__, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        if os.path.isfile(self._fname):
+            os.remove(self._fname)
+
+    def test_path(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        self.assertEqual(
+            sharedMemoryRing.ringPath("pilatus"),
+            os.path.join(sharedMemoryRing.SHMDIR, "pilatus"))
+        self.assertEqual(
+            sharedMemoryRing.ringPath(" /tmp/pilatus "), "/tmp/pilatus")
+
+    def test_write_read(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        writer = sharedMemoryRing.SharedMemoryRingWriter(
+            self._fname, nslots=3, shape=(40, 30), dtype="uint32")
+        reader = sharedMemoryRing.SharedMemoryRingReader(self._fname)
+        self.assertEqual(reader.nslots, 3)
+        self.assertEqual(reader.slotsize, 40 * 30 * 4)
+        self.assertEqual(reader.read(), None)
+
+        images = [np.random.randint(0, 1000, size=(40, 30)).astype("uint32"),
+                  np.random.rand(20, 7),
+                  np.random.randint(0, 100, size=(5, 4, 3)).astype("int8")]
+        for i, image in enumerate(images):
+            self.assertEqual(writer.write(image, timestamp=10. + i), i)
+            frame, frameid, timestamp = reader.read()
+            self.assertEqual(frameid, i)
+            self.assertEqual(timestamp, 10. + i)
+            self.assertEqual(frame.dtype, image.dtype)
+            self.assertTrue(np.array_equal(frame, image))
+            self.assertFalse(frame.flags.writeable)
+            self.assertEqual(reader.read(), None)
+        self.assertEqual(reader.writeIndex(), 3)
+
+        # the reader skips frames it has missed
+        for i in range(5):
+            writer.write(images[0] + i, frameid=100 + i)
+        frame, frameid, _ = reader.read()
+        self.assertEqual(frameid, 104)
+        self.assertEqual(reader.lag, 5)
+        self.assertTrue(np.array_equal(frame, images[0] + 4))
+        self.assertTrue(reader.intact())
+        writer.write(images[0], frameid=105)
+        self.assertTrue(reader.intact())
+        # the writer has wrapped around the ring
+        for i in range(2):
+            writer.write(images[0], frameid=106 + i)
+        self.assertFalse(reader.intact())
+        del frame
+
+        # metadata is stored after the frame data
+        writer.write(images[1], metadata='{"exposure_time": 0.1}')
+        frame = reader.read()[0]
+        self.assertTrue(np.array_equal(frame, images[1]))
+        self.assertEqual(reader.metadata, '{"exposure_time": 0.1}')
+        writer.write(images[2])
+        reader.read()
+        self.assertEqual(reader.metadata, "")
+        del frame
+
+        self.assertRaises(
+            ValueError, writer.write, np.zeros((41, 30), dtype="uint32"))
+        self.assertRaises(
+            ValueError, writer.write, images[0], metadata="{}")
+        self.assertRaises(
+            ValueError, writer.write, np.zeros((1, 1, 1, 1, 1)))
+        reader.close()
+        writer.close(unlink=True)
+        self.assertFalse(os.path.exists(self._fname))
+
+    def test_recreate(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        writer = sharedMemoryRing.SharedMemoryRingWriter(
+            self._fname, nslots=2, slotsize=100)
+        reader = sharedMemoryRing.SharedMemoryRingReader(self._fname)
+        writer.write(np.arange(10, dtype="uint8"), frameid=5)
+        self.assertEqual(reader.read()[1], 5)
+        self.assertEqual(reader.acquisition, 0)
+        writer.close(unlink=True)
+
+        writer = sharedMemoryRing.SharedMemoryRingWriter(
+            self._fname, nslots=4, slotsize=200)
+        self.assertEqual(reader.read(), None)
+        self.assertEqual(reader.nslots, 4)
+        self.assertEqual(reader.acquisition, 1)
+        writer.write(np.arange(20, dtype="uint8"), frameid=1)
+        frame, frameid, _ = reader.read()
+        self.assertEqual(frameid, 1)
+        self.assertTrue(np.array_equal(frame, np.arange(20)))
+        reader.close()
+        writer.close()
+
+        with open(self._fname, "wb") as fl:
+            fl.write(b"\0" * 200)
+        self.assertRaises(
+            ValueError, sharedMemoryRing.SharedMemoryRingReader, self._fname)
+
+    def test_source(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        source = imageSource.SharedMemorySource()
+        self.assertEqual(source.getData()[1], "__ERROR__")
+        source.setConfiguration(self._fname)
+        self.assertFalse(source.connect())
+
+        writer = sharedMemoryRing.SharedMemoryRingWriter(
+            self._fname, nslots=4, shape=(30, 20), dtype="uint16")
+        self.assertTrue(source.connect())
+        self.assertEqual(source.getData(), (None, None, None))
+
+        image = np.random.randint(0, 1000, size=(30, 20)).astype("uint16")
+        writer.write(image, frameid=7, timestamp=10.)
+        data, name, metadata = source.getData()
+        self.assertTrue(np.array_equal(data, np.transpose(image)))
+        # the frame is copied until the write rate is known
+        self.assertTrue(data.base.flags.owndata)
+        self.assertEqual(name, "%s (7)" % self._fname)
+        self.assertEqual(metadata, "")
+        self.assertEqual(source.frameNumber(), 7)
+        self.assertEqual(source.frameKey(data, name), ("frame", 0, 7))
+        self.assertTrue(source.fetchedTime() is not None)
+        self.assertEqual(source.getData(), (None, None, None))
+
+        # a frame is a view if the other slots cover its use
+        writer.write(image + 1, frameid=8, timestamp=10.01)
+        data = source.getData()[0]
+        self.assertFalse(data.base.flags.owndata)
+        # a frame whose slot can be reused meanwhile is copied
+        for i in range(2):
+            writer.write(image + 2, frameid=9 + i, timestamp=10.02 + i / 100.)
+        data = source.getData()[0]
+        self.assertTrue(data.base.flags.owndata)
+        self.assertTrue(np.array_equal(data, np.transpose(image + 2)))
+        del data
+
+        # the counter restarts with a new acquisition
+        writer.close()
+        writer = sharedMemoryRing.SharedMemoryRingWriter(
+            self._fname, nslots=4, shape=(30, 20), dtype="uint16")
+        self.assertEqual(source.getData(), (None, None, None))
+        writer.write(image, frameid=7)
+        data, name, _ = source.getData()
+        self.assertEqual(source.frameKey(data, name), ("frame", 1, 7))
+        del data
+        source.disconnect()
+        writer.close()
+
+    def test_decimation(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        writer = sharedMemoryRing.SharedMemoryRingWriter(
+            self._fname, nslots=4, slotsize=100)
+        reader = sharedMemoryRing.SharedMemoryRingReader(
+            self._fname, decimation=3)
+        frameids = []
+        for i in range(10):
+            writer.write(np.arange(10, dtype="uint8") + i, frameid=i)
+            frame = reader.read()
+            if frame is not None:
+                self.assertTrue(
+                    np.array_equal(frame[0], np.arange(10) + i))
+                frameids.append(frame[1])
+        self.assertEqual(frameids, [0, 3, 6, 9])
+
+        # a slower reader gets the last frame
+        for i in range(10, 15):
+            writer.write(np.arange(10, dtype="uint8") + i, frameid=i)
+        self.assertEqual(reader.read()[1], 14)
+
+        # the ring recreated in place is reopened
+        reader.decimation = 1
+        writer.close()
+        writer = sharedMemoryRing.SharedMemoryRingWriter(
+            self._fname, nslots=2, slotsize=1000)
+        self.assertEqual(reader.read(), None)
+        writer.write(np.arange(100, dtype="uint8"), frameid=1)
+        frame, frameid, _ = reader.read()
+        self.assertEqual(frameid, 1)
+        self.assertTrue(np.array_equal(frame, np.arange(100)))
+        del frame
+        reader.close()
+        writer.close(unlink=True)
+
+    def test_fanout(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        pipeline = imagePipeline.ImagePipeline(
+            imagePipeline.createSource("test", ""),
+            {"transformation": "transpose", "rangewindow": "10:100,20:200"})
+        publisher = imagePipeline.SharedMemoryPublisher(self._fname, 4)
+        full = imageSource.SharedMemorySource()
+        full.setConfiguration(self._fname)
+        decimated = imageSource.SharedMemorySource()
+        decimated.setConfiguration("%s, 2" % self._fname)
+        received = []
+        frames = pipeline.frames(0.001, 6, sourceregion=False)
+        for i, frame in enumerate(frames):
+            publisher.publish(frame)
+            if not i:
+                self.assertTrue(full.connect())
+                self.assertTrue(decimated.connect())
+            # readers get the decoded frames without the producer settings
+            self.assertEqual(frame["image"].shape, (180, 90))
+            data, name, _ = full.getData()
+            self.assertEqual(data.shape, (512, 256))
+            self.assertTrue(np.array_equal(data, frame["decodedimage"]))
+            self.assertEqual(name, "%s (%s)" % (self._fname, i))
+            data, name, _ = decimated.getData()
+            if data is not None:
+                self.assertTrue(np.array_equal(data, frame["decodedimage"]))
+                self.assertEqual(name, "%s (%s)" % (self._fname, i))
+                received.append(i)
+        self.assertEqual(received, [0, 2, 4])
+
+        # larger frames recreate the ring
+        image = np.random.randint(0, 1000, size=(600, 300)).astype("int32")
+        metadata = json.dumps({"exposure_time": 0.1})
+        publisher.publish({"decodedimage": image, "timestamp": time.time(),
+                           "metadata": metadata})
+        self.assertEqual(full.getData(), (None, None, None))
+        data, name, mdata = full.getData()
+        self.assertTrue(np.array_equal(data, image))
+        self.assertEqual(name, "%s (0)" % self._fname)
+        self.assertEqual(mdata, metadata)
+        full.disconnect()
+        decimated.disconnect()
+        publisher.close()
+        self.assertFalse(os.path.exists(self._fname))
+
+
+if __name__ == '__main__':
+    unittest.main()
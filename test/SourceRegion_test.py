@@ -0,0 +1,195 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import json
+import random
+import binascii
+import time
+import numpy as np
+import h5py
+
+from lavuelib import imageFileHandler
+from lavuelib import imageSource
+
+if sys.version_info > (3,):
+    long = int
+
+
+class ArraySource(imageSource.BaseSource):
+
+    """ source with a fixed image """
+
+    def __init__(self, image, metadata=""):
+        imageSource.BaseSource.__init__(self)
+        self.image = image
+        self.metadata = metadata
+
+    def getData(self):
+        if self.image is None:
+            return None, None, None
+        return self.image, "image", self.metadata
+
+
+# test fixture
+class SourceRegionTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+        self._fname = '%s/%s%s.h5' % (
+            os.getcwd(), self.__class__.__name__, methodName)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+        self._images = np.random.randint(
+            0, 1000, size=(4, 67, 45)).astype("uint16")
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        imageFileHandler.ChunkDecompressor.setNumberOfThreads(0)
+        if os.path.isfile(self._fname):
+            os.remove(self._fname)
+
+    def test_crop_binning(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.transpose(self._images[0])
+        source = ArraySource(image, json.dumps({"energy": 8000}))
+        self.assertEqual(source.region(), (None, 1, "max"))
+        self.assertTrue(
+            source.applyRegion(*source.getData())[0] is image)
+
+        source.setRegion(3, 5, 40, -7)
+        img, name, metadata = source.applyRegion(*source.getData())
+        self.assertEqual(name, "image")
+        self.assertTrue(np.array_equal(img, image[3:40, 5:-7]))
+        mdata = json.loads(metadata)
+        self.assertEqual(mdata["energy"], 8000)
+        self.assertEqual(
+            mdata["sourceregion"],
+            {"window": [3, 5, 40, -7], "binning": 1, "reduction": "max"})
+
+        source.setRegion(3, 5, 40, None, binning=4, reduction="sum")
+        img, name, metadata = source.applyRegion(*source.getData())
+        # the last partial blocks are reduced too
+        cut = np.zeros((40, 64), dtype="uint16")
+        cut[:37, :62] = image[3:40, 5:]
+        self.assertTrue(np.array_equal(
+            img, cut.reshape(10, 4, 16, 4).sum(axis=(1, 3))))
+        self.assertEqual(
+            json.loads(metadata)["sourceregion"]["binning"], 4)
+
+        source.image = np.stack([image, image + 1])
+        source.setRegion(None, None, None, None, binning=3, reduction="mean")
+        img, name, metadata = source.applyRegion(*source.getData())
+        self.assertEqual(img.shape, (2, 15, 23))
+        self.assertTrue(np.allclose(
+            img[1, :, :22], image[:45, :66].reshape(15, 3, 22, 3).mean(
+                axis=(1, 3)) + 1))
+        self.assertTrue(np.allclose(
+            img[1, :, 22], image[:, 66].reshape(15, 3).mean(axis=1) + 1))
+
+        # a window outside the image is left to the viewer
+        source.image = image
+        source.setRegion(100, 100, None, None)
+        img, name, metadata = source.applyRegion(*source.getData())
+        self.assertTrue(img is image)
+        self.assertEqual(metadata, source.metadata)
+        self.assertEqual(
+            source.applyRegion("error", "__ERROR__", ""),
+            ("error", "__ERROR__", ""))
+
+        # the last image is provided again within the changed region
+        source.image = None
+        source.setRegion(None, 2, None, None)
+        img, name, metadata = source.applyRegion(*source.getData())
+        self.assertTrue(np.array_equal(img, image[:, 2:]))
+        self.assertEqual(name, "image")
+        # the refreshed frame is not skipped as a duplicate
+        self.assertTrue(source.refreshed())
+        self.assertEqual(
+            source.applyRegion(*source.getData()), (None, None, None))
+        self.assertFalse(source.refreshed())
+
+    def test_hyperslab(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        with h5py.File(self._fname, "w") as fl:
+            fl.create_dataset(
+                "gzip", data=self._images, chunks=(1, 16, 20),
+                compression="gzip")
+            fl.create_dataset("contiguous", data=self._images)
+            fl.create_dataset(
+                "grow2", data=np.moveaxis(self._images, 0, 2))
+        handler = imageFileHandler.NexusFieldHandler(self._fname)
+        region = [10, 20, 30, -3]
+        for nthreads in [0, 2]:
+            imageFileHandler.ChunkDecompressor.setNumberOfThreads(nthreads)
+            for field, growing in [("gzip", 0), ("contiguous", 0),
+                                   ("grow2", 2)]:
+                node = handler.getNode("/%s" % field)
+                image = imageFileHandler.NexusFieldHandler.getImageRegion(
+                    node, 2, growing, region)
+                self.assertTrue(np.array_equal(
+                    np.transpose(image),
+                    np.transpose(self._images[2])[10:30, 20:-3]))
+                self.assertEqual(
+                    imageFileHandler.NexusFieldHandler.getImageRegion(
+                        node, 7, growing, region), None)
+                self.assertEqual(
+                    imageFileHandler.NexusFieldHandler.getImageRegion(
+                        node, 2, growing, [50, None, 60, None]), None)
+
+        source = imageSource.NXSFileSource()
+        source.setConfiguration(
+            "%s,/gzip,-1,0,True,False" % self._fname)
+        self.assertTrue(source.connect())
+        source.setRegion(10, 20, 30, -3, binning=2)
+        img, name, metadata = source.applyRegion(*source.getData())
+        cut = np.transpose(self._images[0])[10:30, 20:-3]
+        self.assertTrue(np.array_equal(
+            img, cut[:20, :44].reshape(10, 2, 22, 2).max(axis=(1, 3))))
+        self.assertEqual(
+            json.loads(metadata)["sourceregion"],
+            {"window": [10, 20, 30, -3], "binning": 2, "reduction": "max"})
+
+
+if __name__ == '__main__':
+    unittest.main()
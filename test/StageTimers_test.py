@@ -0,0 +1,104 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import sys
+import json
+
+from lavuelib import stageTimers
+
+
+# test fixture
+class StageTimersTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+    def test_add_frame(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        timers = stageTimers.StageTimers(smoothing=0.5)
+        metrics = timers.metrics()
+        self.assertEqual(metrics["frames"], 0)
+        self.assertEqual(metrics["stages"], {})
+        self.assertEqual(metrics["slowest"], None)
+        self.assertEqual(metrics["framerate"], None)
+
+        timers.add("fetch", 0.002)
+        timers.add("fetch", 0.002)
+        timers.add("render", 0.001)
+        timers.frameDone()
+        metrics = timers.metrics()
+        self.assertEqual(metrics["frames"], 1)
+        self.assertEqual(
+            metrics["stages"]["fetch"],
+            {"last": 4.0, "mean": 4.0, "max": 4.0})
+        self.assertEqual(metrics["slowest"], "fetch")
+
+        timers.add("render", 0.009)
+        timers.frameDone()
+        metrics = timers.metrics()
+        self.assertEqual(metrics["frames"], 2)
+        self.assertEqual(
+            metrics["stages"]["fetch"],
+            {"last": 0.0, "mean": 2.0, "max": 4.0})
+        self.assertEqual(
+            metrics["stages"]["render"],
+            {"last": 9.0, "mean": 5.0, "max": 9.0})
+        self.assertEqual(metrics["slowest"], "render")
+        self.assertTrue(metrics["framerate"] > 0)
+        json.dumps(metrics)
+
+    def test_timer_count(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        timers = stageTimers.StageTimers()
+        with timers.timer("stats"):
+            sum(range(1000))
+        timers.count("dropped", 3)
+        timers.count("duplicates")
+        timers.frameDone()
+        metrics = timers.metrics()
+        self.assertTrue(metrics["stages"]["stats"]["last"] >= 0)
+        self.assertEqual(metrics["dropped"], 3)
+        self.assertEqual(metrics["duplicates"], 1)
+
+        summary = timers.summary()
+        self.assertTrue(summary.startswith("stats "))
+        self.assertTrue(" *" in summary)
+        self.assertTrue(
+            summary.endswith("frames 1, dropped 3, duplicates 1"))
+
+        timers.reset()
+        metrics = timers.metrics()
+        self.assertEqual(metrics["frames"], 0)
+        self.assertEqual(metrics["dropped"], 0)
+        self.assertEqual(metrics["stages"], {})
+
+
+if __name__ == '__main__':
+    unittest.main()
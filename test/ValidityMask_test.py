@@ -0,0 +1,148 @@
+# Copyright (C) 2017  DESY, Notkestr. 85, D-22607 Hamburg
+#
+# lavue is an image viewing program for photon science imaging detectors.
+# Its usual application is as a live viewer using hidra as data source.
+#
+# This program is free software; you can redistribute it and/or
+# modify it under the terms of the GNU General Public License
+# as published by the Free Software Foundation in  version 2
+# of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin Street, Fifth Floor,
+# Boston, MA  02110-1301, USA.
+#
+# Authors:
+#     Jan Kotanski <jan.kotanski@desy.de>
+#
+import unittest
+import os
+import sys
+import random
+import binascii
+import time
+import numpy as np
+
+from lavuelib import validityMask
+from lavuelib import imagePipeline
+
+if sys.version_info > (3,):
+    long = int
+
+
+# test fixture
+class ValidityMaskTest(unittest.TestCase):
+
+    # constructor
+    # \param methodName name of the test method
+    def __init__(self, methodName):
+        unittest.TestCase.__init__(self, methodName)
+
+        try:
+            self.__seed = long(binascii.hexlify(os.urandom(16)), 16)
+        except NotImplementedError:
+            self.__seed = long(time.time() * 256)
+
+        self.__rnd = random.Random(self.__seed)
+
+    # test starter
+    # \brief Common set up
+    def setUp(self):
+        print("SEED = %s" % self.__seed)
+        np.random.seed(self.__rnd.randint(0, 2 ** 31))
+
+    # test closer
+    # \brief Common tear down
+    def tearDown(self):
+        pass
+
+    def test_mask_pixels(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(1, 1000, size=(23, 17)).astype("uint16")
+        self.assertTrue(validityMask.isIntegerImage(image))
+        self.assertTrue(validityMask.isIntegerImage(image.astype("int32")))
+        self.assertTrue(not validityMask.isIntegerImage(image.astype("f")))
+        self.assertTrue(not validityMask.isIntegerImage(None))
+
+        indices = np.zeros(image.shape, dtype=bool)
+        indices[3:5, 2:9] = True
+        masked, invalid = validityMask.maskPixels(image, indices)
+        self.assertEqual(masked.dtype, image.dtype)
+        self.assertTrue(masked is not image)
+        self.assertTrue(np.array_equal(invalid, indices))
+        self.assertTrue((masked[indices] == 0).all())
+        self.assertTrue(np.array_equal(masked[~indices], image[~indices]))
+
+        high = image > 900
+        masked, invalid = validityMask.maskPixels(masked, high, invalid)
+        self.assertTrue(np.array_equal(invalid, indices | high))
+        self.assertTrue(validityMask.matches(masked, invalid))
+        self.assertTrue(not validityMask.matches(masked.T, invalid))
+        self.assertTrue(not validityMask.matches(masked, None))
+
+        valid = validityMask.validPixels(masked, invalid)
+        self.assertEqual(valid.size, (~invalid).sum())
+        self.assertEqual(valid.min(), image[~invalid].min())
+        self.assertTrue(
+            validityMask.validPixels(masked, np.zeros(image.shape, bool))
+            is masked)
+
+    def test_projections(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(1, 100, size=(12, 9)).astype("int32")
+        invalid = np.zeros(image.shape, dtype=bool)
+        invalid[:, 4] = True
+        invalid[7, :] = True
+        masked = validityMask.maskedImage(image, invalid)
+        fimage = image.astype("float64")
+        fimage[invalid] = np.nan
+        with np.errstate(invalid='ignore'):
+            for axis in [0, 1]:
+                expected = np.nanmean(fimage, axis=axis)
+                result = validityMask.nanmean(masked, axis=axis)
+                self.assertTrue(np.allclose(
+                    result, expected, equal_nan=True))
+        self.assertTrue(np.isnan(validityMask.nanmean(masked, axis=0)[4]))
+        self.assertTrue(
+            validityMask.maskedImage(image, invalid.T) is image)
+
+    def test_pipeline(self):
+        fun = sys._getframe().f_code.co_name
+        print("Run: %s.%s() " % (self.__class__.__name__, fun))
+
+        image = np.random.randint(0, 1000, size=(40, 30)).astype("uint16")
+        pipeline = imagePipeline.ImagePipeline(
+            state={"maskhighvalue": 800, "validitymask": True,
+                   "transformation": "rot90", "scaling": "sqrt"})
+        frame = pipeline.process(image, "img1")
+        invalid = frame["validitymask"]
+        expected = np.swapaxes(np.flipud(image), 0, 1)
+        self.assertEqual(frame["image"].dtype, np.uint16)
+        self.assertTrue(np.array_equal(invalid, expected > 800))
+        self.assertTrue((frame["image"][invalid] == 0).all())
+        valid = expected[expected <= 800]
+        self.assertEqual(frame["stats"]["maxval"], float(valid.max()))
+        self.assertAlmostEqual(
+            frame["stats"]["meanval"], float(valid.mean()))
+        self.assertAlmostEqual(
+            frame["stats"]["minval"], float(np.sqrt(valid.min())), 5)
+
+        pipeline.setState({"validitymask": False})
+        frame = pipeline.process(image, "img2")
+        self.assertEqual(frame["validitymask"], None)
+        self.assertEqual(frame["image"].dtype, np.float64)
+        self.assertTrue(np.isnan(frame["image"][invalid]).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -65,6 +65,25 @@ import ASAPOImageSource_test
 import HttpImageSource_test
 import PyTineImageSource_test
 import EpicsImageSource_test
+import ImageRemap_test
+import RingBuffer_test
+import FrameDigest_test
+import ImagePipeline_test
+import ImageStages_test
+import StageTimers_test
+import SharedMemoryRing_test
+import RawStack_test
+import DirectoryWatcher_test
+import ImagePyramid_test
+import LookupTable_test
+import ImageOrientation_test
+import SourceRegion_test
+import BlockReduction_test
+import FilterChain_test
+import ValidityMask_test
+import RegionContour_test
+import GeometryMaps_test
+import NexusRecorder_test
 
 if not H5CPP_AVAILABLE and not H5PY_AVAILABLE:
     raise Exception("Please install h5py or pni")
@@ -87,6 +106,7 @@ if H5PY_AVAILABLE:
     import FileWriterH5PY_test
     import ASAPOImageSourceH5PY_test
     import HidraImageSourceH5PY_test
+    import NexusChunkReader_test
 if H5CPP_AVAILABLE:
     import H5CppWriter_test
     import FileWriterH5Cpp_test
@@ -145,6 +165,63 @@ def main():
     basicsuite.addTests(
         unittest.defaultTestLoader.loadTestsFromModule(
             ASAPOImageSource_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            ImageRemap_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            RingBuffer_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            FrameDigest_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            ImagePipeline_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            ImageStages_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            StageTimers_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            SharedMemoryRing_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            RawStack_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            DirectoryWatcher_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            ImagePyramid_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            LookupTable_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            ImageOrientation_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            SourceRegion_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            BlockReduction_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            FilterChain_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            ValidityMask_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            RegionContour_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            GeometryMaps_test))
+    basicsuite.addTests(
+        unittest.defaultTestLoader.loadTestsFromModule(
+            NexusRecorder_test))
     httpsuite.addTests(
         unittest.defaultTestLoader.loadTestsFromModule(
             HttpImageSource_test))
@@ -166,6 +243,9 @@ def main():
         basicsuite.addTests(
             unittest.defaultTestLoader.loadTestsFromModule(
                 HidraImageSourceH5PY_test))
+        basicsuite.addTests(
+            unittest.defaultTestLoader.loadTestsFromModule(
+                NexusChunkReader_test))
     if H5CPP_AVAILABLE:
         basicsuite.addTests(
             unittest.defaultTestLoader.loadTestsFromModule(
@@ -89,6 +89,17 @@ class Broker(object):
 
     def get_last(self, meta_only=True, stream="default"):
         print("Broker.get_last(%s, %s)" % (stream, meta_only))
+        return self._message(meta_only, stream)
+
+    # old version
+    # def get_next(self, gid, substream="default", meta_only=True):
+
+    def get_next(self, gid, meta_only=True, stream="default"):
+        print("Broker.get_next(%s, %s, %s)" % (gid, stream, meta_only))
+        self.gid = gid
+        return self._message(meta_only, stream)
+
+    def _message(self, meta_only, stream):
         global filename
         # self.gid = gid
         self.metaonly = meta_only
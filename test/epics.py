@@ -27,15 +27,21 @@ import fabio
 
 #: (:obj:`str`) file name
 filename = ""
+#: (:obj:`dict` <:obj:`str`, :class:`PV`>) created process variables
+pvs = {}
 
 
 class PV(object):
 
-    def __init__(self, pvname):
+    def __init__(self, pvname, auto_monitor=None):
         self.pvname = pvname
         self.timeout = None
         self.as_numpy = True
         self.data = None
+        self.auto_monitor = auto_monitor
+        self.value = None
+        self.callbacks = {}
+        pvs[pvname] = self
 
     def get(self, as_numpy, timeout):
         global filename
@@ -45,3 +51,18 @@ class PV(object):
             image = fabio.open(filename)
             data = image.data
             return data
+
+    def add_callback(self, callback=None, index=None, **kw):
+        if index is None:
+            index = len(self.callbacks) + 1
+        self.callbacks[index] = callback
+        return index
+
+    def remove_callback(self, index=None):
+        self.callbacks.pop(index, None)
+
+    def post(self, value, timestamp=None):
+        """ emulates a CA monitor update """
+        self.value = value
+        for callback in list(self.callbacks.values()):
+            callback(pvname=self.pvname, value=value, timestamp=timestamp)